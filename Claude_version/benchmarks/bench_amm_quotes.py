@@ -0,0 +1,40 @@
+"""Vectorized constant-product quotes from the local reserve mirror.
+
+Run from the project root:  python -m benchmarks.bench_amm_quotes
+"""
+import time
+import numpy as np
+from src.trading.amm_mirror import ReserveMirror
+
+PAIRS = 200
+SIZES = 50
+ROUNDS = 200
+
+
+def main():
+    rng = np.random.default_rng(7)
+    mirror = ReserveMirror()
+    pairs = [f"0x{i + 1:040x}" for i in range(PAIRS)]
+    for pair in pairs:
+        mirror.track(pair)
+        mirror.set_reserves(pair, int(rng.uniform(1e20, 1e24)), int(rng.uniform(1e20, 1e24)))
+    sizes = np.tile(np.logspace(15, 21, SIZES), (PAIRS, 1))
+
+    mirror.quote(pairs, sizes)
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        mirror.quote(pairs, sizes)
+    elapsed = (time.perf_counter() - started) / ROUNDS
+
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        mirror.quote(pairs[:1], sizes[:1, :1])
+    single = (time.perf_counter() - started) / ROUNDS
+
+    print(f"{PAIRS} pairs x {SIZES} sizes: {elapsed * 1e6:.0f} us per grid "
+          f"({elapsed / (PAIRS * SIZES) * 1e9:.0f} ns per quote)")
+    print(f"single quote: {single * 1e6:.1f} us")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""Throughput of the fast-path Swap/Sync decoder against web3 event decoding.
+
+Run from the project root:  python -m benchmarks.bench_log_decoder
+"""
+import json
+import random
+import time
+from eth_abi import encode
+from hexbytes import HexBytes
+from web3 import Web3
+from src.blockchain.backfill import SWAP_TOPIC
+from src.blockchain.log_decoder import decode_logs
+
+LOGS = 20000
+
+SWAP_ABI = [{'anonymous': False, 'name': 'Swap', 'type': 'event', 'inputs': [
+    {'indexed': True, 'name': 'sender', 'type': 'address'},
+    {'indexed': False, 'name': 'amount0In', 'type': 'uint256'},
+    {'indexed': False, 'name': 'amount1In', 'type': 'uint256'},
+    {'indexed': False, 'name': 'amount0Out', 'type': 'uint256'},
+    {'indexed': False, 'name': 'amount1Out', 'type': 'uint256'},
+    {'indexed': True, 'name': 'to', 'type': 'address'}
+]}]
+
+
+def make_logs(count, pair):
+    rng = random.Random(7)
+    address_topic = HexBytes('0x' + '00' * 12 + '11' * 20)
+    logs = []
+    for i in range(count):
+        amounts = [rng.getrandbits(96), 0, 0, rng.getrandbits(96)]
+        logs.append({
+            'address': pair,
+            'topics': [HexBytes(SWAP_TOPIC), address_topic, address_topic],
+            'data': HexBytes(encode(['uint256'] * 4, amounts)),
+            'blockNumber': 1000 + i // 100,
+            'transactionHash': HexBytes(rng.getrandbits(256).to_bytes(32, 'big')),
+            'transactionIndex': i % 100,
+            'blockHash': HexBytes('0x' + '22' * 32),
+            'logIndex': i % 100,
+            'removed': False
+        })
+    return logs
+
+
+def web3_decode(contract, logs):
+    # What EventListener/EventService did before: ABI decode, then dict(args)
+    swap = contract.events.Swap()
+    decoded = []
+    for log in logs:
+        event = swap.process_log(log)
+        decoded.append({
+            'transaction_hash': event['transactionHash'].hex(),
+            'block_number': event['blockNumber'],
+            'address': event['address'],
+            'args': dict(event['args'])
+        })
+    return decoded
+
+
+def main():
+    pair = Web3.to_checksum_address('0x' + 'ab' * 20)
+    contract = Web3().eth.contract(address=pair, abi=json.loads(json.dumps(SWAP_ABI)))
+    logs = make_logs(LOGS, pair)
+
+    print(f"{LOGS} Swap logs")
+    print(f"{'decoder':<12}{'seconds':>10}{'logs/s':>12}")
+    for name, fn in (('web3', lambda: web3_decode(contract, logs)), ('fast-path', lambda: decode_logs(logs))):
+        started = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - started
+        print(f"{name:<12}{elapsed:>10.3f}{LOGS / elapsed:>12.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+"""Compare per-call eth_call reads with batched and Multicall3-aggregated reads.
+
+Run from the project root:  python -m benchmarks.bench_read_aggregator
+"""
+import asyncio
+import time
+from web3 import Web3
+from src.blockchain.read_aggregator import HttpJsonRpcTransport, ReadAggregator
+from benchmarks.mock_node import MockNode
+
+PAIRS = 200
+LATENCY = 0.005
+
+
+async def read_all(reader, pairs):
+    return await asyncio.gather(*(reader.get_reserves(pair) for pair in pairs))
+
+
+async def main():
+    node = MockNode(latency=LATENCY)
+    url = await node.start()
+    pairs = [Web3.to_checksum_address(f"0x{i + 1:040x}") for i in range(PAIRS)]
+    for i, pair in enumerate(pairs):
+        node.reserves[pair.lower()] = (10 ** 18 + i, 2 * 10 ** 21 + i, 1)
+
+    print(f"{PAIRS} getReserves reads, {LATENCY * 1000:.0f} ms simulated RTT")
+    print(f"{'mode':<12}{'round-trips':>12}{'wall ms':>10}")
+    try:
+        # Baseline: one eth_call per read (max_batch=1 flushes every call alone)
+        for mode, max_batch in (('per-call', 1), ('batch', 500), ('multicall', 500)):
+            transport = HttpJsonRpcTransport(url)
+            reader = ReadAggregator(
+                transport,
+                mode='batch' if mode == 'per-call' else mode,
+                max_batch=max_batch
+            )
+            started = time.perf_counter()
+            await read_all(reader, pairs)
+            elapsed = time.perf_counter() - started
+            print(f"{mode:<12}{transport.round_trips:>12}{elapsed * 1000:>10.1f}")
+            await transport.close()
+    finally:
+        await node.stop()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,106 @@
+"""CPU per broadcast: per-client send_json against one shared orjson frame.
+
+Run from the project root:  python -m benchmarks.bench_ws_broadcast
+"""
+import asyncio
+import json
+import time
+from decimal import Decimal
+import numpy as np
+from src.api.ws_connection import ClientConnection, FanoutStats
+from src.utils.serialization import encode_frame
+
+CLIENTS = 2000
+BROADCASTS = 50
+
+
+class NullWebSocket:
+    """Accepts frames without I/O so only encoding and queueing are measured."""
+
+    async def send_text(self, frame):
+        pass
+
+    async def send_json(self, message):
+        # What Starlette's send_json does for every recipient
+        await self.send_text(json.dumps(message, separators=(',', ':'), ensure_ascii=False))
+
+
+def make_trade(i):
+    return {
+        'type': 'trade',
+        'pair': 'WETH/USDC',
+        'transaction_hash': f"0x{i:064x}",
+        'block_number': 19000000 + i,
+        'price': np.float64(3150.25 + i),
+        'amount_in': Decimal('1.234567890123456789'),
+        'amount_out': Decimal('3889.123456'),
+        'features': np.linspace(0, 1, 16),
+        'scores': {'momentum': np.float32(0.42), 'mean_reversion': np.float32(-0.17)}
+    }
+
+
+def plain(trade):
+    # The stdlib encoder can't take NumPy or Decimal values, so callers converted first
+    return {
+        **trade,
+        'price': float(trade['price']),
+        'amount_in': str(trade['amount_in']),
+        'amount_out': str(trade['amount_out']),
+        'features': trade['features'].tolist(),
+        'scores': {k: float(v) for k, v in trade['scores'].items()}
+    }
+
+
+async def drain(clients):
+    # Let the writer tasks send everything so their CPU is counted too
+    while any(client.depth for client in clients):
+        await asyncio.sleep(0)
+
+
+async def inline_send_json(sockets, clients, trades):
+    # The old broadcast loop: encode and await each client in turn
+    for trade in trades:
+        message = plain(trade)
+        for ws in sockets:
+            await ws.send_json(message)
+
+
+async def queued_per_client(sockets, clients, trades):
+    for trade in trades:
+        for client in clients:
+            client.send(trade)
+        await drain(clients)
+
+
+async def queued_shared_frame(sockets, clients, trades):
+    fanout = FanoutStats()
+    for trade in trades:
+        fanout.fan_out(clients, trade)
+        await drain(clients)
+
+
+async def main():
+    sockets = [NullWebSocket() for _ in range(CLIENTS)]
+    clients = [ClientConnection(ws, max_queue=2) for ws in sockets]
+    for client in clients:
+        client.start()
+    trades = [make_trade(i) for i in range(BROADCASTS)]
+    assert json.loads(encode_frame(trades[0])).keys() == plain(trades[0]).keys()
+
+    print(f"{BROADCASTS} broadcasts to {CLIENTS} clients")
+    print(f"{'path':<22}{'cpu ms/broadcast':>18}{'us/client':>12}")
+    for name, run in (
+        ('inline send_json', inline_send_json),
+        ('queued, per-client', queued_per_client),
+        ('queued, shared frame', queued_shared_frame)
+    ):
+        started = time.process_time()
+        await run(sockets, clients, trades)
+        cpu = (time.process_time() - started) / BROADCASTS
+        print(f"{name:<22}{cpu * 1000:>18.2f}{cpu / CLIENTS * 1e6:>12.2f}")
+    for client in clients:
+        await client.close()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
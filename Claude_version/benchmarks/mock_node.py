@@ -0,0 +1,75 @@
+"""Local JSON-RPC node stand-in used by the benchmarks.
+
+Serves eth_call for Uniswap V2 getReserves/decimals/balanceOf and Multicall3
+aggregate3, single or batched, with a fixed per-request latency.
+"""
+from typing import Dict, Any, Tuple
+import asyncio
+from aiohttp import web
+from eth_abi import encode, decode
+from src.blockchain.read_aggregator import (
+    MULTICALL3_ADDRESS,
+    AGGREGATE3,
+    GET_RESERVES,
+    DECIMALS,
+    BALANCE_OF
+)
+
+
+class MockNode:
+    def __init__(self, latency: float = 0.005):
+        self.latency = latency
+        self.reserves: Dict[str, Tuple[int, int, int]] = {}
+        self.decimals: Dict[str, int] = {}
+        self.balances: Dict[Tuple[str, str], int] = {}
+        self.http_requests = 0
+        self.url = None
+        self._runner = None
+
+    def _eth_call(self, to: str, data: bytes) -> Tuple[bool, bytes]:
+        to = to.lower()
+        selector, args = data[:4], data[4:]
+        if to == MULTICALL3_ADDRESS.lower() and selector == AGGREGATE3:
+            (calls,) = decode(['(address,bool,bytes)[]'], args)
+            results = [self._eth_call(target, call_data) for target, _, call_data in calls]
+            return True, encode(['(bool,bytes)[]'], [results])
+        if selector == GET_RESERVES and to in self.reserves:
+            return True, encode(['uint112', 'uint112', 'uint32'], list(self.reserves[to]))
+        if selector == DECIMALS and to in self.decimals:
+            return True, encode(['uint8'], [self.decimals[to]])
+        if selector == BALANCE_OF:
+            (owner,) = decode(['address'], args)
+            return True, encode(['uint256'], [self.balances.get((to, owner.lower()), 0)])
+        return False, b''
+
+    def _handle_one(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        if request['method'] != 'eth_call':
+            return {'jsonrpc': '2.0', 'id': request['id'], 'error': {'code': -32601, 'message': 'method not found'}}
+        call = request['params'][0]
+        ok, data = self._eth_call(call['to'], bytes.fromhex(call['data'][2:]))
+        if not ok:
+            return {'jsonrpc': '2.0', 'id': request['id'], 'error': {'code': 3, 'message': 'execution reverted'}}
+        return {'jsonrpc': '2.0', 'id': request['id'], 'result': '0x' + data.hex()}
+
+    async def handle(self, request: web.Request) -> web.Response:
+        self.http_requests += 1
+        await asyncio.sleep(self.latency)
+        body = await request.json()
+        if isinstance(body, list):
+            return web.json_response([self._handle_one(item) for item in body])
+        return web.json_response(self._handle_one(body))
+
+    async def start(self) -> str:
+        app = web.Application(client_max_size=64 * 1024 * 1024)
+        app.router.add_post('/', self.handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, '127.0.0.1', 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}"
+        return self.url
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
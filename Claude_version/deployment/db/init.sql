@@ -1,21 +1,52 @@
+-- trades, trade_events and predictions are range-partitioned by timestamp; partitions are
+-- created ahead of time and dropped after retention by PartitionManager
+-- (src/database/partitions.py). Unique keys must include the partition key.
 CREATE TABLE IF NOT EXISTS trades (
-    id SERIAL PRIMARY KEY,
-    transaction_hash VARCHAR(66) UNIQUE,
+    id BIGSERIAL,
+    transaction_hash VARCHAR(66),
     symbol VARCHAR(20) NOT NULL,
     amount DECIMAL NOT NULL,
     price DECIMAL NOT NULL,
     timestamp TIMESTAMP NOT NULL,
     status VARCHAR(20) NOT NULL,
-    type VARCHAR(10) NOT NULL
-);
+    type VARCHAR(10) NOT NULL,
+    PRIMARY KEY (id, timestamp),
+    UNIQUE (transaction_hash, timestamp)
+) PARTITION BY RANGE (timestamp);
+
+-- Catches rows outside every managed partition
+CREATE TABLE IF NOT EXISTS trades_default PARTITION OF trades DEFAULT;
+
+-- Swaps observed on monitored DEX pools, partitioned by block timestamp
+-- (stable across replays, so re-persisting an event hits the same row)
+CREATE TABLE IF NOT EXISTS trade_events (
+    id BIGSERIAL,
+    transaction_hash VARCHAR(66) NOT NULL,
+    log_index INTEGER NOT NULL,
+    block_number BIGINT NOT NULL,
+    timestamp TIMESTAMP NOT NULL,
+    dex_address VARCHAR(42) NOT NULL,
+    event_type VARCHAR(20) NOT NULL,
+    token_in VARCHAR(42),
+    token_out VARCHAR(42),
+    amount_in DECIMAL,
+    amount_out DECIMAL,
+    PRIMARY KEY (id, timestamp),
+    UNIQUE (transaction_hash, log_index, timestamp)
+) PARTITION BY RANGE (timestamp);
+
+CREATE TABLE IF NOT EXISTS trade_events_default PARTITION OF trade_events DEFAULT;
 
 CREATE TABLE IF NOT EXISTS predictions (
-    id SERIAL PRIMARY KEY,
+    id BIGSERIAL,
     symbol VARCHAR(20) NOT NULL,
     prediction DECIMAL NOT NULL,
     confidence DECIMAL NOT NULL,
-    timestamp TIMESTAMP NOT NULL
-);
+    timestamp TIMESTAMP NOT NULL,
+    PRIMARY KEY (id, timestamp)
+) PARTITION BY RANGE (timestamp);
+
+CREATE TABLE IF NOT EXISTS predictions_default PARTITION OF predictions DEFAULT;
 
 CREATE TABLE IF NOT EXISTS performance_metrics (
     id SERIAL PRIMARY KEY,
@@ -23,8 +54,55 @@ CREATE TABLE IF NOT EXISTS performance_metrics (
     sharpe_ratio DECIMAL NOT NULL,
     max_drawdown DECIMAL NOT NULL,
     win_rate DECIMAL NOT NULL,
-    timestamp TIMESTAMP NOT NULL
+    timestamp TIMESTAMP NOT NULL,
+    -- Rollup bucket state ('1h', '1d' or '1w' buckets)
+    timeframe VARCHAR(10),
+    bucket_start TIMESTAMP,
+    start_equity DECIMAL,
+    end_equity DECIMAL,
+    peak_equity DECIMAL,
+    min_equity DECIMAL,
+    trade_count INTEGER DEFAULT 0,
+    closed_trades INTEGER DEFAULT 0,
+    winning_trades INTEGER DEFAULT 0,
+    return_sum DOUBLE PRECISION DEFAULT 0,
+    return_sq_sum DOUBLE PRECISION DEFAULT 0,
+    UNIQUE (timeframe, bucket_start)
 );
 
-CREATE INDEX idx_trades_timestamp ON trades(timestamp);
+-- Tables created before the rollup columns existed: CREATE TABLE IF NOT
+-- EXISTS leaves them unchanged, so add the columns and the upsert key here
+ALTER TABLE performance_metrics
+    ADD COLUMN IF NOT EXISTS timeframe VARCHAR(10),
+    ADD COLUMN IF NOT EXISTS bucket_start TIMESTAMP,
+    ADD COLUMN IF NOT EXISTS start_equity DECIMAL,
+    ADD COLUMN IF NOT EXISTS end_equity DECIMAL,
+    ADD COLUMN IF NOT EXISTS peak_equity DECIMAL,
+    ADD COLUMN IF NOT EXISTS min_equity DECIMAL,
+    ADD COLUMN IF NOT EXISTS trade_count INTEGER DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS closed_trades INTEGER DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS winning_trades INTEGER DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS return_sum DOUBLE PRECISION DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS return_sq_sum DOUBLE PRECISION DEFAULT 0;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_constraint
+        WHERE conrelid = 'performance_metrics'::regclass
+          AND conname = 'performance_metrics_timeframe_bucket_start_key'
+    ) THEN
+        ALTER TABLE performance_metrics
+            ADD CONSTRAINT performance_metrics_timeframe_bucket_start_key UNIQUE (timeframe, bucket_start);
+    END IF;
+END $$;
+
+-- Rows arrive in time order, so BRIN indexes stay tiny and still skip
+-- unrelated blocks; indexes on the parent are created on every partition
+CREATE INDEX idx_trades_timestamp ON trades USING BRIN (timestamp);
+CREATE INDEX idx_trades_symbol_timestamp ON trades(symbol, timestamp);
+CREATE INDEX idx_trade_events_timestamp ON trade_events USING BRIN (timestamp);
+CREATE INDEX idx_trade_events_dex_timestamp ON trade_events(dex_address, timestamp);
+CREATE INDEX idx_trade_events_block ON trade_events(block_number);
+CREATE INDEX idx_predictions_timestamp ON predictions USING BRIN (timestamp);
 CREATE INDEX idx_predictions_symbol_timestamp ON predictions(symbol, timestamp); 
\ No newline at end of file
@@ -0,0 +1,199 @@
+from typing import Dict, Any, Optional, Set, Tuple, Hashable
+import asyncio
+import time
+from src.api.subscriptions import ALL_PAIRS, Topic, normalize_pair
+from src.api.ws_connection import FanoutStats
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+MODES = ('latest', 'summary')
+
+ConflationKey = Tuple[Topic, float, str]
+
+
+def _numeric(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+class _PairWindow:
+    """Updates for one pair since the last delivery."""
+
+    __slots__ = ('count', 'latest', 'fields', 'started')
+
+    def __init__(self):
+        self.count = 0
+        self.latest: Any = None
+        self.fields: Dict[str, Dict[str, float]] = {}
+        self.started = time.time()
+
+    def add(self, message: Any, summarize: bool) -> None:
+        self.count += 1
+        self.latest = message
+        if not summarize or not isinstance(message, dict):
+            return
+        for name, value in message.items():
+            if not _numeric(value):
+                continue
+            stats = self.fields.get(name)
+            if stats is None:
+                self.fields[name] = {'first': value, 'last': value, 'min': value, 'max': value, 'sum': value}
+            else:
+                stats['last'] = value
+                stats['min'] = min(stats['min'], value)
+                stats['max'] = max(stats['max'], value)
+                stats['sum'] += value
+
+
+class Conflator:
+    """Coalesce one topic's updates and deliver at most once per ``interval`` per pair.
+
+    ``latest`` delivers the newest message (with a ``conflated`` count);
+    ``summary`` delivers the update count, the newest message and
+    first/last/min/max/sum of every numeric field. A channel-wide topic
+    keeps a window per pair. The first update after a quiet interval goes
+    out on the next loop iteration, so conflation only delays bursts.
+    """
+
+    def __init__(self, topic: Topic, interval: float, mode: str, fanout: FanoutStats):
+        if mode not in MODES:
+            raise ValueError(f"Invalid conflation mode: {mode}")
+        self.topic = topic
+        self.interval = interval
+        self.mode = mode
+        self.fanout = fanout
+        self.clients: Set[Hashable] = set()
+        self._windows: Dict[str, _PairWindow] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._last_flush = 0.0
+        self.stats = {'received': 0, 'delivered': 0}
+
+    def offer(self, pair: str, message: Any) -> None:
+        window = self._windows.get(pair)
+        if window is None:
+            window = self._windows[pair] = _PairWindow()
+        window.add(message, self.mode == 'summary')
+        self.stats['received'] += 1
+        if self._timer is None:
+            loop = asyncio.get_running_loop()
+            delay = max(0.0, self._last_flush + self.interval - loop.time())
+            self._timer = loop.call_later(delay, self.flush)
+
+    def _render(self, pair: str, window: _PairWindow) -> Any:
+        if self.mode == 'latest':
+            if isinstance(window.latest, dict):
+                return {**window.latest, 'conflated': window.count}
+            return window.latest
+        return {
+            'type': 'summary',
+            'channel': self.topic[0],
+            'pair': pair,
+            'count': window.count,
+            'window_start': window.started,
+            'window_end': time.time(),
+            'latest': window.latest,
+            'fields': window.fields
+        }
+
+    def flush(self) -> None:
+        self._timer = None
+        self._last_flush = asyncio.get_running_loop().time()
+        windows, self._windows = self._windows, {}
+        for pair, window in windows.items():
+            try:
+                # Encoded once per pair for every conflating subscriber
+                self.fanout.fan_out(list(self.clients), self._render(pair, window))
+                self.stats['delivered'] += 1
+            except Exception as e:
+                logger.error(f"Error delivering conflated {self.topic[0]} update for {pair}: {str(e)}")
+
+    def close(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._windows.clear()
+
+
+class ConflationHub:
+    """Conflated subscriptions, shared per (topic, interval, mode) across clients.
+
+    Work per update is one dict lookup plus one window update per distinct
+    conflation setting on the topic, not per client.
+    """
+
+    def __init__(self, fanout: FanoutStats, min_interval: float = 0.05, max_interval: float = 60.0):
+        self.fanout = fanout
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self._by_topic: Dict[Topic, Dict[Tuple[float, str], Conflator]] = {}
+        self._by_client: Dict[Hashable, Set[ConflationKey]] = {}
+
+    def subscribe(self, client: Hashable, channel: str, pair: str, interval: float, mode: str = 'latest') -> bool:
+        """Returns False if the client already had exactly this conflated subscription."""
+        if not self.min_interval <= interval <= self.max_interval:
+            raise ValueError(f"Conflation interval must be between {self.min_interval} and {self.max_interval}s")
+        if mode not in MODES:
+            raise ValueError(f"Invalid conflation mode: {mode}")
+        topic = (channel, normalize_pair(pair))
+        key = (topic, float(interval), mode)
+        keys = self._by_client.setdefault(client, set())
+        if key in keys:
+            return False
+        # One conflation setting per topic and client
+        self.unsubscribe(client, *topic)
+        conflators = self._by_topic.setdefault(topic, {})
+        conflator = conflators.get(key[1:])
+        if conflator is None:
+            conflator = conflators[key[1:]] = Conflator(topic, key[1], mode, self.fanout)
+        conflator.clients.add(client)
+        keys.add(key)
+        return True
+
+    def unsubscribe(self, client: Hashable, channel: str, pair: str) -> bool:
+        topic = (channel, normalize_pair(pair))
+        keys = self._by_client.get(client)
+        if not keys:
+            return False
+        removed = [key for key in keys if key[0] == topic]
+        for key in removed:
+            keys.discard(key)
+            self._discard(key, client)
+        return bool(removed)
+
+    def _discard(self, key: ConflationKey, client: Hashable) -> None:
+        topic, interval, mode = key
+        conflators = self._by_topic.get(topic, {})
+        conflator = conflators.get((interval, mode))
+        if conflator is None:
+            return
+        conflator.clients.discard(client)
+        if not conflator.clients:
+            conflator.close()
+            del conflators[(interval, mode)]
+            if not conflators:
+                del self._by_topic[topic]
+
+    def remove(self, client: Hashable) -> None:
+        for key in self._by_client.pop(client, ()):
+            self._discard(key, client)
+
+    def offer(self, channel: str, pair: str, message: Any) -> None:
+        """Feed a published message to the topic's (and channel-wide) conflators."""
+        topics = [(channel, ALL_PAIRS)]
+        if pair != ALL_PAIRS:
+            topics.append((channel, normalize_pair(pair)))
+        for topic in topics:
+            for conflator in self._by_topic.get(topic, {}).values():
+                conflator.offer(pair, message)
+
+    def subscriptions(self, client: Hashable) -> Set[ConflationKey]:
+        return set(self._by_client.get(client, ()))
+
+    def get_metrics(self) -> Dict[str, Any]:
+        conflators = [c for by_setting in self._by_topic.values() for c in by_setting.values()]
+        return {
+            'conflators': len(conflators),
+            'clients': len(self._by_client),
+            'received': sum(c.stats['received'] for c in conflators),
+            'delivered': sum(c.stats['delivered'] for c in conflators)
+        }
@@ -1,5 +1,5 @@
 from fastapi import Request
-from fastapi.responses import JSONResponse
+from src.utils.serialization import FastJSONResponse
 import time
 from collections import defaultdict
 
@@ -17,7 +17,7 @@ class RateLimiter:
                                   if now - req_time < 60]
         
         if len(self.requests[client_ip]) >= self.requests_per_minute:
-            return JSONResponse(
+            return FastJSONResponse(
                 status_code=429,
                 content={"detail": "Too many requests"}
             )
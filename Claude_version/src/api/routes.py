@@ -1,25 +1,37 @@
-from fastapi import APIRouter, HTTPException, Depends, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, HTTPException, Depends, Query, WebSocket, WebSocketDisconnect
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from typing import List, Dict, Any
 from datetime import datetime, timedelta
+import asyncio
 import jwt
 from pydantic import BaseModel
-from fastapi.responses import JSONResponse
 
 from src.utils.logger import get_logger
 from src.trading.strategy_manager import StrategyManager
 from src.models.trading_model import TradingModel
 from src.config.settings import settings
 from src.utils.error_handler import ErrorHandler, TradingError
+from src.utils.serialization import FastJSONResponse
 from src.services.trading_service import TradingService
+from src.trading.performance_tracker import PerformanceTracker
+from src.blockchain.connection_manager import ConnectionManager, PooledWeb3
+from src.blockchain.tx_pipeline import TransactionPipeline
+from src.blockchain.gas_oracle import GasOracle
+from src.trading.pair_manager import PairManager
+from src.trading.router import RoutingEngine
+from src.trading.stop_trigger import StopTriggerEngine
+from src.trading.stop_loss import StopLossManager
+from src.models.volatility import VolatilityTracker
+from src.database.models import database, store, RANGE_TABLES
 from src.services.health_check import (
     check_database_connection,
     check_model_status,
-    check_websocket_status
+    check_websocket_status,
+    check_rpc_providers
 )
 
 logger = get_logger()
-router = APIRouter()
+router = APIRouter(default_response_class=FastJSONResponse)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/token")
 
 # Models
@@ -77,13 +89,16 @@ async def execute_trade(
 ):
     """Execute a manual trade with error handling."""
     try:
-        trading_service = TradingService(strategy_manager, model)
         result = await trading_service.execute_trade({
             "symbol": trade_request.symbol,
             "amount": trade_request.amount,
             "action": trade_request.action,
             "strategy": trade_request.strategy,
-            "price": trade_request.price
+            "price": trade_request.price,
+            # Monitored pairs are impact-checked and routed from mirrored reserves
+            **pair_manager.trade_params(
+                trade_request.symbol, trade_request.action, trade_request.amount, trade_request.price
+            )
         })
         return result
     except TradingError as e:
@@ -112,6 +127,34 @@ async def get_predictions(
         logger.error(f"Error getting predictions: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/history/{table}")
+async def get_history(
+    table: str,
+    start: datetime,
+    end: datetime,
+    symbols: List[str] = Query(default=[]),
+    limit: int = 1000,
+    current_user: User = Depends(get_current_user)
+):
+    """Trades, trade events or predictions in [start, end), read only from overlapping partitions."""
+    try:
+        if table not in RANGE_TABLES:
+            raise HTTPException(status_code=404, detail=f"Unknown history table: {table}")
+        if table == 'trade_events':
+            # Swaps are stored per pool; monitored symbols resolve to their pool address
+            symbols = [
+                pair.address if (pair := pair_manager.by_symbol(symbol)) is not None else symbol.lower()
+                for symbol in symbols
+            ]
+        rows = await store.range(table, start, end, symbols, limit=min(limit, 10000))
+        # Rendered directly: skips FastAPI's per-value jsonable_encoder pass
+        return FastJSONResponse({"table": table, "count": len(rows), "rows": rows})
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error reading {table} history: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/performance")
 async def get_performance(
     timeframe: str = "1d",
@@ -119,13 +162,10 @@ async def get_performance(
 ):
     """Get trading performance metrics."""
     try:
-        # Implement performance metrics calculation
-        return {
-            "total_return": 0.15,
-            "sharpe_ratio": 1.2,
-            "max_drawdown": -0.05,
-            "win_rate": 0.65
-        }
+        # Served from pre-aggregated rollup buckets, never from raw trades
+        return FastJSONResponse(performance_tracker.get_metrics(timeframe))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error getting performance: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -169,7 +209,7 @@ async def health_check():
         if all([db_healthy, model_healthy, ws_healthy]):
             return {"status": "healthy"}
         else:
-            return JSONResponse(
+            return FastJSONResponse(
                 status_code=503,
                 content={
                     "status": "unhealthy",
@@ -182,11 +222,102 @@ async def health_check():
             )
     except Exception as e:
         logger.error(f"Health check failed: {str(e)}")
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=500,
             content={"status": "error", "detail": str(e)}
         ) 
 
+@router.get("/health/database")
+async def database_health():
+    """Database ping latency and connection pool stats."""
+    try:
+        latency = await asyncio.wait_for(database.ping(), timeout=2.0)
+        return {"latency_ms": round(latency * 1000, 3), **database.get_pool_stats()}
+    except Exception as e:
+        logger.error(f"Database health check failed: {str(e)}")
+        return FastJSONResponse(
+            status_code=503,
+            content={"status": "unhealthy", "detail": str(e), **database.get_pool_stats()}
+        )
+
+@router.get("/health/providers")
+async def provider_health():
+    """RPC provider pool health and per-provider latency/error stats."""
+    try:
+        healthy = await check_rpc_providers(connection_manager)
+        return FastJSONResponse(
+            status_code=200 if healthy else 503,
+            content=connection_manager.get_pool_stats()
+        )
+    except Exception as e:
+        logger.error(f"Provider health check failed: {str(e)}")
+        return FastJSONResponse(
+            status_code=500,
+            content={"status": "error", "detail": str(e)}
+        )
+
 # Add at module level
-strategy_manager = StrategyManager()
-model = TradingModel() 
\ No newline at end of file
+# One rolling ATR/volatility state per symbol, fed by the event service's
+# price ticks (see main.py) and shared by strategies and stop sizing
+volatility_tracker = VolatilityTracker(
+    atr_period=settings.VOLATILITY_ATR_PERIOD,
+    volatility_window=settings.VOLATILITY_WINDOW,
+    bar_interval=settings.VOLATILITY_BAR_INTERVAL
+)
+strategy_manager = StrategyManager(volatility=volatility_tracker)
+stop_loss_manager = StopLossManager(
+    {
+        'default_stop_loss': settings.DEFAULT_STOP_LOSS,
+        'trailing_stop_enabled': settings.TRAILING_STOP_ENABLED,
+        'trailing_stop_distance': settings.TRAILING_STOP_DISTANCE
+    },
+    volatility=volatility_tracker
+)
+model = TradingModel()
+performance_tracker = PerformanceTracker(store=store)
+# Event ingestion, the gas oracle and transactions all fail over through this pool
+connection_manager = ConnectionManager(
+    list(dict.fromkeys([settings.WEB3_PROVIDER_URI, *settings.RPC_PROVIDER_URLS]))
+) 
+
+# Monitored pools; their reserves are mirrored by the event service and
+# shared with the router
+pair_manager = PairManager.from_config(settings.MONITORED_PAIRS)
+trade_router = RoutingEngine()
+pair_manager.add_to_router(trade_router)
+
+# Fee parameters are kept current from new heads, off the trade path
+gas_oracle = GasOracle(
+    PooledWeb3(connection_manager),
+    window=settings.GAS_ORACLE_WINDOW,
+    horizon=settings.GAS_ORACLE_HORIZON,
+    mode=settings.GAS_ORACLE_MODE
+)
+
+# One pipeline per wallet so nonces are tracked across requests
+tx_pipeline = TransactionPipeline(
+    PooledWeb3(connection_manager),
+    settings.WALLET_ADDRESS,
+    settings.PRIVATE_KEY,
+    max_in_flight=settings.TX_MAX_IN_FLIGHT,
+    receipt_interval=settings.TX_RECEIPT_INTERVAL,
+    speed_up_after=settings.TX_SPEED_UP_AFTER,
+    fee_oracle=gas_oracle
+)
+
+# Stops are priced from the event service's Sync ticks (see main.py); fired
+# stops exit through the same service that opened the position
+stop_engine = StopTriggerEngine({
+    'trailing_stop_enabled': settings.TRAILING_STOP_ENABLED,
+    'trailing_stop_distance': settings.TRAILING_STOP_DISTANCE
+})
+trading_service = TradingService(
+    strategy_manager,
+    model,
+    router=trade_router,
+    tx_pipeline=tx_pipeline,
+    pairs=pair_manager,
+    stop_engine=stop_engine,
+    performance_tracker=performance_tracker
+)
+stop_engine.on_trigger = trading_service.execute_exits
@@ -0,0 +1,100 @@
+from typing import Dict, Any, Set, Tuple, Iterator, Hashable
+
+CHANNELS = ('trades', 'predictions', 'performance')
+# Pair wildcard: everything published on the channel
+ALL_PAIRS = '*'
+
+Topic = Tuple[str, str]
+
+
+def normalize_pair(pair: str) -> str:
+    if not isinstance(pair, str):
+        raise ValueError(f"Invalid pair: {pair!r}")
+    return pair.strip().upper()
+
+
+class SubscriptionRegistry:
+    """(channel, pair) -> subscribed connections, plus the reverse index.
+
+    Subscribe and unsubscribe are O(1) set operations and dropping a
+    connection costs O(its own subscriptions), independent of how many
+    pairs or other clients exist. Subscribing to ``ALL_PAIRS`` receives
+    every message on the channel.
+    """
+
+    def __init__(self, channels: Tuple[str, ...] = CHANNELS):
+        self.channels = set(channels)
+        self._subscribers: Dict[Topic, Set[Hashable]] = {}
+        self._topics: Dict[Hashable, Set[Topic]] = {}
+
+    def _topic(self, channel: str, pair: str) -> Topic:
+        if channel not in self.channels:
+            raise ValueError(f"Unknown channel: {channel}")
+        return channel, normalize_pair(pair)
+
+    def add(self, connection: Hashable) -> None:
+        """Register a connection with no subscriptions yet."""
+        self._topics.setdefault(connection, set())
+
+    def subscribe(self, connection: Hashable, channel: str, pair: str = ALL_PAIRS) -> bool:
+        """Returns False if the connection was already subscribed."""
+        topic = self._topic(channel, pair)
+        topics = self._topics.setdefault(connection, set())
+        if topic in topics:
+            return False
+        topics.add(topic)
+        self._subscribers.setdefault(topic, set()).add(connection)
+        return True
+
+    def unsubscribe(self, connection: Hashable, channel: str, pair: str = ALL_PAIRS) -> bool:
+        """Returns False if the connection wasn't subscribed."""
+        topic = self._topic(channel, pair)
+        topics = self._topics.get(connection)
+        if not topics or topic not in topics:
+            return False
+        topics.discard(topic)
+        self._discard(topic, connection)
+        return True
+
+    def _discard(self, topic: Topic, connection: Hashable) -> None:
+        subscribers = self._subscribers.get(topic)
+        if subscribers is not None:
+            subscribers.discard(connection)
+            if not subscribers:
+                del self._subscribers[topic]
+
+    def remove(self, connection: Hashable) -> Set[Topic]:
+        """Drop a connection and all its subscriptions; safe to call twice."""
+        topics = self._topics.pop(connection, set())
+        for topic in topics:
+            self._discard(topic, connection)
+        return topics
+
+    def subscribers(self, channel: str, pair: str = ALL_PAIRS) -> Iterator[Hashable]:
+        """Connections to deliver a (channel, pair) message to, each once."""
+        channel_wide = self._subscribers.get((channel, ALL_PAIRS), set())
+        yield from channel_wide
+        if pair != ALL_PAIRS:
+            for connection in self._subscribers.get((channel, normalize_pair(pair)), ()):
+                if connection not in channel_wide:
+                    yield connection
+
+    def topics(self, connection: Hashable) -> Set[Topic]:
+        return set(self._topics.get(connection, ()))
+
+    def __contains__(self, connection: Hashable) -> bool:
+        return connection in self._topics
+
+    def __len__(self) -> int:
+        return len(self._topics)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        per_channel = {channel: 0 for channel in self.channels}
+        for channel, _ in self._subscribers:
+            per_channel[channel] += 1
+        return {
+            'connections': len(self._topics),
+            'topics': len(self._subscribers),
+            'subscriptions': sum(len(topics) for topics in self._topics.values()),
+            'topics_per_channel': per_channel
+        }
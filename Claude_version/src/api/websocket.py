@@ -1,36 +1,183 @@
 from fastapi import WebSocket
-from typing import List, Dict, Any
-import json
+import asyncio
+from typing import List, Dict, Any, Optional, Union
+from src.api.ws_connection import ClientConnection, FanoutStats
+from src.api.subscriptions import SubscriptionRegistry, ALL_PAIRS
+from src.api.conflation import ConflationHub
+from src.config.settings import settings
+from src.utils.logger import get_logger
+
+logger = get_logger()
 
 class WebSocketManager:
+    """Connections and their (channel, pair) subscriptions for every WebSocket endpoint."""
+
     def __init__(self):
-        self.active_connections: List[WebSocket] = []
-        self.pair_subscriptions: Dict[str, List[WebSocket]] = {}
-        
-    async def connect(self, websocket: WebSocket, pairs: List[str] = None):
+        self.active_connections: Dict[WebSocket, ClientConnection] = {}
+        self.subscriptions = SubscriptionRegistry()
+        self.fanout = FanoutStats()
+        # Opt-in per-subscription conflation; everyone else gets every event
+        self.conflation = ConflationHub(
+            self.fanout,
+            min_interval=settings.WS_CONFLATION_MIN_INTERVAL,
+            max_interval=settings.WS_CONFLATION_MAX_INTERVAL
+        )
+
+    async def connect(self, websocket: WebSocket, pairs: List[str] = None, channel: str = 'trades'):
         await websocket.accept()
-        self.active_connections.append(websocket)
-        if pairs:
-            for pair in pairs:
-                if pair not in self.pair_subscriptions:
-                    self.pair_subscriptions[pair] = []
-                self.pair_subscriptions[pair].append(websocket)
-                
+        client = ClientConnection(
+            websocket,
+            max_queue=settings.WS_SEND_QUEUE_SIZE,
+            max_lag=settings.WS_MAX_LAG,
+            send_timeout=settings.WS_SEND_TIMEOUT,
+            on_close=self._on_close
+        )
+        self.active_connections[websocket] = client
+        self.subscriptions.add(client)
+        client.start()
+        for pair in pairs or []:
+            self.subscriptions.subscribe(client, channel, pair)
+        return client
+
+    def subscribe(
+        self,
+        websocket: WebSocket,
+        channel: str,
+        pairs: Optional[List[str]] = None,
+        conflate: Optional[Dict[str, Any]] = None
+    ) -> List[str]:
+        """Subscribe to pairs on a channel (the whole channel if no pairs); returns the new subscriptions.
+
+        With ``conflate`` ({'interval': seconds, 'mode': 'latest' | 'summary'})
+        updates are coalesced per pair and delivered at most once per
+        interval; a subscription is either conflated or full-fidelity.
+        """
+        client = self.active_connections[websocket]
+        if channel not in self.subscriptions.channels:
+            raise ValueError(f"Unknown channel: {channel}")
+        changed = []
+        for pair in pairs or [ALL_PAIRS]:
+            if conflate is None:
+                self.conflation.unsubscribe(client, channel, pair)
+                added = self.subscriptions.subscribe(client, channel, pair)
+            else:
+                added = self.conflation.subscribe(
+                    client,
+                    channel,
+                    pair,
+                    interval=float(conflate.get('interval', settings.WS_CONFLATION_INTERVAL)),
+                    mode=conflate.get('mode', 'latest')
+                )
+                self.subscriptions.unsubscribe(client, channel, pair)
+            if added:
+                changed.append(pair)
+        return changed
+
+    def unsubscribe(self, websocket: WebSocket, channel: str, pairs: Optional[List[str]] = None) -> List[str]:
+        client = self.active_connections[websocket]
+        return [
+            pair for pair in pairs or [ALL_PAIRS]
+            if self.subscriptions.unsubscribe(client, channel, pair) | self.conflation.unsubscribe(client, channel, pair)
+        ]
+
+    @staticmethod
+    def _conflation_options(value: Union[bool, float, Dict[str, Any], None]) -> Optional[Dict[str, Any]]:
+        """``true``, an interval in seconds, or {'interval', 'mode'}."""
+        if value is None or value is False:
+            return None
+        if value is True:
+            return {}
+        if isinstance(value, (int, float)):
+            return {'interval': value}
+        if isinstance(value, dict):
+            return value
+        raise ValueError(f"Invalid conflation options: {value}")
+
+    def handle_message(self, websocket: WebSocket, message: Dict[str, Any]) -> Dict[str, Any]:
+        """Apply a client control message and return the reply.
+
+        ``{"action": "subscribe" | "unsubscribe", "channel": "trades", "pairs": ["WETH/USDC"]}``
+        changes subscriptions; ``{"action": "subscriptions"}`` lists them.
+        """
+        action = message.get('action')
+        client = self.active_connections.get(websocket)
+        if client is None:
+            # Evicted while the message was in flight
+            return {'type': 'error', 'error': 'Not connected'}
+        try:
+            if action in ('subscribe', 'unsubscribe'):
+                channel = message.get('channel', 'trades')
+                pairs = message.get('pairs')
+                if pairs is not None and not isinstance(pairs, list):
+                    pairs = [pairs]
+                if action == 'subscribe':
+                    conflate = self._conflation_options(message.get('conflate'))
+                    changed = self.subscribe(websocket, channel, pairs, conflate)
+                else:
+                    changed = self.unsubscribe(websocket, channel, pairs)
+                return {'type': f"{action}d", 'channel': channel, 'pairs': changed}
+            if action == 'subscriptions':
+                topics = [f"{channel}:{pair}" for channel, pair in self.subscriptions.topics(client)]
+                topics += [
+                    f"{channel}:{pair}@{interval:g}s/{mode}"
+                    for (channel, pair), interval, mode in self.conflation.subscriptions(client)
+                ]
+                return {'type': 'subscriptions', 'subscriptions': sorted(topics)}
+            return {'type': 'error', 'error': f"Unknown action: {action}"}
+        except (ValueError, TypeError) as e:
+            return {'type': 'error', 'error': str(e)}
+
+    async def broadcast(self, message: Dict[str, Any], channel: str, pair: str = ALL_PAIRS):
+        """Queue message for the channel's subscribers; slow clients don't hold up the rest."""
+        self.fanout.fan_out(self.subscriptions.subscribers(channel, pair), message)
+        self.conflation.offer(channel, pair, message)
+
     async def broadcast_trade(self, pair: str, trade_data: Dict[str, Any]):
-        """Broadcast trade updates to subscribed clients"""
-        if pair in self.pair_subscriptions:
-            for connection in self.pair_subscriptions[pair]:
-                try:
-                    await connection.send_json(trade_data)
-                except Exception as e:
-                    await self.disconnect(connection) 
-
-    async def disconnect(self, websocket: WebSocket):
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
-        # Remove from pair subscriptions
-        for pair, subscribers in list(self.pair_subscriptions.items()):
-            if websocket in subscribers:
-                subscribers.remove(websocket)
-            if not subscribers:
-                del self.pair_subscriptions[pair]
\ No newline at end of file
+        """Queue trade updates for subscribed clients; never waits on a socket"""
+        await self.broadcast(trade_data, 'trades', pair)
+
+    async def publish_performance(self, tracker: Any):
+        """Push the tracker's latest metrics snapshot to the performance channel."""
+        await self.broadcast(
+            {'type': 'performance', 'data': tracker.get_metrics()},
+            'performance'
+        )
+
+    async def run_performance(self, tracker: Any, interval: float):
+        """Publish the tracker's snapshot every ``interval`` seconds, skipping unchanged ones."""
+        published = None
+        while True:
+            try:
+                # Snapshots are replaced, never mutated, on every trade
+                if tracker.metrics is not published:
+                    published = tracker.metrics
+                    await self.publish_performance(tracker)
+            except Exception as e:
+                logger.error(f"Error publishing performance metrics: {str(e)}")
+            await asyncio.sleep(interval)
+
+    def _on_close(self, client: ClientConnection):
+        self.fanout.closed(client)
+        self._remove(client.websocket)
+
+    def _remove(self, websocket: WebSocket) -> Optional[ClientConnection]:
+        client = self.active_connections.pop(websocket, None)
+        if client is not None:
+            self.subscriptions.remove(client)
+            self.conflation.remove(client)
+        return client
+
+    async def disconnect(self, websocket: WebSocket, channel: Optional[str] = None):
+        """Forget a connection; a no-op if it is already gone."""
+        client = self._remove(websocket)
+        if client is not None:
+            client.abort()
+            logger.debug(f"WebSocket client {client.name} disconnected")
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Fan-out latency, queue depth, slow-consumer counts and subscription counts."""
+        return {
+            **self.fanout.get_metrics(self.active_connections.values()),
+            'subscriptions': self.subscriptions.get_metrics(),
+            'conflation': self.conflation.get_metrics()
+        }
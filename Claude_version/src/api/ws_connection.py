@@ -0,0 +1,203 @@
+from typing import Dict, Any, Optional, Callable, Deque, Iterable, Tuple
+from collections import deque
+import asyncio
+import time
+from fastapi import WebSocket
+from src.utils.serialization import encode_frame
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+# "Try again later": the client was too slow and should reconnect
+SLOW_CONSUMER_CLOSE_CODE = 1013
+
+
+class ClientConnection:
+    """One WebSocket client with a bounded outbound queue and its own writer task.
+
+    ``send`` never awaits the socket, so a broadcast costs one enqueue per
+    client. Messages are queued as encoded text frames. When the queue is full the oldest queued message is dropped
+    (the client is downgraded to lossy delivery); a client whose oldest
+    queued message is more than ``max_lag`` seconds old, or whose current
+    send has been blocked for ``send_timeout`` seconds, is disconnected
+    on the next send. Checking there rather than wrapping every write in
+    ``wait_for`` avoids a task per message.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        max_queue: int = 256,
+        max_lag: float = 5.0,
+        send_timeout: float = 5.0,
+        on_close: Optional[Callable[['ClientConnection'], Any]] = None
+    ):
+        self.websocket = websocket
+        self.max_queue = max_queue
+        self.max_lag = max_lag
+        self.send_timeout = send_timeout
+        self.on_close = on_close
+        self._queue: Deque[Tuple[float, str]] = deque()
+        self._ready = asyncio.Event()
+        self._writer: Optional[asyncio.Task] = None
+        self._closing: Optional[asyncio.Task] = None
+        self._send_started: Optional[float] = None
+        self.closed = False
+        self.lossy = False
+        self.stats = {
+            'sent': 0,
+            'dropped': 0,
+            'errors': 0,
+            'evicted': False,
+            'max_depth': 0,
+            'latency_ewma': 0.0,
+            'latency_max': 0.0
+        }
+
+    def start(self) -> None:
+        if self._writer is None:
+            self._writer = asyncio.create_task(self._write())
+
+    def send(self, message: Any) -> bool:
+        """Encode and queue a message without waiting."""
+        return self.send_frame(encode_frame(message))
+
+    def send_frame(self, frame: str) -> bool:
+        """Queue a prebuilt text frame; returns False if the client is gone or was evicted."""
+        if self.closed:
+            return False
+        now = time.perf_counter()
+        if self._send_started is not None and now - self._send_started > self.send_timeout:
+            self._evict(f"send blocked for over {self.send_timeout}s")
+            return False
+        if self._queue and now - self._queue[0][0] > self.max_lag:
+            self._evict(f"lagging {now - self._queue[0][0]:.1f}s behind")
+            return False
+        if len(self._queue) >= self.max_queue:
+            self._queue.popleft()
+            self.stats['dropped'] += 1
+            if not self.lossy:
+                self.lossy = True
+                logger.warning(f"WebSocket client {self.name} is slow; dropping its oldest updates")
+        self._queue.append((now, frame))
+        self.stats['max_depth'] = max(self.stats['max_depth'], len(self._queue))
+        self._ready.set()
+        return True
+
+    async def _write(self) -> None:
+        while not self.closed:
+            if not self._queue:
+                self._ready.clear()
+                await self._ready.wait()
+                continue
+            queued_at, frame = self._queue.popleft()
+            self._send_started = time.perf_counter()
+            try:
+                await self.websocket.send_text(frame)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats['errors'] += 1
+                logger.debug(f"WebSocket send to {self.name} failed: {str(e)}")
+                await self.close()
+                return
+            self._send_started = None
+            latency = time.perf_counter() - queued_at
+            self.stats['latency_ewma'] = latency if not self.stats['sent'] else 0.9 * self.stats['latency_ewma'] + 0.1 * latency
+            self.stats['latency_max'] = max(self.stats['latency_max'], latency)
+            self.stats['sent'] += 1
+            if not self._queue and self.lossy:
+                # Caught up again
+                self.lossy = False
+
+    def _evict(self, reason: str) -> None:
+        logger.warning(f"Disconnecting slow WebSocket client {self.name}: {reason}")
+        self.stats['evicted'] = True
+        if self._closing is None:
+            self._closing = asyncio.create_task(self.close(SLOW_CONSUMER_CLOSE_CODE))
+
+    async def close(self, code: int = 1000) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        self._queue.clear()
+        self._ready.set()
+        if self._writer is not None and self._writer is not asyncio.current_task():
+            self._writer.cancel()
+        try:
+            await self.websocket.close(code=code)
+        except Exception:
+            # Already closed by the peer
+            pass
+        if self.on_close is not None:
+            self.on_close(self)
+
+    def abort(self) -> None:
+        """Stop the writer after the peer has gone; the socket is not touched."""
+        self.closed = True
+        self._queue.clear()
+        if self._writer is not None:
+            self._writer.cancel()
+
+    @property
+    def name(self) -> str:
+        client = getattr(self.websocket, 'client', None)
+        return f"{client.host}:{client.port}" if client else hex(id(self.websocket))
+
+    @property
+    def depth(self) -> int:
+        return len(self._queue)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {**self.stats, 'client': self.name, 'depth': self.depth, 'lossy': self.lossy}
+
+
+class FanoutStats:
+    """Broadcast counters shared by the WebSocket managers."""
+
+    def __init__(self):
+        self.stats = {
+            'broadcasts': 0,
+            'enqueued': 0,
+            'rejected': 0,
+            'evicted': 0,
+            'fanout_ewma': 0.0,
+            'fanout_max': 0.0
+        }
+
+    def fan_out(self, clients: Iterable[ClientConnection], message: Any) -> int:
+        """Encode ``message`` once and queue the frame on every client; returns how many accepted it."""
+        started = time.perf_counter()
+        frame = encode_frame(message)
+        accepted = rejected = 0
+        for client in clients:
+            if client.send_frame(frame):
+                accepted += 1
+            else:
+                rejected += 1
+        elapsed = time.perf_counter() - started
+        stats = self.stats
+        stats['fanout_ewma'] = elapsed if not stats['broadcasts'] else 0.9 * stats['fanout_ewma'] + 0.1 * elapsed
+        stats['fanout_max'] = max(stats['fanout_max'], elapsed)
+        stats['broadcasts'] += 1
+        stats['enqueued'] += accepted
+        stats['rejected'] += rejected
+        return accepted
+
+    def closed(self, client: ClientConnection) -> None:
+        if client.stats['evicted']:
+            self.stats['evicted'] += 1
+
+    def get_metrics(self, clients: Iterable[ClientConnection]) -> Dict[str, Any]:
+        clients = list(clients)
+        depths = [client.depth for client in clients]
+        latencies = [client.stats['latency_ewma'] for client in clients if client.stats['sent']]
+        return {
+            **self.stats,
+            'clients': len(clients),
+            'lossy_clients': sum(client.lossy for client in clients),
+            'queue_depth_total': sum(depths),
+            'queue_depth_max': max(depths, default=0),
+            'delivery_latency_max': max(latencies, default=0.0),
+            'dropped': sum(client.stats['dropped'] for client in clients)
+        }
@@ -0,0 +1,190 @@
+from typing import List, Dict, Any, Optional, Callable, Awaitable, Sequence
+from collections import deque
+import asyncio
+import json
+import os
+import time
+from aiohttp import ClientError
+from web3 import AsyncWeb3, Web3
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+SWAP_TOPIC = Web3.keccak(text="Swap(address,uint256,uint256,uint256,uint256,address)").hex()
+
+# Substrings providers use when a getLogs range returns too much data
+RANGE_ERROR_MARKERS = (
+    'more than',
+    'too many',
+    'block range',
+    'range too large',
+    'limit exceeded',
+    'response size',
+    'query timeout',
+    'query returned'
+)
+RANGE_ERROR_CODES = {-32005, -32602}
+
+
+class LogBackfiller:
+    """Fetch historical logs with eth_getLogs over adaptively sized block ranges.
+
+    Ranges grow while responses are small and shrink (splitting the failed
+    range) when the provider rejects them. Up to ``max_in_flight`` ranges are
+    fetched concurrently but delivered to the callback strictly in block
+    order, and each delivered range advances a JSON checkpoint on disk.
+    """
+
+    def __init__(
+        self,
+        w3: AsyncWeb3,
+        addresses: Sequence[str],
+        topics: Sequence[str],
+        checkpoint_path: Optional[str] = None,
+        initial_range: int = 2000,
+        min_range: int = 1,
+        max_range: int = 10000,
+        target_logs: int = 5000,
+        max_in_flight: int = 4,
+        retry_count: int = 3,
+        retry_delay: float = 1.0
+    ):
+        self.w3 = w3
+        self.addresses = [Web3.to_checksum_address(a) for a in addresses]
+        self.topics = list(topics)
+        self.checkpoint_path = checkpoint_path
+        self.range_size = initial_range
+        self.min_range = min_range
+        self.max_range = max_range
+        self.target_logs = target_logs
+        self.max_in_flight = max_in_flight
+        self.retry_count = retry_count
+        self.retry_delay = retry_delay
+        self.stats = {
+            'requests': 0,
+            'splits': 0,
+            'logs': 0,
+            'blocks': 0
+        }
+
+    def load_checkpoint(self) -> Optional[Dict[str, Any]]:
+        """Return the saved checkpoint, or None when starting fresh."""
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return None
+        with open(self.checkpoint_path) as f:
+            return json.load(f)
+
+    def _save_checkpoint(self, next_block: int, to_block: int) -> None:
+        if not self.checkpoint_path:
+            return
+        directory = os.path.dirname(self.checkpoint_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({
+                'next_block': next_block,
+                'to_block': to_block,
+                'range_size': self.range_size,
+                'updated_at': time.time()
+            }, f)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    @staticmethod
+    def _is_range_error(error: Exception) -> bool:
+        payload = error.args[0] if error.args else None
+        if isinstance(payload, dict) and payload.get('code') in RANGE_ERROR_CODES:
+            return True
+        message = str(error).lower()
+        return any(marker in message for marker in RANGE_ERROR_MARKERS)
+
+    async def _get_logs(self, from_block: int, to_block: int) -> List[Dict[str, Any]]:
+        for attempt in range(self.retry_count):
+            try:
+                self.stats['requests'] += 1
+                return await self.w3.eth.get_logs({
+                    'fromBlock': from_block,
+                    'toBlock': to_block,
+                    'address': self.addresses,
+                    'topics': [self.topics]
+                })
+            except (ClientError, asyncio.TimeoutError) as e:
+                if attempt == self.retry_count - 1:
+                    logger.error(f"Max retries reached fetching logs {from_block}-{to_block}: {str(e)}")
+                    raise
+                logger.warning(f"Error fetching logs {from_block}-{to_block}, retrying in {self.retry_delay} seconds...")
+                await asyncio.sleep(self.retry_delay * (attempt + 1))
+
+    async def _fetch_range(self, from_block: int, to_block: int) -> List[Dict[str, Any]]:
+        """Fetch one range, splitting it in half while the provider refuses it."""
+        try:
+            logs = await self._get_logs(from_block, to_block)
+        except ValueError as e:
+            if not self._is_range_error(e) or from_block == to_block:
+                raise
+            self.stats['splits'] += 1
+            span = to_block - from_block + 1
+            self.range_size = max(self.min_range, min(self.range_size, span // 2))
+            mid = from_block + span // 2 - 1
+            logger.debug(f"Splitting log range {from_block}-{to_block} at {mid}")
+            left = await self._fetch_range(from_block, mid)
+            right = await self._fetch_range(mid + 1, to_block)
+            return left + right
+
+        span = to_block - from_block + 1
+        if len(logs) > self.target_logs:
+            self.range_size = max(self.min_range, span // 2)
+        elif len(logs) < self.target_logs // 2 and span >= self.range_size:
+            self.range_size = min(self.max_range, self.range_size * 2)
+        return sorted(logs, key=lambda log: (log['blockNumber'], log['logIndex']))
+
+    async def run(
+        self,
+        callback: Callable[[List[Dict[str, Any]]], Awaitable[Any]],
+        from_block: Optional[int] = None,
+        to_block: Optional[int] = None
+    ) -> int:
+        """Backfill [from_block, to_block] and return the next unprocessed block.
+
+        ``from_block`` defaults to the checkpoint, ``to_block`` to the chain head.
+        """
+        if from_block is None:
+            checkpoint = self.load_checkpoint()
+            if checkpoint is None:
+                raise ValueError('No checkpoint found; from_block is required')
+            from_block = checkpoint['next_block']
+        if to_block is None:
+            to_block = await self.w3.eth.block_number
+
+        started = time.perf_counter()
+        next_start = from_block
+        window: deque = deque()
+        try:
+            while next_start <= to_block or window:
+                while next_start <= to_block and len(window) < self.max_in_flight:
+                    end = min(next_start + self.range_size - 1, to_block)
+                    task = asyncio.create_task(self._fetch_range(next_start, end))
+                    window.append((next_start, end, task))
+                    next_start = end + 1
+
+                # Deliver strictly in order; later ranges keep fetching meanwhile
+                start, end, task = window.popleft()
+                logs = await task
+                await callback(logs)
+                self.stats['logs'] += len(logs)
+                self.stats['blocks'] += end - start + 1
+                self._save_checkpoint(end + 1, to_block)
+
+            elapsed = time.perf_counter() - started
+            logger.info(
+                f"Backfilled blocks {from_block}-{to_block}: {self.stats['logs']} logs, "
+                f"{self.stats['requests']} requests in {elapsed:.1f}s"
+            )
+            return to_block + 1
+
+        except Exception as e:
+            logger.error(f"Error during log backfill: {str(e)}")
+            raise
+        finally:
+            for _, _, task in window:
+                task.cancel()
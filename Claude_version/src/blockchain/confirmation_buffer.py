@@ -0,0 +1,277 @@
+from typing import List, Dict, Any, Optional, Callable, Awaitable, Iterable, Tuple
+from collections import deque
+import asyncio
+import json
+import os
+import time
+from web3 import AsyncWeb3
+from src.blockchain.log_subscription import to_hex
+from src.utils.logger import get_logger
+from src.config.settings import settings
+
+logger = get_logger()
+
+EventBatchHandler = Callable[[List[Dict[str, Any]]], Awaitable[Any]]
+
+
+def _quantity(value: Any) -> int:
+    return int(value, 16) if isinstance(value, str) else int(value)
+
+
+def event_position(event: Dict[str, Any]) -> Tuple[int, str, int, bool]:
+    """(block number, block hash, log index, removed) for raw logs or processed events."""
+    if 'blockNumber' in event:
+        return (
+            _quantity(event['blockNumber']),
+            to_hex(event['blockHash']),
+            _quantity(event['logIndex']),
+            bool(event.get('removed', False))
+        )
+    return event['block_number'], to_hex(event['block_hash']), event['log_index'], False
+
+
+class ConfirmationBuffer:
+    """Hold events until their block is ``depth`` blocks deep, then release them.
+
+    Buffered events are keyed by block number and block hash. Each new head
+    is checked against the parent hash recorded for the block below it; on a
+    mismatch the canonical chain is re-read back to the fork point and events
+    from orphaned blocks are dropped (and reported to ``on_rollback``) before
+    they are ever processed. Heads skipped between polls are fetched so the
+    check always links back to a block we saw. The last finalized block is
+    checkpointed to disk so a restart resumes from the block after it; with
+    ``unpersisted_floor`` (lowest block whose released events are not yet
+    persisted) the checkpoint never moves past events still in flight.
+    """
+
+    def __init__(
+        self,
+        w3: AsyncWeb3,
+        on_final: EventBatchHandler,
+        depth: int = 12,
+        checkpoint_path: Optional[str] = None,
+        on_rollback: Optional[EventBatchHandler] = None,
+        unpersisted_floor: Optional[Callable[[], Optional[int]]] = None
+    ):
+        self.w3 = w3
+        self.on_final = on_final
+        self.on_rollback = on_rollback
+        self.unpersisted_floor = unpersisted_floor
+        self.depth = depth
+        self.checkpoint_path = checkpoint_path
+        # block number -> {(block hash, log index): event}
+        self.pending: Dict[int, Dict[Tuple[str, int], Dict[str, Any]]] = {}
+        # block number -> canonical block hash, for unfinalized blocks seen as heads
+        self.headers: Dict[int, str] = {}
+        self.head: Optional[int] = None
+        self.finalized_block: Optional[int] = None
+        self.finalized_hash: Optional[str] = None
+        # Finalized (block, hash) pairs waiting for their events to be persisted
+        self._uncommitted: deque = deque()
+        self.checkpoint_block: Optional[int] = None
+        self.running = False
+        self.stats = {
+            'buffered': 0,
+            'finalized': 0,
+            'orphaned': 0,
+            'removed': 0,
+            'reorgs': 0
+        }
+
+        checkpoint = self.load_checkpoint()
+        if checkpoint is not None:
+            self.finalized_block = checkpoint['block']
+            self.finalized_hash = checkpoint.get('hash')
+            self.checkpoint_block = self.finalized_block
+
+    def load_checkpoint(self) -> Optional[Dict[str, Any]]:
+        """Return the last finalized block checkpoint, or None when starting fresh."""
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return None
+        with open(self.checkpoint_path) as f:
+            return json.load(f)
+
+    def _save_checkpoint(self, number: int, block_hash: Optional[str]) -> None:
+        self.checkpoint_block = number
+        if not self.checkpoint_path:
+            return
+        directory = os.path.dirname(self.checkpoint_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({
+                'block': number,
+                'hash': block_hash,
+                'updated_at': time.time()
+            }, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def commit(self) -> None:
+        """Checkpoint the highest finalized block below every unpersisted event."""
+        floor = self.unpersisted_floor() if self.unpersisted_floor is not None else None
+        latest = None
+        while self._uncommitted and (floor is None or self._uncommitted[0][0] < floor):
+            latest = self._uncommitted.popleft()
+        if latest is not None:
+            self._save_checkpoint(*latest)
+
+    def _advance(self, number: int, block_hash: Optional[str]) -> None:
+        self.finalized_block = number
+        self.finalized_hash = block_hash
+        self._uncommitted.append((number, block_hash))
+        self.commit()
+
+    def mark_finalized(self, number: int, block_hash: Optional[str] = None) -> None:
+        """Record blocks up to ``number`` as handled outside the buffer (e.g. backfilled)."""
+        if self.finalized_block is not None and number <= self.finalized_block:
+            return
+        for stale in [n for n in self.pending if n <= number]:
+            del self.pending[stale]
+        self._advance(number, to_hex(block_hash) if block_hash else None)
+
+    @property
+    def resume_block(self) -> Optional[int]:
+        """First block not yet finalized, i.e. where ingestion should restart."""
+        return None if self.finalized_block is None else self.finalized_block + 1
+
+    async def add_logs(self, events: Iterable[Dict[str, Any]]) -> None:
+        """Buffer events; ``removed`` logs retract a previously buffered event."""
+        for event in events:
+            number, block_hash, index, removed = event_position(event)
+            if self.finalized_block is not None and number <= self.finalized_block:
+                continue
+            if removed:
+                if self.pending.get(number, {}).pop((block_hash, index), None) is not None:
+                    self.stats['removed'] += 1
+                continue
+            block = self.pending.setdefault(number, {})
+            if (block_hash, index) not in block:
+                block[(block_hash, index)] = event
+                self.stats['buffered'] += 1
+
+    async def _block_hashes(self, number: int) -> Tuple[str, str]:
+        block = await self.w3.eth.get_block(number)
+        return to_hex(block['hash']), to_hex(block['parentHash'])
+
+    async def _rewind(self, number: int, parent_hash: str) -> None:
+        """Re-read canonical hashes below ``number`` until they match what we saw."""
+        self.stats['reorgs'] += 1
+        replaced = 0
+        cursor = number - 1
+        while cursor in self.headers and self.headers[cursor] != parent_hash:
+            if self.finalized_block is not None and cursor <= self.finalized_block:
+                logger.error(f"Reorg below finalized block {self.finalized_block}; finalized events may be stale")
+                break
+            self.headers[cursor] = parent_hash
+            _, parent_hash = await self._block_hashes(cursor)
+            cursor -= 1
+            replaced += 1
+        logger.warning(f"Chain reorg at block {number}: {replaced} block(s) replaced")
+
+    async def _fill_gap(self, number: int, parent_hash: str) -> None:
+        """Fetch heads skipped below ``number`` back to a known block and check the link."""
+        known = max(n for n in self.headers if n < number)
+        cursor = number - 1
+        while cursor > known:
+            self.headers[cursor] = parent_hash
+            _, parent_hash = await self._block_hashes(cursor)
+            cursor -= 1
+        if self.headers[known] != parent_hash:
+            await self._rewind(known + 1, parent_hash)
+
+    async def on_head(self, number: int, block_hash: str, parent_hash: str) -> None:
+        """Apply a new chain head, roll back orphans and release confirmed events."""
+        block_hash, parent_hash = to_hex(block_hash), to_hex(parent_hash)
+        if number - 1 not in self.headers and any(n < number for n in self.headers):
+            await self._fill_gap(number, parent_hash)
+        elif self.headers.get(number - 1, parent_hash) != parent_hash:
+            await self._rewind(number, parent_hash)
+        else:
+            self.headers.setdefault(number - 1, parent_hash)
+        # A shorter replacement chain invalidates anything above the new head
+        for stale in [n for n in self.headers if n > number]:
+            del self.headers[stale]
+        self.headers[number] = block_hash
+        self.head = number
+        await self._drop_orphans()
+        await self._finalize(number - self.depth)
+
+    async def _drop_orphans(self) -> None:
+        orphaned = []
+        for number, block in self.pending.items():
+            canonical = self.headers.get(number)
+            if canonical is None:
+                continue
+            for key in [key for key in block if key[0] != canonical]:
+                orphaned.append(block.pop(key))
+        if orphaned:
+            self.stats['orphaned'] += len(orphaned)
+            logger.warning(f"Rolled back {len(orphaned)} events from orphaned blocks")
+            if self.on_rollback is not None:
+                await self.on_rollback(orphaned)
+
+    async def _finalize(self, up_to: int) -> None:
+        if up_to < 0 or (self.finalized_block is not None and up_to <= self.finalized_block):
+            return
+        final, orphaned = [], []
+        ready = sorted(n for n in self.pending if n <= up_to)
+        for number in ready:
+            block = self.pending[number]
+            canonical = self.headers.get(number)
+            if canonical is None and block:
+                # Block was never seen as a head (backfilled or skipped); ask the node
+                canonical, _ = await self._block_hashes(number)
+            for (block_hash, _), event in sorted(block.items(), key=lambda item: item[0][1]):
+                (final if block_hash == canonical else orphaned).append(event)
+
+        if final:
+            # Events stay buffered (and the checkpoint unchanged) if this fails
+            await self.on_final(final)
+            self.stats['finalized'] += len(final)
+        if orphaned:
+            self.stats['orphaned'] += len(orphaned)
+            if self.on_rollback is not None:
+                await self.on_rollback(orphaned)
+
+        for number in ready:
+            del self.pending[number]
+        for number in [n for n in self.headers if n < up_to]:
+            del self.headers[number]
+        # Checkpointed once the released events are persisted, not on hand-off
+        self._advance(up_to, self.headers.get(up_to))
+
+    async def poll_head(self) -> None:
+        """Fetch the latest block and apply it as the new head."""
+        block = await self.w3.eth.get_block('latest')
+        if block['number'] != self.head or to_hex(block['hash']) != self.headers.get(block['number']):
+            await self.on_head(block['number'], block['hash'], block['parentHash'])
+
+    async def run(self) -> None:
+        """Track the chain head until stopped."""
+        self.running = True
+        while self.running:
+            try:
+                await self.poll_head()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error tracking chain head: {str(e)}")
+                await asyncio.sleep(settings.ERROR_RETRY_DELAY)
+                continue
+            await asyncio.sleep(settings.POLLING_INTERVAL)
+
+    async def stop(self) -> None:
+        self.running = False
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            'head': self.head,
+            'finalized_block': self.finalized_block,
+            'checkpoint_block': self.checkpoint_block,
+            'pending_blocks': len(self.pending),
+            'pending_events': sum(len(block) for block in self.pending.values())
+        }
@@ -1,20 +1,312 @@
-from web3 import Web3
+from typing import List, Dict, Any, Optional, Callable, Awaitable, TypeVar
+from dataclasses import dataclass
+import asyncio
+import time
+from web3 import AsyncWeb3, AsyncHTTPProvider, WebsocketProviderV2
+from web3.exceptions import BlockNotFound, ContractLogicError, TransactionNotFound
+from src.blockchain.read_aggregator import HttpJsonRpcTransport, JsonRpcPayload
 from src.utils.error_handler import with_retry, RetryableError
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+T = TypeVar('T')
+
+# The node answered and refused the request (JSON-RPC error, revert, not
+# found); another provider would say the same, so these never fail over
+NODE_ERRORS = (ValueError, ContractLogicError, TransactionNotFound, BlockNotFound)
+
+# AsyncEth attributes that are awaited as properties rather than called
+ETH_PROPERTIES = frozenset({
+    'accounts', 'blob_base_fee', 'block_number', 'chain_id', 'coinbase',
+    'gas_price', 'hashrate', 'max_priority_fee', 'mining', 'syncing'
+})
+
+@dataclass
+class ProviderStats:
+    url: str
+    latency: Optional[float] = None  # EWMA of successful request latency, seconds
+    error_rate: float = 0.0  # EWMA of request failures (0..1)
+    requests: int = 0
+    errors: int = 0
+    consecutive_failures: int = 0
+    last_error: Optional[str] = None
+    last_checked: Optional[float] = None
+
+    @property
+    def healthy(self) -> bool:
+        return self.consecutive_failures < 3
+
+    def score(self, error_penalty: float) -> float:
+        """Lower is better; unmeasured providers sort after measured healthy ones."""
+        if not self.healthy:
+            return float('inf')
+        latency = self.latency if self.latency is not None else 1.0
+        return latency * (1 + error_penalty * self.error_rate)
+
 
 class ConnectionManager:
-    def __init__(self, urls: List[str]):
+    """Pool of persistent Web3 connections routed by measured provider health."""
+
+    def __init__(
+        self,
+        urls: List[str],
+        alpha: float = 0.2,
+        error_penalty: float = 10.0,
+        hedge_delay: Optional[float] = None,
+        probe_interval: float = 15.0
+    ):
+        if not urls:
+            raise ValueError('At least one provider URL is required')
         self.provider_urls = urls
-        self.current_provider = 0
-        
-    @with_retry(max_retries=3, delay=2)
-    async def get_web3_connection(self) -> Web3:
-        """Get Web3 connection with retry mechanism"""
+        self.alpha = alpha
+        self.error_penalty = error_penalty
+        self.hedge_delay = hedge_delay
+        self.probe_interval = probe_interval
+        self.stats: Dict[str, ProviderStats] = {url: ProviderStats(url) for url in urls}
+        self._connections: Dict[str, AsyncWeb3] = {}
+        self._connect_locks: Dict[str, asyncio.Lock] = {url: asyncio.Lock() for url in urls}
+        self._probe_task: Optional[asyncio.Task] = None
+
+    @property
+    def current_provider(self) -> int:
+        return self.provider_urls.index(self.ranked_providers()[0])
+
+    def ranked_providers(self) -> List[str]:
+        """Provider URLs ordered from healthiest to least healthy."""
+        return sorted(self.provider_urls, key=lambda url: self.stats[url].score(self.error_penalty))
+
+    async def _connect(self, url: str) -> AsyncWeb3:
+        connection = self._connections.get(url)
+        if connection is not None:
+            return connection
+        async with self._connect_locks[url]:
+            if url not in self._connections:
+                if url.startswith(('ws://', 'wss://')):
+                    w3 = await AsyncWeb3.persistent_websocket(WebsocketProviderV2(url))
+                else:
+                    w3 = AsyncWeb3(AsyncHTTPProvider(url))
+                self._connections[url] = w3
+            return self._connections[url]
+
+    async def _drop(self, url: str) -> None:
+        connection = self._connections.pop(url, None)
+        if connection is not None and hasattr(connection.provider, 'disconnect'):
+            try:
+                await connection.provider.disconnect()
+            except Exception as e:
+                logger.warning(f"Error closing connection to {url}: {str(e)}")
+
+    def _record(self, url: str, latency: Optional[float], error: Optional[Exception] = None) -> None:
+        stats = self.stats[url]
+        stats.requests += 1
+        stats.last_checked = time.time()
+        failed = 1.0 if error is not None else 0.0
+        stats.error_rate += self.alpha * (failed - stats.error_rate)
+        if error is not None:
+            stats.errors += 1
+            stats.consecutive_failures += 1
+            stats.last_error = str(error)
+            return
+        stats.consecutive_failures = 0
+        if stats.latency is None:
+            stats.latency = latency
+        else:
+            stats.latency += self.alpha * (latency - stats.latency)
+
+    async def _call(self, url: str, fn: Callable[[AsyncWeb3], Awaitable[T]]) -> T:
+        started = time.perf_counter()
         try:
-            provider_url = self.provider_urls[self.current_provider]
-            w3 = Web3(Web3.WebsocketProvider(provider_url))
-            if not w3.is_connected():
-                raise RetryableError("Failed to connect to provider")
-            return w3
+            w3 = await self._connect(url)
+            result = await fn(w3)
+        except asyncio.CancelledError:
+            raise
+        except NODE_ERRORS:
+            self._record(url, time.perf_counter() - started)
+            raise
         except Exception as e:
-            self.current_provider = (self.current_provider + 1) % len(self.provider_urls)
-            raise RetryableError(f"Connection error: {str(e)}") 
\ No newline at end of file
+            self._record(url, None, e)
+            if not self.stats[url].healthy:
+                await self._drop(url)
+            raise
+        self._record(url, time.perf_counter() - started)
+        return result
+
+    async def request(self, fn: Callable[[AsyncWeb3], Awaitable[T]], hedge: bool = False) -> T:
+        """Run ``fn(w3)`` on the healthiest provider, failing over in score order.
+
+        With ``hedge=True`` a second provider is raced once the first has not
+        answered within the hedge delay, and the first answer wins.
+        """
+        ranked = self.ranked_providers()
+        if hedge and len(ranked) > 1:
+            return await self._hedged(fn, ranked[0], ranked[1])
+
+        last_error: Optional[Exception] = None
+        for url in ranked:
+            try:
+                return await self._call(url, fn)
+            except NODE_ERRORS:
+                raise
+            except Exception as e:
+                last_error = e
+                logger.warning(f"Provider {url} failed, trying next: {str(e)}")
+        raise RetryableError(f"All providers failed: {str(last_error)}")
+
+    async def _hedged(self, fn: Callable[[AsyncWeb3], Awaitable[T]], primary: str, secondary: str) -> T:
+        delay = self.hedge_delay
+        if delay is None:
+            # Default: hedge after twice the primary's typical latency
+            latency = self.stats[primary].latency
+            delay = 2 * latency if latency is not None else 0.25
+
+        tasks = [asyncio.create_task(self._call(primary, fn))]
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        if not done or tasks[0].exception() is not None:
+            tasks.append(asyncio.create_task(self._call(secondary, fn)))
+
+        errors = []
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None or isinstance(task.exception(), NODE_ERRORS):
+                        return task.result()
+                    errors.append(task.exception())
+        finally:
+            for task in pending:
+                task.cancel()
+        raise RetryableError(f"Hedged request failed: {', '.join(str(e) for e in errors)}")
+
+    @with_retry(max_retries=3, delay=2)
+    async def get_web3_connection(self) -> AsyncWeb3:
+        """Get the healthiest pooled Web3 connection with retry mechanism"""
+        for url in self.ranked_providers():
+            try:
+                w3 = await self._connect(url)
+                if await w3.is_connected():
+                    return w3
+                self._record(url, None, RetryableError("Provider not connected"))
+            except Exception as e:
+                self._record(url, None, e)
+                await self._drop(url)
+        raise RetryableError("Failed to connect to any provider")
+
+    async def probe(self) -> None:
+        """Measure every provider's latency with a cheap eth_blockNumber call."""
+        async def check(url: str) -> None:
+            try:
+                await self._call(url, lambda w3: w3.eth.block_number)
+            except Exception as e:
+                logger.warning(f"Health probe failed for {url}: {str(e)}")
+
+        await asyncio.gather(*(check(url) for url in self.provider_urls))
+
+    async def _probe_loop(self) -> None:
+        while True:
+            await self.probe()
+            await asyncio.sleep(self.probe_interval)
+
+    def start_health_checks(self) -> None:
+        if self._probe_task is None or self._probe_task.done():
+            self._probe_task = asyncio.create_task(self._probe_loop())
+
+    async def close(self) -> None:
+        if self._probe_task is not None:
+            self._probe_task.cancel()
+        for url in list(self._connections):
+            await self._drop(url)
+
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """Pool health and per-provider statistics for monitoring."""
+        ranked = self.ranked_providers()
+        return {
+            'healthy_providers': sum(1 for s in self.stats.values() if s.healthy),
+            'total_providers': len(self.stats),
+            'preferred_provider': ranked[0],
+            'providers': [
+                {
+                    'url': url,
+                    'healthy': self.stats[url].healthy,
+                    'connected': url in self._connections,
+                    'latency_ms': None if self.stats[url].latency is None else self.stats[url].latency * 1000,
+                    'error_rate': self.stats[url].error_rate,
+                    'requests': self.stats[url].requests,
+                    'errors': self.stats[url].errors,
+                    'last_error': self.stats[url].last_error
+                }
+                for url in ranked
+            ]
+        }
+
+
+class PooledEth:
+    """``w3.eth`` stand-in that sends every call through a ConnectionManager."""
+
+    def __init__(self, manager: ConnectionManager):
+        self._manager = manager
+
+    def __getattr__(self, name: str) -> Any:
+        if name in ETH_PROPERTIES:
+            return self._manager.request(lambda w3: getattr(w3.eth, name))
+
+        async def call(*args, **kwargs):
+            return await self._manager.request(lambda w3: getattr(w3.eth, name)(*args, **kwargs))
+        return call
+
+
+class PooledTransport:
+    """ReadAggregator transport that posts raw JSON-RPC payloads through the pool.
+
+    Payloads (including batches) go to the healthiest HTTP provider and fail
+    over in score order; outcomes feed the same provider statistics as
+    ``ConnectionManager.request``. Websocket providers are skipped.
+    """
+
+    def __init__(self, manager: ConnectionManager):
+        self.manager = manager
+        self._transports: Dict[str, HttpJsonRpcTransport] = {}
+
+    @property
+    def round_trips(self) -> int:
+        return sum(transport.round_trips for transport in self._transports.values())
+
+    async def send(self, payload: JsonRpcPayload) -> Any:
+        last_error: Optional[Exception] = None
+        for url in self.manager.ranked_providers():
+            if not url.startswith(('http://', 'https://')):
+                continue
+            transport = self._transports.setdefault(url, HttpJsonRpcTransport(url))
+            started = time.perf_counter()
+            try:
+                response = await transport.send(payload)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.manager._record(url, None, e)
+                last_error = e
+                logger.warning(f"Provider {url} failed, trying next: {str(e)}")
+                continue
+            self.manager._record(url, time.perf_counter() - started)
+            return response
+        raise RetryableError(f"All providers failed: {str(last_error)}")
+
+    async def close(self) -> None:
+        for transport in self._transports.values():
+            await transport.close()
+        self._transports.clear()
+
+
+class PooledWeb3:
+    """AsyncWeb3 stand-in for services that only make ``eth`` RPC calls.
+
+    Each call goes to the healthiest provider and fails over in score
+    order. A filter is created on whichever provider answers and is polled
+    and uninstalled there through the filter's own ``eth_module``; contracts
+    need a concrete connection from ``get_web3_connection``.
+    """
+
+    def __init__(self, manager: ConnectionManager):
+        self.manager = manager
+        self.eth = PooledEth(manager)
@@ -0,0 +1,152 @@
+from typing import Dict, Any, Optional, Tuple
+from collections import deque
+import hashlib
+import math
+from src.blockchain.log_subscription import to_hex
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+
+def event_fingerprint(transaction_hash: Any, log_index: int) -> Tuple[int, int]:
+    """Two 64-bit hashes of (tx hash, log index): the set key and the bloom stride."""
+    digest = hashlib.blake2b(
+        f"{to_hex(transaction_hash)}:{int(log_index)}".encode(),
+        digest_size=16
+    ).digest()
+    return int.from_bytes(digest[:8], 'big'), int.from_bytes(digest[8:], 'big') | 1
+
+
+class BloomFilter:
+    """Fixed-size bloom filter over precomputed 64-bit hash pairs."""
+
+    def __init__(self, capacity: int, false_positive_rate: float = 0.001):
+        self.size = max(8, int(-capacity * math.log(false_positive_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, h1: int, h2: int):
+        # Kirsch-Mitzenmacher double hashing
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, h1: int, h2: int) -> None:
+        bits = self.bits
+        for position in self._positions(h1, h2):
+            bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, hashes: Tuple[int, int]) -> bool:
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(*hashes))
+
+
+class _Generation:
+    __slots__ = ('start_block', 'keys', 'bloom')
+
+    def __init__(self, start_block: Optional[int], capacity: int, false_positive_rate: float):
+        self.start_block = start_block
+        self.keys: set = set()
+        self.bloom = BloomFilter(capacity, false_positive_rate)
+
+
+class DedupIndex:
+    """Bounded-memory set of recently seen (tx hash, log index) pairs.
+
+    Keys live in a ring of ``generations`` exact sets, each spanning
+    ``window_blocks / generations`` blocks and capped at
+    ``max_per_generation`` entries, so memory stays flat at any event rate.
+    A bloom filter in front of each set answers most "never seen" checks
+    without probing it. Events older than the window are treated as new.
+    """
+
+    def __init__(
+        self,
+        window_blocks: int = 256,
+        generations: int = 4,
+        max_per_generation: int = 50000,
+        false_positive_rate: float = 0.001
+    ):
+        self.generations = generations
+        self.span = max(1, window_blocks // generations)
+        self.max_per_generation = max_per_generation
+        self.false_positive_rate = false_positive_rate
+        self._ring: deque = deque(maxlen=generations)
+        self.stats = {
+            'checks': 0,
+            'duplicates': 0,
+            'bloom_negatives': 0,
+            'rotations': 0,
+            'discarded': 0
+        }
+
+    def _current(self, block_number: Optional[int]) -> _Generation:
+        newest = self._ring[-1] if self._ring else None
+        if (
+            newest is None
+            or len(newest.keys) >= self.max_per_generation
+            or (
+                block_number is not None
+                and newest.start_block is not None
+                and block_number >= newest.start_block + self.span
+            )
+        ):
+            start = block_number - block_number % self.span if block_number is not None else None
+            # deque(maxlen) drops the oldest generation
+            self._ring.append(_Generation(start, self.max_per_generation, self.false_positive_rate))
+            self.stats['rotations'] += 1
+            return self._ring[-1]
+        return newest
+
+    def _contains(self, hashes: Tuple[int, int]) -> bool:
+        for generation in reversed(self._ring):
+            if hashes in generation.bloom:
+                if hashes[0] in generation.keys:
+                    return True
+            else:
+                self.stats['bloom_negatives'] += 1
+        return False
+
+    def seen(self, transaction_hash: Any, log_index: int) -> bool:
+        """O(generations) membership check; does not record the event."""
+        self.stats['checks'] += 1
+        if self._contains(event_fingerprint(transaction_hash, log_index)):
+            self.stats['duplicates'] += 1
+            return True
+        return False
+
+    def add(self, transaction_hash: Any, log_index: int, block_number: Optional[int] = None) -> None:
+        hashes = event_fingerprint(transaction_hash, log_index)
+        generation = self._current(block_number)
+        generation.keys.add(hashes[0])
+        generation.bloom.add(*hashes)
+
+    def check_and_add(self, transaction_hash: Any, log_index: int, block_number: Optional[int] = None) -> bool:
+        """Record the event and return True if it had not been seen before."""
+        self.stats['checks'] += 1
+        hashes = event_fingerprint(transaction_hash, log_index)
+        if self._contains(hashes):
+            self.stats['duplicates'] += 1
+            return False
+        generation = self._current(block_number)
+        generation.keys.add(hashes[0])
+        generation.bloom.add(*hashes)
+        return True
+
+    def discard(self, transaction_hash: Any, log_index: int) -> None:
+        """Forget an event (e.g. one that was never persisted) so a redelivery is accepted."""
+        key = event_fingerprint(transaction_hash, log_index)[0]
+        for generation in self._ring:
+            # The bloom bits stay set; membership is decided by the key set
+            generation.keys.discard(key)
+        self.stats['discarded'] += 1
+
+    def __len__(self) -> int:
+        return sum(len(generation.keys) for generation in self._ring)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            'entries': len(self),
+            'generations': len(self._ring),
+            'oldest_block': self._ring[0].start_block if self._ring else None,
+            'bloom_bytes': sum(len(generation.bloom.bits) for generation in self._ring)
+        }
@@ -1,10 +1,13 @@
-from typing import List, Dict, Any, Optional
-from web3 import Web3
-from web3.contract import Contract
-from web3.exceptions import WebsocketConnectionError
+from typing import List, Dict, Any, Optional, Tuple
+from web3 import AsyncWeb3, Web3
+from web3.contract import AsyncContract
+from web3.exceptions import ProviderConnectionError
 from websockets.exceptions import ConnectionClosed
+from aiohttp import ClientError
 import asyncio
 import json
+import time
+from collections import deque
 from datetime import datetime
 from src.utils.logger import get_logger
 from src.config.settings import settings
@@ -12,12 +15,16 @@ from src.config.settings import settings
 logger = get_logger()
 
 class EventListener:
-    def __init__(self, w3: Web3):
+    def __init__(self, w3: AsyncWeb3, max_concurrency: Optional[int] = None):
         self.w3 = w3
-        self.contracts: Dict[str, Contract] = {}
+        self.contracts: Dict[str, AsyncContract] = {}
         self.event_filters: Dict[str, Any] = {}
         self.retry_count = 3
         self.retry_delay = 5  # seconds
+        # Bounds in-flight RPC polls so many pools don't flood the provider
+        self._semaphore = asyncio.Semaphore(max_concurrency or settings.EVENT_POLL_CONCURRENCY)
+        # (finished_at, round_trip_seconds, events) for recent poll rounds
+        self._rounds: deque = deque(maxlen=100)
         
     async def add_contract(self, address: str, abi: str, name: str) -> None:
         """Add a new contract to monitor."""
@@ -46,7 +53,7 @@ class EventListener:
             if from_block is None:
                 from_block = await self.w3.eth.block_number
                 
-            event_filter = event.create_filter(fromBlock=from_block)
+            event_filter = await event.create_filter(fromBlock=from_block)
             filter_key = f"{contract_name}_{event_name}"
             self.event_filters[filter_key] = event_filter
             
@@ -61,6 +68,8 @@ class EventListener:
             return {
                 'transaction_hash': event.transactionHash.hex(),
                 'block_number': event.blockNumber,
+                'block_hash': event.blockHash.hex(),
+                'log_index': event.logIndex,
                 'timestamp': datetime.utcnow().isoformat(),
                 'address': event.address,
                 'event_type': event.event,
@@ -75,9 +84,11 @@ class EventListener:
         """Get events from filter with retry mechanism."""
         for attempt in range(self.retry_count):
             try:
-                events = event_filter.get_new_entries()
+                # Only the RPC round-trip holds a slot, never the retry wait
+                async with self._semaphore:
+                    events = await event_filter.get_new_entries()
                 return [await self.process_event(event) for event in events]
-            except (WebsocketConnectionError, ConnectionClosed) as e:
+            except (ProviderConnectionError, ConnectionClosed, ClientError, asyncio.TimeoutError) as e:
                 if attempt == self.retry_count - 1:
                     logger.error(f"Max retries reached: {str(e)}")
                     raise
@@ -87,16 +98,52 @@ class EventListener:
                 logger.error(f"Unexpected error in handle_event_with_retry: {str(e)}")
                 raise
 
+    async def _poll_filter(self, filter_key: str, event_filter: Any) -> Tuple[str, List[Dict[str, Any]]]:
+        return filter_key, await self.handle_event_with_retry(event_filter)
+
+    async def poll_once(self) -> List[Tuple[str, List[Dict[str, Any]]]]:
+        """Poll every filter concurrently and return events grouped by filter."""
+        started = time.perf_counter()
+        results = await asyncio.gather(
+            *(self._poll_filter(key, f) for key, f in list(self.event_filters.items())),
+            return_exceptions=True
+        )
+
+        polled = []
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f"Error polling event filter: {str(result)}")
+                continue
+            polled.append(result)
+
+        finished = time.perf_counter()
+        self._rounds.append((finished, finished - started, sum(len(events) for _, events in polled)))
+        return polled
+
+    def get_metrics(self) -> Dict[str, float]:
+        """Return poll round-trip and throughput metrics over recent rounds."""
+        if not self._rounds:
+            return {'filters': len(self.event_filters), 'rounds': 0}
+        round_trips = [rtt for _, rtt, _ in self._rounds]
+        events = sum(count for _, _, count in self._rounds)
+        elapsed = self._rounds[-1][0] - self._rounds[0][0] + self._rounds[0][1]
+        return {
+            'filters': len(self.event_filters),
+            'rounds': len(self._rounds),
+            'last_round_trip': round_trips[-1],
+            'avg_round_trip': sum(round_trips) / len(round_trips),
+            'max_round_trip': max(round_trips),
+            'events_per_second': events / elapsed if elapsed > 0 else 0.0
+        }
+
     async def listen_to_events(self, callback) -> None:
         """Main event listening loop."""
         while True:
             try:
-                for filter_key, event_filter in self.event_filters.items():
-                    events = await self.handle_event_with_retry(event_filter)
-                    if events:
-                        for event in events:
-                            await callback(event)
-                            logger.info(f"Processed event from {filter_key}: {event['transaction_hash']}")
+                for filter_key, events in await self.poll_once():
+                    for event in events:
+                        await callback(event)
+                        logger.info(f"Processed event from {filter_key}: {event['transaction_hash']}")
                 
                 await asyncio.sleep(settings.POLLING_INTERVAL)
             except Exception as e:
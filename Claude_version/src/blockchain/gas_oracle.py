@@ -0,0 +1,220 @@
+from typing import Dict, Any, Optional, Sequence
+from collections import deque
+import asyncio
+import time
+import numpy as np
+from web3 import AsyncWeb3, WebsocketProviderV2
+from src.utils.error_handler import NetworkError
+from src.utils.logger import get_logger
+from src.config.settings import settings
+
+logger = get_logger()
+
+# EIP-1559: base fee moves at most 1/8 per block towards a half-full target
+BASE_FEE_MAX_CHANGE_DENOMINATOR = 8
+ELASTICITY_MULTIPLIER = 2
+
+SPEEDS = {'slow': 10, 'standard': 50, 'fast': 90}
+
+
+def next_base_fee(base_fee: int, gas_used: int, gas_limit: int) -> int:
+    """Base fee of the following block, exactly as the protocol computes it."""
+    target = gas_limit // ELASTICITY_MULTIPLIER
+    if target == 0 or gas_used == target:
+        return base_fee
+    if gas_used > target:
+        delta = max(base_fee * (gas_used - target) // target // BASE_FEE_MAX_CHANGE_DENOMINATOR, 1)
+        return base_fee + delta
+    delta = base_fee * (target - gas_used) // target // BASE_FEE_MAX_CHANGE_DENOMINATOR
+    return max(base_fee - delta, 0)
+
+
+def _quantity(value: Any) -> int:
+    return int(value, 16) if isinstance(value, str) else int(value)
+
+
+class GasOracle:
+    """EIP-1559 fee parameters predicted locally from a rolling fee history.
+
+    The window is seeded with one ``eth_feeHistory`` call; after that every
+    new head updates it: the next base fee comes straight from the header,
+    and the head's priority-fee percentiles from a one-block
+    ``eth_feeHistory`` fetched in a background task, so the head stream
+    never waits on it. Fees are recomputed on each update, so ``get_fees``
+    on the execution path is a dictionary lookup.
+    """
+
+    def __init__(
+        self,
+        w3: AsyncWeb3,
+        window: int = 20,
+        horizon: int = 3,
+        percentiles: Sequence[int] = tuple(SPEEDS.values()),
+        mode: str = 'subscribe',
+        stale_after: float = 60.0
+    ):
+        if mode not in ('subscribe', 'poll'):
+            raise ValueError(f"Invalid gas oracle mode: {mode}")
+        self.w3 = w3
+        self.window = window
+        self.horizon = horizon
+        self.percentiles = sorted(percentiles)
+        self.mode = mode
+        self.stale_after = stale_after
+        self.head: Optional[int] = None
+        self.base_fee: Optional[int] = None  # predicted base fee of the next block
+        self._ratios: deque = deque(maxlen=window)
+        self._rewards: deque = deque(maxlen=window)
+        self._fees: Dict[str, Dict[str, int]] = {}
+        self._updated_at = 0.0
+        self._history_tasks: set = set()
+        # The run() task; stop() cancels it so a silent head stream can't hold shutdown
+        self._task: Optional[asyncio.Task] = None
+        self.running = False
+        self.stats = {'heads': 0, 'history_calls': 0, 'errors': 0}
+
+    @property
+    def ready(self) -> bool:
+        return self.base_fee is not None and bool(self._rewards)
+
+    async def seed(self) -> None:
+        """Fill the window with the last ``window`` blocks of fee history."""
+        history = await self.w3.eth.fee_history(self.window, 'latest', self.percentiles)
+        self.stats['history_calls'] += 1
+        base_fees = history['baseFeePerGas']
+        oldest = _quantity(history['oldestBlock'])
+        self._ratios.clear()
+        self._rewards.clear()
+        self._ratios.extend(history['gasUsedRatio'])
+        self._rewards.extend([_quantity(v) for v in row] for row in history['reward'])
+        # feeHistory returns one base fee more than blocks: the next block's
+        self.base_fee = _quantity(base_fees[-1])
+        self.head = oldest + len(history['gasUsedRatio']) - 1
+        self._recompute()
+
+    async def on_head(self, header: Dict[str, Any]) -> None:
+        """Apply a new block header; its priority-fee percentiles follow in the background."""
+        number = _quantity(header['number'])
+        if self.head is not None and number <= self.head and self.base_fee is not None:
+            return
+        gas_used, gas_limit = _quantity(header['gasUsed']), _quantity(header['gasLimit'])
+        self.base_fee = next_base_fee(_quantity(header['baseFeePerGas']), gas_used, gas_limit)
+        self._ratios.append(gas_used / gas_limit if gas_limit else 0.0)
+        self.head = number
+        self.stats['heads'] += 1
+        self._recompute()
+
+        task = asyncio.create_task(self._fetch_rewards(number))
+        self._history_tasks.add(task)
+        task.add_done_callback(self._history_tasks.discard)
+
+    async def _fetch_rewards(self, number: int) -> None:
+        try:
+            history = await self.w3.eth.fee_history(1, number, self.percentiles)
+            self.stats['history_calls'] += 1
+            if history['reward']:
+                self._rewards.append([_quantity(v) for v in history['reward'][0]])
+                self._recompute()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.stats['errors'] += 1
+            logger.warning(f"Fee history for block {number} failed: {str(e)}")
+
+    def predict_base_fee(self, blocks_ahead: int = 1) -> Dict[str, int]:
+        """Expected base fee ``blocks_ahead`` blocks out at the recent utilisation, and its ceiling."""
+        if self.base_fee is None:
+            raise NetworkError("Gas oracle has no fee history yet", error_code="GAS_ORACLE_NOT_READY")
+        utilisation = float(np.mean(self._ratios)) if self._ratios else 0.5
+        step = 1 + (utilisation * ELASTICITY_MULTIPLIER - 1) / BASE_FEE_MAX_CHANGE_DENOMINATOR
+        steps = max(blocks_ahead - 1, 0)
+        return {
+            'expected': int(self.base_fee * step ** steps),
+            'max': int(self.base_fee * (1 + 1 / BASE_FEE_MAX_CHANGE_DENOMINATOR) ** steps)
+        }
+
+    def _recompute(self) -> None:
+        if not self.ready:
+            return
+        # Median of each percentile across the window smooths one-block spikes
+        tips = np.median(np.asarray(self._rewards, dtype=float), axis=0)
+        max_base_fee = self.predict_base_fee(self.horizon)['max']
+        fees = {}
+        for speed, percentile in SPEEDS.items():
+            column = self.percentiles.index(percentile) if percentile in self.percentiles else len(tips) // 2
+            tip = int(tips[column])
+            fees[speed] = {
+                'maxFeePerGas': max_base_fee + tip,
+                'maxPriorityFeePerGas': tip
+            }
+        self._fees = fees
+        self._updated_at = time.monotonic()
+
+    def fees(self, speed: str = 'standard') -> Dict[str, int]:
+        """Cached fee parameters for a speed; never touches the network."""
+        if speed not in SPEEDS:
+            raise ValueError(f"Unknown fee speed: {speed}")
+        if not self._fees:
+            raise NetworkError("Gas oracle has no fee history yet", error_code="GAS_ORACLE_NOT_READY")
+        if time.monotonic() - self._updated_at > self.stale_after:
+            logger.warning(f"Gas oracle fees are {time.monotonic() - self._updated_at:.0f}s old")
+        return dict(self._fees[speed])
+
+    async def get_fees(self, speed: str = 'standard') -> Dict[str, int]:
+        """Fee oracle interface used by TransactionPipeline; seeds on first use."""
+        if not self._fees:
+            await self.seed()
+        return self.fees(speed)
+
+    async def _run_subscribe(self) -> None:
+        async with AsyncWeb3.persistent_websocket(
+            WebsocketProviderV2(settings.WS_PROVIDER_URI)
+        ) as ws_w3:
+            subscription_id = await ws_w3.eth.subscribe('newHeads')
+            async for message in ws_w3.ws.process_subscriptions():
+                if not self.running:
+                    break
+                if message.get('subscription') == subscription_id:
+                    await self.on_head(message['result'])
+
+    async def _poll(self) -> None:
+        block = await self.w3.eth.get_block('latest')
+        if block['number'] != self.head:
+            await self.on_head(block)
+
+    async def run(self) -> None:
+        """Seed the window, then follow new heads until stopped."""
+        self.running = True
+        self._task = asyncio.current_task()
+        while self.running:
+            try:
+                if not self.ready:
+                    await self.seed()
+                if self.mode == 'subscribe':
+                    await self._run_subscribe()
+                else:
+                    await self._poll()
+                    await asyncio.sleep(settings.POLLING_INTERVAL)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats['errors'] += 1
+                logger.error(f"Error updating gas oracle: {str(e)}")
+                await asyncio.sleep(settings.ERROR_RETRY_DELAY)
+
+    async def stop(self) -> None:
+        self.running = False
+        if self._task is not None and self._task is not asyncio.current_task():
+            self._task.cancel()
+        for task in list(self._history_tasks):
+            task.cancel()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            'head': self.head,
+            'base_fee': self.base_fee,
+            'window': len(self._rewards),
+            'age': time.monotonic() - self._updated_at if self._fees else None,
+            'fees': self._fees
+        }
@@ -0,0 +1,158 @@
+from typing import List, Dict, Any, Optional, Callable, Iterable, NamedTuple, Union
+from datetime import datetime
+from src.blockchain.backfill import SWAP_TOPIC
+from src.blockchain.log_subscription import SYNC_TOPIC, to_hex
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+
+class SwapRecord(NamedTuple):
+    address: str
+    block_number: int
+    transaction_hash: str
+    log_index: int
+    sender: str
+    to: str
+    amount0_in: int
+    amount1_in: int
+    amount0_out: int
+    amount1_out: int
+
+
+class SyncRecord(NamedTuple):
+    address: str
+    block_number: int
+    transaction_hash: str
+    log_index: int
+    reserve0: int
+    reserve1: int
+
+
+DecodedLog = Union[SwapRecord, SyncRecord]
+
+
+def _quantity(value: Any) -> int:
+    # Raw subscription logs carry hex quantities, formatted logs carry ints
+    return int(value, 16) if isinstance(value, str) else value
+
+
+def _words(data: Any, count: int) -> List[int]:
+    """Slice ``count`` 32-byte big-endian words from log data (hex str or bytes)."""
+    if isinstance(data, str):
+        offset = 2 if data.startswith('0x') else 0
+        if len(data) - offset < 64 * count:
+            raise ValueError(f"Log data too short for {count} words")
+        return [int(data[offset + 64 * i:offset + 64 * (i + 1)], 16) for i in range(count)]
+    if len(data) < 32 * count:
+        raise ValueError(f"Log data too short for {count} words")
+    # memoryview slices avoid copying (and HexBytes' costly __getitem__)
+    view = memoryview(data)
+    return [int.from_bytes(view[32 * i:32 * (i + 1)], 'big') for i in range(count)]
+
+
+def _topic_address(topic: Any) -> str:
+    """Indexed address argument: the low 20 bytes of a topic, as lowercase hex."""
+    return '0x' + topic[-40:].lower() if isinstance(topic, str) else '0x' + memoryview(topic)[12:].hex()
+
+
+def decode_swap(log: Dict[str, Any]) -> SwapRecord:
+    """Swap(address indexed sender, uint amount0In, uint amount1In, uint amount0Out, uint amount1Out, address indexed to)"""
+    topics = log['topics']
+    amount0_in, amount1_in, amount0_out, amount1_out = _words(log['data'], 4)
+    return SwapRecord(
+        to_hex(log['address']),
+        _quantity(log['blockNumber']),
+        to_hex(log['transactionHash']),
+        _quantity(log['logIndex']),
+        _topic_address(topics[1]),
+        _topic_address(topics[2]),
+        amount0_in,
+        amount1_in,
+        amount0_out,
+        amount1_out
+    )
+
+
+def decode_sync(log: Dict[str, Any]) -> SyncRecord:
+    """Sync(uint112 reserve0, uint112 reserve1)"""
+    reserve0, reserve1 = _words(log['data'], 2)
+    return SyncRecord(
+        to_hex(log['address']),
+        _quantity(log['blockNumber']),
+        to_hex(log['transactionHash']),
+        _quantity(log['logIndex']),
+        reserve0,
+        reserve1
+    )
+
+
+# topic0 -> decoder, keyed by both lowercase 0x-hex and raw bytes so either
+# log shape resolves with a single dict lookup
+DECODERS: Dict[Union[str, bytes], Callable[[Dict[str, Any]], DecodedLog]] = {}
+for _topic, _decoder in ((SWAP_TOPIC, decode_swap), (SYNC_TOPIC, decode_sync)):
+    DECODERS[_topic.lower()] = _decoder
+    DECODERS[bytes.fromhex(_topic[2:])] = _decoder
+
+
+def _decoder_for(topic: Any) -> Optional[Callable[[Dict[str, Any]], DecodedLog]]:
+    decoder = DECODERS.get(topic)
+    return decoder if decoder is not None else DECODERS.get(to_hex(topic))
+
+
+def decode_log(log: Dict[str, Any]) -> Optional[DecodedLog]:
+    """Decode a raw Swap or Sync log; returns None for other topics."""
+    topics = log.get('topics')
+    if not topics:
+        return None
+    decoder = _decoder_for(topics[0])
+    return decoder(log) if decoder is not None else None
+
+
+def decode_logs(logs: Iterable[Dict[str, Any]]) -> List[DecodedLog]:
+    """Bulk-decode a batch of raw logs, skipping unknown topics and malformed logs."""
+    records = []
+    append = records.append
+    for log in logs:
+        topics = log.get('topics')
+        if not topics:
+            continue
+        decoder = _decoder_for(topics[0])
+        if decoder is None:
+            continue
+        try:
+            append(decoder(log))
+        except (ValueError, IndexError, KeyError) as e:
+            logger.warning(f"Skipping malformed log: {str(e)}")
+    return records
+
+
+def block_timestamp(log: Dict[str, Any]) -> Optional[int]:
+    """Unix time of the log's block when the node (or EventService) attached it."""
+    value = log.get('blockTimestamp')
+    return None if value is None else _quantity(value)
+
+
+def swap_to_event(record: SwapRecord, timestamp: Optional[float] = None) -> Dict[str, Any]:
+    """Expand a SwapRecord into the event dict shape used by EventListener.process_event.
+
+    ``timestamp`` is the block's unix time; without it the decode time is used.
+    """
+    moment = datetime.utcnow() if timestamp is None else datetime.utcfromtimestamp(timestamp)
+    return {
+        'transaction_hash': record.transaction_hash,
+        'block_number': record.block_number,
+        'log_index': record.log_index,
+        'timestamp': moment.isoformat(),
+        'address': record.address,
+        'event_type': 'Swap',
+        'args': {
+            'sender': record.sender,
+            'to': record.to,
+            'amount0In': record.amount0_in,
+            'amount1In': record.amount1_in,
+            'amount0Out': record.amount0_out,
+            'amount1Out': record.amount1_out
+        },
+        'processed': False
+    }
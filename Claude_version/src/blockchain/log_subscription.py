@@ -0,0 +1,197 @@
+from typing import List, Dict, Any, Optional, Callable, Awaitable, Iterable, Tuple
+from collections import defaultdict
+import asyncio
+from web3 import AsyncWeb3, Web3
+from src.blockchain.backfill import LogBackfiller, SWAP_TOPIC
+from src.utils.logger import get_logger
+from src.config.settings import settings
+
+logger = get_logger()
+
+SYNC_TOPIC = Web3.keccak(text="Sync(uint112,uint112)").hex()
+
+LogHandler = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+
+def to_hex(value: Any) -> str:
+    """Normalise addresses/topics (str, bytes or HexBytes) to lowercase 0x-hex."""
+    if isinstance(value, str):
+        return value.lower() if value.startswith('0x') else f"0x{value.lower()}"
+    return f"0x{bytes(value).hex()}"
+
+
+class LogSubscription:
+    """One log stream covering every monitored pool, demultiplexed locally.
+
+    ``mode='subscribe'`` uses a single ``eth_subscribe("logs")`` push
+    subscription (the ``w3`` must be a persistent websocket connection);
+    ``mode='poll'`` uses a single address-list filter polled every
+    ``POLLING_INTERVAL``. Either way the RPC cost no longer grows with the
+    number of pools. Added pools are picked up within ``check_interval``
+    seconds in both modes, even while the socket is silent. Every
+    resubscribe (after an error or a widened address list) backfills from
+    the last block delivered, so handlers may see a log twice but never
+    miss one.
+    """
+
+    def __init__(
+        self,
+        w3: AsyncWeb3,
+        addresses: Iterable[str] = (),
+        topics: Iterable[str] = (SWAP_TOPIC, SYNC_TOPIC),
+        mode: str = 'subscribe',
+        check_interval: Optional[float] = None
+    ):
+        if mode not in ('subscribe', 'poll'):
+            raise ValueError(f"Invalid subscription mode: {mode}")
+        self.w3 = w3
+        self.mode = mode
+        self.check_interval = settings.POLLING_INTERVAL if check_interval is None else check_interval
+        self.addresses: Dict[str, str] = {}
+        self.topics = [to_hex(topic) for topic in topics]
+        self.handlers: Dict[Tuple[str, str], List[LogHandler]] = defaultdict(list)
+        self.running = False
+        self._stale = True
+        self._subscription_id: Optional[str] = None
+        self._filter: Any = None
+        # Highest block delivered; the replay after a resubscribe starts here
+        self.last_block: Optional[int] = None
+        self.stats = {
+            'received': 0,
+            'dispatched': 0,
+            'unrouted': 0,
+            'errors': 0,
+            'resubscribes': 0,
+            'replayed': 0
+        }
+        for address in addresses:
+            self.add_address(address)
+
+    def add_address(self, address: str) -> None:
+        """Add a pool; the subscription is widened on the next cycle."""
+        key = to_hex(address)
+        if key not in self.addresses:
+            self.addresses[key] = Web3.to_checksum_address(address)
+            self._stale = True
+
+    def on(self, topic: str, handler: LogHandler, address: Optional[str] = None) -> None:
+        """Route logs with this topic0 (optionally from one address) to handler."""
+        self.handlers[(to_hex(address) if address else '*', to_hex(topic))].append(handler)
+
+    def _filter_params(self) -> Dict[str, Any]:
+        return {
+            'address': list(self.addresses.values()),
+            'topics': [self.topics]
+        }
+
+    async def dispatch(self, log: Dict[str, Any]) -> int:
+        """Deliver a raw log to the handlers for its (address, topic0)."""
+        self.stats['received'] += 1
+        number = log.get('blockNumber')
+        if number is not None and not log.get('removed'):
+            number = int(number, 16) if isinstance(number, str) else number
+            self.last_block = number if self.last_block is None else max(self.last_block, number)
+        if not log.get('topics'):
+            self.stats['unrouted'] += 1
+            return 0
+        address = to_hex(log['address'])
+        topic = to_hex(log['topics'][0])
+        handlers = self.handlers.get((address, topic), []) + self.handlers.get(('*', topic), [])
+        if not handlers:
+            self.stats['unrouted'] += 1
+            return 0
+        for handler in handlers:
+            try:
+                await handler(log)
+                self.stats['dispatched'] += 1
+            except Exception as e:
+                self.stats['errors'] += 1
+                logger.error(f"Error handling log from {address}: {str(e)}")
+        return len(handlers)
+
+    async def _resubscribe(self) -> None:
+        params = self._filter_params()
+        if self.mode == 'subscribe':
+            if self._subscription_id is not None:
+                await self.w3.eth.unsubscribe(self._subscription_id)
+            self._subscription_id = await self.w3.eth.subscribe('logs', params)
+        else:
+            if self._filter is not None:
+                # Only the provider that installed the filter knows its id
+                try:
+                    await self._filter.eth_module.uninstall_filter(self._filter.filter_id)
+                except Exception as e:
+                    logger.warning(f"Error uninstalling log filter: {str(e)}")
+            self._filter = await self.w3.eth.filter(params)
+        self._stale = False
+        self.stats['resubscribes'] += 1
+        logger.info(f"Subscribed to logs for {len(self.addresses)} addresses ({self.mode})")
+        if self.last_block is not None:
+            await self._replay(self.last_block)
+
+    async def _replay(self, from_block: int) -> None:
+        """Deliver logs from ``from_block`` to head that the old stream may have missed."""
+        backfiller = LogBackfiller(self.w3, list(self.addresses.values()), self.topics)
+        await backfiller.run(self._dispatch_batch, from_block=from_block)
+
+    async def _dispatch_batch(self, logs: List[Dict[str, Any]]) -> None:
+        self.stats['replayed'] += len(logs)
+        for log in logs:
+            await self.dispatch(log)
+
+    async def poll_once(self) -> int:
+        """Fetch and dispatch new entries from the shared filter (poll mode)."""
+        if self._stale or self._filter is None:
+            await self._resubscribe()
+        logs = await self._filter.get_new_entries()
+        for log in logs:
+            await self.dispatch(log)
+        return len(logs)
+
+    async def _consume(self) -> None:
+        async for message in self.w3.ws.process_subscriptions():
+            if not self.running:
+                return
+            if message.get('subscription') == self._subscription_id:
+                await self.dispatch(message['result'])
+
+    async def _watch_stale(self) -> None:
+        # On a timer, not per message: a quiet socket must still be widened
+        while self.running:
+            await asyncio.sleep(self.check_interval)
+            if self._stale:
+                await self._resubscribe()
+
+    async def _run_subscribe(self) -> None:
+        await self._resubscribe()
+        tasks = {asyncio.ensure_future(self._consume()), asyncio.ensure_future(self._watch_stale())}
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                task.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def run(self) -> None:
+        """Main ingestion loop; reconnects after errors."""
+        self.running = True
+        while self.running:
+            try:
+                if self.mode == 'subscribe':
+                    await self._run_subscribe()
+                else:
+                    await self.poll_once()
+                    await asyncio.sleep(settings.POLLING_INTERVAL)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error in log subscription loop: {str(e)}")
+                self._stale = True
+                self._filter = None
+                self._subscription_id = None
+                await asyncio.sleep(settings.ERROR_RETRY_DELAY)
+
+    async def stop(self) -> None:
+        self.running = False
@@ -0,0 +1,194 @@
+from typing import List, Dict, Any, Optional, Tuple, Union
+import asyncio
+import itertools
+import aiohttp
+from eth_abi import encode, decode
+from web3 import Web3
+from src.utils.error_handler import ContractError, NetworkError
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+
+# Function selectors (plain bytes; HexBytes.hex() would add a 0x prefix)
+AGGREGATE3 = bytes(Web3.keccak(text="aggregate3((address,bool,bytes)[])")[:4])
+GET_RESERVES = bytes(Web3.keccak(text="getReserves()")[:4])
+DECIMALS = bytes(Web3.keccak(text="decimals()")[:4])
+BALANCE_OF = bytes(Web3.keccak(text="balanceOf(address)")[:4])
+
+JsonRpcPayload = Union[Dict[str, Any], List[Dict[str, Any]]]
+
+
+class HttpJsonRpcTransport:
+    """Minimal JSON-RPC over HTTP transport that supports batch payloads."""
+
+    def __init__(self, url: str, session: Optional[aiohttp.ClientSession] = None):
+        self.url = url
+        self._session = session
+        self.round_trips = 0
+
+    async def send(self, payload: JsonRpcPayload) -> Any:
+        if self._session is None:
+            self._session = aiohttp.ClientSession()
+        self.round_trips += 1
+        try:
+            async with self._session.post(self.url, json=payload) as response:
+                response.raise_for_status()
+                return await response.json()
+        except aiohttp.ClientError as e:
+            raise NetworkError(
+                message="JSON-RPC request failed",
+                error_code="NETWORK_ERROR",
+                details={"url": self.url, "error": str(e)}
+            )
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+class ReadAggregator:
+    """Coalesce concurrent eth_call reads into one round-trip.
+
+    Calls issued within ``window`` seconds (or until ``max_batch`` calls are
+    queued) are sent together, either as a single Multicall3 ``aggregate3``
+    eth_call (``mode='multicall'``) or as one JSON-RPC batch request
+    (``mode='batch'``). Each caller awaits only its own decoded result.
+    """
+
+    def __init__(
+        self,
+        transport: Any,
+        mode: str = 'multicall',
+        window: float = 0.002,
+        max_batch: int = 200,
+        block: Union[str, int] = 'latest',
+        multicall_address: str = MULTICALL3_ADDRESS
+    ):
+        if mode not in ('multicall', 'batch'):
+            raise ValueError(f"Invalid aggregation mode: {mode}")
+        self.transport = transport
+        self.mode = mode
+        self.window = window
+        self.max_batch = max_batch
+        self.block = block if isinstance(block, str) else hex(block)
+        self.multicall_address = Web3.to_checksum_address(multicall_address)
+        self._pending: List[Tuple[str, bytes, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._ids = itertools.count(1)
+        self._tasks: set = set()
+        self.stats = {'calls': 0, 'batches': 0}
+
+    async def call(self, to: str, data: bytes) -> bytes:
+        """Queue an eth_call and wait for its raw return data."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((Web3.to_checksum_address(to), data, future))
+        self.stats['calls'] += 1
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        self.stats['batches'] += 1
+        task = asyncio.ensure_future(self._execute(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def flush(self) -> None:
+        """Send queued calls immediately and wait for them to finish."""
+        self._flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _execute(self, batch: List[Tuple[str, bytes, asyncio.Future]]) -> None:
+        try:
+            if self.mode == 'multicall':
+                results = await self._execute_multicall(batch)
+            else:
+                results = await self._execute_batch(batch)
+        except Exception as e:
+            logger.error(f"Error executing aggregated read of {len(batch)} calls: {str(e)}")
+            results = [e] * len(batch)
+
+        for (_, _, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    async def _execute_multicall(self, batch: List[Tuple[str, bytes, asyncio.Future]]) -> List[Any]:
+        calldata = AGGREGATE3 + encode(
+            ['(address,bool,bytes)[]'],
+            [[(to, True, data) for to, data, _ in batch]]
+        )
+        response = await self.transport.send({
+            'jsonrpc': '2.0',
+            'id': next(self._ids),
+            'method': 'eth_call',
+            'params': [{'to': self.multicall_address, 'data': '0x' + calldata.hex()}, self.block]
+        })
+        if 'error' in response:
+            raise ContractError(
+                message="Multicall aggregate3 failed",
+                error_code="CONTRACT_ERROR",
+                details=response['error']
+            )
+        (decoded,) = decode(['(bool,bytes)[]'], bytes.fromhex(response['result'][2:]))
+        return [
+            data if success else ContractError(
+                message="Call reverted",
+                error_code="CONTRACT_ERROR",
+                details={"to": to}
+            )
+            for (success, data), (to, _, _) in zip(decoded, batch)
+        ]
+
+    async def _execute_batch(self, batch: List[Tuple[str, bytes, asyncio.Future]]) -> List[Any]:
+        ids = [next(self._ids) for _ in batch]
+        responses = await self.transport.send([
+            {
+                'jsonrpc': '2.0',
+                'id': request_id,
+                'method': 'eth_call',
+                'params': [{'to': to, 'data': '0x' + data.hex()}, self.block]
+            }
+            for request_id, (to, data, _) in zip(ids, batch)
+        ])
+        # Batch responses may come back in any order
+        by_id = {response['id']: response for response in responses}
+        results = []
+        for request_id, (to, _, _) in zip(ids, batch):
+            response = by_id.get(request_id)
+            if response is None or 'error' in response:
+                results.append(ContractError(
+                    message="eth_call failed",
+                    error_code="CONTRACT_ERROR",
+                    details={"to": to, "error": response.get('error') if response else 'missing response'}
+                ))
+            else:
+                results.append(bytes.fromhex(response['result'][2:]))
+        return results
+
+    async def get_reserves(self, pair: str) -> Tuple[int, int, int]:
+        """Uniswap V2 pair reserves: (reserve0, reserve1, blockTimestampLast)."""
+        return decode(['uint112', 'uint112', 'uint32'], await self.call(pair, GET_RESERVES))
+
+    async def decimals(self, token: str) -> int:
+        return decode(['uint8'], await self.call(token, DECIMALS))[0]
+
+    async def balance_of(self, token: str, owner: str) -> int:
+        data = BALANCE_OF + encode(['address'], [Web3.to_checksum_address(owner)])
+        return decode(['uint256'], await self.call(token, data))[0]
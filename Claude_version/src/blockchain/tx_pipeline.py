@@ -0,0 +1,426 @@
+from typing import List, Dict, Any, Optional, Tuple, Callable, Awaitable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+import asyncio
+import heapq
+import time
+from eth_account import Account
+from web3 import AsyncWeb3
+from src.utils.error_handler import ContractError, NetworkError
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+GasKey = Tuple[str, str, int]  # (router address, method, path length)
+
+# Substrings nodes use when rejecting a raw transaction
+NONCE_TOO_LOW = ('nonce too low', 'already been used')
+UNDERPRICED = ('underpriced', 'fee too low')
+ALREADY_KNOWN = ('already known', 'known transaction')
+
+
+def _error_text(error: Exception) -> str:
+    payload = error.args[0] if error.args else None
+    if isinstance(payload, dict):
+        return str(payload.get('message', payload)).lower()
+    return str(error).lower()
+
+
+class NonceManager:
+    """Hand out nonces locally; the node is only asked on start and after a nonce error."""
+
+    def __init__(self, w3: AsyncWeb3, address: str):
+        self.w3 = w3
+        self.address = AsyncWeb3.to_checksum_address(address)
+        self._next: Optional[int] = None
+        self._released: List[int] = []
+        self._lock = asyncio.Lock()
+
+    async def sync(self) -> int:
+        """Skip past nonces the node has seen used.
+
+        Only moves forward: nonces already handed out to submits that have
+        not broadcast yet are never allocated a second time.
+        """
+        async with self._lock:
+            chain_next = await self.w3.eth.get_transaction_count(self.address, 'pending')
+            self._next = chain_next if self._next is None else max(self._next, chain_next)
+            self._released = [nonce for nonce in self._released if nonce >= chain_next]
+            heapq.heapify(self._released)
+            return self._next
+
+    async def allocate(self) -> int:
+        async with self._lock:
+            if self._released:
+                return heapq.heappop(self._released)
+            if self._next is None:
+                self._next = await self.w3.eth.get_transaction_count(self.address, 'pending')
+            nonce = self._next
+            self._next += 1
+            return nonce
+
+    def release(self, nonce: int) -> None:
+        """Return a nonce that was never broadcast so the next transaction fills the gap."""
+        heapq.heappush(self._released, nonce)
+
+    def take_released_below(self, limit: int) -> List[int]:
+        """Remove and return released nonces below ``limit`` (gaps later nonces wait on)."""
+        gaps = []
+        while self._released and self._released[0] < limit:
+            gaps.append(heapq.heappop(self._released))
+        return gaps
+
+
+class GasEstimateCache:
+    """eth_estimateGas results per (router, method, path shape), with a safety margin."""
+
+    def __init__(self, ttl: float = 300.0, margin: float = 1.2):
+        self.ttl = ttl
+        self.margin = margin
+        self._entries: Dict[GasKey, Tuple[int, float]] = {}
+        # Concurrent misses for one key share a single estimate
+        self._inflight: Dict[GasKey, asyncio.Future] = {}
+        self.stats = {'hits': 0, 'misses': 0}
+
+    async def get(self, key: GasKey, estimate: Callable[[], Awaitable[int]]) -> int:
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() - entry[1] < self.ttl:
+            self.stats['hits'] += 1
+            return entry[0]
+        if key in self._inflight:
+            self.stats['hits'] += 1
+            return await asyncio.shield(self._inflight[key])
+        self.stats['misses'] += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            gas = int(await estimate() * self.margin)
+            self._entries[key] = (gas, time.monotonic())
+            future.set_result(gas)
+            return gas
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Retrieved here so an unawaited failure is not reported as unhandled
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+
+    def invalidate(self, key: GasKey) -> None:
+        self._entries.pop(key, None)
+
+
+class NodeFees:
+    """EIP-1559 fees from the latest block, cached for ``ttl`` seconds."""
+
+    def __init__(self, w3: AsyncWeb3, ttl: float = 2.0):
+        self.w3 = w3
+        self.ttl = ttl
+        self._fees: Optional[Dict[str, int]] = None
+        self._fetched_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def get_fees(self) -> Dict[str, int]:
+        async with self._lock:
+            if self._fees is None or time.monotonic() - self._fetched_at > self.ttl:
+                block, tip = await asyncio.gather(
+                    self.w3.eth.get_block('latest'),
+                    self.w3.eth.max_priority_fee
+                )
+                self._fees = {
+                    'maxFeePerGas': 2 * block['baseFeePerGas'] + tip,
+                    'maxPriorityFeePerGas': tip
+                }
+                self._fetched_at = time.monotonic()
+            return self._fees
+
+
+@dataclass
+class InFlightTransaction:
+    nonce: int
+    tx: Dict[str, Any]
+    gas_key: Optional[GasKey]
+    hashes: List[str] = field(default_factory=list)
+    sent_at: float = 0.0
+    replacements: int = 0
+    mined_at: Optional[float] = None  # when the nonce was first seen used on chain
+    receipt: Optional[asyncio.Future] = None
+    gap_fill: bool = False  # self-transfer filling a nonce a failed submit left behind
+
+    @property
+    def tx_hash(self) -> str:
+        return self.hashes[-1]
+
+    async def wait(self, timeout: Optional[float] = None) -> Dict[str, Any]:
+        return await asyncio.wait_for(asyncio.shield(self.receipt), timeout)
+
+
+class TransactionPipeline:
+    """Submit signed transactions without per-trade nonce, gas or fee round-trips.
+
+    Nonces come from a local NonceManager, gas limits from a
+    GasEstimateCache and fees from a cached fee source. Signing runs in a
+    worker thread. Up to ``max_in_flight`` transactions are pending at once;
+    a single receipt loop polls the account's mined nonce and only fetches
+    receipts for nonces that advanced, bumping fees on transactions that
+    have been pending longer than ``speed_up_after`` seconds. A mined nonce
+    whose receipt the node doesn't serve yet is polled for up to
+    ``receipt_timeout`` seconds before it is reported as failed. A nonce
+    released by a failed broadcast while higher nonces are in flight is
+    filled with a zero-value self-transfer so those are not stuck behind it.
+    """
+
+    def __init__(
+        self,
+        w3: AsyncWeb3,
+        address: str,
+        private_key: str,
+        max_in_flight: int = 4,
+        receipt_interval: float = 1.0,
+        speed_up_after: float = 30.0,
+        fee_bump: float = 1.125,
+        max_replacements: int = 3,
+        receipt_timeout: float = 120.0,
+        gas_cache: Optional[GasEstimateCache] = None,
+        fee_oracle: Optional[Any] = None
+    ):
+        self.w3 = w3
+        self.address = AsyncWeb3.to_checksum_address(address)
+        self._private_key = private_key
+        self.nonces = NonceManager(w3, self.address)
+        self.gas_cache = gas_cache or GasEstimateCache()
+        self.fees = fee_oracle or NodeFees(w3)
+        self.max_in_flight = max_in_flight
+        self.receipt_interval = receipt_interval
+        self.speed_up_after = speed_up_after
+        self.fee_bump = fee_bump
+        self.max_replacements = max_replacements
+        self.receipt_timeout = receipt_timeout
+        self.in_flight: Dict[int, InFlightTransaction] = {}
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._signer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='tx-signer')
+        self._chain_id: Optional[int] = None
+        self._receipt_task: Optional[asyncio.Task] = None
+        self.stats = {
+            'submitted': 0,
+            'confirmed': 0,
+            'failed': 0,
+            'replaced': 0,
+            'nonce_resyncs': 0,
+            'gap_fills': 0
+        }
+
+    async def _sign(self, tx: Dict[str, Any]) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._signer, Account.sign_transaction, tx, self._private_key)
+
+    async def _broadcast(self, tx: Dict[str, Any]) -> str:
+        signed = await self._sign(tx)
+        try:
+            tx_hash = await self.w3.eth.send_raw_transaction(signed.rawTransaction)
+            return AsyncWeb3.to_hex(tx_hash)
+        except ValueError as e:
+            if any(marker in _error_text(e) for marker in ALREADY_KNOWN):
+                return AsyncWeb3.to_hex(signed.hash)
+            raise
+
+    async def _prepare(self, tx: Dict[str, Any], gas_key: Optional[GasKey]) -> Dict[str, Any]:
+        if self._chain_id is None:
+            self._chain_id = await self.w3.eth.chain_id
+        tx = {'from': self.address, 'value': 0, 'chainId': self._chain_id, **tx}
+        if 'gas' not in tx:
+            estimate = lambda: self.w3.eth.estimate_gas({k: v for k, v in tx.items() if k != 'nonce'})
+            tx['gas'] = await (self.gas_cache.get(gas_key, estimate) if gas_key else estimate())
+        if 'maxFeePerGas' not in tx and 'gasPrice' not in tx:
+            tx.update(await self.fees.get_fees())
+        return tx
+
+    async def submit(self, tx: Dict[str, Any], gas_key: Optional[GasKey] = None) -> InFlightTransaction:
+        """Sign and broadcast ``tx``; waits only while max_in_flight are pending."""
+        await self._slots.acquire()
+        nonce = None
+        try:
+            tx = await self._prepare(tx, gas_key)
+            for attempt in range(2):
+                nonce = await self.nonces.allocate()
+                try:
+                    tx_hash = await self._broadcast({**tx, 'nonce': nonce})
+                    break
+                except ValueError as e:
+                    if attempt == 0 and any(marker in _error_text(e) for marker in NONCE_TOO_LOW):
+                        # Another sender used our nonce; skip past it and retry once
+                        self.stats['nonce_resyncs'] += 1
+                        await self.nonces.sync()
+                        nonce = None
+                        continue
+                    raise
+
+            pending = InFlightTransaction(
+                nonce=nonce,
+                tx={**tx, 'nonce': nonce},
+                gas_key=gas_key,
+                hashes=[tx_hash],
+                sent_at=time.monotonic(),
+                receipt=asyncio.get_running_loop().create_future()
+            )
+            self.in_flight[nonce] = pending
+            self.stats['submitted'] += 1
+            self._ensure_receipt_loop()
+            logger.info(f"Submitted transaction {tx_hash} (nonce {nonce})")
+            # A concurrent submit may have released a lower nonce before this one landed
+            await self._fill_gaps()
+            return pending
+
+        except Exception as e:
+            if nonce is not None:
+                self.nonces.release(nonce)
+            self._slots.release()
+            logger.error(f"Error submitting transaction: {str(e)}")
+            await self._fill_gaps()
+            if isinstance(e, ValueError):
+                raise ContractError(
+                    message="Transaction rejected by node",
+                    error_code="CONTRACT_ERROR",
+                    details={"error": _error_text(e)}
+                )
+            raise
+
+    async def replace(self, pending: InFlightTransaction, tx: Optional[Dict[str, Any]] = None) -> str:
+        """Rebroadcast the nonce with bumped fees, optionally with new contents."""
+        replacement = {**pending.tx, **(tx or {}), 'nonce': pending.nonce}
+        if 'gasPrice' in replacement:
+            replacement['gasPrice'] = int(pending.tx['gasPrice'] * self.fee_bump) + 1
+        else:
+            current = await self.fees.get_fees()
+            for key in ('maxFeePerGas', 'maxPriorityFeePerGas'):
+                replacement[key] = max(int(pending.tx[key] * self.fee_bump) + 1, current[key])
+        tx_hash = await self._broadcast(replacement)
+        pending.tx = replacement
+        pending.hashes.append(tx_hash)
+        pending.sent_at = time.monotonic()
+        pending.replacements += 1
+        self.stats['replaced'] += 1
+        logger.info(f"Replaced nonce {pending.nonce} with {tx_hash}")
+        return tx_hash
+
+    async def cancel(self, pending: InFlightTransaction) -> str:
+        """Replace with a zero-value self-transfer."""
+        return await self.replace(pending, {'to': self.address, 'value': 0, 'data': b'', 'gas': 21000})
+
+    async def _fill_gaps(self) -> None:
+        """Fill released nonces below an in-flight one so the later transactions can mine."""
+        if not self.in_flight:
+            return
+        for nonce in self.nonces.take_released_below(max(self.in_flight)):
+            try:
+                tx = await self._prepare({'to': self.address, 'data': b'', 'gas': 21000}, None)
+                tx['nonce'] = nonce
+                tx_hash = await self._broadcast(tx)
+            except Exception as e:
+                self.nonces.release(nonce)
+                logger.warning(f"Failed to fill nonce gap {nonce}: {str(e)}")
+                continue
+            self.in_flight[nonce] = InFlightTransaction(
+                nonce=nonce,
+                tx=tx,
+                gas_key=None,
+                hashes=[tx_hash],
+                sent_at=time.monotonic(),
+                receipt=asyncio.get_running_loop().create_future(),
+                gap_fill=True
+            )
+            self.stats['gap_fills'] += 1
+            self._ensure_receipt_loop()
+            logger.info(f"Filled nonce gap {nonce} with self-transfer {tx_hash}")
+
+    async def _receipt_for(self, pending: InFlightTransaction) -> Optional[Dict[str, Any]]:
+        # Any broadcast version of the nonce may be the one that was mined
+        for tx_hash in reversed(pending.hashes):
+            try:
+                receipt = await self.w3.eth.get_transaction_receipt(tx_hash)
+                if receipt is not None:
+                    return receipt
+            except Exception:
+                continue
+        return None
+
+    def _settle(self, pending: InFlightTransaction, receipt: Optional[Dict[str, Any]], error: Optional[Exception] = None) -> None:
+        self.in_flight.pop(pending.nonce, None)
+        if not pending.gap_fill:
+            # Gap fills never took a submit slot
+            self._slots.release()
+        if pending.receipt.done():
+            return
+        if error is not None:
+            self.stats['failed'] += 1
+            pending.receipt.set_exception(error)
+            if pending.gap_fill:
+                # Nobody awaits a gap fill; retrieved so it is not reported as unhandled
+                pending.receipt.exception()
+            return
+        if receipt['status'] == 1:
+            self.stats['confirmed'] += 1
+        else:
+            self.stats['failed'] += 1
+            if pending.gas_key and receipt['gasUsed'] >= pending.tx['gas']:
+                # Ran out of gas: the cached estimate is too low for this shape
+                self.gas_cache.invalidate(pending.gas_key)
+        pending.receipt.set_result(receipt)
+
+    async def poll_receipts(self) -> int:
+        """One receipt-tracking round; returns the number of settled transactions."""
+        if not self.in_flight:
+            return 0
+        mined_nonce = await self.w3.eth.get_transaction_count(self.address, 'latest')
+        mined = [p for nonce, p in sorted(self.in_flight.items()) if nonce < mined_nonce]
+        receipts = await asyncio.gather(*(self._receipt_for(p) for p in mined))
+        now = time.monotonic()
+        settled = 0
+        for pending, receipt in zip(mined, receipts):
+            if receipt is not None:
+                self._settle(pending, receipt)
+                settled += 1
+                continue
+            # Nonce used, but this node may not serve the receipt yet
+            if pending.mined_at is None:
+                pending.mined_at = now
+            elif now - pending.mined_at > self.receipt_timeout:
+                self._settle(pending, None, NetworkError(
+                    message="Nonce mined by an unknown transaction",
+                    error_code="NETWORK_ERROR",
+                    details={"nonce": pending.nonce, "hashes": pending.hashes}
+                ))
+                settled += 1
+
+        for pending in list(self.in_flight.values()):
+            if pending.mined_at is not None:
+                continue
+            if now - pending.sent_at < self.speed_up_after or pending.replacements >= self.max_replacements:
+                continue
+            try:
+                await self.replace(pending)
+            except Exception as e:
+                logger.warning(f"Speed-up of nonce {pending.nonce} failed: {str(e)}")
+        return settled
+
+    async def _receipt_loop(self) -> None:
+        while self.in_flight:
+            await asyncio.sleep(self.receipt_interval)
+            try:
+                await self.poll_receipts()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error polling transaction receipts: {str(e)}")
+
+    def _ensure_receipt_loop(self) -> None:
+        if self._receipt_task is None or self._receipt_task.done():
+            self._receipt_task = asyncio.create_task(self._receipt_loop())
+
+    async def close(self) -> None:
+        if self._receipt_task is not None:
+            self._receipt_task.cancel()
+        self._signer.shutdown(wait=False)
@@ -1,31 +1,38 @@
-from web3 import Web3
-from web3.middleware import geth_poa_middleware
-from typing import Dict, List, Any
-import asyncio
+from web3 import AsyncWeb3, AsyncHTTPProvider
+from web3.middleware import async_geth_poa_middleware
+from typing import Dict, List, Any, Callable, Awaitable, Optional
+from src.blockchain.event_listener import EventListener
+from src.blockchain.log_subscription import LogSubscription
+from src.blockchain.backfill import SWAP_TOPIC
+from src.utils.logger import get_logger
+
+logger = get_logger()
 
 class Web3Client:
     def __init__(self, settings):
-        self.w3 = Web3(Web3.WebsocketProvider(settings.WS_PROVIDER_URI))
-        self.w3.middleware_onion.inject(geth_poa_middleware, layer=0)
+        self.w3 = AsyncWeb3(AsyncHTTPProvider(settings.WEB3_PROVIDER_URI))
+        self.w3.middleware_onion.inject(async_geth_poa_middleware, layer=0)
         self.contracts: Dict[str, Any] = {}
-        self.event_filters: Dict[str, Any] = {}
+        self.event_listener = EventListener(self.w3)
+        # One shared filter for all pools instead of one per address
+        self.log_subscription = LogSubscription(self.w3, topics=[SWAP_TOPIC], mode='poll')
+        self._callback: Optional[Callable[[Dict[str, Any]], Awaitable[Any]]] = None
         
     async def setup_contract_monitoring(self, contract_addresses: List[str], abi: List[Dict]):
         """Setup monitoring for multiple DEX contracts"""
         for address in contract_addresses:
             contract = self.w3.eth.contract(address=address, abi=abi)
-            self.contracts[address] = contract
-            # Setup event filters
-            self.event_filters[address] = contract.events.Swap.create_filter(fromBlock='latest')
+            self.contracts[contract.address] = contract
+            self.log_subscription.add_address(contract.address)
+            self.log_subscription.on(SWAP_TOPIC, self._handle_swap_log, address=contract.address)
+
+    async def _handle_swap_log(self, log: Dict[str, Any]):
+        contract = self.contracts[AsyncWeb3.to_checksum_address(log['address'])]
+        event = contract.events.Swap().process_log(log)
+        if self._callback is not None:
+            await self._callback(await self.event_listener.process_event(event))
             
-    async def monitor_trading_events(self):
+    async def monitor_trading_events(self, callback: Callable[[Dict[str, Any]], Awaitable[Any]]):
         """Monitor trading events from all contracts"""
-        while True:
-            try:
-                for address, event_filter in self.event_filters.items():
-                    events = event_filter.get_new_entries()
-                    for event in events:
-                        await self.process_trade_event(event)
-            except Exception as e:
-                logger.error(f"Error monitoring events: {str(e)}")
-                await asyncio.sleep(5)  # Retry delay 
\ No newline at end of file
+        self._callback = callback
+        await self.log_subscription.run()
@@ -1,12 +1,14 @@
 from pydantic_settings import BaseSettings
 from dotenv import load_dotenv
-from typing import List
+from typing import List, Dict, Any, Optional
 
 load_dotenv()
 
 class Settings(BaseSettings):
     # Blockchain settings
     WEB3_PROVIDER_URI: str
+    # Additional RPC endpoints pooled alongside WEB3_PROVIDER_URI
+    RPC_PROVIDER_URLS: List[str] = []
     WALLET_ADDRESS: str
     PRIVATE_KEY: str
     
@@ -23,6 +25,62 @@ class Settings(BaseSettings):
     # Event listener settings
     POLLING_INTERVAL: float = 1.0  # seconds
     ERROR_RETRY_DELAY: int = 5  # seconds
+    EVENT_POLL_CONCURRENCY: int = 8  # max filters polled in parallel
+    # "subscribe" (one eth_subscribe stream), "poll" (one shared filter)
+    # or "filters" (legacy per-contract filters)
+    EVENT_INGESTION_MODE: str = "poll"
+    CONFIRMATION_DEPTH: int = 12  # blocks before an event is processed
+    EVENT_CHECKPOINT_PATH: str = "data/event_checkpoint.json"
+    DEDUP_WINDOW_BLOCKS: int = 256  # blocks of (tx hash, log index) history kept
+    DEDUP_MAX_ENTRIES: int = 50000  # per generation (4 generations)
+    RESERVE_RECONCILE_INTERVAL: float = 60.0  # seconds between on-chain reserve checks
+    # Per-stage event pipeline config: concurrency, queue_size and policy
+    # ("block" applies backpressure, "drop_newest"/"drop_oldest" shed load)
+    EVENT_PIPELINE_STAGES: Dict[str, Dict[str, Any]] = {
+        'ingest': {'concurrency': 1, 'queue_size': 100, 'policy': 'block'},
+        'decode': {'concurrency': 1, 'queue_size': 5000, 'policy': 'block'},
+        'persist': {'concurrency': 1, 'queue_size': 5000, 'policy': 'block'},
+        'score': {'concurrency': 4, 'queue_size': 1000, 'policy': 'block'},
+        'broadcast': {'concurrency': 1, 'queue_size': 1000, 'policy': 'drop_oldest'}
+    }
+    WRITE_BEHIND_BATCH_SIZE: int = 500  # rows per bulk upsert
+    WRITE_BEHIND_FLUSH_INTERVAL: float = 1.0  # max seconds a row waits before a flush
+    WRITE_BEHIND_MAX_PENDING: int = 10000  # buffered rows before producers wait
+    WRITE_BEHIND_MAX_ROW_FAILURES: int = 3  # failed solo writes before a row is dead-lettered
+    EVENT_JOURNAL_DIR: Optional[str] = "data/journal"  # None disables the event journal
+    EVENT_JOURNAL_SEGMENT_BYTES: int = 64 * 1024 * 1024  # segment size before rolling over
+    EVENT_JOURNAL_FSYNC_INTERVAL: float = 0.05  # seconds between group fsyncs
+    EVENT_JOURNAL_RETAIN_SEGMENTS: int = 8  # committed segments kept for replays
+    WS_SEND_QUEUE_SIZE: int = 256  # outbound messages queued per WebSocket client
+    WS_MAX_LAG: float = 5.0  # seconds a client may fall behind before it's disconnected
+    WS_SEND_TIMEOUT: float = 5.0  # seconds a single send may block
+    WS_CONFLATION_INTERVAL: float = 0.25  # default seconds between conflated updates per pair
+    WS_CONFLATION_MIN_INTERVAL: float = 0.05  # fastest rate a client may request
+    WS_CONFLATION_MAX_INTERVAL: float = 60.0
+    WS_PERFORMANCE_INTERVAL: float = 1.0  # seconds between performance channel snapshots
+
+    # Transaction submission settings
+    TX_MAX_IN_FLIGHT: int = 4  # pending transactions per wallet
+    TX_RECEIPT_INTERVAL: float = 1.0  # seconds between receipt polls
+    TX_SPEED_UP_AFTER: float = 30.0  # seconds pending before fees are bumped
+    GAS_ORACLE_MODE: str = "subscribe"  # "subscribe" (newHeads) or "poll"
+    GAS_ORACLE_WINDOW: int = 20  # blocks of fee history kept in memory
+    GAS_ORACLE_HORIZON: int = 3  # blocks maxFeePerGas must stay valid for
+    
+    # Database settings (postgresql://... in deployment, sqlite:///path locally)
+    DATABASE_URL: str = "sqlite:///data/trading.db"
+    DB_POOL_MIN_SIZE: int = 1
+    DB_POOL_MAX_SIZE: int = 10
+    DB_STATEMENT_CACHE_SIZE: int = 256  # prepared statements kept per connection
+    PARTITION_INTERVAL: str = "month"  # trades/trade_events/predictions partition size: day, week or month
+    PARTITIONS_AHEAD: int = 2  # future partitions created in advance
+    TRADES_RETENTION_DAYS: Optional[int] = None  # None keeps all trades
+    PREDICTIONS_RETENTION_DAYS: Optional[int] = 180
+    TRADE_EVENTS_RETENTION_DAYS: Optional[int] = 90  # observed swaps, by block time
+    
+    # Historical log backfill settings
+    BACKFILL_MAX_RANGE: int = 10000  # blocks per eth_getLogs request
+    BACKFILL_CONCURRENCY: int = 4  # ranges fetched in parallel
     WS_PROVIDER_URI: str
     
     # DEX contract addresses
@@ -35,6 +93,34 @@ class Settings(BaseSettings):
         "WETH/USDT",
         "WBTC/USDT"
     ]
+    # On-chain pools behind the trading pairs: mirrored from Sync logs,
+    # routed through and priced for stops (token0/token1 in pool order)
+    MONITORED_PAIRS: Dict[str, Dict[str, Any]] = {
+        "WETH/USDC": {
+            'address': "0xB4e16d0168e52d35CaCD2c6185b44281Ec28C9Dc",
+            'token0': "0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48",
+            'token1': "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2",
+            'decimals0': 6,
+            'decimals1': 18,
+            'base': "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2"
+        },
+        "WETH/USDT": {
+            'address': "0x0d4a11d5EEaaC28EC3F61d100daF4d40471f1852",
+            'token0': "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2",
+            'token1': "0xdAC17F958D2ee523a2206206994597C13D831ec7",
+            'decimals0': 18,
+            'decimals1': 6
+        }
+    }
+    # Positions opened through the trade API get a trailing stop this far
+    # below the running high; fired exits are routed back through TradingService
+    TRAILING_STOP_ENABLED: bool = True
+    TRAILING_STOP_DISTANCE: float = 0.05
+    DEFAULT_STOP_LOSS: float = 0.02
+    # Shared rolling ATR/volatility, fed from the mirrored price ticks
+    VOLATILITY_BAR_INTERVAL: float = 60.0  # seconds of ticks folded into one bar
+    VOLATILITY_ATR_PERIOD: int = 14  # bars
+    VOLATILITY_WINDOW: int = 20  # bars
     
     class Config:
         env_file = ".env"
@@ -0,0 +1,334 @@
+from typing import List, Dict, Any, Optional, Iterator, Iterable, Tuple, Union
+import asyncio
+import contextlib
+import heapq
+import json
+import mmap
+import os
+import struct
+import time
+import zlib
+import numpy as np
+from src.blockchain.log_decoder import SwapRecord, SyncRecord
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+JournalRecord = Union[SwapRecord, SyncRecord, Dict[str, Any]]
+
+# Frame: payload length, CRC32 of the payload; payload: type, sequence,
+# unix timestamp, then the type-specific body
+FRAME = struct.Struct('<II')
+HEADER = struct.Struct('<BQd')
+
+JSON_EVENT, SWAP, SYNC = 0, 1, 2
+# Addresses and hashes as raw bytes, uint256 amounts as 32-byte big-endian words
+SWAP_BODY = struct.Struct('>20sQ32sI20s20s32s32s32s32s')
+SYNC_BODY = struct.Struct('>20sQ32sI32s32s')
+
+SEGMENT_SUFFIX = '.seg'
+
+
+def _raw(hex_value: str) -> bytes:
+    return bytes.fromhex(hex_value[2:] if hex_value.startswith('0x') else hex_value)
+
+
+def _word(value: int) -> bytes:
+    return value.to_bytes(32, 'big')
+
+
+def encode_record(record: JournalRecord) -> Tuple[int, bytes]:
+    """(type, body) for a decoded log record or a processed event dict."""
+    if isinstance(record, SwapRecord):
+        return SWAP, SWAP_BODY.pack(
+            _raw(record.address), record.block_number, _raw(record.transaction_hash), record.log_index,
+            _raw(record.sender), _raw(record.to), _word(record.amount0_in), _word(record.amount1_in),
+            _word(record.amount0_out), _word(record.amount1_out)
+        )
+    if isinstance(record, SyncRecord):
+        return SYNC, SYNC_BODY.pack(
+            _raw(record.address), record.block_number, _raw(record.transaction_hash), record.log_index,
+            _word(record.reserve0), _word(record.reserve1)
+        )
+    return JSON_EVENT, json.dumps(record, default=str, separators=(',', ':')).encode()
+
+
+def decode_record(kind: int, body: Union[bytes, memoryview]) -> JournalRecord:
+    if kind == SWAP:
+        (address, block, tx, index, sender, to, a0_in, a1_in, a0_out, a1_out) = SWAP_BODY.unpack(body)
+        return SwapRecord(
+            '0x' + address.hex(), block, '0x' + tx.hex(), index, '0x' + sender.hex(), '0x' + to.hex(),
+            int.from_bytes(a0_in, 'big'), int.from_bytes(a1_in, 'big'),
+            int.from_bytes(a0_out, 'big'), int.from_bytes(a1_out, 'big')
+        )
+    if kind == SYNC:
+        address, block, tx, index, reserve0, reserve1 = SYNC_BODY.unpack(body)
+        return SyncRecord(
+            '0x' + address.hex(), block, '0x' + tx.hex(), index,
+            int.from_bytes(reserve0, 'big'), int.from_bytes(reserve1, 'big')
+        )
+    if kind == JSON_EVENT:
+        return json.loads(bytes(body))
+    raise ValueError(f"Unknown journal record type: {kind}")
+
+
+def _frames(data: Union[bytes, mmap.mmap]) -> Iterator[Tuple[int, int, float, memoryview, int]]:
+    """(type, seq, timestamp, body, end offset) for each intact frame; stops at a torn or corrupt one."""
+    view = memoryview(data)
+    offset, size = 0, len(view)
+    try:
+        while offset + FRAME.size <= size:
+            length, crc = FRAME.unpack_from(view, offset)
+            start, end = offset + FRAME.size, offset + FRAME.size + length
+            if length < HEADER.size or end > size:
+                return
+            payload = view[start:end]
+            try:
+                if zlib.crc32(payload) != crc:
+                    return
+                kind, seq, timestamp = HEADER.unpack_from(payload)
+                yield kind, seq, timestamp, payload[HEADER.size:], end
+            finally:
+                payload.release()
+            offset = end
+    finally:
+        view.release()
+
+
+def _segments(directory: str) -> List[Tuple[int, str]]:
+    """(first sequence, path) of every segment, oldest first."""
+    if not os.path.isdir(directory):
+        return []
+    return sorted(
+        (int(name[:-len(SEGMENT_SUFFIX)]), os.path.join(directory, name))
+        for name in os.listdir(directory) if name.endswith(SEGMENT_SUFFIX)
+    )
+
+
+def read_journal(directory: str, from_seq: int = 0) -> Iterator[Tuple[int, float, JournalRecord]]:
+    """Replay (seq, timestamp, record) from ``from_seq`` on via mmap; usable offline for backtests."""
+    segments = _segments(directory)
+    for i, (first, path) in enumerate(segments):
+        if i + 1 < len(segments) and segments[i + 1][0] <= from_seq:
+            continue
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                continue
+            # Every view into the map is released before it closes, even when
+            # the consumer stops early
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data, \
+                    contextlib.closing(_frames(data)) as frames:
+                for kind, seq, timestamp, body, _ in frames:
+                    try:
+                        record = decode_record(kind, body) if seq >= from_seq else None
+                    finally:
+                        body.release()
+                    if record is not None:
+                        yield seq, timestamp, record
+
+
+def price_series(
+    directory: str,
+    address: str,
+    decimals0: int = 18,
+    decimals1: int = 18,
+    from_seq: int = 0
+) -> Tuple[np.ndarray, np.ndarray]:
+    """(block numbers, token1-per-token0 prices) of a pair from journaled Syncs, e.g. for Backtester."""
+    address = address.lower()
+    blocks, prices = [], []
+    scale = 10.0 ** (decimals0 - decimals1)
+    for _, _, record in read_journal(directory, from_seq):
+        if isinstance(record, SyncRecord) and record.address == address and record.reserve0:
+            blocks.append(record.block_number)
+            prices.append(record.reserve1 / record.reserve0 * scale)
+    return np.asarray(blocks, dtype=np.int64), np.asarray(prices, dtype=np.float64)
+
+
+class EventJournal:
+    """Segmented append-only journal of decoded events with CRC framing.
+
+    Appends are buffered writes; a background task fsyncs the active
+    segment every ``fsync_interval`` seconds, so many events share one
+    fsync. Records appended with ``pending=True`` must later be acked
+    (e.g. once persisted to the database); the lowest unacked sequence
+    bounds ``committed``, which is checkpointed so a restart replays only
+    what never reached the database. Segments roll at ``segment_bytes``
+    and old, fully committed segments beyond ``retain_segments`` are
+    deleted.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        segment_bytes: int = 64 * 1024 * 1024,
+        fsync_interval: float = 0.05,
+        retain_segments: int = 8
+    ):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.fsync_interval = fsync_interval
+        self.retain_segments = retain_segments
+        self.checkpoint_path = os.path.join(directory, 'checkpoint.json')
+        self.next_seq = 0
+        self._file: Any = None
+        self._segment_start = 0
+        self._segment_size = 0
+        self._outstanding: List[int] = []
+        self._acked: set = set()
+        self._committed = -1
+        self._saved_committed = -1
+        self._dirty = False
+        self.running = False
+        self.stats = {'appended': 0, 'bytes': 0, 'fsyncs': 0, 'segments_rolled': 0, 'segments_deleted': 0}
+
+    def open(self) -> int:
+        """Recover the sequence from disk, dropping a torn tail left by a crash.
+
+        Returns the checkpointed commit point: records after it may not
+        have reached the database before the last shutdown.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        if os.path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path) as f:
+                self._committed = self._saved_committed = json.load(f)['committed']
+        segments = _segments(self.directory)
+        if not segments:
+            self.next_seq = self._committed + 1
+            self._open_segment(self.next_seq)
+            return self._committed
+        first, path = segments[-1]
+        valid_end, last_seq = 0, first - 1
+        with open(path, 'rb') as f:
+            data = f.read()
+        for _, seq, _, body, end in _frames(data):
+            body.release()
+            valid_end, last_seq = end, seq
+        if valid_end < len(data):
+            logger.warning(f"Truncating {len(data) - valid_end} torn bytes from journal segment {path}")
+            with open(path, 'r+b') as f:
+                f.truncate(valid_end)
+        self.next_seq = max(last_seq + 1, self._committed + 1)
+        self._file = open(path, 'ab')
+        self._segment_start = first
+        self._segment_size = valid_end
+        return self._committed
+
+    def _open_segment(self, first_seq: int) -> None:
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+        path = os.path.join(self.directory, f"{first_seq:020d}{SEGMENT_SUFFIX}")
+        self._file = open(path, 'ab')
+        self._segment_start = first_seq
+        self._segment_size = 0
+
+    def append(self, record: JournalRecord, timestamp: Optional[float] = None, pending: bool = True) -> int:
+        """Frame and buffer a record; returns its sequence number."""
+        if self._file is None:
+            self.open()
+        if self._segment_size >= self.segment_bytes:
+            self._open_segment(self.next_seq)
+            self.stats['segments_rolled'] += 1
+        seq = self.next_seq
+        kind, body = encode_record(record)
+        payload = HEADER.pack(kind, seq, time.time() if timestamp is None else timestamp) + body
+        frame = FRAME.pack(len(payload), zlib.crc32(payload)) + payload
+        self._file.write(frame)
+        self._segment_size += len(frame)
+        self.next_seq += 1
+        if pending:
+            heapq.heappush(self._outstanding, seq)
+        self._dirty = True
+        self.stats['appended'] += 1
+        self.stats['bytes'] += len(frame)
+        return seq
+
+    def mark_pending(self, seqs: Iterable[int]) -> None:
+        """Track replayed records again until they are acked."""
+        for seq in seqs:
+            heapq.heappush(self._outstanding, seq)
+
+    def ack(self, seqs: Iterable[int]) -> None:
+        """Mark pending records as durably handled downstream."""
+        self._acked.update(seqs)
+        while self._outstanding and self._outstanding[0] in self._acked:
+            self._acked.discard(heapq.heappop(self._outstanding))
+
+    @property
+    def committed(self) -> int:
+        """Highest sequence with it and everything before it handled downstream."""
+        return (self._outstanding[0] if self._outstanding else self.next_seq) - 1
+
+    def _fsync(self) -> None:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    async def sync(self) -> None:
+        """Flush and fsync the active segment, then checkpoint the commit point."""
+        if self._file is None:
+            return
+        committed = self.committed
+        if self._dirty:
+            self._dirty = False
+            await asyncio.get_running_loop().run_in_executor(None, self._fsync)
+            self.stats['fsyncs'] += 1
+        if committed != self._saved_committed:
+            self._save_checkpoint(committed)
+            self._delete_old_segments()
+
+    def _save_checkpoint(self, committed: int) -> None:
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'committed': committed, 'updated_at': time.time()}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.checkpoint_path)
+        self._saved_committed = committed
+
+    def _delete_old_segments(self) -> None:
+        segments = _segments(self.directory)
+        for i, (first, path) in enumerate(segments[:-self.retain_segments] if self.retain_segments else []):
+            # A segment is fully committed once the next one starts at or below the commit point
+            if segments[i + 1][0] - 1 <= self._saved_committed:
+                os.remove(path)
+                self.stats['segments_deleted'] += 1
+
+    def replay(self, from_seq: int = 0) -> Iterator[Tuple[int, float, JournalRecord]]:
+        """Records from ``from_seq`` on, including ones not yet fsynced."""
+        if self._file is not None:
+            self._file.flush()
+        return read_journal(self.directory, from_seq)
+
+    async def run(self) -> None:
+        """Group-commit loop: one fsync per interval for everything appended."""
+        self.running = True
+        while self.running:
+            try:
+                await self.sync()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error syncing event journal: {str(e)}")
+            await asyncio.sleep(self.fsync_interval)
+
+    async def stop(self) -> None:
+        self.running = False
+
+    async def close(self) -> None:
+        self.running = False
+        if self._file is not None:
+            await self.sync()
+            self._file.close()
+            self._file = None
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            'next_seq': self.next_seq,
+            'committed': self.committed,
+            'outstanding': len(self._outstanding),
+            'segment_start': self._segment_start,
+            'segment_size': self._segment_size
+        }
@@ -0,0 +1,227 @@
+from typing import List, Dict, Any, Callable, Awaitable, Optional, Sequence, Tuple, Union
+import asyncio
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+BatchWriter = Callable[[List[Dict[str, Any]]], Awaitable[Any]]
+
+
+class WriteBehindBuffer:
+    """Accumulate rows in memory and persist them in bulk off the hot path.
+
+    ``put`` returns as soon as the row is queued; a background task hands
+    batches to ``writer`` (a bulk upsert) once ``max_batch`` rows are
+    waiting or ``flush_interval`` seconds have passed. Rows are keyed by
+    ``key`` (a column or tuple of columns) so a repeat of the same row
+    before a flush is coalesced, and the writer is expected to upsert on
+    that key so a retried batch is idempotent. When ``max_pending`` rows
+    are waiting (the database is lagging) ``put`` blocks until a flush
+    makes room. ``on_flush`` is called with each written batch (plus any
+    rows it superseded), e.g. to acknowledge journaled events.
+
+    A failed batch halves the batch size until writes succeed again. A row
+    that fails on its own is moved behind the rest of the queue and written
+    alone from then on; once it has failed ``max_row_failures`` times with
+    other writes succeeding in between (the database is up, the row is bad)
+    it is dropped and handed to ``on_dead_letter``.
+    """
+
+    def __init__(
+        self,
+        writer: BatchWriter,
+        key: Union[str, Sequence[str]] = 'transaction_hash',
+        max_batch: int = 500,
+        flush_interval: float = 1.0,
+        max_pending: int = 10000,
+        retry_delay: float = 1.0,
+        close_retries: int = 3,
+        on_flush: Optional[Callable[[List[Dict[str, Any]]], Any]] = None,
+        max_row_failures: int = 3,
+        on_dead_letter: Optional[Callable[[List[Dict[str, Any]]], Any]] = None
+    ):
+        self.writer = writer
+        self.key = key
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.retry_delay = retry_delay
+        self.close_retries = close_retries
+        self.on_flush = on_flush
+        self.max_row_failures = max_row_failures
+        self.on_dead_letter = on_dead_letter
+        # Insertion-ordered; a re-put row keeps its place with the newer values
+        self._rows: Dict[Any, Dict[str, Any]] = {}
+        # key -> rows replaced by a newer version, reported once that one is written
+        self._superseded: Dict[Any, List[Dict[str, Any]]] = {}
+        # key -> (failures, successful writes seen at the last failure) for
+        # rows that failed on their own
+        self._strikes: Dict[Any, Tuple[int, int]] = {}
+        self._batch_limit = max_batch
+        self._writes = 0
+        self._room = asyncio.Condition()
+        self._ready = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+        self.stats = {
+            'queued': 0,
+            'coalesced': 0,
+            'written': 0,
+            'batches': 0,
+            'failures': 0,
+            'dead_lettered': 0,
+            'backpressure_waits': 0
+        }
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    async def put(self, row: Dict[str, Any]) -> None:
+        """Queue a row; waits only while ``max_pending`` rows are unflushed."""
+        if self._closed:
+            raise RuntimeError("Write-behind buffer is closed")
+        key = row[self.key] if isinstance(self.key, str) else tuple(row[k] for k in self.key)
+        if key in self._rows:
+            if self.on_flush is not None:
+                self._superseded.setdefault(key, []).append(self._rows[key])
+            self._rows[key] = row
+            self.stats['coalesced'] += 1
+            return
+        if len(self._rows) >= self.max_pending:
+            self.stats['backpressure_waits'] += 1
+            self._ready.set()
+            async with self._room:
+                await self._room.wait_for(lambda: len(self._rows) < self.max_pending)
+        self._rows[key] = row
+        self.stats['queued'] += 1
+        if len(self._rows) >= self.max_batch:
+            self._ready.set()
+
+    async def flush(self) -> int:
+        """Write everything queued so far; failed batches stay queued."""
+        written = 0
+        async with self._flush_lock:
+            while self._rows:
+                keys = self._next_batch()
+                batch = [self._rows[k] for k in keys]
+                try:
+                    await self.writer(batch)
+                except Exception as e:
+                    self.stats['failures'] += 1
+                    logger.error(f"Error flushing {len(batch)} buffered rows: {str(e)}")
+                    await self._batch_failed(keys, batch)
+                    raise
+                self._writes += 1
+                self._batch_limit = min(self.max_batch, self._batch_limit * 2)
+                flushed = list(batch)
+                for k, row in zip(keys, batch):
+                    # Only drop rows that weren't replaced while the batch was in flight
+                    if self._rows.get(k) is row:
+                        del self._rows[k]
+                        self._strikes.pop(k, None)
+                        flushed.extend(self._superseded.pop(k, ()))
+                if self.on_flush is not None:
+                    try:
+                        self.on_flush(flushed)
+                    except Exception as e:
+                        logger.error(f"Error in write-behind flush callback: {str(e)}")
+                written += len(batch)
+                self.stats['written'] += len(batch)
+                self.stats['batches'] += 1
+                async with self._room:
+                    self._room.notify_all()
+        return written
+
+    def _next_batch(self) -> List[Any]:
+        """Keys of the next batch; a row that failed on its own goes alone."""
+        keys = []
+        for key in self._rows:
+            if key in self._strikes:
+                if not keys:
+                    keys.append(key)
+                break
+            keys.append(key)
+            if len(keys) >= self._batch_limit:
+                break
+        return keys
+
+    async def _batch_failed(self, keys: List[Any], batch: List[Dict[str, Any]]) -> None:
+        if len(keys) > 1:
+            self._batch_limit = max(1, len(keys) // 2)
+            return
+        key, row = keys[0], batch[0]
+        if self._rows.get(key) is not row:
+            # Replaced while in flight; the newer version gets a clean slate
+            self._strikes.pop(key, None)
+            return
+        failures, writes = self._strikes.get(key, (0, -1))
+        # Failures only count as evidence against the row if other rows were
+        # written since its last one; otherwise the database may just be down
+        if self._writes > writes:
+            failures += 1
+        if failures < self.max_row_failures:
+            self._strikes[key] = (failures, self._writes)
+            # Behind everything else so it doesn't block the queue
+            del self._rows[key]
+            self._rows[key] = row
+            return
+        del self._rows[key]
+        del self._strikes[key]
+        dropped = [row, *self._superseded.pop(key, ())]
+        self.stats['dead_lettered'] += 1
+        logger.error(f"Dead-lettering buffered row {key} after {failures} failed writes")
+        if self.on_dead_letter is not None:
+            try:
+                self.on_dead_letter(dropped)
+            except Exception as e:
+                logger.error(f"Error in write-behind dead-letter callback: {str(e)}")
+        async with self._room:
+            self._room.notify_all()
+
+    async def run(self) -> None:
+        """Flush on size or time until closed; retries failed batches."""
+        while not self._closed:
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._ready.clear()
+            try:
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                if not self._closed:
+                    await asyncio.sleep(self.retry_delay)
+
+    def start(self) -> asyncio.Task:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+        return self._task
+
+    async def close(self) -> None:
+        """Stop accepting rows and flush whatever is still buffered."""
+        self._closed = True
+        self._ready.set()
+        if self._task is not None:
+            # The loop sees _closed after its current flush and exits
+            await self._task
+            self._task = None
+        for attempt in range(self.close_retries + 1):
+            try:
+                await self.flush()
+                return
+            except Exception:
+                if attempt == self.close_retries:
+                    logger.error(f"Dropping {len(self._rows)} unflushed rows on shutdown")
+                    raise
+                await asyncio.sleep(self.retry_delay)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            'pending': len(self._rows),
+            'suspect': len(self._strikes),
+            'batch_limit': self._batch_limit
+        }
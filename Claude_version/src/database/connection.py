@@ -0,0 +1,257 @@
+from typing import List, Dict, Any, Optional, Sequence
+from contextlib import asynccontextmanager
+from decimal import Decimal
+from functools import lru_cache
+import asyncio
+import os
+import re
+import sqlite3
+import time
+from src.utils.error_handler import DatabaseError
+from src.utils.logger import get_logger
+
+try:
+    import aiosqlite
+except ImportError:  # only needed for sqlite:// URLs
+    aiosqlite = None
+
+try:
+    import asyncpg
+except ImportError:  # only needed for postgresql:// URLs
+    asyncpg = None
+
+logger = get_logger()
+
+# SQLite stores NUMERIC columns from text without float rounding
+sqlite3.register_adapter(Decimal, str)
+
+
+@lru_cache(maxsize=512)
+def _sqlite_sql(sql: str) -> str:
+    # Queries are written with asyncpg's $n placeholders; SQLite accepts ?n
+    return re.sub(r'\$(\d+)', r'?\1', sql)
+
+
+class _SQLitePool:
+    """Fixed set of aiosqlite connections handed out through a queue.
+
+    Each connection keeps sqlite3's per-connection statement cache, so hot
+    queries are compiled once per connection.
+    """
+
+    def __init__(self, path: str, size: int, statement_cache_size: int):
+        self.path = path
+        self.size = size
+        self.statement_cache_size = statement_cache_size
+        self._idle: asyncio.Queue = asyncio.Queue()
+        self._connections: List[Any] = []
+
+    async def open(self) -> None:
+        if self.path != ':memory:':
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        # A private in-memory database can't be shared, so it gets one connection
+        size = 1 if self.path == ':memory:' else self.size
+        for _ in range(size):
+            connection = await aiosqlite.connect(
+                self.path,
+                cached_statements=self.statement_cache_size,
+                detect_types=sqlite3.PARSE_DECLTYPES
+            )
+            connection.row_factory = aiosqlite.Row
+            await connection.execute('PRAGMA journal_mode=WAL')
+            await connection.execute('PRAGMA synchronous=NORMAL')
+            self._connections.append(connection)
+            self._idle.put_nowait(connection)
+
+    @asynccontextmanager
+    async def acquire(self):
+        connection = await self._idle.get()
+        try:
+            yield connection
+        finally:
+            self._idle.put_nowait(connection)
+
+    async def execute(self, sql: str, args: Sequence[Any]) -> int:
+        async with self.acquire() as connection:
+            async with connection.execute(_sqlite_sql(sql), args) as cursor:
+                affected = cursor.rowcount
+            await connection.commit()
+            return max(affected, 0)
+
+    async def executemany(self, sql: str, rows: Sequence[Sequence[Any]]) -> None:
+        async with self.acquire() as connection:
+            try:
+                await connection.executemany(_sqlite_sql(sql), rows)
+                await connection.commit()
+            except Exception:
+                await connection.rollback()
+                raise
+
+    async def fetch(self, sql: str, args: Sequence[Any]) -> List[Dict[str, Any]]:
+        async with self.acquire() as connection:
+            async with connection.execute(_sqlite_sql(sql), args) as cursor:
+                return [dict(row) for row in await cursor.fetchall()]
+
+    async def executescript(self, script: str) -> None:
+        async with self.acquire() as connection:
+            await connection.executescript(script)
+            await connection.commit()
+
+    async def close(self) -> None:
+        for connection in self._connections:
+            await connection.close()
+        self._connections = []
+        self._idle = asyncio.Queue()
+
+    def stats(self) -> Dict[str, int]:
+        return {'size': len(self._connections), 'idle': self._idle.qsize()}
+
+
+class _PostgresPool:
+    """asyncpg pool; asyncpg prepares and caches statements per connection."""
+
+    def __init__(self, dsn: str, min_size: int, max_size: int, statement_cache_size: int):
+        self.dsn = dsn
+        self.min_size = min_size
+        self.max_size = max_size
+        self.statement_cache_size = statement_cache_size
+        self._pool: Any = None
+
+    async def open(self) -> None:
+        self._pool = await asyncpg.create_pool(
+            self.dsn,
+            min_size=self.min_size,
+            max_size=self.max_size,
+            statement_cache_size=self.statement_cache_size
+        )
+
+    async def execute(self, sql: str, args: Sequence[Any]) -> int:
+        # Command status such as 'DELETE 42'
+        status = await self._pool.execute(sql, *args)
+        count = status.rsplit(' ', 1)[-1]
+        return int(count) if count.isdigit() else 0
+
+    async def executemany(self, sql: str, rows: Sequence[Sequence[Any]]) -> None:
+        async with self._pool.acquire() as connection:
+            async with connection.transaction():
+                await connection.executemany(sql, rows)
+
+    async def fetch(self, sql: str, args: Sequence[Any]) -> List[Dict[str, Any]]:
+        return [dict(row) for row in await self._pool.fetch(sql, *args)]
+
+    async def executescript(self, script: str) -> None:
+        await self._pool.execute(script)
+
+    async def close(self) -> None:
+        await self._pool.close()
+
+    def stats(self) -> Dict[str, int]:
+        return {'size': self._pool.get_size(), 'idle': self._pool.get_idle_size()}
+
+
+class Database:
+    """Bounded async connection pool for ``sqlite:///path`` or ``postgresql://`` URLs.
+
+    The pool is opened on first use. Queries use ``$1``-style placeholders
+    on both backends.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        min_size: int = 1,
+        max_size: int = 10,
+        statement_cache_size: int = 256
+    ):
+        self.url = url
+        self.min_size = min_size
+        self.max_size = max_size
+        self.statement_cache_size = statement_cache_size
+        self.dialect = 'sqlite' if url.startswith('sqlite') else 'postgresql'
+        self._pool: Any = None
+        self._lock = asyncio.Lock()
+        self.stats = {'queries': 0, 'batches': 0, 'rows_written': 0, 'errors': 0}
+
+    def _create_pool(self) -> Any:
+        if self.dialect == 'sqlite':
+            if aiosqlite is None:
+                raise DatabaseError("aiosqlite is required for SQLite databases", error_code="DATABASE_ERROR")
+            path = self.url.split(':///', 1)[1] if ':///' in self.url else ':memory:'
+            return _SQLitePool(path or ':memory:', self.max_size, self.statement_cache_size)
+        if asyncpg is None:
+            raise DatabaseError("asyncpg is required for PostgreSQL databases", error_code="DATABASE_ERROR")
+        dsn = self.url.replace('postgresql+asyncpg://', 'postgresql://')
+        return _PostgresPool(dsn, self.min_size, self.max_size, self.statement_cache_size)
+
+    async def connect(self) -> Any:
+        if self._pool is None:
+            async with self._lock:
+                if self._pool is None:
+                    pool = self._create_pool()
+                    await pool.open()
+                    self._pool = pool
+                    logger.info(f"Opened {self.dialect} connection pool")
+        return self._pool
+
+    async def execute(self, sql: str, *args: Any) -> int:
+        """Run one statement; returns the number of rows affected."""
+        pool = await self.connect()
+        try:
+            affected = await pool.execute(sql, args)
+            self.stats['queries'] += 1
+            return affected
+        except Exception as e:
+            self.stats['errors'] += 1
+            logger.error(f"Error executing query: {str(e)}")
+            raise
+
+    async def executemany(self, sql: str, rows: Sequence[Sequence[Any]]) -> int:
+        """Run one statement for every row in a single transaction."""
+        if not rows:
+            return 0
+        pool = await self.connect()
+        try:
+            await pool.executemany(sql, rows)
+            self.stats['batches'] += 1
+            self.stats['rows_written'] += len(rows)
+            return len(rows)
+        except Exception as e:
+            self.stats['errors'] += 1
+            logger.error(f"Error executing batch of {len(rows)} rows: {str(e)}")
+            raise
+
+    async def fetch(self, sql: str, *args: Any) -> List[Dict[str, Any]]:
+        pool = await self.connect()
+        try:
+            rows = await pool.fetch(sql, args)
+            self.stats['queries'] += 1
+            return rows
+        except Exception as e:
+            self.stats['errors'] += 1
+            logger.error(f"Error fetching rows: {str(e)}")
+            raise
+
+    async def fetchrow(self, sql: str, *args: Any) -> Optional[Dict[str, Any]]:
+        rows = await self.fetch(sql, *args)
+        return rows[0] if rows else None
+
+    async def executescript(self, script: str) -> None:
+        pool = await self.connect()
+        await pool.executescript(script)
+
+    async def ping(self) -> float:
+        """Round-trip ``SELECT 1`` through the pool; returns latency in seconds."""
+        started = time.perf_counter()
+        await self.fetch('SELECT 1 AS ok')
+        return time.perf_counter() - started
+
+    async def close(self) -> None:
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+
+    def get_pool_stats(self) -> Dict[str, Any]:
+        pool = self._pool.stats() if self._pool is not None else {'size': 0, 'idle': 0}
+        return {**self.stats, **pool, 'dialect': self.dialect, 'max_size': self.max_size}
@@ -0,0 +1,304 @@
+from typing import List, Dict, Any, Optional, Sequence, AsyncIterator
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from decimal import Decimal
+from functools import lru_cache
+import sqlite3
+from src.database.connection import Database
+from src.config.settings import settings
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+# DECIMAL_TEXT has TEXT affinity, so token amounts wider than 64 bits are
+# stored verbatim instead of being rounded to REAL, and read back as Decimal
+sqlite3.register_converter('DECIMAL_TEXT', lambda value: Decimal(value.decode()))
+
+# Mirrors deployment/db/init.sql for SQLite (tests and local development)
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS trades (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    transaction_hash VARCHAR(66),
+    symbol VARCHAR(20) NOT NULL,
+    amount DECIMAL_TEXT NOT NULL,
+    price DECIMAL_TEXT NOT NULL,
+    timestamp TIMESTAMP NOT NULL,
+    status VARCHAR(20) NOT NULL,
+    type VARCHAR(10) NOT NULL,
+    UNIQUE (transaction_hash, timestamp)
+);
+
+CREATE TABLE IF NOT EXISTS trade_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    transaction_hash VARCHAR(66) NOT NULL,
+    log_index INTEGER NOT NULL,
+    block_number INTEGER NOT NULL,
+    timestamp TIMESTAMP NOT NULL,
+    dex_address VARCHAR(42) NOT NULL,
+    event_type VARCHAR(20) NOT NULL,
+    token_in VARCHAR(42),
+    token_out VARCHAR(42),
+    amount_in DECIMAL_TEXT,
+    amount_out DECIMAL_TEXT,
+    UNIQUE (transaction_hash, log_index, timestamp)
+);
+
+CREATE TABLE IF NOT EXISTS predictions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    symbol VARCHAR(20) NOT NULL,
+    prediction DECIMAL_TEXT NOT NULL,
+    confidence DECIMAL_TEXT NOT NULL,
+    timestamp TIMESTAMP NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS performance_metrics (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    total_return DECIMAL_TEXT NOT NULL,
+    sharpe_ratio DECIMAL_TEXT NOT NULL,
+    max_drawdown DECIMAL_TEXT NOT NULL,
+    win_rate DECIMAL_TEXT NOT NULL,
+    timestamp TIMESTAMP NOT NULL,
+    timeframe VARCHAR(10),
+    bucket_start TIMESTAMP,
+    start_equity DECIMAL_TEXT,
+    end_equity DECIMAL_TEXT,
+    peak_equity DECIMAL_TEXT,
+    min_equity DECIMAL_TEXT,
+    trade_count INTEGER DEFAULT 0,
+    closed_trades INTEGER DEFAULT 0,
+    winning_trades INTEGER DEFAULT 0,
+    return_sum DOUBLE PRECISION DEFAULT 0,
+    return_sq_sum DOUBLE PRECISION DEFAULT 0,
+    UNIQUE (timeframe, bucket_start)
+);
+
+CREATE INDEX IF NOT EXISTS idx_trades_timestamp ON trades(timestamp);
+CREATE INDEX IF NOT EXISTS idx_trades_symbol_timestamp ON trades(symbol, timestamp);
+CREATE INDEX IF NOT EXISTS idx_trade_events_block ON trade_events(block_number);
+CREATE INDEX IF NOT EXISTS idx_trade_events_dex_timestamp ON trade_events(dex_address, timestamp);
+CREATE INDEX IF NOT EXISTS idx_predictions_symbol_timestamp ON predictions(symbol, timestamp);
+"""
+
+TRADE_COLUMNS = ('transaction_hash', 'symbol', 'amount', 'price', 'timestamp', 'status', 'type')
+TRADE_EVENT_COLUMNS = (
+    'transaction_hash', 'log_index', 'block_number', 'timestamp', 'dex_address',
+    'event_type', 'token_in', 'token_out', 'amount_in', 'amount_out'
+)
+PREDICTION_COLUMNS = ('symbol', 'prediction', 'confidence', 'timestamp')
+PERFORMANCE_COLUMNS = (
+    'total_return', 'sharpe_ratio', 'max_drawdown', 'win_rate', 'timestamp', 'timeframe',
+    'bucket_start', 'start_equity', 'end_equity', 'peak_equity', 'min_equity', 'trade_count',
+    'closed_trades', 'winning_trades', 'return_sum', 'return_sq_sum'
+)
+
+NUMERIC_COLUMNS = {
+    'amount', 'price', 'amount_in', 'amount_out', 'prediction', 'confidence', 'total_return',
+    'sharpe_ratio', 'max_drawdown', 'win_rate', 'start_equity', 'end_equity', 'peak_equity', 'min_equity'
+}
+TIMESTAMP_COLUMNS = {'timestamp', 'bucket_start'}
+
+
+def _insert_sql(table: str, columns: Sequence[str], conflict: Sequence[str] = ()) -> str:
+    """Parameterised INSERT, upserting on ``conflict`` (same SQL on Postgres and SQLite)."""
+    placeholders = ', '.join(f"${i}" for i in range(1, len(columns) + 1))
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"
+    if conflict:
+        updates = ', '.join(f"{column} = EXCLUDED.{column}" for column in columns if column not in conflict)
+        sql += f" ON CONFLICT ({', '.join(conflict)}) DO UPDATE SET {updates}"
+    return sql
+
+
+# Built once so each statement text is identical across calls and hits the
+# per-connection prepared statement cache. trades and trade_events are
+# partitioned by timestamp on Postgres, so their unique keys include it.
+UPSERT_TRADES = _insert_sql('trades', TRADE_COLUMNS, ('transaction_hash', 'timestamp'))
+UPSERT_TRADE_EVENTS = _insert_sql('trade_events', TRADE_EVENT_COLUMNS, ('transaction_hash', 'log_index', 'timestamp'))
+INSERT_PREDICTIONS = _insert_sql('predictions', PREDICTION_COLUMNS)
+UPSERT_PERFORMANCE = _insert_sql('performance_metrics', PERFORMANCE_COLUMNS, ('timeframe', 'bucket_start'))
+
+SELECT_TRADE = "SELECT * FROM trades WHERE transaction_hash = $1"
+SELECT_RECENT_TRADES = "SELECT * FROM trades ORDER BY timestamp DESC LIMIT $1"
+SELECT_RECENT_PREDICTIONS = "SELECT * FROM predictions WHERE symbol = $1 ORDER BY timestamp DESC LIMIT $2"
+SELECT_PERFORMANCE = (
+    "SELECT * FROM performance_metrics WHERE timeframe = $1 AND bucket_start >= $2 AND bucket_start < $3 "
+    "ORDER BY bucket_start"
+)
+
+# Time-partitioned tables served by the range-query API -> the column its
+# ``symbols`` filter applies to (trade events are filtered by pool address)
+RANGE_TABLES = {'trades': 'symbol', 'predictions': 'symbol', 'trade_events': 'dex_address'}
+
+
+@lru_cache(maxsize=128)
+def _range_sql(table: str, symbols: int, keyset: bool, limit: bool) -> str:
+    """Time-range read with optional symbol filter; one cached statement per shape.
+
+    Filtering on timestamp lets Postgres prune to the partitions that
+    overlap [start, end); rows come back in (timestamp, id) order so
+    ``keyset`` pages resume after the last row without OFFSET scans.
+    """
+    if table not in RANGE_TABLES:
+        raise ValueError(f"Not a time-partitioned table: {table}")
+    conditions = ["timestamp >= $1", "timestamp < $2"]
+    index = 3
+    if symbols:
+        conditions.append(f"{RANGE_TABLES[table]} IN ({', '.join(f'${i}' for i in range(index, index + symbols))})")
+        index += symbols
+    if keyset:
+        conditions.append(f"(timestamp, id) > (${index}, ${index + 1})")
+        index += 2
+    sql = f"SELECT * FROM {table} WHERE {' AND '.join(conditions)} ORDER BY timestamp, id"
+    if limit:
+        sql += f" LIMIT ${index}"
+    return sql
+
+
+
+def _timestamp(value: Any) -> Optional[datetime]:
+    if value is None or isinstance(value, datetime):
+        return value
+    if isinstance(value, str):
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).replace(tzinfo=None)
+    return datetime.utcfromtimestamp(float(value))
+
+
+def _numeric(value: Any) -> Optional[Decimal]:
+    if value is None or isinstance(value, Decimal):
+        return value
+    # str() keeps floats at their shortest repr instead of the binary expansion
+    return Decimal(str(value))
+
+
+def _params(row: Dict[str, Any], columns: Sequence[str]) -> tuple:
+    values = []
+    for column in columns:
+        value = row.get(column)
+        if column in NUMERIC_COLUMNS:
+            value = _numeric(value)
+        elif column in TIMESTAMP_COLUMNS:
+            value = _timestamp(value)
+        values.append(value)
+    return tuple(values)
+
+
+class TradingStore:
+    """Bulk reads and writes for trades, trade events, predictions and performance metrics."""
+
+    def __init__(self, database: Database):
+        self.database = database
+
+    async def init_schema(self) -> None:
+        """Create tables on SQLite; Postgres is provisioned from deployment/db/init.sql."""
+        if self.database.dialect == 'sqlite':
+            await self.database.executescript(SQLITE_SCHEMA)
+
+    async def save_trades(self, rows: Sequence[Dict[str, Any]]) -> int:
+        """Upsert trades on transaction_hash."""
+        return await self.database.executemany(UPSERT_TRADES, [_params(r, TRADE_COLUMNS) for r in rows])
+
+    async def save_trade_events(self, rows: Sequence[Dict[str, Any]]) -> int:
+        """Upsert on-chain trade events on (transaction_hash, log_index, block timestamp)."""
+        return await self.database.executemany(
+            UPSERT_TRADE_EVENTS,
+            [_params({'log_index': 0, **r}, TRADE_EVENT_COLUMNS) for r in rows]
+        )
+
+    async def save_predictions(self, rows: Sequence[Dict[str, Any]]) -> int:
+        return await self.database.executemany(INSERT_PREDICTIONS, [_params(r, PREDICTION_COLUMNS) for r in rows])
+
+    async def save_performance_buckets(self, rows: Sequence[Dict[str, Any]]) -> int:
+        """Upsert rollup buckets on (timeframe, bucket_start)."""
+        return await self.database.executemany(UPSERT_PERFORMANCE, [_params(r, PERFORMANCE_COLUMNS) for r in rows])
+
+    async def get_trade(self, transaction_hash: str) -> Optional[Dict[str, Any]]:
+        return await self.database.fetchrow(SELECT_TRADE, transaction_hash)
+
+    async def recent_trades(self, limit: int = 100) -> List[Dict[str, Any]]:
+        return await self.database.fetch(SELECT_RECENT_TRADES, limit)
+
+    async def recent_predictions(self, symbol: str, limit: int = 100) -> List[Dict[str, Any]]:
+        return await self.database.fetch(SELECT_RECENT_PREDICTIONS, symbol, limit)
+
+    async def range(
+        self,
+        table: str,
+        start: Any,
+        end: Any,
+        symbols: Optional[Sequence[str]] = None,
+        limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Rows of ``table`` with start <= timestamp < end, optionally for some symbols only."""
+        symbols = sorted(set(symbols or ()))
+        args = [_timestamp(start), _timestamp(end), *symbols]
+        if limit:
+            args.append(limit)
+        return await self.database.fetch(_range_sql(table, len(symbols), False, bool(limit)), *args)
+
+    async def iter_range(
+        self,
+        table: str,
+        start: Any,
+        end: Any,
+        symbols: Optional[Sequence[str]] = None,
+        batch_size: int = 5000
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Stream a time range in keyset-paginated batches (training exports, backfills)."""
+        symbols = sorted(set(symbols or ()))
+        base = [_timestamp(start), _timestamp(end), *symbols]
+        rows = await self.database.fetch(_range_sql(table, len(symbols), False, True), *base, batch_size)
+        while rows:
+            yield rows
+            if len(rows) < batch_size:
+                return
+            last = rows[-1]
+            rows = await self.database.fetch(
+                _range_sql(table, len(symbols), True, True),
+                *base, last['timestamp'], last['id'], batch_size
+            )
+
+    async def trades_between(self, start: Any, end: Any, symbols: Optional[Sequence[str]] = None,
+                             limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        return await self.range('trades', start, end, symbols, limit)
+
+    async def predictions_between(self, start: Any, end: Any, symbols: Optional[Sequence[str]] = None,
+                                  limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        return await self.range('predictions', start, end, symbols, limit)
+
+    async def trade_events_between(self, start: Any, end: Any, pools: Optional[Sequence[str]] = None,
+                                   limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        return await self.range('trade_events', start, end, pools, limit)
+
+    async def performance_buckets(self, timeframe: str, start: Any, end: Any) -> List[Dict[str, Any]]:
+        return await self.database.fetch(SELECT_PERFORMANCE, timeframe, _timestamp(start), _timestamp(end))
+
+
+database = Database(
+    settings.DATABASE_URL,
+    min_size=settings.DB_POOL_MIN_SIZE,
+    max_size=settings.DB_POOL_MAX_SIZE,
+    statement_cache_size=settings.DB_STATEMENT_CACHE_SIZE
+)
+store = TradingStore(database)
+
+
+@dataclass
+class TradeEvent:
+    """A Swap observed on-chain, persisted to trade_events."""
+    transaction_hash: str
+    block_number: int
+    timestamp: Any
+    dex_address: str
+    event_type: str
+    log_index: int = 0
+    token_in: Optional[str] = None
+    token_out: Optional[str] = None
+    amount_in: Optional[Any] = None
+    amount_out: Optional[Any] = None
+
+    async def save(self, trading_store: Optional[TradingStore] = None) -> None:
+        await (trading_store or store).save_trade_events([asdict(self)])
+
+    @classmethod
+    async def bulk_upsert(cls, rows: Sequence[Dict[str, Any]], trading_store: Optional[TradingStore] = None) -> int:
+        """Write-behind flush target: one batched upsert for many events."""
+        return await (trading_store or store).save_trade_events(rows)
@@ -0,0 +1,195 @@
+from typing import List, Dict, Any, Optional, Tuple
+from datetime import datetime, timedelta
+import asyncio
+import re
+from src.database.connection import Database
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+INTERVALS = ('day', 'week', 'month')
+
+LIST_PARTITIONS = (
+    "SELECT child.relname AS name FROM pg_inherits "
+    "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+    "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+    "WHERE parent.relname = $1"
+)
+
+
+def period_start(moment: datetime, interval: str) -> datetime:
+    """Start of the partition period containing ``moment``."""
+    day = datetime(moment.year, moment.month, moment.day)
+    if interval == 'day':
+        return day
+    if interval == 'week':
+        return day - timedelta(days=day.weekday())
+    return day.replace(day=1)
+
+
+def next_period(start: datetime, interval: str) -> datetime:
+    if interval == 'day':
+        return start + timedelta(days=1)
+    if interval == 'week':
+        return start + timedelta(weeks=1)
+    return datetime(start.year + start.month // 12, start.month % 12 + 1, 1)
+
+
+def partition_name(table: str, start: datetime) -> str:
+    return f"{table}_p{start:%Y%m%d}"
+
+
+def partition_bounds(table: str, name: str, interval: str) -> Optional[Tuple[datetime, datetime]]:
+    """[start, end) of a managed partition from its name; None for others (e.g. the default)."""
+    match = re.fullmatch(rf"{re.escape(table)}_p(\d{{8}})", name)
+    if match is None:
+        return None
+    start = datetime.strptime(match.group(1), '%Y%m%d')
+    return start, next_period(start, interval)
+
+
+class PartitionManager:
+    """Create upcoming time partitions and enforce retention.
+
+    On PostgreSQL each table in ``retention`` is range-partitioned by
+    timestamp (see deployment/db/init.sql): partitions are created
+    ``ahead`` periods in advance and whole partitions past retention are
+    dropped, which is far cheaper than deleting rows. Rows that landed in
+    a table's DEFAULT partition are moved into their partition when it is
+    created, and expired from it by row. SQLite has no partitioning, so
+    there retention deletes expired rows instead.
+    """
+
+    def __init__(
+        self,
+        database: Database,
+        retention: Dict[str, Optional[int]],
+        interval: str = 'month',
+        ahead: int = 2
+    ):
+        if interval not in INTERVALS:
+            raise ValueError(f"Invalid partition interval: {interval}")
+        self.database = database
+        # table -> days of data kept (None keeps everything)
+        self.retention = retention
+        self.interval = interval
+        self.ahead = ahead
+        # The run() task; stop() cancels it instead of waiting out the interval
+        self._task: Optional[asyncio.Task] = None
+        self.running = False
+        self.stats = {'created': 0, 'dropped': 0, 'rows_moved': 0, 'rows_expired': 0, 'runs': 0, 'errors': 0}
+
+    async def partitions(self, table: str) -> List[str]:
+        if self.database.dialect != 'postgresql':
+            return []
+        rows = await self.database.fetch(LIST_PARTITIONS, table)
+        return sorted(row['name'] for row in rows)
+
+    async def ensure_partitions(self, now: Optional[datetime] = None) -> List[str]:
+        """Create partitions for the current period and ``ahead`` periods after it."""
+        if self.database.dialect != 'postgresql':
+            return []
+        now = now or datetime.utcnow()
+        created = []
+        for table in self.retention:
+            try:
+                existing = set(await self.partitions(table))
+                start = period_start(now, self.interval)
+                for _ in range(self.ahead + 1):
+                    end = next_period(start, self.interval)
+                    name = partition_name(table, start)
+                    if name not in existing:
+                        await self._create_partition(table, name, start, end, f"{table}_default" in existing)
+                        created.append(name)
+                    start = end
+            except Exception as e:
+                # One table's failure shouldn't hold up the others or retention
+                self.stats['errors'] += 1
+                logger.error(f"Error creating partitions for {table}: {str(e)}")
+        if created:
+            self.stats['created'] += len(created)
+            logger.info(f"Created partitions: {', '.join(created)}")
+        return created
+
+    async def _create_partition(self, table: str, name: str, start: datetime, end: datetime, has_default: bool) -> None:
+        # Table names come from configuration, bounds are generated: DDL can't take parameters
+        bounds = f"FROM ('{start:%Y-%m-%d}') TO ('{end:%Y-%m-%d}')"
+        if has_default:
+            default = f"{table}_default"
+            in_range = f"timestamp >= '{start:%Y-%m-%d}' AND timestamp < '{end:%Y-%m-%d}'"
+            stray = await self.database.fetch(f"SELECT count(*) AS n FROM {default} WHERE {in_range}")
+            if stray and stray[0]['n']:
+                # CREATE ... PARTITION OF fails while DEFAULT holds rows in the
+                # range; build the partition from them and attach it instead
+                # (one implicit transaction)
+                await self.database.executescript(
+                    f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS);"
+                    f"INSERT INTO {name} SELECT * FROM {default} WHERE {in_range};"
+                    f"DELETE FROM {default} WHERE {in_range};"
+                    f"ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES {bounds};"
+                )
+                self.stats['rows_moved'] += stray[0]['n']
+                logger.warning(f"Moved {stray[0]['n']} rows from {default} into new partition {name}")
+                return
+        await self.database.execute(f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} FOR VALUES {bounds}")
+
+    async def enforce_retention(self, now: Optional[datetime] = None) -> List[str]:
+        """Drop partitions (Postgres) or delete rows (SQLite) older than each table's retention."""
+        now = now or datetime.utcnow()
+        dropped = []
+        for table, days in self.retention.items():
+            if days is None:
+                continue
+            cutoff = now - timedelta(days=days)
+            if self.database.dialect != 'postgresql':
+                self.stats['rows_expired'] += await self.database.execute(
+                    f"DELETE FROM {table} WHERE timestamp < $1", cutoff
+                )
+                continue
+            for name in await self.partitions(table):
+                if name == f"{table}_default":
+                    # Rows outside every managed partition expire one by one
+                    self.stats['rows_expired'] += await self.database.execute(
+                        f"DELETE FROM {name} WHERE timestamp < $1", cutoff
+                    )
+                    continue
+                bounds = partition_bounds(table, name, self.interval)
+                # Only partitions entirely older than the cutoff go
+                if bounds is not None and bounds[1] <= cutoff:
+                    await self.database.execute(f"DROP TABLE IF EXISTS {name}")
+                    dropped.append(name)
+        if dropped:
+            self.stats['dropped'] += len(dropped)
+            logger.info(f"Dropped expired partitions: {', '.join(dropped)}")
+        return dropped
+
+    async def maintain(self, now: Optional[datetime] = None) -> Dict[str, List[str]]:
+        try:
+            created = await self.ensure_partitions(now)
+            dropped = await self.enforce_retention(now)
+            self.stats['runs'] += 1
+            return {'created': created, 'dropped': dropped}
+        except Exception as e:
+            logger.error(f"Error maintaining partitions: {str(e)}")
+            raise
+
+    async def run(self, interval: float = 3600.0) -> None:
+        """Maintain partitions periodically until stopped."""
+        self.running = True
+        self._task = asyncio.current_task()
+        while self.running:
+            try:
+                await self.maintain()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Partition maintenance failed, retrying in {interval:.0f}s: {str(e)}")
+            await asyncio.sleep(interval)
+
+    async def stop(self) -> None:
+        self.running = False
+        if self._task is not None and self._task is not asyncio.current_task():
+            self._task.cancel()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {**self.stats, 'interval': self.interval, 'retention': self.retention}
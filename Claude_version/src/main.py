@@ -1,47 +1,130 @@
 import uvicorn
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
-from src.api.routes import router
+from src.api.routes import (
+    router, gas_oracle, pair_manager, trade_router, stop_engine, performance_tracker, connection_manager,
+    volatility_tracker
+)
 from src.config.settings import settings
 from src.utils.logger import get_logger
+from src.utils.serialization import FastJSONResponse, loads
 from src.api.websocket import WebSocketManager
 from src.services.event_service import EventService
+from src.database.models import database, store
+from src.database.partitions import PartitionManager
 import asyncio
 import json
 
 logger = get_logger()
 
-app = FastAPI(title="AI Trading Agent")
+app = FastAPI(title="AI Trading Agent", default_response_class=FastJSONResponse)
 app.include_router(router, prefix="/api/v1")
 
 websocket_manager = WebSocketManager()
-event_service = EventService()
+event_service = EventService(
+    reserve_mirror=trade_router.mirror,
+    pairs=pair_manager,
+    websocket_manager=websocket_manager,
+    connection_manager=connection_manager
+)
+# Every mirrored price tick checks stops; crossings exit via TradingService.execute_exits
+event_service.add_price_listener(stop_engine.on_price)
+# ...and folds into the shared per-symbol ATR/volatility bars
+event_service.add_price_listener(volatility_tracker.on_price)
+partition_manager = PartitionManager(
+    database,
+    retention={
+        'trades': settings.TRADES_RETENTION_DAYS,
+        'predictions': settings.PREDICTIONS_RETENTION_DAYS,
+        'trade_events': settings.TRADE_EVENTS_RETENTION_DAYS
+    },
+    interval=settings.PARTITION_INTERVAL,
+    ahead=settings.PARTITIONS_AHEAD
+)
+background_tasks = []
+
+def _report_failure(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.critical(f"Background task {task.get_name()} stopped: {str(task.exception())}")
+
+def start_background(coro, name: str) -> asyncio.Task:
+    """Run a long-lived service loop; kept for shutdown and logged if it dies."""
+    task = asyncio.create_task(coro, name=name)
+    task.add_done_callback(_report_failure)
+    background_tasks.append(task)
+    return task
 
 @app.websocket("/ws/trades")
 async def websocket_endpoint(websocket: WebSocket):
-    await websocket_manager.connect(websocket)
+    client = await websocket_manager.connect(websocket)
     try:
         while True:
+            data = await websocket.receive_text()
             try:
-                data = await websocket.receive_text()
-                parsed_data = json.loads(data)
-                # Handle parsed_data
+                parsed_data = loads(data)
             except json.JSONDecodeError as e:
                 logger.error(f"Invalid message format: {str(e)}")
-                await websocket.send_text(json.dumps({
-                    "error": "Invalid message format"
-                }))
+                client.send({"error": "Invalid message format"})
+                continue
+            # Subscribe/unsubscribe to (channel, pair) updates
+            if isinstance(parsed_data, dict):
+                client.send(websocket_manager.handle_message(websocket, parsed_data))
+            else:
+                client.send({"error": "Invalid message format"})
     except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.error(f"WebSocket error: {str(e)}")
+    finally:
+        # Always drop the client's queue, writer task and subscriptions
         await websocket_manager.disconnect(websocket)
 
+@app.get("/metrics/events")
+async def event_metrics():
+    """Per-stage queue depth, throughput and latency of the event pipeline."""
+    return FastJSONResponse(event_service.get_metrics())
+
+@app.get("/metrics/websocket")
+async def websocket_metrics():
+    """WebSocket fan-out latency, per-client queue depth and slow-consumer evictions."""
+    return FastJSONResponse(websocket_manager.get_metrics())
+
 @app.on_event("startup")
 async def startup_event():
+    # Fail fast: without tables every write-behind flush fails and the
+    # persist stage eventually stalls the event pipeline
+    await store.init_schema()
+    # Rollups persisted by the last run; trades arriving before this would
+    # overwrite the open buckets
+    await performance_tracker.load()
+    # Periodic probes keep the pool's provider ranking current
+    connection_manager.start_health_checks()
     # Start the event service
-    asyncio.create_task(event_service.start())
+    start_background(event_service.start(), 'event-service')
+    start_background(gas_oracle.run(), 'gas-oracle')
+    start_background(partition_manager.run(), 'partition-manager')
+    # Performance channel subscribers get a snapshot after trades change it
+    start_background(
+        websocket_manager.run_performance(performance_tracker, settings.WS_PERFORMANCE_INTERVAL),
+        'performance-publisher'
+    )
 
 @app.on_event("shutdown")
 async def shutdown_event():
     # Stop the event service
     await event_service.stop()
+    for task in background_tasks:
+        task.cancel()
+    await gas_oracle.stop()
+    await partition_manager.stop()
+    # Stops still queued for exit are dropped with the process
+    await stop_engine.close()
+    try:
+        await performance_tracker.close()
+    except Exception:
+        # Already logged by the rollups
+        pass
+    await connection_manager.close()
+    await database.close()
 
 if __name__ == "__main__":
     try:
@@ -0,0 +1,208 @@
+from typing import Dict, Any, List, Optional, Sequence
+import time
+import numpy as np
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """Calculate true range for each bar (the first bar uses high - low)."""
+    prev_close = np.empty_like(close)
+    prev_close[0] = close[0]
+    prev_close[1:] = close[:-1]
+    return np.maximum(
+        high - low,
+        np.maximum(np.abs(high - prev_close), np.abs(low - prev_close))
+    )
+
+
+def wilder_atr(tr: np.ndarray, period: int) -> float:
+    """Wilder-smoothed ATR of the final bar of a true range series."""
+    if len(tr) <= period:
+        return float(tr.mean())
+    atr = tr[:period].mean()
+    for value in tr[period:]:
+        atr += (value - atr) / period
+    return float(atr)
+
+
+class VolatilityTracker:
+    """Rolling per-symbol ATR and close-price volatility.
+
+    Each symbol occupies one slot in flat NumPy arrays so stops for a whole
+    batch of orders are computed in a single vectorized expression. Bars
+    come from ``update`` or from price ticks (``on_price``), which are
+    folded into ``bar_interval``-second bars.
+    """
+
+    def __init__(
+        self,
+        atr_period: int = 14,
+        volatility_window: int = 20,
+        capacity: int = 64,
+        bar_interval: float = 60.0
+    ):
+        self.atr_period = atr_period
+        self.volatility_window = volatility_window
+        self.bar_interval = bar_interval
+        # symbol -> [bar start, high, low, close] of the bar still open
+        self._open_bars: Dict[str, List[float]] = {}
+        self.symbols: Dict[str, int] = {}
+        self._atr = np.zeros(capacity)
+        self._volatility = np.zeros(capacity)
+        self._last_close = np.zeros(capacity)
+        self._bars = np.zeros(capacity, dtype=np.int64)
+        self._mean = np.zeros(capacity)
+        self._m2 = np.zeros(capacity)
+        # Close-price ring buffers, one row per symbol
+        self._closes = np.zeros((capacity, volatility_window))
+
+    def _slot(self, symbol: str) -> int:
+        slot = self.symbols.get(symbol)
+        if slot is not None:
+            return slot
+        slot = len(self.symbols)
+        if slot == len(self._atr):
+            self._grow()
+        self.symbols[symbol] = slot
+        return slot
+
+    def _grow(self) -> None:
+        capacity = len(self._atr) * 2
+        for name in ('_atr', '_volatility', '_last_close', '_bars', '_mean', '_m2'):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+        closes = np.zeros((capacity, self.volatility_window))
+        closes[:len(self._closes)] = self._closes
+        self._closes = closes
+
+    def seed(self, symbol: str, market_data: Dict[str, Any]) -> None:
+        """Initialise a symbol from the tail of its OHLC history."""
+        try:
+            tail = max(self.atr_period * 4, self.volatility_window)
+            high = np.asarray(market_data['high'], dtype=float)[-tail:]
+            low = np.asarray(market_data['low'], dtype=float)[-tail:]
+            close = np.asarray(market_data['close'], dtype=float)[-tail:]
+            if len(close) == 0:
+                raise ValueError('Empty price history')
+
+            slot = self._slot(symbol)
+            self._atr[slot] = wilder_atr(true_range(high, low, close), self.atr_period)
+
+            window = close[-self.volatility_window:]
+            self._closes[slot, :len(window)] = window
+            self._bars[slot] = len(window)
+            self._mean[slot] = window.mean()
+            self._m2[slot] = ((window - window.mean()) ** 2).sum()
+            self._volatility[slot] = np.sqrt(self._m2[slot] / len(window))
+            self._last_close[slot] = close[-1]
+
+        except Exception as e:
+            logger.error(f"Error seeding volatility for {symbol}: {str(e)}")
+            raise
+
+    def update(self, symbol: str, high: float, low: float, close: float) -> None:
+        """Fold one new bar into the symbol's ATR and volatility in O(1)."""
+        slot = self._slot(symbol)
+        bars = int(self._bars[slot])
+
+        if bars == 0:
+            tr = high - low
+        else:
+            prev_close = self._last_close[slot]
+            tr = max(high - low, abs(high - prev_close), abs(low - prev_close))
+        period = min(bars + 1, self.atr_period)
+        self._atr[slot] += (tr - self._atr[slot]) / period
+
+        # Windowed Welford update over the close ring buffer
+        window = self.volatility_window
+        pos = bars % window
+        mean = self._mean[slot]
+        if bars < window:
+            count = bars + 1
+            new_mean = mean + (close - mean) / count
+            self._m2[slot] += (close - mean) * (close - new_mean)
+        else:
+            count = window
+            dropped = self._closes[slot, pos]
+            new_mean = mean + (close - dropped) / window
+            self._m2[slot] += (close - dropped) * (close - new_mean + dropped - mean)
+        self._closes[slot, pos] = close
+        self._mean[slot] = new_mean
+        self._volatility[slot] = np.sqrt(max(self._m2[slot], 0.0) / count)
+
+        self._last_close[slot] = close
+        self._bars[slot] = bars + 1
+
+    async def on_price(self, symbol: str, price: float, received_at: Optional[float] = None) -> None:
+        """EventService price listener; a tick in a later interval closes the open bar."""
+        now = time.time()
+        start = now - now % self.bar_interval
+        bar = self._open_bars.get(symbol)
+        if bar is not None and start <= bar[0]:
+            bar[1] = max(bar[1], price)
+            bar[2] = min(bar[2], price)
+            bar[3] = price
+            return
+        if bar is not None:
+            self.update(symbol, bar[1], bar[2], bar[3])
+        self._open_bars[symbol] = [start, price, price, price]
+
+    def get_atr(self, symbol: str) -> float:
+        return float(self._atr[self.symbols[symbol]])
+
+    def get_volatility(self, symbol: str) -> float:
+        return float(self._volatility[self.symbols[symbol]])
+
+    def batch_stop_loss(
+        self,
+        symbols: Sequence[str],
+        entry_prices: Sequence[float],
+        position_sizes: Optional[Sequence[float]] = None,
+        sides: Optional[Sequence[str]] = None,
+        risk_budget: Optional[float] = None,
+        atr_multiplier: float = 2.0,
+        volatility_multiplier: float = 1.5
+    ) -> Dict[str, np.ndarray]:
+        """Compute stop levels (and optionally sizes) for many positions at once.
+
+        When ``position_sizes`` is omitted, sizes are derived so each position
+        risks ``risk_budget`` between entry and stop.
+        """
+        try:
+            slots = np.fromiter((self.symbols[s] for s in symbols), dtype=np.int64, count=len(symbols))
+            entry = np.asarray(entry_prices, dtype=float)
+            direction = np.ones(len(entry))
+            if sides is not None:
+                direction = np.where(np.asarray(sides) == 'short', -1.0, 1.0)
+
+            # Use the more conservative (tighter) of the two stop distances
+            distance = np.minimum(
+                self._atr[slots] * atr_multiplier,
+                self._volatility[slots] * volatility_multiplier
+            )
+            stop_price = entry - direction * distance
+
+            if position_sizes is not None:
+                sizes = np.asarray(position_sizes, dtype=float)
+            elif risk_budget is not None:
+                sizes = np.divide(
+                    risk_budget, distance,
+                    out=np.zeros_like(distance), where=distance > 0
+                )
+            else:
+                raise ValueError('Either position_sizes or risk_budget is required')
+
+            return {
+                'stop_price': stop_price,
+                'stop_distance': distance / entry,
+                'position_size': sizes,
+                'risk_amount': sizes * distance
+            }
+
+        except Exception as e:
+            logger.error(f"Error calculating batch stop loss: {str(e)}")
+            raise
@@ -0,0 +1,193 @@
+from typing import List, Dict, Any, Optional, Callable, Awaitable, Sequence
+import asyncio
+import time
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+StageHandler = Callable[[Any], Awaitable[Any]]
+
+POLICIES = ('block', 'drop_newest', 'drop_oldest')
+
+
+class PipelineStage:
+    """One pipeline step: a bounded queue drained by ``concurrency`` workers.
+
+    A handler's return value is forwarded to every downstream stage;
+    ``None`` stops the item, and with ``fan_out`` each element of the
+    returned iterable is forwarded separately. When the queue is full,
+    ``block`` makes the producer wait (backpressure), ``drop_newest``
+    discards the incoming item and ``drop_oldest`` evicts the oldest
+    queued one. ``on_discard`` is called with every item that is dropped
+    or whose handler fails.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        handler: StageHandler,
+        concurrency: int = 1,
+        queue_size: int = 1000,
+        policy: str = 'block',
+        fan_out: bool = False,
+        on_discard: Optional[Callable[[Any], None]] = None
+    ):
+        if policy not in POLICIES:
+            raise ValueError(f"Invalid queue policy for stage {name}: {policy}")
+        self.name = name
+        self.handler = handler
+        self.concurrency = max(1, concurrency)
+        self.policy = policy
+        self.fan_out = fan_out
+        self.on_discard = on_discard
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.downstream: List['PipelineStage'] = []
+        self._workers: List[asyncio.Task] = []
+        self.busy = 0
+        self.stats = {
+            'received': 0,
+            'processed': 0,
+            'dropped': 0,
+            'errors': 0,
+            'max_depth': 0,
+            'latency_ewma': 0.0,
+            'latency_max': 0.0,
+            'wait_ewma': 0.0
+        }
+
+    def to(self, *stages: 'PipelineStage') -> 'PipelineStage':
+        self.downstream.extend(stages)
+        return stages[-1] if stages else self
+
+    async def put(self, item: Any) -> bool:
+        """Enqueue per the stage policy; returns False if an item was dropped."""
+        self.stats['received'] += 1
+        entry = (time.perf_counter(), item)
+        accepted = True
+        if self.policy == 'block':
+            await self.queue.put(entry)
+        else:
+            try:
+                self.queue.put_nowait(entry)
+            except asyncio.QueueFull:
+                self.stats['dropped'] += 1
+                if self.policy == 'drop_newest':
+                    self._discard(item)
+                    return False
+                _, evicted = self.queue.get_nowait()
+                self.queue.task_done()
+                self.queue.put_nowait(entry)
+                self._discard(evicted)
+                accepted = False
+        self.stats['max_depth'] = max(self.stats['max_depth'], self.queue.qsize())
+        return accepted
+
+    def _discard(self, item: Any) -> None:
+        if self.on_discard is None:
+            return
+        try:
+            self.on_discard(item)
+        except Exception as e:
+            logger.error(f"Error in discard callback of stage {self.name}: {str(e)}")
+
+    def _observe(self, key: str, value: float) -> None:
+        # Exponentially weighted so the metric tracks the recent rate
+        self.stats[key] = value if not self.stats['processed'] else 0.9 * self.stats[key] + 0.1 * value
+
+    async def _forward(self, result: Any) -> None:
+        if result is None:
+            return
+        items = result if self.fan_out else (result,)
+        for item in items:
+            for stage in self.downstream:
+                await stage.put(item)
+
+    async def _work(self) -> None:
+        while True:
+            queued_at, item = await self.queue.get()
+            started = time.perf_counter()
+            self.busy += 1
+            try:
+                result = await self.handler(item)
+                latency = time.perf_counter() - started
+                self._observe('wait_ewma', started - queued_at)
+                self._observe('latency_ewma', latency)
+                self.stats['latency_max'] = max(self.stats['latency_max'], latency)
+                self.stats['processed'] += 1
+                await self._forward(result)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats['errors'] += 1
+                logger.error(f"Error in pipeline stage {self.name}: {str(e)}")
+                self._discard(item)
+            finally:
+                self.busy -= 1
+                self.queue.task_done()
+
+    def start(self) -> None:
+        if not self._workers:
+            self._workers = [
+                asyncio.create_task(self._work(), name=f"{self.name}-{i}")
+                for i in range(self.concurrency)
+            ]
+
+    async def stop(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            'depth': self.queue.qsize(),
+            'capacity': self.queue.maxsize,
+            'busy': self.busy,
+            'concurrency': self.concurrency,
+            'policy': self.policy
+        }
+
+
+class EventPipeline:
+    """Stages linked into a DAG; items enter at the first stage.
+
+    Each stage runs independently, so throughput is bounded by the
+    slowest stage instead of the sum of all per-item work.
+    """
+
+    def __init__(self, stages: Sequence[PipelineStage]):
+        self.stages: Dict[str, PipelineStage] = {stage.name: stage for stage in stages}
+        self.entry = stages[0]
+        self.running = False
+
+    def __getitem__(self, name: str) -> PipelineStage:
+        return self.stages[name]
+
+    async def submit(self, item: Any) -> bool:
+        return await self.entry.put(item)
+
+    def start(self) -> None:
+        for stage in self.stages.values():
+            stage.start()
+        self.running = True
+
+    async def drain(self) -> None:
+        """Wait until every queued item has passed through every stage."""
+        # Stages are listed upstream first, so one pass sees all forwarded work
+        for stage in self.stages.values():
+            await stage.queue.join()
+
+    async def stop(self, drain: bool = True, timeout: Optional[float] = 30.0) -> None:
+        if drain and self.running:
+            try:
+                await asyncio.wait_for(self.drain(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pending = {name: stage.queue.qsize() for name, stage in self.stages.items()}
+                logger.warning(f"Event pipeline stopped with items still queued: {pending}")
+        for stage in self.stages.values():
+            await stage.stop()
+        self.running = False
+
+    def get_metrics(self) -> Dict[str, Dict[str, Any]]:
+        return {name: stage.get_metrics() for name, stage in self.stages.items()}
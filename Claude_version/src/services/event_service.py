@@ -1,78 +1,495 @@
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Callable, Awaitable
 import asyncio
-from web3 import Web3, WebsocketProvider
+import json
+import time
+from collections import OrderedDict
+from datetime import datetime
+from web3 import AsyncWeb3, AsyncHTTPProvider, WebsocketProviderV2
 from src.blockchain.event_listener import EventListener
+from src.blockchain.backfill import LogBackfiller, SWAP_TOPIC
+from src.blockchain.log_subscription import LogSubscription, SYNC_TOPIC, to_hex
+from src.blockchain.log_decoder import SwapRecord, SyncRecord, block_timestamp, decode_log, decode_sync, swap_to_event
+from src.blockchain.confirmation_buffer import ConfirmationBuffer
+from src.blockchain.connection_manager import ConnectionManager, PooledWeb3, PooledTransport
+from src.blockchain.dedup_index import DedupIndex
+from src.blockchain.read_aggregator import HttpJsonRpcTransport, ReadAggregator
+from src.trading.amm_mirror import ReserveMirror
+from src.trading.pair_manager import PairManager
+from src.data.write_behind import WriteBehindBuffer
+from src.data.event_journal import EventJournal
+from src.services.event_pipeline import EventPipeline, PipelineStage
+from src.api.websocket import WebSocketManager
 from src.config.settings import settings
 from src.utils.logger import get_logger
-from src.database.models import TradeEvent  # You'll need to implement this
+from src.database.models import TradeEvent
 
 logger = get_logger()
 
+# Recent block number -> unix time, so each block is fetched once
+BLOCK_TIME_CACHE_SIZE = 1024
+
+# Swap event of a Uniswap V2 pair, for the legacy per-contract filters
+PAIR_SWAP_ABI = json.dumps([{
+    'anonymous': False,
+    'name': 'Swap',
+    'type': 'event',
+    'inputs': [
+        {'indexed': True, 'name': 'sender', 'type': 'address'},
+        {'indexed': False, 'name': 'amount0In', 'type': 'uint256'},
+        {'indexed': False, 'name': 'amount1In', 'type': 'uint256'},
+        {'indexed': False, 'name': 'amount0Out', 'type': 'uint256'},
+        {'indexed': False, 'name': 'amount1Out', 'type': 'uint256'},
+        {'indexed': True, 'name': 'to', 'type': 'address'}
+    ]
+}])
+
+
+def _block_number(event: Dict[str, Any]) -> int:
+    if 'blockNumber' not in event:
+        return event['block_number']
+    number = event['blockNumber']
+    return int(number, 16) if isinstance(number, str) else number
+
+
 class EventService:
-    def __init__(self):
-        self.w3 = Web3(WebsocketProvider(settings.WS_PROVIDER_URI))
+    def __init__(
+        self,
+        reserve_mirror: Optional[ReserveMirror] = None,
+        pairs: Optional[PairManager] = None,
+        websocket_manager: Optional[WebSocketManager] = None,
+        connection_manager: Optional[ConnectionManager] = None
+    ):
+        # RPC calls go through the provider pool (with failover) when one is passed in
+        self.connection_manager = connection_manager
+        if connection_manager is not None:
+            self.w3 = PooledWeb3(connection_manager)
+        else:
+            self.w3 = AsyncWeb3(AsyncHTTPProvider(settings.WEB3_PROVIDER_URI))
         self.event_listener = EventListener(self.w3)
+        self.log_subscription: Optional[LogSubscription] = None
+        # Block number -> events handed to the pipeline but not yet persisted
+        # (or dropped); the confirmation checkpoint stays below the lowest one
+        self._unpersisted: Dict[int, int] = {}
+        # Live events are processed only once CONFIRMATION_DEPTH blocks deep
+        self.confirmations = ConfirmationBuffer(
+            self.w3,
+            on_final=self._process_confirmed,
+            depth=settings.CONFIRMATION_DEPTH,
+            checkpoint_path=settings.EVENT_CHECKPOINT_PATH,
+            unpersisted_floor=self._unpersisted_floor
+        )
+        # Drops logs delivered twice by retries, failover or overlapping backfills
+        self.dedup = DedupIndex(
+            window_blocks=settings.DEDUP_WINDOW_BLOCKS,
+            max_per_generation=settings.DEDUP_MAX_ENTRIES
+        )
+        # Reserves of the monitored pairs, kept current from Sync logs; shared
+        # with the trading router when one is passed in
+        self.pairs = pairs or PairManager.from_config(settings.MONITORED_PAIRS)
+        self.reserve_mirror = reserve_mirror or ReserveMirror()
+        self.pairs.track(self.reserve_mirror)
+        if connection_manager is not None:
+            self.reader = ReadAggregator(PooledTransport(connection_manager))
+        else:
+            self.reader = ReadAggregator(HttpJsonRpcTransport(settings.WEB3_PROVIDER_URI))
+        # Trades are persisted in bulk upserts keyed on (transaction_hash, log_index)
+        self.trade_writer = WriteBehindBuffer(
+            TradeEvent.bulk_upsert,
+            key=('transaction_hash', 'log_index'),
+            max_batch=settings.WRITE_BEHIND_BATCH_SIZE,
+            flush_interval=settings.WRITE_BEHIND_FLUSH_INTERVAL,
+            max_pending=settings.WRITE_BEHIND_MAX_PENDING,
+            on_flush=self._on_trades_flushed,
+            max_row_failures=settings.WRITE_BEHIND_MAX_ROW_FAILURES,
+            on_dead_letter=self._on_trades_dead_lettered
+        )
+        # Decoded events are journaled before persistence so a crash loses
+        # nothing still queued; replayed on start (EVENT_JOURNAL_DIR=None disables)
+        self.journal: Optional[EventJournal] = None
+        if settings.EVENT_JOURNAL_DIR:
+            self.journal = EventJournal(
+                settings.EVENT_JOURNAL_DIR,
+                segment_bytes=settings.EVENT_JOURNAL_SEGMENT_BYTES,
+                fsync_interval=settings.EVENT_JOURNAL_FSYNC_INTERVAL,
+                retain_segments=settings.EVENT_JOURNAL_RETAIN_SEGMENTS
+            )
+        self._monitored: set = set(self.pairs.pairs)
+        self._block_times: OrderedDict = OrderedDict()
+        # Scored events fan out to WebSocket subscribers of their pair
+        self.websocket_manager = websocket_manager
+        self.scorers: Dict[str, Callable[[Dict[str, Any]], Awaitable[Any]]] = {}
+        # Mid-price ticks of monitored pairs, e.g. StopTriggerEngine.on_price
+        self.price_listeners: List[Callable[[str, float, float], Awaitable[Any]]] = []
+        self.pipeline = self._build_pipeline()
         self.running = False
         
     async def initialize(self):
-        """Initialize contracts and event filters."""
+        """Set up legacy per-pool filters if configured and catch up on missed swaps.
+
+        Swaps are emitted by the pools (not the routers), so the monitored
+        pairs are the only contracts watched.
+        """
         try:
-            # Add Uniswap contract
-            await self.event_listener.add_contract(
-                address=settings.UNISWAP_V2_ROUTER,
-                abi=UNISWAP_V2_ABI,  # You'll need to provide this
-                name="uniswap_v2"
-            )
-            
-            # Add SushiSwap contract
-            await self.event_listener.add_contract(
-                address=settings.SUSHISWAP_ROUTER,
-                abi=SUSHISWAP_ABI,  # You'll need to provide this
-                name="sushiswap"
-            )
-            
-            # Setup event filters for each DEX
-            for dex in ["uniswap_v2", "sushiswap"]:
-                await self.event_listener.setup_event_filter(
-                    contract_name=dex,
-                    event_name="Swap"
-                )
+            self._monitored = set(self.pairs.pairs)
+            if settings.EVENT_INGESTION_MODE == "filters":
+                if self.connection_manager is not None:
+                    # Contracts and their filters are bound to a single provider
+                    self.event_listener.w3 = await self.connection_manager.get_web3_connection()
+                for address, pair in self.pairs.pairs.items():
+                    name = pair.symbol or address
+                    await self.event_listener.add_contract(address=address, abi=PAIR_SWAP_ABI, name=name)
+                    await self.event_listener.setup_event_filter(contract_name=name, event_name="Swap")
+
+            # Recover swaps emitted while the service was down
+            await self.catch_up()
                 
             logger.info("Initialized event service")
         except Exception as e:
             logger.error(f"Error initializing event service: {str(e)}")
             raise
 
-    async def process_trade_event(self, event: Dict[str, Any]):
-        """Process and store trade events."""
+    async def catch_up(self, from_block: Optional[int] = None) -> None:
+        """Backfill Swap logs from the last finalized block (or from_block) to head.
+
+        Blocks already CONFIRMATION_DEPTH deep are processed directly; the
+        unconfirmed tail goes through the confirmation buffer. The buffer's
+        finalized-block checkpoint is the only resume point.
+        """
         try:
-            # Create trade event record
-            trade_event = TradeEvent(
-                transaction_hash=event['transaction_hash'],
-                block_number=event['block_number'],
-                timestamp=event['timestamp'],
-                dex_address=event['address'],
-                event_type=event['event_type'],
-                token_in=event['args'].get('tokenIn'),
-                token_out=event['args'].get('tokenOut'),
-                amount_in=event['args'].get('amountIn'),
-                amount_out=event['args'].get('amountOut')
+            backfiller = LogBackfiller(
+                self.w3,
+                addresses=list(self.pairs.pairs),
+                topics=[SWAP_TOPIC],
+                max_range=settings.BACKFILL_MAX_RANGE,
+                max_in_flight=settings.BACKFILL_CONCURRENCY
             )
-            
-            # Save to database (implement this part)
-            await trade_event.save()
-            
-            # Emit WebSocket update
-            await self.broadcast_event(event)
-            
+            head = await self.w3.eth.block_number
+            safe = head - self.confirmations.depth
+            if from_block is None:
+                from_block = self.confirmations.resume_block
+            if from_block is None:
+                # First run: only the unconfirmed tail needs scanning
+                from_block = max(safe + 1, 0)
+
+            if from_block <= safe:
+                await backfiller.run(self._process_raw_logs, from_block=from_block, to_block=safe)
+                self.confirmations.mark_finalized(safe)
+            if max(from_block, safe + 1) <= head:
+                await backfiller.run(
+                    self.confirmations.add_logs,
+                    from_block=max(from_block, safe + 1),
+                    to_block=head
+                )
+            await self.confirmations.poll_head()
         except Exception as e:
+            logger.error(f"Error catching up on missed events: {str(e)}")
+            raise
+
+    async def _process_raw_logs(self, logs: List[Dict[str, Any]]) -> None:
+        await self._submit(await self._with_block_times(logs))
+
+    async def _process_confirmed(self, events: List[Dict[str, Any]]) -> None:
+        # Blocks (and so holds events in the confirmation buffer) while the
+        # pipeline is full
+        await self._submit(await self._with_block_times(events))
+
+    async def _submit(self, events: List[Dict[str, Any]]) -> None:
+        self._track(events)
+        try:
+            await self.pipeline.submit(events)
+        except Exception:
+            self._release(events)
+            raise
+
+    def _track(self, events: List[Dict[str, Any]]) -> None:
+        for event in events:
+            number = _block_number(event)
+            self._unpersisted[number] = self._unpersisted.get(number, 0) + 1
+
+    def _release(self, events: List[Dict[str, Any]]) -> None:
+        """Mark events persisted or dropped and let the confirmation checkpoint catch up."""
+        for event in events:
+            number = _block_number(event)
+            count = self._unpersisted.get(number)
+            if count is None:
+                continue
+            if count > 1:
+                self._unpersisted[number] = count - 1
+            else:
+                del self._unpersisted[number]
+        self.confirmations.commit()
+
+    def _unpersisted_floor(self) -> Optional[int]:
+        return min(self._unpersisted, default=None)
+
+    async def _with_block_times(self, events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Stamp events with their block's timestamp, which (unlike decode time) is stable across replays.
+
+        Raw logs get ``blockTimestamp`` unless the node already attached it;
+        processed events get their ``timestamp`` replaced.
+        """
+        numbers = [_block_number(event) for event in events]
+        unknown = list({
+            number for event, number in zip(events, numbers)
+            if number not in self._block_times and ('event_type' in event or block_timestamp(event) is None)
+        })
+        if unknown:
+            try:
+                blocks = await asyncio.gather(*(self.w3.eth.get_block(number) for number in unknown))
+            except Exception as e:
+                logger.error(f"Error fetching block timestamps: {str(e)}")
+                raise
+            for number, block in zip(unknown, blocks):
+                self._block_times[number] = block['timestamp']
+            while len(self._block_times) > BLOCK_TIME_CACHE_SIZE:
+                self._block_times.popitem(last=False)
+        stamped = []
+        for event, number in zip(events, numbers):
+            if 'event_type' in event:
+                moment = datetime.utcfromtimestamp(self._block_times[number]).isoformat()
+                event = {**event, 'timestamp': moment}
+            elif block_timestamp(event) is None:
+                event = {**event, 'blockTimestamp': self._block_times[number]}
+            stamped.append(event)
+        return stamped
+
+    def _build_pipeline(self) -> EventPipeline:
+        """ingest -> decode -> {persist, score -> broadcast}, each with its own queue and workers."""
+        config = settings.EVENT_PIPELINE_STAGES
+        stage = lambda name, handler, **kw: PipelineStage(name, handler, **{**config.get(name, {}), **kw})
+        ingest = stage('ingest', self._ingest_stage, fan_out=True, on_discard=self._release)
+        decode = stage('decode', self._decode_stage, on_discard=lambda item: self._release([item]))
+        persist = stage('persist', self._persist_stage, on_discard=self._on_persist_discarded)
+        score = stage('score', self._score_stage)
+        broadcast = stage('broadcast', self._broadcast_stage)
+        ingest.to(decode)
+        # Persistence and scoring branch off decode so a lagging database
+        # doesn't delay broadcasts until its queue is full
+        decode.to(persist, score)
+        score.to(broadcast)
+        return EventPipeline([ingest, decode, persist, score, broadcast])
+
+    async def _ingest_stage(self, batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return batch
+
+    async def _decode_stage(self, item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        # Legacy filters deliver events already processed by EventListener;
+        # backfill and log subscriptions deliver raw logs
+        timestamp = None
+        if 'event_type' in item:
+            event = record = item
+        else:
+            # Fixed-width word slicing instead of web3's ABI event decoding
+            record = decode_log(item)
+            if not isinstance(record, SwapRecord) or record.address not in self._monitored:
+                self._release([item])
+                return None
+            timestamp = block_timestamp(item)
+            event = swap_to_event(record, timestamp)
+        if not self.dedup.check_and_add(event['transaction_hash'], event['log_index'], event['block_number']):
+            logger.debug(f"Skipping duplicate event {event['transaction_hash']}:{event['log_index']}")
+            self._release([item])
+            return None
+        if self.journal is not None:
+            try:
+                # The frame's timestamp is the block time, restored on recovery
+                event = {**event, 'journal_seq': self.journal.append(record, timestamp=timestamp)}
+            except Exception:
+                self.dedup.discard(event['transaction_hash'], event['log_index'])
+                raise
+        return event
+
+    def _swap_legs(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        """token_in/token_out/amount_in/amount_out of a Uniswap V2 Swap.
+
+        The pair reports four amounts; the side with a positive net inflow
+        is the input. Tokens come from the monitored pair's token0/token1.
+        """
+        args = event['args']
+        if 'amount0In' not in args:
+            return {
+                'token_in': args.get('tokenIn'),
+                'token_out': args.get('tokenOut'),
+                'amount_in': args.get('amountIn'),
+                'amount_out': args.get('amountOut')
+            }
+        pair = self.pairs.pairs.get(to_hex(event['address']))
+        token0, token1 = (pair.token0, pair.token1) if pair is not None else (None, None)
+        net0 = args['amount0In'] - args['amount0Out']
+        net1 = args['amount1In'] - args['amount1Out']
+        if net0 > 0:
+            return {'token_in': token0, 'token_out': token1, 'amount_in': net0, 'amount_out': -net1}
+        return {'token_in': token1, 'token_out': token0, 'amount_in': net1, 'amount_out': -net0}
+
+    async def _persist_stage(self, event: Dict[str, Any]) -> None:
+        # Queue the trade record; waits only when the database is lagging
+        await self.trade_writer.put({
+            'transaction_hash': event['transaction_hash'],
+            'log_index': event['log_index'],
+            'block_number': event['block_number'],
+            'timestamp': event['timestamp'],
+            'dex_address': event['address'],
+            'event_type': event['event_type'],
+            **self._swap_legs(event),
+            'journal_seq': event.get('journal_seq')
+        })
+
+    def _on_trades_flushed(self, rows: List[Dict[str, Any]]) -> None:
+        if self.journal is not None:
+            self.journal.ack(row['journal_seq'] for row in rows if row.get('journal_seq') is not None)
+        self._release(rows)
+
+    def _on_trades_dead_lettered(self, rows: List[Dict[str, Any]]) -> None:
+        for row in rows:
+            self._on_persist_discarded(row)
+
+    def _on_persist_discarded(self, event: Dict[str, Any]) -> None:
+        # A dropped or failed event would otherwise hold the journal's commit
+        # point (and every segment after it) forever
+        logger.warning(f"Event {event.get('transaction_hash')}:{event.get('log_index')} was not persisted")
+        if self.journal is not None and event.get('journal_seq') is not None:
+            self.journal.ack([event['journal_seq']])
+        # Accept it again when a backfill or failover redelivers it
+        self.dedup.discard(event['transaction_hash'], event['log_index'])
+        self._release([event])
+
+    async def recover(self) -> Dict[str, int]:
+        """Rebuild in-memory state from the journal and re-persist what never reached the database.
+
+        Syncs restore mirrored reserves and swaps re-seed the dedup index;
+        events past the journal's commit point are queued for persistence
+        again (upserts make that idempotent) but not re-broadcast.
+        """
+        counts = {'replayed': 0, 'syncs': 0, 'requeued': 0}
+        if self.journal is None:
+            return counts
+        try:
+            committed = self.journal.open()
+            requeue = []
+            for seq, timestamp, record in self.journal.replay():
+                counts['replayed'] += 1
+                if isinstance(record, SyncRecord):
+                    counts['syncs'] += self.reserve_mirror.apply_sync(record)
+                    continue
+                if isinstance(record, SwapRecord):
+                    event = {**swap_to_event(record), 'timestamp': datetime.utcfromtimestamp(timestamp).isoformat()}
+                else:
+                    event = record
+                self.dedup.add(event['transaction_hash'], event['log_index'], event['block_number'])
+                if seq > committed:
+                    requeue.append({**event, 'journal_seq': seq})
+            self.journal.mark_pending(event['journal_seq'] for event in requeue)
+            self._track(requeue)
+            for event in requeue:
+                await self.pipeline['persist'].put(event)
+            counts['requeued'] = len(requeue)
+            logger.info(f"Recovered from event journal: {counts}")
+            return counts
+        except Exception as e:
+            logger.error(f"Error recovering from event journal: {str(e)}")
+            raise
+
+    def add_scorer(self, name: str, scorer: Callable[[Dict[str, Any]], Awaitable[Any]]) -> None:
+        """Evaluate every new trade event (e.g. strategy signals); results go out with the broadcast."""
+        self.scorers[name] = scorer
+
+    async def _score_stage(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        if not self.scorers:
+            return event
+        names = list(self.scorers)
+        results = await asyncio.gather(*(self.scorers[name](event) for name in names), return_exceptions=True)
+        scores = {}
+        for name, result in zip(names, results):
+            if isinstance(result, Exception):
+                logger.error(f"Scorer {name} failed: {str(result)}")
+            else:
+                scores[name] = result
+        return {**event, 'scores': scores}
+
+    async def _broadcast_stage(self, event: Dict[str, Any]) -> None:
+        await self.broadcast_event(event)
+
+    async def _handle_swap_log(self, log: Dict[str, Any]) -> None:
+        await self.confirmations.add_logs([log])
+
+    async def _buffer_event(self, event: Dict[str, Any]) -> None:
+        await self.confirmations.add_logs([event])
+
+    def _build_log_subscription(self, w3: AsyncWeb3, mode: str) -> LogSubscription:
+        """One subscription over every contract, demultiplexed by address and topic."""
+        subscription = LogSubscription(w3, mode=mode)
+        for address in self.pairs.pairs:
+            subscription.add_address(address)
+            subscription.on(SWAP_TOPIC, self._handle_swap_log, address=address)
+        # Reserves track the unconfirmed head; a reorg is corrected by the next Sync
+        for address in self.reserve_mirror.addresses:
+            subscription.add_address(address)
+        subscription.on(SYNC_TOPIC, self._handle_sync_log)
+        return subscription
+
+    def add_price_listener(self, listener: Callable[[str, float, float], Awaitable[Any]]) -> None:
+        """Call ``listener(symbol, mid_price, received_at)`` after every applied Sync of a monitored pair."""
+        self.price_listeners.append(listener)
+
+    async def _handle_sync_log(self, log: Dict[str, Any]) -> None:
+        received_at = time.perf_counter()
+        if log.get('removed'):
+            # Reorged out; the replacing block's Sync brings the pair back in line
+            return
+        record = decode_sync(log)
+        if not self.reserve_mirror.apply_sync(record):
+            return
+        # Journaled so a restart restores reserves without a full reconciliation
+        if self.journal is not None:
+            self.journal.append(record, pending=False)
+        await self._publish_price(to_hex(record.address), received_at)
+
+    async def _publish_price(self, address: str, received_at: float) -> None:
+        pair = self.pairs.pairs.get(address)
+        if pair is None or not pair.symbol or not self.price_listeners:
+            return
+        price = self.pairs.mid_price(self.reserve_mirror, pair)
+        for listener in self.price_listeners:
+            try:
+                await listener(pair.symbol, price, received_at)
+            except Exception as e:
+                logger.error(f"Price listener failed for {pair.symbol}: {str(e)}")
+
+    async def _run_log_subscription(self) -> None:
+        if settings.EVENT_INGESTION_MODE == "subscribe":
+            async with AsyncWeb3.persistent_websocket(
+                WebsocketProviderV2(settings.WS_PROVIDER_URI)
+            ) as ws_w3:
+                self.log_subscription = self._build_log_subscription(ws_w3, "subscribe")
+                await self.log_subscription.run()
+        else:
+            self.log_subscription = self._build_log_subscription(self.w3, "poll")
+            await self.log_subscription.run()
+
+    async def process_trade_event(self, event: Dict[str, Any]):
+        """Queue a processed trade event for dedup, persistence, scoring and broadcast."""
+        try:
+            self._track([event])
+            await self.pipeline['decode'].put(event)
+        except Exception as e:
+            self._release([event])
             logger.error(f"Error processing trade event: {str(e)}")
             raise
 
     async def broadcast_event(self, event: Dict[str, Any]):
         """Broadcast event to WebSocket clients."""
-        # Implement WebSocket broadcasting logic here
-        pass
+        if self.websocket_manager is None:
+            return
+        try:
+            # Clients subscribe by symbol; unknown pools go out under their address
+            pair = self.pairs.pairs.get(to_hex(event['address']))
+            await self.websocket_manager.broadcast_trade(
+                pair.symbol if pair is not None and pair.symbol else event['address'],
+                event
+            )
+        except Exception as e:
+            logger.error(f"Error broadcasting event: {str(e)}")
+            raise
 
     async def start(self):
         """Start the event listening service."""
@@ -81,8 +498,23 @@ class EventService:
             
         self.running = True
         try:
+            # Workers first: catch-up backfill already feeds the pipeline
+            self.pipeline.start()
+            await self.recover()
             await self.initialize()
-            await self.event_listener.listen_to_events(self.process_trade_event)
+            if settings.EVENT_INGESTION_MODE == "filters":
+                ingestion = self.event_listener.listen_to_events(self._buffer_event)
+            else:
+                ingestion = self._run_log_subscription()
+            tasks = [
+                ingestion,
+                self.confirmations.run(),
+                self.trade_writer.run(),
+                self.reserve_mirror.run_reconciliation(self.reader, settings.RESERVE_RECONCILE_INTERVAL)
+            ]
+            if self.journal is not None:
+                tasks.append(self.journal.run())
+            await asyncio.gather(*tasks)
         except Exception as e:
             self.running = False
             logger.error(f"Error in event service: {str(e)}")
@@ -90,6 +522,25 @@ class EventService:
         finally:
             self.running = False
 
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            'pipeline': self.pipeline.get_metrics(),
+            'confirmations': self.confirmations.get_metrics(),
+            'dedup': self.dedup.get_metrics(),
+            'trade_writer': self.trade_writer.get_metrics(),
+            'journal': self.journal.get_metrics() if self.journal is not None else None
+        }
+
     async def stop(self):
         """Stop the event listening service."""
-        self.running = False 
\ No newline at end of file
+        self.running = False
+        if self.log_subscription is not None:
+            await self.log_subscription.stop()
+        await self.confirmations.stop()
+        # Let queued events finish, then flush trades still buffered
+        await self.pipeline.stop(drain=True)
+        await self.trade_writer.close()
+        if self.journal is not None:
+            # Checkpoints the commit point after the final flush
+            await self.journal.close()
+        await self.reader.transport.close() 
\ No newline at end of file
@@ -1,15 +1,16 @@
 import asyncio
-from typing import Optional
+from typing import Optional, Any
 
+from src.database.models import database as default_database
 from src.utils.logger import get_logger
 
 logger = get_logger()
 
 
-async def check_database_connection() -> bool:
-    # Placeholder: implement actual DB ping when DB layer is added
+async def check_database_connection(database: Optional[Any] = None, timeout: float = 2.0) -> bool:
     try:
-        await asyncio.sleep(0)
+        latency = await asyncio.wait_for((database or default_database).ping(), timeout=timeout)
+        logger.debug(f"Database ping {latency * 1000:.1f}ms")
         return True
     except Exception as exc:
         logger.error(f"Database health check failed: {exc}")
@@ -33,3 +34,11 @@ async def check_websocket_status() -> bool:
         logger.error(f"WebSocket health check failed: {exc}")
         return False
 
+
+async def check_rpc_providers(connection_manager: Any) -> bool:
+    try:
+        await connection_manager.probe()
+        return connection_manager.get_pool_stats()['healthy_providers'] > 0
+    except Exception as exc:
+        logger.error(f"RPC provider health check failed: {exc}")
+        return False
@@ -1,7 +1,10 @@
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Callable, Awaitable
 from datetime import datetime
 import asyncio
+import time
 import numpy as np
+from eth_abi import encode
+from web3 import Web3
 from aiohttp import ClientError
 from src.utils.error_handler import (
     ErrorHandler,
@@ -14,19 +17,47 @@ from src.utils.error_handler import (
 from src.utils.logger import get_logger
 from src.trading.strategy_manager import StrategyManager
 from src.models.trading_model import TradingModel
+from src.trading.stop_trigger import StopTrigger, StopTriggerEngine, SIDE_SIGN
+from src.trading.pair_manager import PairManager
+from src.trading.performance_tracker import PerformanceTracker
+from src.trading.amm_mirror import ReserveMirror
+from src.trading.router import RoutingEngine, RoutePlan, Route, DEX_ROUTERS
+from src.blockchain.tx_pipeline import TransactionPipeline
 
 logger = get_logger()
 
+SWAP_EXACT_TOKENS = Web3.keccak(
+    text="swapExactTokensForTokens(uint256,uint256,address[],address,uint256)"
+)[:4]
+
 class TradingService:
     def __init__(
         self,
         strategy_manager: StrategyManager,
         model: TradingModel,
         max_retries: int = 3,
-        retry_delay: float = 1.0
+        retry_delay: float = 1.0,
+        reserve_mirror: Optional[ReserveMirror] = None,
+        router: Optional[RoutingEngine] = None,
+        tx_pipeline: Optional[TransactionPipeline] = None,
+        pairs: Optional[PairManager] = None,
+        stop_engine: Optional[StopTriggerEngine] = None,
+        performance_tracker: Optional[PerformanceTracker] = None
     ):
         self.strategy_manager = strategy_manager
         self.model = model
+        self.router = router
+        self.tx_pipeline = tx_pipeline
+        self.reserve_mirror = reserve_mirror or (router.mirror if router is not None else None)
+        # Exits are routed through the monitored pair of their symbol
+        self.pairs = pairs
+        # Longs opened here get a trailing stop; fired stops come back to execute_exits
+        self.stop_engine = stop_engine
+        # Executed trades and exits feed the ledger behind /performance
+        self.performance_tracker = performance_tracker
+        self._entry_prices: Dict[str, float] = {}
+        # Trades waiting for their receipts before they are booked
+        self._settlements: set = set()
         self.max_retries = max_retries
         self.retry_delay = retry_delay
         self.error_handler = ErrorHandler()
@@ -62,7 +93,9 @@ class TradingService:
                 )
             
             # Execute on-chain transaction
-            return await self._execute_transaction(trade_params, strategy_decision)
+            result = await self._execute_transaction(trade_params, strategy_decision)
+            self._when_confirmed(result, lambda: self._book_entry(trade_params, result))
+            return result
             
         except NetworkError as e:
             if retry_count < self.max_retries:
@@ -84,16 +117,208 @@ class TradingService:
     ) -> Dict[str, Any]:
         """Execute blockchain transaction with error handling."""
         try:
-            # Implement transaction logic here
-            return {
-                "status": "success",
-                "transaction_hash": "0x...",
-                "timestamp": datetime.utcnow().isoformat()
-            }
+            quote = self.check_price_impact(trade_params)
+            if quote is not None:
+                strategy_decision = {**strategy_decision, 'expected_amount_out': quote['amount_out']}
+            route = self.find_route(trade_params)
+            if route is not None:
+                strategy_decision = {**strategy_decision, 'route': route, 'expected_amount_out': route.amount_out}
+
+            if self.tx_pipeline is not None and route is not None:
+                # Split legs are submitted together; each awaits only its own slot
+                max_slippage = trade_params.get('max_slippage', 0.02)
+                submitted = await asyncio.gather(*(
+                    self.tx_pipeline.submit(*self._build_swap(leg, max_slippage))
+                    for leg in route.legs
+                ))
+                return {
+                    "status": "submitted",
+                    "transaction_hashes": [pending.tx_hash for pending in submitted],
+                    "transactions": submitted,
+                    "timestamp": datetime.utcnow().isoformat()
+                }
+
+            raise ValidationError(
+                message="No route or transaction pipeline for trade",
+                error_code="VALIDATION_ERROR",
+                details={"symbol": trade_params.get('symbol'), "routed": route is not None}
+            )
         except Exception as e:
             logger.error(f"Transaction execution error: {str(e)}")
             raise
     
+    def check_price_impact(self, trade_params: Dict[str, Any]) -> Optional[Dict[str, float]]:
+        """Quote the trade from mirrored reserves and reject it above max_slippage.
+
+        ``amount_in`` is in raw token units; without it the human-unit
+        ``amount`` is converted with the pair's decimals.
+        """
+        if self.reserve_mirror is None or 'pair' not in trade_params:
+            return None
+        zero_for_one = trade_params.get('zero_for_one', True)
+        amount_in = trade_params.get('amount_in')
+        if amount_in is None:
+            amount_in = self.reserve_mirror.to_raw(trade_params['pair'], trade_params['amount'], zero_for_one)
+        quote = self.reserve_mirror.quote([trade_params['pair']], [amount_in], zero_for_one)
+        quote = {key: float(value[0]) for key, value in quote.items()}
+        max_slippage = trade_params.get('max_slippage', 0.02)
+        if not quote['price_impact'] <= max_slippage:
+            raise ValidationError(
+                message="Price impact exceeds max slippage",
+                error_code="VALIDATION_ERROR",
+                details={"price_impact": quote['price_impact'], "max_slippage": max_slippage}
+            )
+        return quote
+
+    def find_route(self, trade_params: Dict[str, Any]) -> Optional[RoutePlan]:
+        """Best Uniswap V2 / SushiSwap route for token_in -> token_out trades."""
+        if self.router is None or 'token_in' not in trade_params or 'token_out' not in trade_params:
+            return None
+        amount_in = trade_params.get('amount_in')
+        if amount_in is None:
+            amount_in = self.router.to_raw(trade_params['token_in'], trade_params['amount'])
+        route = self.router.best_route(trade_params['token_in'], trade_params['token_out'], amount_in)
+        if route is None or route.amount_out <= 0:
+            raise ValidationError(
+                message="No route with liquidity",
+                error_code="VALIDATION_ERROR",
+                details={"token_in": trade_params['token_in'], "token_out": trade_params['token_out']}
+            )
+        return route
+
+    def _build_swap(self, leg: Route, max_slippage: float) -> tuple:
+        """Router calldata for one route leg, plus its gas-cache key."""
+        router = Web3.to_checksum_address(DEX_ROUTERS[leg.dexes[0]])
+        path = [Web3.to_checksum_address(token) for token in leg.tokens]
+        data = SWAP_EXACT_TOKENS + encode(
+            ['uint256', 'uint256', 'address[]', 'address', 'uint256'],
+            [
+                int(leg.amount_in),
+                int(leg.amount_out * (1 - max_slippage)),
+                path,
+                self.tx_pipeline.address,
+                int(time.time()) + 300
+            ]
+        )
+        return {'to': router, 'data': data}, (router, 'swapExactTokensForTokens', len(path))
+
+    def _when_confirmed(self, result: Dict[str, Any], book: Callable[[], Awaitable[None]]) -> None:
+        """Run ``book`` once every transaction of a submitted trade is mined successfully."""
+        task = asyncio.create_task(self._await_confirmation(result, book))
+        self._settlements.add(task)
+        task.add_done_callback(self._settlements.discard)
+
+    async def _await_confirmation(self, result: Dict[str, Any], book: Callable[[], Awaitable[None]]) -> None:
+        transactions = result.get('transactions', [])
+        receipts = await asyncio.gather(*(pending.wait() for pending in transactions), return_exceptions=True)
+        failed = [r for r in receipts if isinstance(r, Exception) or r['status'] != 1]
+        if failed:
+            logger.warning(
+                f"Trade {result.get('transaction_hashes')} not booked: "
+                f"{len(failed)} of {len(receipts)} transaction(s) failed or reverted"
+            )
+            return
+        try:
+            await book()
+        except Exception as e:
+            logger.error(f"Error booking confirmed trade {result.get('transaction_hashes')}: {str(e)}")
+
+    async def settle(self) -> None:
+        """Wait until every submitted trade is confirmed (and booked) or failed."""
+        await asyncio.gather(*list(self._settlements), return_exceptions=True)
+
+    async def _book_entry(self, trade_params: Dict[str, Any], result: Dict[str, Any]) -> None:
+        self._track_position(trade_params, result)
+        await self._record_trade(trade_params.get('action'), trade_params['price'], trade_params['amount'], result)
+
+    async def _book_exit(self, trigger: StopTrigger, action: str, result: Dict[str, Any]) -> None:
+        # Realised against the entry recorded when the stop was registered
+        entry = self._entry_prices.pop(trigger.position_id, None)
+        pnl = 0.0
+        if entry is not None:
+            pnl = SIDE_SIGN[trigger.side] * (trigger.trigger_price - entry) * trigger.amount
+        await self._record_trade(action, trigger.trigger_price, trigger.amount, result, pnl)
+
+    def _track_position(self, trade_params: Dict[str, Any], result: Dict[str, Any]) -> None:
+        """Register a trailing stop for a long opened by a buy."""
+        if self.stop_engine is None or not self.stop_engine.trailing_stop_enabled:
+            return
+        if trade_params.get('action') != 'buy' or result.get('status') == 'failed':
+            return
+        hashes = result.get('transaction_hashes')
+        position_id = hashes[0] if hashes else f"{trade_params['symbol']}-{time.time_ns()}"
+        self.stop_engine.add_trailing_stop(
+            position_id,
+            trade_params['symbol'],
+            'long',
+            trade_params['amount'],
+            trade_params['price']
+        )
+        self._entry_prices[position_id] = trade_params['price']
+
+    async def _record_trade(
+        self,
+        action: Optional[str],
+        price: float,
+        amount: float,
+        result: Dict[str, Any],
+        pnl: float = 0.0
+    ) -> None:
+        """Add a confirmed trade to the performance tracker; never fails the trade."""
+        if self.performance_tracker is None or action not in ('buy', 'sell') or result.get('status') == 'failed':
+            return
+        try:
+            await self.performance_tracker.add_trade({
+                'timestamp': datetime.utcnow(),
+                'price': price,
+                'amount': amount,
+                'type': action,
+                'pnl': pnl
+            })
+        except Exception:
+            # Already logged by the tracker; the trade itself went through
+            pass
+
+    async def execute_exits(self, triggers: List[StopTrigger]) -> List[Dict[str, Any]]:
+        """Close positions whose stops fired, bypassing strategy approval."""
+        results = []
+        for trigger in triggers:
+            action = 'sell' if trigger.side == 'long' else 'buy'
+            try:
+                params = {
+                    'symbol': trigger.symbol,
+                    'amount': trigger.amount,
+                    'price': trigger.trigger_price,
+                    'position_id': trigger.position_id
+                }
+                if self.pairs is not None:
+                    params.update(self.pairs.trade_params(trigger.symbol, action, trigger.amount, trigger.trigger_price))
+                result = await self._execute_transaction(
+                    params,
+                    {
+                        'action': action,
+                        'size': trigger.amount,
+                        'reason': trigger.kind
+                    }
+                )
+                logger.info(
+                    f"Submitted {trigger.kind} exit for {trigger.position_id} "
+                    f"at {trigger.trigger_price} ({trigger.latency * 1000:.3f} ms tick-to-trigger)"
+                )
+                self._when_confirmed(
+                    result,
+                    lambda trigger=trigger, action=action, result=result: self._book_exit(trigger, action, result)
+                )
+                results.append(result)
+            except Exception as e:
+                logger.error(f"Error executing exit for {trigger.position_id}: {str(e)}")
+                results.append({
+                    'status': 'failed',
+                    'position_id': trigger.position_id,
+                    'error': str(e)
+                })
+        return results
+
     async def get_prediction(self, symbol: str) -> np.ndarray:
         """Get model prediction with error handling."""
         try:
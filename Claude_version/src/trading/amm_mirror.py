@@ -0,0 +1,258 @@
+from typing import Dict, Any, List, Optional, Sequence, Tuple, Union
+from decimal import Decimal
+import asyncio
+import numpy as np
+from src.blockchain.log_decoder import SyncRecord, decode_sync
+from src.blockchain.log_subscription import to_hex
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+DEFAULT_FEE_BPS = 30  # Uniswap V2 and SushiSwap both charge 0.30%
+
+
+def to_raw_units(amount: Union[float, Decimal], decimals: int) -> int:
+    """Exact raw token amount; float math rounds above 2**53 (any 18-decimal token)."""
+    return int(Decimal(str(amount)) * 10 ** decimals)
+
+
+def amounts_out(
+    amount_in: Union[np.ndarray, float],
+    reserve_in: Union[np.ndarray, float],
+    reserve_out: Union[np.ndarray, float],
+    fee: Union[np.ndarray, float] = DEFAULT_FEE_BPS / 10000
+) -> np.ndarray:
+    """Constant-product output, as UniswapV2Library.getAmountOut, broadcast over arrays."""
+    amount_in_with_fee = np.asarray(amount_in, dtype=float) * (1 - np.asarray(fee, dtype=float))
+    reserve_in = np.asarray(reserve_in, dtype=float)
+    return amount_in_with_fee * np.asarray(reserve_out, dtype=float) / (reserve_in + amount_in_with_fee)
+
+
+def price_impact(
+    amount_in: Union[np.ndarray, float],
+    reserve_in: Union[np.ndarray, float],
+    fee: Union[np.ndarray, float] = DEFAULT_FEE_BPS / 10000
+) -> np.ndarray:
+    """Fractional move of the execution price away from the mid price, excluding the fee."""
+    amount_in_with_fee = np.asarray(amount_in, dtype=float) * (1 - np.asarray(fee, dtype=float))
+    return amount_in_with_fee / (np.asarray(reserve_in, dtype=float) + amount_in_with_fee)
+
+
+class ReserveMirror:
+    """In-memory copy of Uniswap V2-style pair reserves, fed by Sync events.
+
+    Each pair occupies one slot in flat NumPy arrays so quotes for many pairs
+    and trade sizes are a single vectorized expression with no RPC calls.
+    Exact integer reserves are kept alongside for on-chain reconciliation.
+
+    Units: token amounts (inputs, outputs, reserves) are raw integer units;
+    prices are always decimals adjusted (output token per input token).
+    ``to_raw`` converts a human-unit input amount.
+    """
+
+    def __init__(self, capacity: int = 64):
+        self.pairs: Dict[str, int] = {}
+        self._reserve0 = np.zeros(capacity)
+        self._reserve1 = np.zeros(capacity)
+        self._fee = np.full(capacity, DEFAULT_FEE_BPS / 10000)
+        self._scale = np.ones(capacity)  # 10 ** (decimals0 - decimals1)
+        # (block number, log index) of the last applied Sync, to drop stale updates
+        self._position = np.full((capacity, 2), -1, dtype=np.int64)
+        self._version = np.zeros(capacity, dtype=np.int64)
+        self._exact: Dict[str, Tuple[int, int]] = {}
+        self.decimals: Dict[str, Tuple[int, int]] = {}
+        self.stats = {
+            'syncs': 0,
+            'stale_syncs': 0,
+            'untracked_syncs': 0,
+            'reconciliations': 0,
+            'mismatches': 0
+        }
+
+    def _grow(self) -> None:
+        capacity = len(self._reserve0) * 2
+        for name, fill in (('_reserve0', 0.0), ('_reserve1', 0.0), ('_fee', DEFAULT_FEE_BPS / 10000),
+                           ('_scale', 1.0), ('_version', 0)):
+            old = getattr(self, name)
+            new = np.full(capacity, fill, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+        position = np.full((capacity, 2), -1, dtype=np.int64)
+        position[:len(self._position)] = self._position
+        self._position = position
+
+    def track(self, address: str, fee_bps: int = DEFAULT_FEE_BPS, decimals0: int = 18, decimals1: int = 18) -> int:
+        """Register a pair and return its slot."""
+        key = to_hex(address)
+        slot = self.pairs.get(key)
+        if slot is None:
+            slot = len(self.pairs)
+            if slot == len(self._reserve0):
+                self._grow()
+            self.pairs[key] = slot
+        self._fee[slot] = fee_bps / 10000
+        self._scale[slot] = 10.0 ** (decimals0 - decimals1)
+        self.decimals[key] = (decimals0, decimals1)
+        return slot
+
+    @property
+    def addresses(self) -> List[str]:
+        return list(self.pairs)
+
+    def set_reserves(
+        self,
+        address: str,
+        reserve0: int,
+        reserve1: int,
+        block_number: int = -1,
+        log_index: int = -1
+    ) -> bool:
+        """Apply reserves observed at (block, log index); older observations are ignored."""
+        key = to_hex(address)
+        slot = self.pairs.get(key)
+        if slot is None:
+            self.stats['untracked_syncs'] += 1
+            return False
+        if block_number >= 0 and (block_number, log_index) < tuple(self._position[slot]):
+            self.stats['stale_syncs'] += 1
+            return False
+        self._reserve0[slot] = reserve0
+        self._reserve1[slot] = reserve1
+        if block_number >= 0:
+            self._position[slot] = (block_number, log_index)
+        self._version[slot] += 1
+        self._exact[key] = (reserve0, reserve1)
+        return True
+
+    def apply_sync(self, record: SyncRecord) -> bool:
+        applied = self.set_reserves(
+            record.address,
+            record.reserve0,
+            record.reserve1,
+            record.block_number,
+            record.log_index
+        )
+        if applied:
+            self.stats['syncs'] += 1
+        return applied
+
+    async def on_sync_log(self, log: Dict[str, Any]) -> None:
+        """LogSubscription handler for raw Sync logs."""
+        if log.get('removed'):
+            # Reorged out; the replacing block's Sync brings the pair back in line
+            return
+        self.apply_sync(decode_sync(log))
+
+    def get_reserves(self, address: str) -> Optional[Tuple[int, int]]:
+        return self._exact.get(to_hex(address))
+
+    def _slots(self, addresses: Sequence[str]) -> np.ndarray:
+        try:
+            return np.fromiter((self.pairs[to_hex(a)] for a in addresses), dtype=np.int64, count=len(addresses))
+        except KeyError as e:
+            raise ValueError(f"Pair not tracked: {e.args[0]}")
+
+    def mid_prices(self, addresses: Sequence[str], zero_for_one: Union[bool, Sequence[bool]] = True) -> np.ndarray:
+        """Marginal price of the input token in output-token units, decimals adjusted."""
+        slots = self._slots(addresses)
+        direction = np.broadcast_to(np.asarray(zero_for_one, dtype=bool), slots.shape)
+        reserve0, reserve1, scale = self._reserve0[slots], self._reserve1[slots], self._scale[slots]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(direction, reserve1 / reserve0 * scale, reserve0 / reserve1 / scale)
+
+    def to_raw(self, address: str, amount: float, zero_for_one: bool = True) -> int:
+        """Human-unit input amount in raw units of the pair's input token."""
+        decimals = self.decimals.get(to_hex(address))
+        if decimals is None:
+            raise ValueError(f"Pair not tracked: {address}")
+        return to_raw_units(amount, decimals[0 if zero_for_one else 1])
+
+    def quote(
+        self,
+        addresses: Sequence[str],
+        amounts_in: Union[np.ndarray, Sequence[float]],
+        zero_for_one: Union[bool, Sequence[bool]] = True
+    ) -> Dict[str, np.ndarray]:
+        """Quote every pair against every size.
+
+        ``amounts_in`` (raw token units) is either one size per pair (shape
+        ``(n,)``) or a grid of sizes for each pair (shape ``(n, m)``). Results
+        have the shape of ``amounts_in``; ``amount_out`` is in raw units and
+        prices are decimals adjusted, as from ``mid_prices``.
+        """
+        slots = self._slots(addresses)
+        amounts = np.asarray(amounts_in, dtype=float)
+        direction = np.broadcast_to(np.asarray(zero_for_one, dtype=bool), slots.shape)
+        reserve_in = np.where(direction, self._reserve0[slots], self._reserve1[slots])
+        reserve_out = np.where(direction, self._reserve1[slots], self._reserve0[slots])
+        scale = np.where(direction, self._scale[slots], 1 / self._scale[slots])
+        fee = self._fee[slots]
+        if amounts.ndim == 2:
+            reserve_in, reserve_out, fee, scale = reserve_in[:, None], reserve_out[:, None], fee[:, None], scale[:, None]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            out = amounts_out(amounts, reserve_in, reserve_out, fee)
+            mid = np.broadcast_to(reserve_out / reserve_in * scale, amounts.shape)
+            execution = np.where(amounts > 0, out / amounts * scale, mid * (1 - fee))
+        return {
+            'amount_out': out,
+            'mid_price': mid,
+            'execution_price': execution,
+            'price_impact': price_impact(amounts, reserve_in, fee)
+        }
+
+    async def reconcile(self, reader: Any, tolerance: float = 0.0) -> List[Dict[str, Any]]:
+        """Compare the mirror with on-chain getReserves and correct drifted pairs.
+
+        ``reader`` is a ReadAggregator, so all pairs are read in one round-trip.
+        Pairs updated by a Sync while the read was in flight are skipped.
+        """
+        try:
+            addresses = self.addresses
+            versions = self._version[[self.pairs[a] for a in addresses]].copy() if addresses else []
+            results = await asyncio.gather(
+                *(reader.get_reserves(address) for address in addresses),
+                return_exceptions=True
+            )
+            self.stats['reconciliations'] += 1
+
+            mismatches = []
+            for address, version, result in zip(addresses, versions, results):
+                if isinstance(result, Exception):
+                    logger.warning(f"Reserve read failed for {address}: {str(result)}")
+                    continue
+                slot = self.pairs[address]
+                if self._version[slot] != version:
+                    continue
+                chain = (int(result[0]), int(result[1]))
+                local = self._exact.get(address)
+                if local is not None and all(
+                    abs(l - c) <= tolerance * max(c, 1) for l, c in zip(local, chain)
+                ):
+                    continue
+                if local is not None:
+                    mismatches.append({'address': address, 'mirror': local, 'chain': chain})
+                # First read seeds the pair; keep the Sync ordering guard; only the values are corrected
+                self._reserve0[slot], self._reserve1[slot] = chain
+                self._exact[address] = chain
+                self._version[slot] += 1
+
+            if mismatches:
+                self.stats['mismatches'] += len(mismatches)
+                logger.warning(f"Reserve mirror corrected {len(mismatches)} drifted pair(s)")
+            return mismatches
+
+        except Exception as e:
+            logger.error(f"Error reconciling reserve mirror: {str(e)}")
+            raise
+
+    async def run_reconciliation(self, reader: Any, interval: float = 60.0) -> None:
+        """Periodically reconcile until cancelled."""
+        while True:
+            try:
+                await self.reconcile(reader)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Reserve reconciliation failed: {str(e)}")
+            await asyncio.sleep(interval)
@@ -1,5 +1,9 @@
-from typing import Dict, List
+from typing import Dict, List, Tuple, Any, Optional
 from dataclasses import dataclass
+from decimal import Decimal
+import asyncio
+from src.blockchain.log_subscription import to_hex
+from src.trading.amm_mirror import ReserveMirror, DEFAULT_FEE_BPS, to_raw_units
 
 @dataclass
 class TradingPair:
@@ -8,18 +12,114 @@ class TradingPair:
     token1: str
     decimals0: int
     decimals1: int
+    symbol: Optional[str] = None  # "BASE/QUOTE", e.g. "WETH/USDC"
+    base: Optional[str] = None  # base token address; token0 if not set
+    dex: str = 'uniswap_v2'
+    fee_bps: int = DEFAULT_FEE_BPS
+
+    @property
+    def base_is_token0(self) -> bool:
+        return self.base is None or to_hex(self.base) == to_hex(self.token0)
+
+    @property
+    def base_decimals(self) -> int:
+        return self.decimals0 if self.base_is_token0 else self.decimals1
+
+    @property
+    def quote_decimals(self) -> int:
+        return self.decimals1 if self.base_is_token0 else self.decimals0
 
 class PairManager:
     def __init__(self):
         self.pairs: Dict[str, TradingPair] = {}
         self.active_pairs: List[str] = []
-        
-    async def add_pair(self, pair: TradingPair):
-        """Add new trading pair for monitoring"""
+        self.symbols: Dict[str, TradingPair] = {}
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Dict[str, Any]]) -> 'PairManager':
+        """Pairs from settings.MONITORED_PAIRS: symbol -> address, tokens and decimals."""
+        manager = cls()
+        for symbol, entry in config.items():
+            manager.register(TradingPair(symbol=symbol, **entry))
+        return manager
+
+    def register(self, pair: TradingPair) -> TradingPair:
+        pair.address = to_hex(pair.address)
         self.pairs[pair.address] = pair
         if pair.address not in self.active_pairs:
             self.active_pairs.append(pair.address)
-            
+        if pair.symbol:
+            self.symbols[pair.symbol] = pair
+        return pair
+
+    async def add_pair(self, pair: TradingPair):
+        """Add new trading pair for monitoring"""
+        self.register(pair)
+
     async def get_pair_info(self, address: str) -> TradingPair:
         """Get trading pair information"""
-        return self.pairs.get(address) 
\ No newline at end of file
+        return self.pairs.get(to_hex(address))
+
+    def by_symbol(self, symbol: str) -> Optional[TradingPair]:
+        return self.symbols.get(symbol)
+
+    def track(self, mirror: ReserveMirror) -> None:
+        """Register every pair with a reserve mirror so Syncs and quotes cover it."""
+        for pair in self.pairs.values():
+            mirror.track(pair.address, fee_bps=pair.fee_bps, decimals0=pair.decimals0, decimals1=pair.decimals1)
+
+    def add_to_router(self, router: Any) -> None:
+        """Add every pair as a RoutingEngine pool (which also tracks it in the router's mirror)."""
+        for pair in self.pairs.values():
+            router.add_pool(
+                pair.address, pair.token0, pair.token1,
+                dex=pair.dex, fee_bps=pair.fee_bps, decimals0=pair.decimals0, decimals1=pair.decimals1
+            )
+
+    def mid_price(self, mirror: ReserveMirror, pair: TradingPair) -> float:
+        """Quote-token price of one base token, decimals adjusted."""
+        return float(mirror.mid_prices([pair.address], zero_for_one=pair.base_is_token0)[0])
+
+    def trade_params(self, symbol: str, action: str, amount: float, price: float) -> Dict[str, Any]:
+        """Pair, direction and raw input amount for a trade of ``amount`` base tokens.
+
+        A sell spends ``amount`` base tokens; a buy spends ``amount * price``
+        quote tokens.
+        """
+        pair = self.symbols.get(symbol)
+        if pair is None:
+            return {}
+        base, quote = (pair.token0, pair.token1) if pair.base_is_token0 else (pair.token1, pair.token0)
+        if action == 'sell':
+            token_in, token_out = base, quote
+            amount_in = to_raw_units(amount, pair.base_decimals)
+        else:
+            token_in, token_out = quote, base
+            amount_in = to_raw_units(Decimal(str(amount)) * Decimal(str(price)), pair.quote_decimals)
+        return {
+            'pair': pair.address,
+            'zero_for_one': to_hex(token_in) == to_hex(pair.token0),
+            'token_in': token_in,
+            'token_out': token_out,
+            'amount_in': amount_in
+        }
+
+    async def load_pair(self, address: str, token0: str, token1: str, reader) -> TradingPair:
+        """Read token decimals on-chain (one aggregated round-trip) and add the pair"""
+        decimals0, decimals1 = await asyncio.gather(
+            reader.decimals(token0),
+            reader.decimals(token1)
+        )
+        pair = TradingPair(address, token0, token1, decimals0, decimals1)
+        await self.add_pair(pair)
+        return pair
+
+    async def fetch_reserves(self, reader) -> Dict[str, Tuple[int, int]]:
+        """Read reserves for all active pairs; the reader coalesces them into one request"""
+        results = await asyncio.gather(
+            *(reader.get_reserves(address) for address in self.active_pairs)
+        )
+        return {
+            address: (reserve0, reserve1)
+            for address, (reserve0, reserve1, _) in zip(self.active_pairs, results)
+        }
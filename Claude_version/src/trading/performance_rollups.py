@@ -0,0 +1,242 @@
+from typing import Dict, List, Any, Optional, Tuple
+from dataclasses import dataclass, asdict
+from datetime import datetime
+import calendar
+import math
+import re
+import time
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+HOUR = 3600
+DAY = 24 * HOUR
+WEEK = 7 * DAY
+# 1970-01-05 was a Monday, so weekly buckets start on Mondays
+WEEK_OFFSET = 4 * DAY
+
+RESOLUTIONS = {'1h': HOUR, '1d': DAY, '1w': WEEK}
+TIMEFRAME_UNITS = {'h': HOUR, 'd': DAY, 'w': WEEK}
+
+
+def bucket_start(timestamp: float, resolution: int) -> int:
+    offset = WEEK_OFFSET if resolution == WEEK else 0
+    return int((timestamp - offset) // resolution * resolution + offset)
+
+
+def parse_timeframe(timeframe: str) -> int:
+    """Convert strings like '4h', '1d' or '2w' to seconds."""
+    match = re.fullmatch(r'(\d+)([hdw])', timeframe.strip().lower())
+    if not match or int(match.group(1)) == 0:
+        raise ValueError(f"Invalid timeframe: {timeframe}")
+    return int(match.group(1)) * TIMEFRAME_UNITS[match.group(2)]
+
+
+@dataclass
+class RollupBucket:
+    resolution: str
+    start: int
+    start_equity: float
+    end_equity: float
+    peak_equity: float
+    min_equity: float
+    max_drawdown: float = 0.0
+    trade_count: int = 0
+    closed_trades: int = 0
+    winning_trades: int = 0
+    return_sum: float = 0.0
+    return_sq_sum: float = 0.0
+
+    def add(self, pnl: float, trade_return: float, equity: float) -> None:
+        self.trade_count += 1
+        if pnl == 0.0:
+            return
+        self.closed_trades += 1
+        if pnl > 0:
+            self.winning_trades += 1
+        self.return_sum += trade_return
+        self.return_sq_sum += trade_return * trade_return
+        self.end_equity = equity
+        self.peak_equity = max(self.peak_equity, equity)
+        self.min_equity = min(self.min_equity, equity)
+        self.max_drawdown = min(self.max_drawdown, equity / self.peak_equity - 1)
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> 'RollupBucket':
+        """Rebuild a bucket from a performance_metrics row."""
+        start = row['bucket_start']
+        if isinstance(start, datetime):
+            # Written as naive UTC by to_row
+            start = calendar.timegm(start.utctimetuple())
+        return cls(
+            resolution=row['timeframe'],
+            start=int(start),
+            start_equity=float(row['start_equity']),
+            end_equity=float(row['end_equity']),
+            peak_equity=float(row['peak_equity']),
+            min_equity=float(row['min_equity']),
+            max_drawdown=float(row['max_drawdown']),
+            trade_count=int(row['trade_count'] or 0),
+            closed_trades=int(row['closed_trades'] or 0),
+            winning_trades=int(row['winning_trades'] or 0),
+            return_sum=float(row['return_sum'] or 0.0),
+            return_sq_sum=float(row['return_sq_sum'] or 0.0)
+        )
+
+    def to_row(self) -> Dict[str, Any]:
+        """Flatten into a performance_metrics row."""
+        summary = combine_buckets([self])
+        row = asdict(self)
+        row['bucket_start'] = datetime.utcfromtimestamp(row.pop('start'))
+        row['timeframe'] = row.pop('resolution')
+        row['timestamp'] = datetime.utcnow()
+        for key in ('total_return', 'sharpe_ratio', 'max_drawdown', 'win_rate'):
+            row[key] = summary[key]
+        return row
+
+
+def combine_buckets(buckets: List[RollupBucket]) -> Dict[str, float]:
+    """Merge chronologically ordered buckets into summary metrics.
+
+    Drawdown is exact: a point's drawdown against the running peak is the
+    worse of its drawdown within its own bucket and against the peak carried
+    in from earlier buckets.
+    """
+    if not buckets:
+        return {
+            'total_return': 0.0,
+            'sharpe_ratio': 0.0,
+            'max_drawdown': 0.0,
+            'win_rate': 0.0,
+            'total_trades': 0,
+            'closed_trades': 0
+        }
+
+    peak = buckets[0].start_equity
+    max_drawdown = 0.0
+    trades = closed = wins = 0
+    return_sum = return_sq_sum = 0.0
+    for bucket in buckets:
+        max_drawdown = min(max_drawdown, bucket.max_drawdown, bucket.min_equity / peak - 1)
+        peak = max(peak, bucket.peak_equity)
+        trades += bucket.trade_count
+        closed += bucket.closed_trades
+        wins += bucket.winning_trades
+        return_sum += bucket.return_sum
+        return_sq_sum += bucket.return_sq_sum
+
+    sharpe = 0.0
+    if closed > 1:
+        mean = return_sum / closed
+        variance = (return_sq_sum - closed * mean * mean) / (closed - 1)
+        if variance > 0:
+            sharpe = mean / math.sqrt(variance)
+
+    return {
+        'total_return': buckets[-1].end_equity / buckets[0].start_equity - 1,
+        'sharpe_ratio': sharpe,
+        'max_drawdown': max_drawdown,
+        'win_rate': wins / closed if closed else 0.0,
+        'total_trades': trades,
+        'closed_trades': closed
+    }
+
+
+class PerformanceRollups:
+    """Hourly, daily and weekly performance buckets maintained per trade.
+
+    Timeframe queries are answered by tiling the window with the coarsest
+    aligned buckets that fit, so a 30 day query reads a few dozen buckets
+    rather than every fill.
+    """
+
+    def __init__(self, store: Optional[Any] = None):
+        self.store = store
+        self.buckets: Dict[str, Dict[int, RollupBucket]] = {name: {} for name in RESOLUTIONS}
+        self._dirty: Dict[Tuple[str, int], RollupBucket] = {}
+        self._current_hour: Optional[int] = None
+
+    def add(self, timestamp: float, pnl: float, trade_return: float, equity_before: float, equity_after: float) -> bool:
+        """Fold one trade into every resolution; returns True when an hour closed."""
+        for name, resolution in RESOLUTIONS.items():
+            start = bucket_start(timestamp, resolution)
+            bucket = self.buckets[name].get(start)
+            if bucket is None:
+                bucket = RollupBucket(
+                    resolution=name,
+                    start=start,
+                    start_equity=equity_before,
+                    end_equity=equity_before,
+                    peak_equity=equity_before,
+                    min_equity=equity_before
+                )
+                self.buckets[name][start] = bucket
+            bucket.add(pnl, trade_return, equity_after)
+            self._dirty[(name, start)] = bucket
+
+        hour = bucket_start(timestamp, HOUR)
+        rolled = self._current_hour is not None and hour != self._current_hour
+        self._current_hour = hour
+        return rolled
+
+    def query(self, timeframe: str, now: Optional[float] = None) -> Dict[str, Any]:
+        """Summarise the trailing window ending at ``now``."""
+        window = parse_timeframe(timeframe)
+        now = time.time() if now is None else now
+        end = bucket_start(now, HOUR) + HOUR
+        buckets = self._cover(end - window, end)
+        return {
+            'timeframe': timeframe,
+            **combine_buckets(buckets),
+            'buckets_read': len(buckets)
+        }
+
+    def _cover(self, start: float, end: int) -> List[RollupBucket]:
+        cursor = bucket_start(start, HOUR)
+        covered = []
+        while cursor < end:
+            for name in ('1w', '1d', '1h'):
+                resolution = RESOLUTIONS[name]
+                if bucket_start(cursor, resolution) == cursor and cursor + resolution <= end:
+                    break
+            bucket = self.buckets[name].get(cursor)
+            if bucket is not None and bucket.trade_count:
+                covered.append(bucket)
+            cursor += resolution
+        return covered
+
+    async def load(self, since: float = 0.0) -> int:
+        """Restore buckets starting at or after ``since`` from performance_metrics.
+
+        Buckets already built in memory are kept over their persisted copy.
+        """
+        if self.store is None:
+            return 0
+        try:
+            start = datetime.utcfromtimestamp(since)
+            end = datetime.utcfromtimestamp(time.time() + WEEK)
+            loaded = 0
+            for name in RESOLUTIONS:
+                for row in await self.store.performance_buckets(name, start, end):
+                    bucket = RollupBucket.from_row(row)
+                    self.buckets[name].setdefault(bucket.start, bucket)
+                    loaded += 1
+            return loaded
+        except Exception as e:
+            logger.error(f"Error loading performance rollups: {str(e)}")
+            raise
+
+    async def flush(self) -> int:
+        """Persist buckets touched since the last flush to performance_metrics."""
+        if not self._dirty or self.store is None:
+            return 0
+        dirty, self._dirty = self._dirty, {}
+        try:
+            await self.store.save_performance_buckets([bucket.to_row() for bucket in dirty.values()])
+            return len(dirty)
+        except Exception as e:
+            logger.error(f"Error persisting performance rollups: {str(e)}")
+            # Keep the buckets queued for the next flush
+            for key, bucket in dirty.items():
+                self._dirty.setdefault(key, bucket)
+            raise
@@ -1,14 +1,106 @@
-from typing import Dict, List, Any
-import pandas as pd
+from typing import Dict, Any, Optional
 import numpy as np
 import asyncio
+import math
+from src.utils.logger import get_logger
+from src.trading.performance_rollups import PerformanceRollups, combine_buckets
+
+logger = get_logger()
+
+SIDE_CODES = {'buy': 1, 'sell': -1}
+
+class TradeLedger:
+    """Append-only trade ledger stored in growable NumPy columns."""
+
+    COLUMNS = {
+        'timestamp': np.float64,
+        'price': np.float64,
+        'amount': np.float64,
+        'side': np.int8,
+        'pnl': np.float64
+    }
+
+    def __init__(self, capacity: int = 1024):
+        self._columns = {
+            name: np.zeros(capacity, dtype=dtype)
+            for name, dtype in self.COLUMNS.items()
+        }
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def append(self, timestamp: float, price: float, amount: float, side: int, pnl: float) -> None:
+        if self.size == len(self._columns['price']):
+            self._grow()
+        i = self.size
+        self._columns['timestamp'][i] = timestamp
+        self._columns['price'][i] = price
+        self._columns['amount'][i] = amount
+        self._columns['side'][i] = side
+        self._columns['pnl'][i] = pnl
+        self.size = i + 1
+
+    def column(self, name: str) -> np.ndarray:
+        """Return a read-only view of the filled part of a column."""
+        view = self._columns[name][:self.size]
+        view.flags.writeable = False
+        return view
+
+    def _grow(self) -> None:
+        capacity = len(self._columns['price']) * 2
+        for name, old in self._columns.items():
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:len(old)] = old
+            self._columns[name] = new
+
 
 class PerformanceTracker:
-    def __init__(self):
-        self.trades: List[Dict[str, Any]] = []
-        self.metrics: Dict[str, float] = {}
-        self._lock = asyncio.Lock()  # Add thread safety
-        
+    def __init__(self, initial_capital: float = 10000.0, store: Optional[Any] = None):
+        self.initial_capital = initial_capital
+        self.trades = TradeLedger()
+        self.rollups = PerformanceRollups(store)
+        self._lock = asyncio.Lock()  # Serialises writers only
+
+        # Running state, updated in O(1) per trade
+        self._equity = initial_capital
+        self._peak_equity = initial_capital
+        self._max_drawdown = 0.0
+        self._closed_trades = 0
+        self._winning_trades = 0
+        self._return_mean = 0.0
+        self._return_m2 = 0.0
+        # Trades counted in rollups restored from the store, not in the ledger
+        self._restored_trades = 0
+
+        # Readers get whichever immutable snapshot was last published
+        self.metrics: Dict[str, float] = self._build_snapshot(None)
+
+    async def load(self) -> int:
+        """Restore rollup buckets from the store and resume the running metrics from them."""
+        async with self._lock:
+            loaded = await self.rollups.load()
+            weeks = [self.rollups.buckets['1w'][start] for start in sorted(self.rollups.buckets['1w'])]
+            if weeks:
+                summary = combine_buckets(weeks)
+                closed = summary['closed_trades']
+                return_sum = sum(bucket.return_sum for bucket in weeks)
+                return_sq_sum = sum(bucket.return_sq_sum for bucket in weeks)
+                self._equity = weeks[-1].end_equity
+                self._peak_equity = max(bucket.peak_equity for bucket in weeks)
+                self._max_drawdown = summary['max_drawdown']
+                self._closed_trades = closed
+                self._winning_trades = sum(bucket.winning_trades for bucket in weeks)
+                self._return_mean = return_sum / closed if closed else 0.0
+                self._return_m2 = return_sq_sum - closed * self._return_mean ** 2
+                self._restored_trades = summary['total_trades']
+                self.metrics = self._build_snapshot(None)
+            return loaded
+
+    async def close(self) -> None:
+        """Persist the open hour's buckets (and any unsaved ones) before shutdown."""
+        await self.rollups.flush()
+
     async def add_trade(self, trade: Dict[str, Any]):
         """Add trade to performance tracking with validation"""
         try:
@@ -16,11 +108,87 @@ class PerformanceTracker:
             required_fields = {'timestamp', 'price', 'amount', 'type'}
             if not all(field in trade for field in required_fields):
                 raise ValueError('Missing required trade fields')
-                
+            if trade['type'] not in SIDE_CODES:
+                raise ValueError(f"Invalid trade type: {trade['type']}")
+
             async with self._lock:
-                self.trades.append(trade)
-                await self._update_metrics()
-                
+                hour_closed = self._record(trade)
+
         except Exception as e:
             logger.error(f"Error adding trade: {str(e)}")
-            raise 
\ No newline at end of file
+            raise
+
+        if hour_closed:
+            try:
+                await self.rollups.flush()
+            except Exception:
+                # Already logged; unsaved buckets stay queued for the next flush
+                pass
+
+    def _record(self, trade: Dict[str, Any]) -> bool:
+        timestamp = trade['timestamp']
+        if hasattr(timestamp, 'timestamp'):
+            timestamp = timestamp.timestamp()
+        pnl = float(trade.get('pnl') or 0.0)
+
+        self.trades.append(
+            float(timestamp),
+            float(trade['price']),
+            float(trade['amount']),
+            SIDE_CODES[trade['type']],
+            pnl
+        )
+        equity_before = self._equity
+        trade_return = self._update_metrics(float(timestamp), pnl)
+        return self.rollups.add(float(timestamp), pnl, trade_return, equity_before, self._equity)
+
+    def _update_metrics(self, timestamp: float, pnl: float) -> float:
+        """Fold one trade's realised PnL into the running metrics"""
+        trade_return = 0.0
+        if pnl != 0.0:
+            trade_return = pnl / self._equity if self._equity else 0.0
+            self._closed_trades += 1
+            if pnl > 0:
+                self._winning_trades += 1
+
+            # Welford update for the streaming Sharpe ratio
+            delta = trade_return - self._return_mean
+            self._return_mean += delta / self._closed_trades
+            self._return_m2 += delta * (trade_return - self._return_mean)
+
+            self._equity += pnl
+            self._peak_equity = max(self._peak_equity, self._equity)
+            drawdown = self._equity / self._peak_equity - 1
+            self._max_drawdown = min(self._max_drawdown, drawdown)
+
+        self.metrics = self._build_snapshot(timestamp)
+        return trade_return
+
+    def _build_snapshot(self, timestamp: Any) -> Dict[str, float]:
+        closed = self._closed_trades
+        sharpe = 0.0
+        if closed > 1:
+            std = math.sqrt(self._return_m2 / (closed - 1))
+            if std > 0:
+                sharpe = self._return_mean / std
+        return {
+            'total_trades': len(self.trades) + self._restored_trades,
+            'closed_trades': closed,
+            'equity': self._equity,
+            'total_return': self._equity / self.initial_capital - 1,
+            'max_drawdown': self._max_drawdown,
+            'current_drawdown': self._equity / self._peak_equity - 1,
+            'win_rate': self._winning_trades / closed if closed else 0.0,
+            'sharpe_ratio': sharpe,
+            'last_trade_at': timestamp
+        }
+
+    def get_metrics(self, timeframe: Optional[str] = None) -> Dict[str, float]:
+        """Return the latest metrics snapshot without taking the lock"""
+        if timeframe is None or timeframe == 'all':
+            return self.metrics
+        return self.rollups.query(timeframe)
+
+    def get_trade_history(self) -> Dict[str, np.ndarray]:
+        """Return read-only column views over the ledger"""
+        return {name: self.trades.column(name) for name in TradeLedger.COLUMNS}
@@ -0,0 +1,257 @@
+from typing import Dict, List, Optional, Set, Tuple
+from dataclasses import dataclass, field
+from collections import defaultdict
+from itertools import product
+from decimal import Decimal
+import numpy as np
+from src.blockchain.log_subscription import to_hex
+from src.trading.amm_mirror import ReserveMirror, DEFAULT_FEE_BPS, to_raw_units
+from src.config.settings import settings
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+DEX_ROUTERS = {
+    'uniswap_v2': settings.UNISWAP_V2_ROUTER,
+    'sushiswap': settings.SUSHISWAP_ROUTER
+}
+
+
+@dataclass
+class Pool:
+    address: str
+    token0: str
+    token1: str
+    dex: str
+    slot: int
+
+
+@dataclass
+class Route:
+    tokens: List[str]
+    pools: List[str]
+    dexes: List[str]
+    amount_in: float
+    amount_out: float
+
+
+@dataclass
+class RoutePlan:
+    token_in: str
+    token_out: str
+    amount_in: float
+    amount_out: float
+    legs: List[Route] = field(default_factory=list)
+
+    @property
+    def is_split(self) -> bool:
+        return len(self.legs) > 1
+
+
+class _Candidates:
+    """Every pool-level path between two tokens, grouped by hop count as slot arrays."""
+
+    def __init__(self, paths: List[Tuple[List[str], List[Pool]]]):
+        self.groups: Dict[int, Tuple[np.ndarray, np.ndarray, List[Tuple[List[str], List[Pool]]]]] = {}
+        by_hops = defaultdict(list)
+        for tokens, pools in paths:
+            by_hops[len(pools)].append((tokens, pools))
+        for hops, group in by_hops.items():
+            slots = np.array([[pool.slot for pool in pools] for _, pools in group], dtype=np.int64)
+            zero_for_one = np.array(
+                [[pool.token0 == tokens[i] for i, pool in enumerate(pools)] for tokens, pools in group],
+                dtype=bool
+            )
+            self.groups[hops] = (slots, zero_for_one, group)
+
+    def __len__(self) -> int:
+        return sum(len(group) for _, _, group in self.groups.values())
+
+
+class RoutingEngine:
+    """Best 1-3 hop routes over monitored Uniswap V2 and SushiSwap pools.
+
+    Pools form a token graph; candidate paths for a token pair are
+    enumerated once and cached as slot arrays into the ReserveMirror, so a
+    query only evaluates the constant-product formula over live reserves.
+    Adding a pool invalidates just the cached pairs whose endpoints lie
+    within reach of the new edge; reserve updates need no cache changes.
+    """
+
+    def __init__(
+        self,
+        mirror: Optional[ReserveMirror] = None,
+        max_hops: int = 3,
+        split_steps: int = 64
+    ):
+        self.mirror = mirror or ReserveMirror()
+        self.max_hops = max_hops
+        self.split_steps = split_steps
+        self.pools: Dict[str, Pool] = {}
+        # token -> neighbour token -> pools trading that pair
+        self.graph: Dict[str, Dict[str, List[Pool]]] = defaultdict(lambda: defaultdict(list))
+        self.decimals: Dict[str, int] = {}
+        self._cache: Dict[Tuple[str, str], _Candidates] = {}
+        self.stats = {'cache_hits': 0, 'cache_misses': 0, 'invalidations': 0}
+
+    def add_pool(
+        self,
+        address: str,
+        token0: str,
+        token1: str,
+        dex: str = 'uniswap_v2',
+        fee_bps: int = DEFAULT_FEE_BPS,
+        decimals0: int = 18,
+        decimals1: int = 18
+    ) -> Pool:
+        """Register a pool with the mirror and graph, invalidating affected routes."""
+        if dex not in DEX_ROUTERS:
+            raise ValueError(f"Unknown DEX: {dex}")
+        key = to_hex(address)
+        if key in self.pools:
+            return self.pools[key]
+        token0, token1 = to_hex(token0), to_hex(token1)
+        slot = self.mirror.track(key, fee_bps=fee_bps, decimals0=decimals0, decimals1=decimals1)
+        pool = Pool(key, token0, token1, dex, slot)
+        self.decimals.setdefault(token0, decimals0)
+        self.decimals.setdefault(token1, decimals1)
+        self.pools[key] = pool
+        self.graph[token0][token1].append(pool)
+        self.graph[token1][token0].append(pool)
+        self._invalidate(token0, token1)
+        return pool
+
+    def to_raw(self, token: str, amount: float) -> int:
+        """Human-unit amount of a pooled token in raw units, the unit ``best_route`` takes."""
+        decimals = self.decimals.get(to_hex(token))
+        if decimals is None:
+            raise ValueError(f"Token not in any pool: {token}")
+        return to_raw_units(amount, decimals)
+
+    def _within(self, sources: Set[str], radius: int) -> Set[str]:
+        reached = set(sources)
+        frontier = set(sources)
+        for _ in range(radius):
+            frontier = {n for token in frontier for n in self.graph.get(token, ())} - reached
+            reached |= frontier
+        return reached
+
+    def _invalidate(self, token0: str, token1: str) -> None:
+        # A path of <= max_hops using edge (token0, token1) has both endpoints
+        # within max_hops - 1 hops of that edge
+        if not self._cache:
+            return
+        nearby = self._within({token0, token1}, self.max_hops - 1)
+        stale = [key for key in self._cache if key[0] in nearby and key[1] in nearby]
+        for key in stale:
+            del self._cache[key]
+        self.stats['invalidations'] += len(stale)
+
+    def _enumerate(self, token_in: str, token_out: str) -> List[Tuple[List[str], List[Pool]]]:
+        # Meet in the middle: intermediate hops are intersections of
+        # neighbour sets, so hub tokens with thousands of pools stay cheap
+        graph = self.graph
+        outgoing = graph.get(token_in, {})
+        incoming = graph.get(token_out, {})
+        hops: List[List[str]] = []
+        if token_out in outgoing:
+            hops.append([token_in, token_out])
+        if self.max_hops >= 2:
+            for middle in outgoing.keys() & incoming.keys():
+                hops.append([token_in, middle, token_out])
+        if self.max_hops >= 3:
+            for first in outgoing:
+                if first == token_out:
+                    continue
+                for second in graph[first].keys() & incoming.keys():
+                    if second != token_in:
+                        hops.append([token_in, first, second, token_out])
+
+        # Each leg is executed by one DEX router, so its hops share a DEX
+        paths = []
+        for tokens in hops:
+            edges = [graph[a][b] for a, b in zip(tokens, tokens[1:])]
+            for dex in DEX_ROUTERS:
+                options = [[pool for pool in edge if pool.dex == dex] for edge in edges]
+                paths.extend((tokens, list(choice)) for choice in product(*options))
+        return paths
+
+    def candidates(self, token_in: str, token_out: str) -> _Candidates:
+        key = (to_hex(token_in), to_hex(token_out))
+        cached = self._cache.get(key)
+        if cached is not None:
+            self.stats['cache_hits'] += 1
+            return cached
+        self.stats['cache_misses'] += 1
+        cached = _Candidates(self._enumerate(*key))
+        self._cache[key] = cached
+        return cached
+
+    def _evaluate(self, candidates: _Candidates, amounts: np.ndarray) -> List[Tuple[np.ndarray, list]]:
+        """Outputs for every candidate path at every input amount (rows: paths)."""
+        reserve0, reserve1, fee = self.mirror._reserve0, self.mirror._reserve1, self.mirror._fee
+        results = []
+        for hops, (slots, zero_for_one, group) in candidates.groups.items():
+            out = np.broadcast_to(amounts, (len(group), len(amounts))).astype(float)
+            for hop in range(hops):
+                s = slots[:, hop]
+                direction = zero_for_one[:, hop]
+                reserve_in = np.where(direction, reserve0[s], reserve1[s])[:, None]
+                reserve_out = np.where(direction, reserve1[s], reserve0[s])[:, None]
+                with_fee = out * (1 - fee[s])[:, None]
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    out = np.nan_to_num(with_fee * reserve_out / (reserve_in + with_fee))
+            results.append((out, group))
+        return results
+
+    def _route(self, path: Tuple[List[str], List[Pool]], amount_in: float, amount_out: float) -> Route:
+        tokens, pools = path
+        return Route(tokens, [p.address for p in pools], [p.dex for p in pools], amount_in, amount_out)
+
+    def best_route(self, token_in: str, token_out: str, amount_in: float, split: bool = True) -> Optional[RoutePlan]:
+        """Best single path, or best two-way split across pool-disjoint paths."""
+        candidates = self.candidates(token_in, token_out)
+        if not len(candidates):
+            return None
+
+        # Raw (int) inputs stay exact in the plan; floats are only used for quoting
+        exact_in = amount_in
+        amount_in = float(amount_in)
+        if split and self.split_steps > 0:
+            fractions = np.linspace(0.0, 1.0, self.split_steps + 1)
+        else:
+            fractions = np.array([1.0])
+        evaluated = self._evaluate(candidates, fractions * amount_in)
+        outputs = np.vstack([out for out, _ in evaluated])
+        paths = [path for _, group in evaluated for path in group]
+
+        best = int(np.argmax(outputs[:, -1]))
+        plan = RoutePlan(token_in, token_out, exact_in, float(outputs[best, -1]),
+                         [self._route(paths[best], exact_in, float(outputs[best, -1]))])
+        if len(fractions) == 1 or len(paths) < 2:
+            return plan
+
+        # Pair the best path with each pool-disjoint alternative: x on the
+        # first, the rest on the second, searched over the fraction grid
+        best_pools = {pool.address for pool in paths[best][1]}
+        disjoint = [i for i, (_, pools) in enumerate(paths)
+                    if i != best and best_pools.isdisjoint(pool.address for pool in pools)]
+        if not disjoint:
+            return plan
+        totals = outputs[best][None, :] + outputs[disjoint][:, ::-1]
+        row, column = np.unravel_index(int(np.argmax(totals)), totals.shape)
+        if totals[row, column] <= plan.amount_out:
+            return plan
+
+        other = disjoint[row]
+        share = float(fractions[column])
+        if isinstance(exact_in, int):
+            first = int(exact_in * Decimal(str(share)))
+        else:
+            first = amount_in * share
+        legs = [
+            self._route(paths[best], first, float(outputs[best, column])),
+            self._route(paths[other], exact_in - first, float(outputs[other, len(fractions) - 1 - column]))
+        ]
+        return RoutePlan(token_in, token_out, exact_in, float(totals[row, column]),
+                         [leg for leg in legs if leg.amount_in > 0])
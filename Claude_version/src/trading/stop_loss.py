@@ -1,11 +1,16 @@
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Sequence
 import numpy as np
+from src.utils.logger import get_logger
+from src.models.volatility import VolatilityTracker, true_range, wilder_atr
+
+logger = get_logger()
 
 class StopLossManager:
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, config: Dict[str, Any], volatility: Optional[VolatilityTracker] = None):
         self.default_stop_loss = config['default_stop_loss']
         self.trailing_stop_enabled = config['trailing_stop_enabled']
         self.trailing_stop_distance = config['trailing_stop_distance']
+        self.volatility = volatility or VolatilityTracker()
         
     def calculate_stop_loss(
         self,
@@ -16,12 +21,20 @@ class StopLossManager:
     ) -> Dict[str, float]:
         """Calculate stop loss levels based on multiple factors"""
         try:
+            symbol = market_data.get('symbol')
+            if symbol is not None and symbol in self.volatility.symbols:
+                # Use the shared rolling state instead of rescanning history
+                atr = self.volatility.get_atr(symbol)
+                volatility = self.volatility.get_volatility(symbol)
+            else:
+                atr = self._calculate_atr(market_data)
+                window = self.volatility.volatility_window
+                volatility = np.std(np.asarray(market_data['close'], dtype=float)[-window:])
+
             # Calculate ATR-based stop loss
-            atr = self._calculate_atr(market_data)
             atr_stop = entry_price - (atr * 2)
             
             # Calculate volatility-based stop loss
-            volatility = np.std(market_data['close'])
             vol_stop = entry_price - (volatility * 1.5)
             
             # Use the more conservative stop loss
@@ -35,4 +48,32 @@ class StopLossManager:
             
         except Exception as e:
             logger.error(f"Error calculating stop loss: {str(e)}")
-            raise 
\ No newline at end of file
+            raise
+
+    def calculate_stop_losses(
+        self,
+        symbols: Sequence[str],
+        entry_prices: Sequence[float],
+        position_sizes: Optional[Sequence[float]] = None,
+        sides: Optional[Sequence[str]] = None,
+        risk_budget: Optional[float] = None
+    ) -> Dict[str, np.ndarray]:
+        """Calculate stops for a batch of orders in one vectorized call"""
+        return self.volatility.batch_stop_loss(
+            symbols,
+            entry_prices,
+            position_sizes=position_sizes,
+            sides=sides,
+            risk_budget=risk_budget
+        )
+
+    def _calculate_atr(self, market_data: Dict[str, Any]) -> float:
+        """Calculate ATR over the tail of the supplied price history"""
+        period = self.volatility.atr_period
+        tail = period * 4
+        tr = true_range(
+            np.asarray(market_data['high'], dtype=float)[-tail:],
+            np.asarray(market_data['low'], dtype=float)[-tail:],
+            np.asarray(market_data['close'], dtype=float)[-tail:]
+        )
+        return wilder_atr(tr, period)
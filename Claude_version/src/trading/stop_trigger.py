@@ -0,0 +1,344 @@
+from typing import Dict, List, Any, Optional, Callable, Awaitable, Tuple
+from dataclasses import dataclass, field
+from bisect import bisect_left, insort
+from collections import deque
+import asyncio
+import time
+import numpy as np
+from src.utils.logger import get_logger
+
+logger = get_logger()
+
+# Longs exit when price falls to the stop, shorts when it rises to it.
+# Every level is stored as ``sign * price`` so both sides share one
+# "fire everything with key >= sign * tick" rule.
+SIDE_SIGN = {'long': 1.0, 'short': -1.0}
+
+
+@dataclass
+class StopTrigger:
+    position_id: str
+    symbol: str
+    side: str
+    kind: str
+    stop_price: float
+    trigger_price: float
+    amount: float
+    latency: float = 0.0
+
+
+class _StopBook:
+    """Sorted index of fixed stop levels for one (symbol, side)."""
+
+    def __init__(self):
+        self.keys: List[float] = []
+        self.ids: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def add(self, key: float, position_id: str) -> None:
+        i = bisect_left(self.keys, key)
+        self.keys.insert(i, key)
+        self.ids.insert(i, position_id)
+
+    def remove(self, key: float, position_id: str) -> None:
+        i = bisect_left(self.keys, key)
+        while i < len(self.keys) and self.keys[i] == key:
+            if self.ids[i] == position_id:
+                del self.keys[i]
+                del self.ids[i]
+                return
+            i += 1
+
+    def pop_triggered(self, x: float) -> List[Tuple[float, str]]:
+        """Remove and return every stop with key >= x in O(log n + k)."""
+        i = bisect_left(self.keys, x)
+        if i == len(self.keys):
+            return []
+        fired = list(zip(self.keys[i:], self.ids[i:]))
+        del self.keys[i:]
+        del self.ids[i:]
+        return fired
+
+
+@dataclass(eq=False)
+class _Bucket:
+    key: float
+    members: set = field(default_factory=set)
+
+
+class _TrailingBook:
+    """Trailing stops for one (symbol, side, distance), grouped by extreme price.
+
+    Positions whose running extreme has been overtaken by the latest tick all
+    share the same extreme afterwards, so they are merged into one bucket and
+    updated together instead of one by one.
+    """
+
+    def __init__(self, side: str, distance: float):
+        self.sign = SIDE_SIGN[side]
+        self.factor = 1 - distance if side == 'long' else 1 + distance
+        self.keys: List[float] = []
+        self.buckets: Dict[float, _Bucket] = {}
+        self.owner: Dict[str, _Bucket] = {}
+
+    def __len__(self) -> int:
+        return len(self.owner)
+
+    def level(self, position_id: str) -> float:
+        return self.sign * self.owner[position_id].key * self.factor
+
+    def add(self, key: float, position_id: str) -> None:
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = _Bucket(key)
+            self.buckets[key] = bucket
+            insort(self.keys, key)
+        bucket.members.add(position_id)
+        self.owner[position_id] = bucket
+
+    def remove(self, position_id: str) -> None:
+        bucket = self.owner.pop(position_id, None)
+        if bucket is None:
+            return
+        bucket.members.discard(position_id)
+        if not bucket.members:
+            self._drop_bucket(bucket)
+
+    def pop_triggered(self, x: float) -> List[Tuple[float, str]]:
+        """Remove and return positions whose trailing level is crossed by x."""
+        i = bisect_left(self.keys, x / self.factor)
+        if i == len(self.keys):
+            return []
+        fired = []
+        for key in self.keys[i:]:
+            bucket = self.buckets.pop(key)
+            level = self.sign * key * self.factor
+            for position_id in bucket.members:
+                del self.owner[position_id]
+                fired.append((level, position_id))
+        del self.keys[i:]
+        return fired
+
+    def advance(self, x: float) -> None:
+        """Move every extreme behind x up to x in one merge."""
+        i = bisect_left(self.keys, x)
+        if not i:
+            return
+        merged = [self.buckets.pop(key) for key in self.keys[:i]]
+        del self.keys[:i]
+        existing = self.buckets.get(x)
+        if existing is not None:
+            merged.append(existing)
+        target = max(merged, key=lambda bucket: len(bucket.members))
+        for bucket in merged:
+            if bucket is target:
+                continue
+            for position_id in bucket.members:
+                self.owner[position_id] = target
+            target.members |= bucket.members
+        target.key = x
+        self.buckets[x] = target
+        if existing is None:
+            self.keys.insert(0, x)
+
+    def _drop_bucket(self, bucket: _Bucket) -> None:
+        del self.buckets[bucket.key]
+        i = bisect_left(self.keys, bucket.key)
+        del self.keys[i]
+
+
+class StopTriggerEngine:
+    """Price-indexed stop-loss and trailing-stop monitor for open positions."""
+
+    def __init__(
+        self,
+        config: Dict[str, Any],
+        on_trigger: Optional[Callable[[List[StopTrigger]], Awaitable[Any]]] = None,
+        latency_window: int = 10000
+    ):
+        self.trailing_stop_enabled = config['trailing_stop_enabled']
+        self.trailing_stop_distance = config['trailing_stop_distance']
+        self.on_trigger = on_trigger
+        self._stops: Dict[str, Dict[str, _StopBook]] = {}
+        self._trailing: Dict[str, Dict[Tuple[str, float], _TrailingBook]] = {}
+        self._positions: Dict[str, Dict[str, Any]] = {}
+        self._latencies: deque = deque(maxlen=latency_window)
+        self.ticks_processed = 0
+        self.triggers_fired = 0
+        # Fired stops are handed to a worker so a slow exit (e.g. waiting for
+        # a transaction slot) never holds up the price feed
+        self._exits: asyncio.Queue = asyncio.Queue()
+        self._worker: Optional[asyncio.Task] = None
+
+    def add_stop(
+        self,
+        position_id: str,
+        symbol: str,
+        side: str,
+        amount: float,
+        stop_price: float
+    ) -> None:
+        """Register a fixed stop for a position, replacing any existing one."""
+        if side not in SIDE_SIGN:
+            raise ValueError(f"Invalid position side: {side}")
+        self.remove(position_id)
+        book = self._stops.setdefault(symbol, {}).setdefault(side, _StopBook())
+        key = SIDE_SIGN[side] * stop_price
+        book.add(key, position_id)
+        self._positions[position_id] = {
+            'symbol': symbol,
+            'side': side,
+            'amount': amount,
+            'kind': 'stop',
+            'book': book,
+            'key': key
+        }
+
+    def add_trailing_stop(
+        self,
+        position_id: str,
+        symbol: str,
+        side: str,
+        amount: float,
+        reference_price: float,
+        distance: Optional[float] = None
+    ) -> None:
+        """Register a trailing stop anchored at the reference (entry) price."""
+        if not self.trailing_stop_enabled:
+            raise ValueError('Trailing stops are disabled')
+        if side not in SIDE_SIGN:
+            raise ValueError(f"Invalid position side: {side}")
+        distance = self.trailing_stop_distance if distance is None else distance
+        if not 0 < distance < 1:
+            raise ValueError(f"Invalid trailing stop distance: {distance}")
+        self.remove(position_id)
+        books = self._trailing.setdefault(symbol, {})
+        book = books.get((side, distance))
+        if book is None:
+            book = books[(side, distance)] = _TrailingBook(side, distance)
+        book.add(SIDE_SIGN[side] * reference_price, position_id)
+        self._positions[position_id] = {
+            'symbol': symbol,
+            'side': side,
+            'amount': amount,
+            'kind': 'trailing',
+            'book': book
+        }
+
+    def remove(self, position_id: str) -> None:
+        """Stop monitoring a position (closed manually or replaced)."""
+        position = self._positions.pop(position_id, None)
+        if position is None:
+            return
+        if position['kind'] == 'stop':
+            position['book'].remove(position['key'], position_id)
+        else:
+            position['book'].remove(position_id)
+
+    def get_stop_price(self, position_id: str) -> Optional[float]:
+        """Current stop level for a position, including trailing adjustments."""
+        position = self._positions.get(position_id)
+        if position is None:
+            return None
+        if position['kind'] == 'stop':
+            return SIDE_SIGN[position['side']] * position['key']
+        return position['book'].level(position_id)
+
+    async def on_price(
+        self,
+        symbol: str,
+        price: float,
+        received_at: Optional[float] = None
+    ) -> List[StopTrigger]:
+        """Process a price tick, fire crossed stops and ratchet trailing levels.
+
+        ``received_at`` is the ``time.perf_counter()`` reading taken when the
+        tick entered the process; it defaults to now.
+        """
+        if received_at is None:
+            received_at = time.perf_counter()
+        try:
+            self.ticks_processed += 1
+            fired: List[Tuple[str, float, str]] = []
+
+            for side, book in self._stops.get(symbol, {}).items():
+                x = SIDE_SIGN[side] * price
+                fired.extend(('stop', level_key * SIDE_SIGN[side], pid)
+                             for level_key, pid in book.pop_triggered(x))
+
+            for book in self._trailing.get(symbol, {}).values():
+                x = book.sign * price
+                fired.extend(('trailing', level, pid)
+                             for level, pid in book.pop_triggered(x))
+                book.advance(x)
+
+            if not fired:
+                return []
+
+            triggers = []
+            for kind, stop_price, position_id in fired:
+                position = self._positions.pop(position_id)
+                triggers.append(StopTrigger(
+                    position_id=position_id,
+                    symbol=symbol,
+                    side=position['side'],
+                    kind=kind,
+                    stop_price=stop_price,
+                    trigger_price=price,
+                    amount=position['amount']
+                ))
+
+            latency = time.perf_counter() - received_at
+            for trigger in triggers:
+                trigger.latency = latency
+            self._latencies.append(latency)
+            self.triggers_fired += len(triggers)
+
+            if self.on_trigger is not None:
+                self._exits.put_nowait(triggers)
+                if self._worker is None or self._worker.done():
+                    self._worker = asyncio.create_task(self._run_exits())
+            return triggers
+
+        except Exception as e:
+            logger.error(f"Error processing price tick for {symbol}: {str(e)}")
+            raise
+
+    async def _run_exits(self) -> None:
+        while True:
+            triggers = await self._exits.get()
+            try:
+                await self.on_trigger(triggers)
+            except Exception as e:
+                logger.error(f"Error exiting {len(triggers)} stopped position(s): {str(e)}")
+            finally:
+                self._exits.task_done()
+
+    async def drain(self) -> None:
+        """Wait until every fired stop has been handed to ``on_trigger``."""
+        await self._exits.join()
+
+    async def close(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+            await asyncio.gather(self._worker, return_exceptions=True)
+            self._worker = None
+
+    def get_metrics(self) -> Dict[str, float]:
+        """Return index size and tick-to-trigger latency statistics."""
+        metrics = {
+            'open_positions': len(self._positions),
+            'exits_pending': self._exits.qsize(),
+            'ticks_processed': self.ticks_processed,
+            'triggers_fired': self.triggers_fired
+        }
+        if self._latencies:
+            latencies = np.fromiter(self._latencies, dtype=float)
+            metrics.update({
+                'latency_p50': float(np.percentile(latencies, 50)),
+                'latency_p99': float(np.percentile(latencies, 99)),
+                'latency_max': float(latencies.max())
+            })
+        return metrics
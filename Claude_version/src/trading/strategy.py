@@ -4,6 +4,7 @@ import numpy as np
 from src.utils.logger import get_logger
 from src.models.trading_model import TradingModel
 from src.models.risk_management import RiskManager
+from src.models.volatility import VolatilityTracker
 
 logger = get_logger()
 
@@ -14,11 +15,13 @@ class TradingStrategy(ABC):
         self,
         model: TradingModel,
         risk_manager: RiskManager,
-        min_confidence: float = 0.6
+        min_confidence: float = 0.6,
+        volatility: Optional[VolatilityTracker] = None
     ):
         self.model = model
         self.risk_manager = risk_manager
         self.min_confidence = min_confidence
+        self.volatility = volatility
         self.positions: Dict[str, Any] = {}
         self.performance_metrics = {
             'total_trades': 0,
@@ -92,7 +95,12 @@ class TradingStrategy(ABC):
             trend_direction = np.sign(prediction).sum() / len(prediction)
             
             # Analyze volatility
-            volatility = np.std(market_data['close'])
+            symbol = market_data.get('symbol')
+            if self.volatility is not None and symbol in self.volatility.symbols:
+                volatility = self.volatility.get_volatility(symbol)
+            else:
+                window = self.volatility.volatility_window if self.volatility else 20
+                volatility = np.std(np.asarray(market_data['close'], dtype=float)[-window:])
             
             return {
                 'pattern_strength': float(pattern_strength),
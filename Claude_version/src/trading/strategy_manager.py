@@ -1,20 +1,25 @@
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 import numpy as np
 from src.utils.logger import get_logger
 from src.trading.strategy import TradingStrategy
 from src.models.risk_management import RiskManager
+from src.models.volatility import VolatilityTracker
 
 logger = get_logger()
 
 class StrategyManager:
-    def __init__(self, portfolio_value: float):
+    def __init__(self, portfolio_value: float, volatility: Optional[VolatilityTracker] = None):
         self.strategies: Dict[str, TradingStrategy] = {}
         self.portfolio_value = portfolio_value
+        # Shared rolling volatility, given to strategies added without their own
+        self.volatility = volatility
         self.performance_metrics: Dict[str, List[float]] = {}
         
     def add_strategy(self, name: str, strategy: TradingStrategy) -> None:
         """Add a trading strategy to the manager."""
         try:
+            if strategy.volatility is None:
+                strategy.volatility = self.volatility
             self.strategies[name] = strategy
             self.performance_metrics[name] = []
             logger.info(f"Added strategy: {name}")
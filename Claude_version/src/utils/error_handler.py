@@ -38,6 +38,10 @@ class ModelError(TradingError):
     """ML model-related errors."""
     pass
 
+class DatabaseError(TradingError):
+    """Database connectivity and query errors."""
+    pass
+
 class ErrorHandler:
     # HTTP status codes mapping
     STATUS_CODES = {
@@ -45,12 +49,14 @@ class ErrorHandler:
         'CONTRACT_ERROR': 502,
         'VALIDATION_ERROR': 400,
         'MODEL_ERROR': 500,
+        'DATABASE_ERROR': 503,
         'TIMEOUT_ERROR': 504
     }
     
     @staticmethod
-    async def handle_contract_interaction(func):
+    def handle_contract_interaction(func):
         """Decorator for handling smart contract interactions."""
+        @wraps(func)
         async def wrapper(*args, **kwargs):
             try:
                 return await func(*args, **kwargs)
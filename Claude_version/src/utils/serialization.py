@@ -0,0 +1,49 @@
+from typing import Any
+from decimal import Decimal
+import orjson
+from fastapi.responses import JSONResponse
+
+# NumPy arrays/scalars and datetimes are encoded natively; dict keys may be
+# ints (e.g. block numbers)
+OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        # Kept as a string so token amounts don't lose precision
+        return str(value)
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        # Hashes and addresses (HexBytes) as 0x-hex
+        return '0x' + bytes(value).hex()
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if hasattr(value, 'item'):
+        # NumPy scalars orjson doesn't cover (e.g. float16)
+        return value.item()
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(value: Any) -> bytes:
+    """Encode to JSON bytes with orjson."""
+    return orjson.dumps(value, default=_default, option=OPTIONS)
+
+
+def encode_frame(message: Any) -> str:
+    """A WebSocket text frame, built once and shared by every recipient.
+
+    Serialization happens once per message; the server still UTF-8 encodes
+    the str for each socket. That copy is kept on purpose: clients
+    (including the dashboard) parse text frames, and an ASGI text send must
+    be a str, so sending these bytes as-is would mean binary frames.
+    """
+    return dumps(message).decode()
+
+
+loads = orjson.loads
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson, including NumPy and Decimal values."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -1,8 +1,18 @@
+import os
+import tempfile
 import pytest
 import numpy as np
 from unittest.mock import Mock
 from web3 import Web3
 
+# Required settings so modules importing src.config.settings load in tests
+os.environ.setdefault('WEB3_PROVIDER_URI', 'http://localhost:8545')
+os.environ.setdefault('WS_PROVIDER_URI', 'ws://localhost:8546')
+os.environ.setdefault('WALLET_ADDRESS', '0x' + '11' * 20)
+os.environ.setdefault('PRIVATE_KEY', '0x' + '22' * 32)
+# Keep the event journal out of the working tree
+os.environ.setdefault('EVENT_JOURNAL_DIR', tempfile.mkdtemp(prefix='event-journal-'))
+
 @pytest.fixture
 def web3_mock():
     """Create a mock Web3 instance."""
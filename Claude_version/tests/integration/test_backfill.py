@@ -0,0 +1,110 @@
+import json
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from web3 import AsyncWeb3, AsyncHTTPProvider
+from src.blockchain.backfill import LogBackfiller, SWAP_TOPIC
+
+POOL = '0x' + 'ab' * 20
+HEAD = 5000
+MAX_LOGS = 300
+
+def make_log(block, index):
+    return {
+        'address': POOL,
+        'topics': [SWAP_TOPIC],
+        'data': '0x',
+        'blockNumber': hex(block),
+        'blockHash': '0x' + f"{block:064x}",
+        'transactionHash': '0x' + f"{block * 10 + index:064x}",
+        'transactionIndex': '0x0',
+        'logIndex': hex(index),
+        'removed': False
+    }
+
+class FakeNode:
+    """Local JSON-RPC stand-in with a provider-style result cap."""
+
+    def __init__(self):
+        # One swap every other block, two in every hundredth block
+        self.logs = [
+            make_log(block, index)
+            for block in range(0, HEAD + 1, 2)
+            for index in range(2 if block % 100 == 0 else 1)
+        ]
+        self.calls = []
+
+    async def handle(self, request):
+        body = await request.json()
+        method, params = body['method'], body['params']
+        if method == 'eth_blockNumber':
+            result = hex(HEAD)
+        elif method == 'eth_getLogs':
+            start = int(params[0]['fromBlock'], 16)
+            end = int(params[0]['toBlock'], 16)
+            self.calls.append((start, end))
+            result = [log for log in self.logs if start <= int(log['blockNumber'], 16) <= end]
+            if len(result) > MAX_LOGS:
+                return web.json_response({
+                    'jsonrpc': '2.0', 'id': body['id'],
+                    'error': {'code': -32005, 'message': f"query returned more than {MAX_LOGS} results"}
+                })
+        else:
+            result = None
+        return web.json_response({'jsonrpc': '2.0', 'id': body['id'], 'result': result})
+
+@pytest_asyncio.fixture
+async def node():
+    fake = FakeNode()
+    app = web.Application()
+    app.router.add_post('/', fake.handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    fake.url = f"http://127.0.0.1:{port}"
+    yield fake
+    await runner.cleanup()
+
+@pytest.mark.asyncio
+async def test_backfill_adapts_range_and_preserves_order(node, tmp_path):
+    """Test splitting on provider limits, ordered delivery and checkpointing."""
+    w3 = AsyncWeb3(AsyncHTTPProvider(node.url))
+    checkpoint = tmp_path / 'checkpoint.json'
+    backfiller = LogBackfiller(
+        w3, [POOL], [SWAP_TOPIC],
+        checkpoint_path=str(checkpoint),
+        initial_range=2000,
+        target_logs=200,
+        max_in_flight=3
+    )
+    received = []
+
+    async def collect(logs):
+        received.extend(logs)
+
+    next_block = await backfiller.run(collect, from_block=0)
+
+    assert next_block == HEAD + 1
+    assert len(received) == len(node.logs)
+    keys = [(log['blockNumber'], log['logIndex']) for log in received]
+    assert keys == sorted(keys)
+    assert backfiller.stats['splits'] > 0
+    assert json.loads(checkpoint.read_text())['next_block'] == HEAD + 1
+
+@pytest.mark.asyncio
+async def test_backfill_resumes_from_checkpoint(node, tmp_path):
+    """Test a restarted backfill continues after the last delivered range."""
+    w3 = AsyncWeb3(AsyncHTTPProvider(node.url))
+    checkpoint = tmp_path / 'checkpoint.json'
+    checkpoint.write_text(json.dumps({'next_block': 4001, 'to_block': HEAD}))
+    backfiller = LogBackfiller(w3, [POOL], [SWAP_TOPIC], checkpoint_path=str(checkpoint))
+    received = []
+
+    async def collect(logs):
+        received.extend(logs)
+
+    await backfiller.run(collect)
+    assert min(start for start, _ in node.calls) == 4001
+    assert all(log['blockNumber'] > 4000 for log in received)
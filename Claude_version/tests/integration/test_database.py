@@ -0,0 +1,220 @@
+import asyncio
+from datetime import datetime, timedelta
+from decimal import Decimal
+import pytest
+import pytest_asyncio
+from src.database.connection import Database
+from src.database.models import TradingStore, TradeEvent
+from src.data.write_behind import WriteBehindBuffer
+from src.services.health_check import check_database_connection
+
+@pytest_asyncio.fixture
+async def store(tmp_path):
+    database = Database(f"sqlite:///{tmp_path / 'trading.db'}", max_size=4)
+    store = TradingStore(database)
+    await store.init_schema()
+    yield store
+    await database.close()
+
+def trade(i, status='pending'):
+    return {
+        'transaction_hash': f"0x{i:064x}",
+        'symbol': 'WETH/USDC',
+        'amount': 1.5,
+        'price': 3000.25,
+        'timestamp': datetime(2024, 1, 1) + timedelta(minutes=i),
+        'status': status,
+        'type': 'buy'
+    }
+
+@pytest.mark.asyncio
+async def test_bulk_trade_upsert_is_idempotent(store):
+    """Test re-saving trades updates rows instead of duplicating them"""
+    assert await store.save_trades([trade(i) for i in range(100)]) == 100
+    await store.save_trades([trade(7, status='confirmed')])
+
+    recent = await store.recent_trades(limit=1000)
+    assert len(recent) == 100
+    row = await store.get_trade(trade(7)['transaction_hash'])
+    assert row['status'] == 'confirmed'
+    assert row['price'] == Decimal('3000.25')
+    assert row['timestamp'] == datetime(2024, 1, 1, 0, 7)
+
+@pytest.mark.asyncio
+async def test_trade_events_keep_full_precision(store):
+    """Test token amounts wider than 64 bits survive the round trip"""
+    amount = 123456789 * 10 ** 18
+    event = TradeEvent(
+        transaction_hash='0x' + 'ab' * 32,
+        block_number=100,
+        timestamp='2024-01-01T00:00:00',
+        dex_address='0x' + 'cd' * 20,
+        event_type='Swap',
+        log_index=3,
+        amount_in=amount
+    )
+    await event.save(store)
+    # Second log of the same transaction is a separate row
+    await TradeEvent.bulk_upsert([{**vars(event), 'log_index': 4}, vars(event)], store)
+
+    rows = await store.database.fetch("SELECT * FROM trade_events ORDER BY log_index")
+    assert [row['log_index'] for row in rows] == [3, 4]
+    assert rows[0]['amount_in'] == Decimal(amount)
+
+@pytest.mark.asyncio
+async def test_decoded_swaps_persist_tokens_and_amounts(store):
+    """Test a raw Swap log round-trips through the event pipeline into trade_events"""
+    from eth_abi import encode
+    from src.blockchain.backfill import SWAP_TOPIC
+    from src.services.event_service import EventService
+    from src.trading.pair_manager import PairManager
+
+    pair, token0, token1 = '0x' + 'ab' * 20, '0x' + '01' * 20, '0x' + '02' * 20
+    service = EventService(pairs=PairManager.from_config({
+        'T1/T0': {'address': pair, 'token0': token0, 'token1': token1, 'decimals0': 18, 'decimals1': 18}
+    }))
+    service.trade_writer.writer = lambda rows: TradeEvent.bulk_upsert(rows, store)
+    fetched = []
+
+    class FakeEth:
+        async def get_block(self, number):
+            fetched.append(number)
+            return {'number': number, 'timestamp': 1_700_000_000 + number}
+
+    service.w3 = type('FakeWeb3', (), {'eth': FakeEth()})()
+
+    def swap_log(index, amounts):
+        return {
+            'address': pair,
+            'topics': [SWAP_TOPIC, '0x' + '00' * 12 + '11' * 20, '0x' + '00' * 12 + '22' * 20],
+            'data': '0x' + encode(['uint256'] * 4, amounts).hex(),
+            'blockNumber': hex(100),
+            'transactionHash': '0x' + 'ef' * 32,
+            'logIndex': hex(index)
+        }
+
+    big = 3 * 10 ** 30
+    service.pipeline.start()
+    # amount0In, amount1In, amount0Out, amount1Out
+    await service._process_confirmed([swap_log(0, [big, 0, 0, 7]), swap_log(1, [0, 9, 4, 0])])
+    await service.pipeline.drain()
+    await service.trade_writer.flush()
+    await service.pipeline.stop()
+
+    rows = await store.database.fetch("SELECT * FROM trade_events ORDER BY log_index")
+    assert [(row['token_in'], row['token_out'], row['amount_in'], row['amount_out']) for row in rows] == [
+        (token0, token1, Decimal(big), Decimal(7)),
+        (token1, token0, Decimal(9), Decimal(4))
+    ]
+    # Stamped with the block's time, fetched once for both logs
+    assert fetched == [100]
+    assert {row['timestamp'] for row in rows} == {datetime.utcfromtimestamp(1_700_000_100)}
+    assert rows[0]['dex_address'] == pair and rows[0]['block_number'] == 100
+
+@pytest.mark.asyncio
+async def test_predictions_and_performance_buckets(store):
+    await store.save_predictions([
+        {'symbol': 'WETH/USDC', 'prediction': 0.7, 'confidence': 0.9, 'timestamp': datetime(2024, 1, 1, h)}
+        for h in range(5)
+    ])
+    latest = await store.recent_predictions('WETH/USDC', limit=2)
+    assert [row['timestamp'].hour for row in latest] == [4, 3]
+
+    bucket = {
+        'timeframe': '1h', 'bucket_start': datetime(2024, 1, 1), 'timestamp': datetime(2024, 1, 1, 1),
+        'total_return': 0.01, 'sharpe_ratio': 1.2, 'max_drawdown': -0.02, 'win_rate': 0.5,
+        'start_equity': 10000, 'end_equity': 10100, 'peak_equity': 10150, 'min_equity': 9950,
+        'trade_count': 4, 'closed_trades': 2, 'winning_trades': 1, 'return_sum': 0.01, 'return_sq_sum': 0.0002
+    }
+    await store.save_performance_buckets([bucket])
+    await store.save_performance_buckets([{**bucket, 'trade_count': 6}])
+
+    rows = await store.performance_buckets('1h', datetime(2024, 1, 1), datetime(2024, 1, 2))
+    assert len(rows) == 1
+    assert rows[0]['trade_count'] == 6
+
+@pytest.mark.asyncio
+async def test_pool_serves_concurrent_queries_and_health_check(store):
+    await asyncio.gather(*(store.save_trades([trade(i)]) for i in range(20)))
+    results = await asyncio.gather(*(store.recent_trades(limit=5) for _ in range(20)))
+
+    assert all(len(rows) == 5 for rows in results)
+    stats = store.database.get_pool_stats()
+    assert stats['size'] == 4 and stats['idle'] == 4
+    assert await check_database_connection(store.database)
+    assert not await check_database_connection(Database('postgresql://invalid:1/none'), timeout=0.5)
+
+@pytest.mark.asyncio
+async def test_write_behind_flushes_into_store(store):
+    buffer = WriteBehindBuffer(store.save_trades, max_batch=50, flush_interval=0.01)
+    buffer.start()
+    for i in range(120):
+        await buffer.put(trade(i))
+    await buffer.close()
+
+    assert len(await store.recent_trades(limit=500)) == 120
+    assert store.database.stats['batches'] >= 3
+
+@pytest.mark.asyncio
+async def test_range_queries_by_time_and_symbol(store):
+    """Test time/symbol range reads and keyset-paginated export"""
+    rows = [
+        {**trade(i), 'symbol': ('WETH/USDC', 'WBTC/USDT', 'WETH/USDT')[i % 3]}
+        for i in range(300)
+    ]
+    await store.save_trades(rows)
+    start, end = datetime(2024, 1, 1, 1), datetime(2024, 1, 1, 3)
+
+    window = await store.trades_between(start, end)
+    assert len(window) == 120
+    assert all(start <= row['timestamp'] < end for row in window)
+
+    weth = await store.trades_between(start, end, symbols=['WETH/USDC', 'WETH/USDT'], limit=50)
+    assert len(weth) == 50
+    assert {row['symbol'] for row in weth} == {'WETH/USDC', 'WETH/USDT'}
+    assert [row['timestamp'] for row in weth] == sorted(row['timestamp'] for row in weth)
+
+    batches = [batch async for batch in store.iter_range('trades', start, end, ['WBTC/USDT'], batch_size=15)]
+    assert [len(batch) for batch in batches] == [15, 15, 10]
+    exported = [row['transaction_hash'] for batch in batches for row in batch]
+    assert len(set(exported)) == 40
+
+    with pytest.raises(ValueError):
+        await store.range('performance_metrics', start, end)
+
+@pytest.mark.asyncio
+async def test_retention_expires_old_rows_on_sqlite(store):
+    from src.database.partitions import PartitionManager
+    await store.save_predictions([
+        {'symbol': 'WETH/USDC', 'prediction': 1, 'confidence': 0.5, 'timestamp': datetime(2024, 1, day)}
+        for day in range(1, 31)
+    ])
+    manager = PartitionManager(store.database, {'predictions': 10, 'trades': None})
+
+    result = await manager.maintain(now=datetime(2024, 1, 31))
+
+    assert result == {'created': [], 'dropped': []}
+    remaining = await store.predictions_between(datetime(2023, 1, 1), datetime(2025, 1, 1))
+    assert min(row['timestamp'] for row in remaining) == datetime(2024, 1, 21)
+    assert manager.stats['rows_expired'] == 20
+
+@pytest.mark.asyncio
+async def test_performance_rollups_survive_restart(store):
+    """Test rollups flushed on shutdown are restored with the running metrics"""
+    from src.trading.performance_tracker import PerformanceTracker
+
+    now = datetime.utcnow().timestamp()
+    tracker = PerformanceTracker(initial_capital=1000.0, store=store)
+    for i, pnl in enumerate([10.0, -30.0, 5.0, 20.0]):
+        await tracker.add_trade({'timestamp': now - 3600 * (4 - i), 'price': 1.0, 'amount': 1.0, 'type': 'sell', 'pnl': pnl})
+    await tracker.close()
+
+    restarted = PerformanceTracker(initial_capital=1000.0, store=store)
+    assert await restarted.load() > 0
+    for key in ('total_trades', 'closed_trades', 'equity', 'max_drawdown', 'win_rate', 'sharpe_ratio'):
+        assert restarted.get_metrics()[key] == pytest.approx(tracker.get_metrics()[key])
+    assert restarted.get_metrics('1d') == tracker.get_metrics('1d')
+
+    await restarted.add_trade({'timestamp': now, 'price': 1.0, 'amount': 1.0, 'type': 'sell', 'pnl': 15.0})
+    assert restarted.get_metrics()['equity'] == pytest.approx(1020.0)
+    assert restarted.get_metrics('1d')['total_trades'] == 5
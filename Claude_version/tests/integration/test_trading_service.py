@@ -3,9 +3,24 @@ from unittest.mock import Mock, patch
 from src.services.trading_service import TradingService
 from src.trading.strategy_manager import StrategyManager
 from src.models.trading_model import TradingModel
-from src.utils.error_handler import NetworkError, ContractError
+from src.trading.stop_trigger import StopTriggerEngine
+from src.utils.error_handler import NetworkError, ContractError, ValidationError
 import numpy as np
 
+class FakePending:
+    """Submitted transaction whose receipt has the given status."""
+
+    def __init__(self, status=1):
+        self.tx_hash = f"0x{id(self):064x}"
+        self.status = status
+
+    async def wait(self, timeout=None):
+        return {'status': self.status}
+
+def submitted(status=1):
+    pending = FakePending(status)
+    return {'status': 'submitted', 'transaction_hashes': [pending.tx_hash], 'transactions': [pending]}
+
 @pytest.fixture
 async def trading_service():
     strategy_manager = Mock(spec=StrategyManager)
@@ -62,4 +77,115 @@ async def test_contract_interaction(trading_service):
             {'amount': 1.0},
             {'action': 'buy'}
         )
-        assert result['transaction_hash'] == '0x123' 
\ No newline at end of file
+        assert result['transaction_hash'] == '0x123' 
+@pytest.mark.asyncio
+async def test_stop_exits_are_executed():
+    """Test that fired stops are closed through execute_exits."""
+    service = TradingService(Mock(spec=StrategyManager), Mock(spec=TradingModel))
+    results = []
+
+    async def execute(params, decision):
+        return submitted()
+
+    service._execute_transaction = execute
+
+    async def on_trigger(triggers):
+        results.extend(await service.execute_exits(triggers))
+
+    engine = StopTriggerEngine(
+        {'trailing_stop_enabled': True, 'trailing_stop_distance': 0.1},
+        on_trigger=on_trigger
+    )
+    engine.add_stop('p1', 'ETH/USD', 'long', 1.0, 1900.0)
+    await engine.on_price('ETH/USD', 1850.0)
+    await engine.drain()
+
+    assert len(results) == 1
+    assert results[0]['status'] == 'submitted'
+    # The decorator keeps the wrapped coroutine function's identity
+    assert TradingService._execute_transaction.__name__ == '_execute_transaction'
+
+@pytest.mark.asyncio
+async def test_buys_register_trailing_stops():
+    """Test that longs opened by a buy get a trailing stop and exit through the pair."""
+    from src.config.settings import settings
+    from src.trading.pair_manager import PairManager
+
+    engine = StopTriggerEngine({'trailing_stop_enabled': True, 'trailing_stop_distance': 0.05})
+    service = TradingService(
+        Mock(spec=StrategyManager),
+        Mock(spec=TradingModel),
+        pairs=PairManager.from_config(settings.MONITORED_PAIRS),
+        stop_engine=engine
+    )
+    service._track_position({'symbol': 'WETH/USDC', 'action': 'buy', 'amount': 2.0, 'price': 2000.0}, {'status': 'success'})
+    service._track_position({'symbol': 'WETH/USDC', 'action': 'sell', 'amount': 1.0, 'price': 2000.0}, {'status': 'success'})
+    assert engine.get_metrics()['open_positions'] == 1
+
+    exits = []
+
+    async def execute(params, decision):
+        exits.append((params, decision))
+        return submitted()
+
+    service._execute_transaction = execute
+    engine.on_trigger = service.execute_exits
+    triggers = await engine.on_price('WETH/USDC', 1890.0)
+    await engine.drain()
+
+    assert len(triggers) == 1
+    params, decision = exits[0]
+    assert decision['action'] == 'sell' and decision['reason'] == 'trailing'
+    assert params['pair'] == settings.MONITORED_PAIRS['WETH/USDC']['address'].lower()
+    assert params['amount_in'] == 2 * 10 ** 18
+
+@pytest.mark.asyncio
+async def test_executed_trades_feed_performance_tracker():
+    """Test that confirmed entries and stop exits are recorded with realised PnL."""
+    from src.trading.performance_tracker import PerformanceTracker
+
+    tracker = PerformanceTracker(initial_capital=10000.0)
+    engine = StopTriggerEngine({'trailing_stop_enabled': True, 'trailing_stop_distance': 0.05})
+    strategy_manager = Mock(spec=StrategyManager)
+
+    async def approve(params):
+        return {'action': params['action']}
+
+    strategy_manager.execute_strategies = approve
+    service = TradingService(strategy_manager, Mock(spec=TradingModel), stop_engine=engine, performance_tracker=tracker)
+
+    async def predict(symbol):
+        return np.array([[0.7]])
+
+    service.get_prediction = predict
+    service.error_handler.validate_model_prediction = Mock()
+    statuses = [0, 1, 1]
+
+    async def execute(params, decision):
+        return submitted(statuses.pop(0))
+
+    service._execute_transaction = execute
+    # Reverted on chain: neither booked nor protected by a stop
+    await service.execute_trade({'symbol': 'ETH/USD', 'action': 'buy', 'amount': 5.0, 'price': 2000.0})
+    await service.settle()
+    assert tracker.get_metrics()['total_trades'] == 0
+    assert engine.get_metrics()['open_positions'] == 0
+
+    await service.execute_trade({'symbol': 'ETH/USD', 'action': 'buy', 'amount': 2.0, 'price': 2000.0})
+    await service.settle()
+    engine.on_trigger = service.execute_exits
+    await engine.on_price('ETH/USD', 1800.0)
+    await engine.drain()
+    await service.settle()
+
+    metrics = tracker.get_metrics()
+    assert metrics['total_trades'] == 2
+    assert metrics['closed_trades'] == 1
+    assert metrics['equity'] == pytest.approx(10000.0 - 400.0)
+
+@pytest.mark.asyncio
+async def test_unroutable_trade_is_rejected():
+    """Test that a trade with no route or pipeline raises instead of reporting a fill."""
+    service = TradingService(Mock(spec=StrategyManager), Mock(spec=TradingModel))
+    with pytest.raises(ValidationError):
+        await service._execute_transaction({'symbol': 'ETH/USD', 'amount': 1.0, 'price': 2000.0}, {'action': 'buy'})
@@ -0,0 +1,297 @@
+import asyncio
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from eth_account import Account
+from eth_account._utils.typed_transactions import TypedTransaction
+from hexbytes import HexBytes
+from web3 import AsyncWeb3, AsyncHTTPProvider, Web3
+from src.blockchain.tx_pipeline import TransactionPipeline, GasEstimateCache
+
+ROUTER = Web3.to_checksum_address('0x' + '7a' * 20)
+GWEI = 10 ** 9
+
+class DevChain:
+    """Local JSON-RPC dev-chain stand-in: mempool with replacement rules and manual mining."""
+
+    def __init__(self):
+        self.mined_nonce = {}
+        self.mempool = {}  # (sender, nonce) -> (tx hash, tx)
+        self.receipts = {}
+        self.block = 100
+        self.calls = []
+        self.reject_nonces = set()  # nonces whose next broadcast is rejected once
+
+    def _send(self, raw):
+        raw = HexBytes(raw)
+        tx = TypedTransaction.from_bytes(raw).as_dict()
+        sender = Account.recover_transaction(raw).lower()
+        tx_hash = '0x' + Web3.keccak(raw).hex().removeprefix('0x')
+        nonce = tx['nonce']
+        if nonce < self.mined_nonce.get(sender, 0):
+            return None, {'code': -32000, 'message': 'nonce too low'}
+        if nonce in self.reject_nonces:
+            self.reject_nonces.discard(nonce)
+            return None, {'code': -32000, 'message': 'insufficient funds for gas * price + value'}
+        existing = self.mempool.get((sender, nonce))
+        if existing is not None:
+            if existing[0] == tx_hash:
+                return None, {'code': -32000, 'message': 'already known'}
+            if tx['maxFeePerGas'] < existing[1]['maxFeePerGas'] * 1.1:
+                return None, {'code': -32000, 'message': 'replacement transaction underpriced'}
+        self.mempool[(sender, nonce)] = (tx_hash, tx)
+        return tx_hash, None
+
+    def mine(self, sender):
+        """Mine every contiguous pending nonce for sender into one block"""
+        sender = sender.lower()
+        self.block += 1
+        nonce = self.mined_nonce.get(sender, 0)
+        while (sender, nonce) in self.mempool:
+            tx_hash, tx = self.mempool.pop((sender, nonce))
+            self.receipts[tx_hash] = {
+                'transactionHash': tx_hash,
+                'transactionIndex': '0x0',
+                'blockHash': '0x' + f"{self.block:064x}",
+                'blockNumber': hex(self.block),
+                'from': sender,
+                'to': '0x' + bytes(tx['to']).hex(),
+                'cumulativeGasUsed': hex(tx['gas'] // 2),
+                'gasUsed': hex(tx['gas'] // 2),
+                'effectiveGasPrice': hex(tx['maxFeePerGas']),
+                'contractAddress': None,
+                'logs': [],
+                'logsBloom': '0x' + '00' * 256,
+                'status': '0x1',
+                'type': '0x2'
+            }
+            nonce += 1
+        self.mined_nonce[sender] = nonce
+
+    def _dispatch(self, method, params):
+        self.calls.append(method)
+        if method == 'eth_chainId':
+            return '0x539', None
+        if method == 'eth_getTransactionCount':
+            sender, tag = params[0].lower(), params[1]
+            self.calls.append(f"{method}:{tag}")
+            nonce = self.mined_nonce.get(sender, 0)
+            if tag == 'pending':
+                while (sender, nonce) in self.mempool:
+                    nonce += 1
+            return hex(nonce), None
+        if method == 'eth_estimateGas':
+            return hex(150000), None
+        if method == 'eth_maxPriorityFeePerGas':
+            return hex(2 * GWEI), None
+        if method == 'eth_getBlockByNumber':
+            return {
+                'number': hex(self.block),
+                'hash': '0x' + f"{self.block:064x}",
+                'parentHash': '0x' + f"{self.block - 1:064x}",
+                'baseFeePerGas': hex(30 * GWEI),
+                'timestamp': hex(1700000000 + self.block),
+                'gasLimit': hex(30000000),
+                'gasUsed': '0x0',
+                'transactions': []
+            }, None
+        if method == 'eth_sendRawTransaction':
+            return self._send(params[0])
+        if method == 'eth_getTransactionReceipt':
+            return self.receipts.get(params[0]), None
+        return None, {'code': -32601, 'message': f'method {method} not found'}
+
+    async def handle(self, request):
+        body = await request.json()
+        result, error = self._dispatch(body['method'], body['params'])
+        response = {'jsonrpc': '2.0', 'id': body['id']}
+        response.update({'error': error} if error else {'result': result})
+        return web.json_response(response)
+
+@pytest.fixture
+def chain():
+    return DevChain()
+
+@pytest_asyncio.fixture
+async def w3(chain):
+    app = web.Application()
+    app.router.add_post('/', chain.handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    yield AsyncWeb3(AsyncHTTPProvider(f"http://127.0.0.1:{port}"))
+    await runner.cleanup()
+
+@pytest.fixture
+def account():
+    return Account.create()
+
+def swap_tx(i):
+    return {'to': ROUTER, 'data': bytes([i]) * 4}
+
+@pytest.mark.asyncio
+async def test_pipelined_submits_share_nonce_and_gas_lookups(w3, chain, account):
+    """Test concurrent trades get distinct local nonces and one gas estimate"""
+    pipeline = TransactionPipeline(w3, account.address, account.key, max_in_flight=4, receipt_interval=0.01)
+    key = (ROUTER, 'swapExactTokensForTokens', 2)
+
+    submitted = await asyncio.gather(*(pipeline.submit(swap_tx(i), gas_key=key) for i in range(4)))
+
+    assert sorted(p.nonce for p in submitted) == [0, 1, 2, 3]
+    assert chain.calls.count('eth_getTransactionCount:pending') == 1
+    assert chain.calls.count('eth_estimateGas') == 1
+    assert all(p.tx['gas'] == 180000 for p in submitted)
+
+    chain.mine(account.address)
+    receipts = await asyncio.gather(*(p.wait(timeout=2) for p in submitted))
+    assert all(receipt['status'] == 1 for receipt in receipts)
+    assert pipeline.stats['confirmed'] == 4
+    await pipeline.close()
+
+@pytest.mark.asyncio
+async def test_in_flight_limit_applies_backpressure(w3, chain, account):
+    """Test submissions beyond max_in_flight wait for earlier receipts"""
+    pipeline = TransactionPipeline(w3, account.address, account.key, max_in_flight=2, receipt_interval=0.01)
+    first = await asyncio.gather(pipeline.submit(swap_tx(1)), pipeline.submit(swap_tx(2)))
+
+    third = asyncio.create_task(pipeline.submit(swap_tx(3)))
+    await asyncio.sleep(0.05)
+    assert not third.done()
+
+    chain.mine(account.address)
+    pending = await asyncio.wait_for(third, timeout=2)
+    assert pending.nonce == 2
+    await pipeline.close()
+
+@pytest.mark.asyncio
+async def test_stuck_transaction_is_sped_up(w3, chain, account):
+    """Test a pending transaction is rebroadcast with bumped fees and its receipt found"""
+    pipeline = TransactionPipeline(
+        w3, account.address, account.key, receipt_interval=3600, speed_up_after=0
+    )
+    pending = await pipeline.submit(swap_tx(1))
+    original_fee = pending.tx['maxFeePerGas']
+
+    await pipeline.poll_receipts()
+    assert pending.replacements == 1
+    assert pending.tx['maxFeePerGas'] >= original_fee * 1.1
+    assert len(pending.hashes) == 2
+
+    chain.mine(account.address)
+    await pipeline.poll_receipts()
+    receipt = await pending.wait(timeout=1)
+    assert receipt['transactionHash'].hex().removeprefix('0x') == pending.hashes[-1].removeprefix('0x')
+    await pipeline.close()
+
+@pytest.mark.asyncio
+async def test_nonce_resync_after_external_send(w3, chain, account):
+    """Test a nonce used outside the pipeline triggers one resync"""
+    pipeline = TransactionPipeline(w3, account.address, account.key, receipt_interval=0.01)
+    await pipeline.nonces.sync()
+    chain.mined_nonce[account.address.lower()] = 5
+
+    pending = await pipeline.submit(swap_tx(1))
+
+    assert pending.nonce == 5
+    assert pipeline.stats['nonce_resyncs'] == 1
+    await pipeline.close()
+
+@pytest.mark.asyncio
+async def test_resync_never_reissues_held_nonce(w3, chain, account):
+    """Test a resync skips nonces still held by submits that have not broadcast"""
+    pipeline = TransactionPipeline(w3, account.address, account.key)
+    await pipeline.nonces.sync()
+    failed = await pipeline.nonces.allocate()
+    held = await pipeline.nonces.allocate()
+    chain.mined_nonce[account.address.lower()] = failed + 1
+
+    await pipeline.nonces.sync()
+
+    assert await pipeline.nonces.allocate() not in (failed, held)
+    await pipeline.close()
+
+@pytest.mark.asyncio
+async def test_failed_broadcast_gap_is_filled(w3, chain, account):
+    """Test a nonce released below an in-flight leg is filled so that leg can mine"""
+    pipeline = TransactionPipeline(w3, account.address, account.key, max_in_flight=2, receipt_interval=0.01)
+    chain.reject_nonces.add(0)
+
+    results = await asyncio.gather(pipeline.submit(swap_tx(1)), pipeline.submit(swap_tx(2)), return_exceptions=True)
+    leg = next(result for result in results if not isinstance(result, Exception))
+
+    assert leg.nonce == 1
+    filler = pipeline.in_flight[0]
+    assert filler.gap_fill and filler.tx['to'] == account.address and filler.tx['value'] == 0
+    assert pipeline.stats['gap_fills'] == 1
+
+    chain.mine(account.address)
+    assert (await leg.wait(timeout=2))['status'] == 1
+    await asyncio.sleep(0.05)
+    assert pipeline.in_flight == {}
+    assert pipeline._slots._value == 2
+    await pipeline.close()
+
+@pytest.mark.asyncio
+async def test_mined_nonce_keeps_polling_for_receipt(w3, chain, account):
+    """Test a mined nonce whose receipt is not served yet is not failed"""
+    pipeline = TransactionPipeline(w3, account.address, account.key, receipt_interval=3600, speed_up_after=0)
+    pending = await pipeline.submit(swap_tx(1))
+    chain.mine(account.address)
+    receipt = chain.receipts.pop(pending.tx_hash)
+
+    assert await pipeline.poll_receipts() == 0
+    assert pending.nonce in pipeline.in_flight and not pending.receipt.done()
+    assert pending.replacements == 0
+
+    chain.receipts[pending.tx_hash] = receipt
+    assert await pipeline.poll_receipts() == 1
+    assert (await pending.wait(timeout=1))['status'] == 1
+    assert pipeline.stats['failed'] == 0
+    await pipeline.close()
+
+@pytest.mark.asyncio
+async def test_trading_service_submits_route_legs(w3, chain, account):
+    """Test routed trades go through the pipeline from TradingService"""
+    from unittest.mock import Mock
+    from src.services.trading_service import TradingService
+    from src.trading.router import RoutingEngine
+
+    weth, usdc = '0x' + 'a' * 40, '0x' + 'b' * 40
+    router = RoutingEngine()
+    router.add_pool('0x' + '01' * 20, weth, usdc, dex='uniswap_v2')
+    router.add_pool('0x' + '02' * 20, weth, usdc, dex='sushiswap')
+    router.mirror.set_reserves('0x' + '01' * 20, int(1000e18), int(2_000_000e18))
+    router.mirror.set_reserves('0x' + '02' * 20, int(500e18), int(1_000_000e18))
+    pipeline = TransactionPipeline(w3, account.address, account.key, receipt_interval=0.01)
+    service = TradingService(Mock(), Mock(), router=router, tx_pipeline=pipeline)
+
+    result = await service._execute_transaction(
+        {'symbol': 'WETH/USDC', 'amount': 300.0, 'price': 2000.0, 'token_in': weth, 'token_out': usdc},
+        {'action': 'sell'}
+    )
+
+    assert result['status'] == 'submitted'
+    assert len(result['transaction_hashes']) == 2
+    assert sorted(p.nonce for p in result['transactions']) == [0, 1]
+    chain.mine(account.address)
+    receipts = await asyncio.gather(*(p.wait(timeout=2) for p in result['transactions']))
+    assert all(receipt['status'] == 1 for receipt in receipts)
+    await pipeline.close()
+
+@pytest.mark.asyncio
+async def test_gas_cache_expires_and_invalidates():
+    cache = GasEstimateCache(ttl=60, margin=1.0)
+    calls = []
+
+    async def estimate():
+        calls.append(1)
+        return 100000
+
+    key = (ROUTER, 'swapExactTokensForTokens', 3)
+    assert await cache.get(key, estimate) == 100000
+    assert await cache.get(key, estimate) == 100000
+    cache.invalidate(key)
+    await cache.get(key, estimate)
+    assert len(calls) == 2
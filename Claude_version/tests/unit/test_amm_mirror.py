@@ -0,0 +1,117 @@
+import numpy as np
+import pytest
+from eth_abi import encode
+from src.blockchain.log_subscription import SYNC_TOPIC
+from src.trading.amm_mirror import ReserveMirror, amounts_out
+
+PAIR_A = '0x' + 'aa' * 20
+PAIR_B = '0x' + 'bb' * 20
+
+def get_amount_out(amount_in, reserve_in, reserve_out):
+    """UniswapV2Library.getAmountOut in integer math"""
+    amount_in_with_fee = amount_in * 997
+    return amount_in_with_fee * reserve_out // (reserve_in * 1000 + amount_in_with_fee)
+
+def sync_log(address, reserve0, reserve1, block, index=0):
+    return {
+        'address': address,
+        'topics': [SYNC_TOPIC],
+        'data': '0x' + encode(['uint112', 'uint112'], [reserve0, reserve1]).hex(),
+        'blockNumber': hex(block),
+        'transactionHash': '0x' + '00' * 32,
+        'logIndex': hex(index)
+    }
+
+@pytest.fixture
+def mirror():
+    mirror = ReserveMirror(capacity=1)
+    mirror.track(PAIR_A, decimals0=18, decimals1=6)
+    mirror.track(PAIR_B)
+    mirror.set_reserves(PAIR_A, 1000 * 10 ** 18, 2_000_000 * 10 ** 6, block_number=1)
+    mirror.set_reserves(PAIR_B, 5 * 10 ** 21, 5 * 10 ** 21, block_number=1)
+    return mirror
+
+def test_amounts_out_matches_router_math():
+    """Test the float quote agrees with on-chain integer getAmountOut"""
+    reserve_in, reserve_out = 1234 * 10 ** 18, 987654 * 10 ** 6
+    sizes = [10 ** 15, 10 ** 18, 50 * 10 ** 18]
+    quoted = amounts_out(np.array(sizes, dtype=float), reserve_in, reserve_out)
+    expected = [get_amount_out(size, reserve_in, reserve_out) for size in sizes]
+
+    # Router floors to whole units
+    np.testing.assert_allclose(quoted, expected, rtol=1e-12, atol=1)
+
+def test_quote_grid_for_many_pairs(mirror):
+    """Test a (pairs, sizes) grid is quoted in one call"""
+    sizes = np.array([[10 ** 18, 10 * 10 ** 18], [10 ** 18, 10 * 10 ** 18]], dtype=float)
+    quote = mirror.quote([PAIR_A, PAIR_B], sizes)
+
+    assert quote['amount_out'].shape == (2, 2)
+    # Amounts are raw units; prices are decimals adjusted everywhere
+    assert quote['mid_price'][0, 0] == pytest.approx(2000.0)
+    assert quote['amount_out'][0, 0] == pytest.approx(quote['execution_price'][0, 0] * 10 ** 6)
+    assert quote['price_impact'][0, 1] > quote['price_impact'][0, 0]
+    assert np.all(quote['execution_price'] < quote['mid_price'])
+    # Human-unit mid price uses the pair's decimals
+    assert mirror.mid_prices([PAIR_A])[0] == pytest.approx(2000.0)
+    assert mirror.mid_prices([PAIR_A], zero_for_one=False)[0] == pytest.approx(1 / 2000.0)
+
+@pytest.mark.asyncio
+async def test_sync_logs_update_and_stale_ones_ignored(mirror):
+    """Test Sync events move reserves and out-of-order ones are dropped"""
+    await mirror.on_sync_log(sync_log(PAIR_A, 900 * 10 ** 18, 2_222_222 * 10 ** 6, block=5, index=2))
+    await mirror.on_sync_log(sync_log(PAIR_A, 1, 1, block=5, index=1))
+    await mirror.on_sync_log(sync_log('0x' + 'cc' * 20, 1, 1, block=6))
+
+    assert mirror.get_reserves(PAIR_A) == (900 * 10 ** 18, 2_222_222 * 10 ** 6)
+    assert mirror.stats['stale_syncs'] == 1
+    assert mirror.stats['untracked_syncs'] == 1
+
+def test_untracked_pair_rejected(mirror):
+    with pytest.raises(ValueError):
+        mirror.quote(['0x' + 'cc' * 20], [1.0])
+
+class FakeReader:
+    def __init__(self, reserves):
+        self.reserves = reserves
+
+    async def get_reserves(self, pair):
+        return (*self.reserves[pair], 0)
+
+@pytest.mark.asyncio
+async def test_reconcile_corrects_drift(mirror):
+    """Test on-chain reads flag and fix pairs the mirror got wrong"""
+    reader = FakeReader({
+        PAIR_A: mirror.get_reserves(PAIR_A),
+        PAIR_B: (4 * 10 ** 21, 6 * 10 ** 21)
+    })
+
+    mismatches = await mirror.reconcile(reader)
+
+    assert [m['address'] for m in mismatches] == [PAIR_B]
+    assert mirror.get_reserves(PAIR_B) == (4 * 10 ** 21, 6 * 10 ** 21)
+    assert await mirror.reconcile(reader) == []
+
+def test_pair_manager_tracks_and_prices_configured_pairs():
+    """Test configured pairs are mirrored and priced base-in-quote"""
+    from src.trading.pair_manager import PairManager
+
+    usdc, weth = '0x' + '0a' * 20, '0x' + 'c0' * 20
+    pairs = PairManager.from_config({
+        'WETH/USDC': {'address': PAIR_A, 'token0': usdc, 'token1': weth,
+                      'decimals0': 6, 'decimals1': 18, 'base': weth}
+    })
+    mirror = ReserveMirror()
+    pairs.track(mirror)
+    mirror.set_reserves(PAIR_A, 2_000_000 * 10 ** 6, 1000 * 10 ** 18)
+
+    assert mirror.addresses == [PAIR_A]
+    assert pairs.mid_price(mirror, pairs.by_symbol('WETH/USDC')) == pytest.approx(2000.0)
+    sell = pairs.trade_params('WETH/USDC', 'sell', 1.5, 2000.0)
+    assert sell['token_in'] == weth and not sell['zero_for_one']
+    assert sell['amount_in'] == 1_500_000_000_000_000_000
+    buy = pairs.trade_params('WETH/USDC', 'buy', 1.5, 2000.0)
+    assert buy['zero_for_one'] and buy['amount_in'] == 3000 * 10 ** 6
+    # Human amounts convert with the input token's decimals
+    assert mirror.to_raw(PAIR_A, 3000.0, zero_for_one=True) == buy['amount_in']
+    assert pairs.trade_params('WBTC/USDT', 'buy', 1.0, 1.0) == {}
@@ -0,0 +1,167 @@
+import pytest
+from unittest.mock import Mock
+from src.blockchain.confirmation_buffer import ConfirmationBuffer
+
+def block_hash(number, fork=''):
+    return '0x' + f"{fork}{number}".encode().hex().ljust(64, '0')
+
+class FakeChain:
+    """Canonical chain of block hashes that tests can reorg"""
+
+    def __init__(self, height):
+        self.hashes = {n: block_hash(n) for n in range(height + 1)}
+
+    def reorg(self, from_block, fork):
+        for n in list(self.hashes):
+            if n >= from_block:
+                self.hashes[n] = block_hash(n, fork)
+
+    def extend(self, number, fork=''):
+        self.hashes[number] = block_hash(number, fork)
+
+    @property
+    def height(self):
+        return max(self.hashes)
+
+    async def get_block(self, number):
+        number = self.height if number == 'latest' else number
+        return {'number': number, 'hash': self.hashes[number], 'parentHash': self.hashes.get(number - 1, '0x' + '00' * 32)}
+
+def log(number, index, chain):
+    return {'blockNumber': number, 'blockHash': chain.hashes[number], 'logIndex': index, 'data': f"{number}:{index}"}
+
+@pytest.fixture
+def chain():
+    return FakeChain(100)
+
+@pytest.fixture
+def final_events():
+    return []
+
+def make_buffer(chain, final_events, rolled_back=None, path=None, unpersisted_floor=None):
+    w3 = Mock()
+    w3.eth.get_block = chain.get_block
+
+    async def on_final(events):
+        final_events.extend(event['data'] for event in events)
+
+    async def on_rollback(events):
+        if rolled_back is not None:
+            rolled_back.extend(event['data'] for event in events)
+
+    return ConfirmationBuffer(
+        w3, on_final, depth=3, checkpoint_path=path, on_rollback=on_rollback, unpersisted_floor=unpersisted_floor
+    )
+
+@pytest.mark.asyncio
+async def test_events_released_after_confirmation_depth(chain, final_events):
+    """Test events are processed in order only once depth blocks deep"""
+    buffer = make_buffer(chain, final_events)
+    await buffer.poll_head()
+    await buffer.add_logs([log(100, 1, chain), log(100, 0, chain)])
+
+    for number in (101, 102):
+        chain.extend(number)
+        await buffer.poll_head()
+    assert final_events == []
+
+    chain.extend(103)
+    await buffer.poll_head()
+    assert final_events == ['100:0', '100:1']
+    assert buffer.finalized_block == 100
+
+@pytest.mark.asyncio
+async def test_reorg_rolls_back_orphaned_events(chain, final_events):
+    """Test events from blocks replaced by a reorg are never processed"""
+    rolled_back = []
+    buffer = make_buffer(chain, final_events, rolled_back)
+    for number in (101, 102):
+        chain.extend(number)
+        await buffer.poll_head()
+    await buffer.add_logs([log(101, 0, chain), log(102, 0, chain)])
+
+    # Blocks 102+ replaced; the new head's parent hash no longer matches
+    chain.reorg(102, 'b')
+    chain.extend(103, 'b')
+    await buffer.poll_head()
+    await buffer.add_logs([log(102, 5, chain)])
+    for number in (104, 105, 106):
+        chain.extend(number, 'b')
+        await buffer.poll_head()
+
+    assert rolled_back == ['102:0']
+    assert final_events == ['101:0', '102:5']
+    assert buffer.stats['reorgs'] == 1
+
+@pytest.mark.asyncio
+async def test_removed_log_retracts_buffered_event(chain, final_events):
+    """Test eth_subscribe removed=True logs cancel the buffered copy"""
+    buffer = make_buffer(chain, final_events)
+    await buffer.poll_head()
+    event = log(100, 0, chain)
+    await buffer.add_logs([event])
+    await buffer.add_logs([dict(event, removed=True)])
+
+    for number in (101, 102, 103):
+        chain.extend(number)
+        await buffer.poll_head()
+    assert final_events == []
+    assert buffer.stats['removed'] == 1
+
+@pytest.mark.asyncio
+async def test_checkpoint_resumes_after_restart(chain, final_events, tmp_path):
+    """Test the finalized block survives a restart and old events are ignored"""
+    path = str(tmp_path / 'events.json')
+    buffer = make_buffer(chain, final_events, path=path)
+    await buffer.poll_head()
+    assert buffer.resume_block == 98
+
+    restarted = make_buffer(chain, final_events, path=path)
+    assert restarted.resume_block == 98
+    await restarted.add_logs([log(97, 0, chain)])
+    assert restarted.pending == {}
+
+@pytest.mark.asyncio
+async def test_skipped_heads_are_checked_for_reorgs(chain, final_events):
+    """Test a reorg hidden between two polls still rolls back the orphaned block"""
+    rolled_back = []
+    buffer = make_buffer(chain, final_events, rolled_back)
+    chain.extend(101)
+    await buffer.poll_head()
+    await buffer.add_logs([log(101, 0, chain)])
+
+    # 101 is replaced and two more blocks land before the next poll
+    chain.reorg(101, 'b')
+    for number in (102, 103):
+        chain.extend(number, 'b')
+    await buffer.poll_head()
+    await buffer.add_logs([log(101, 1, chain)])
+    chain.extend(104, 'b')
+    await buffer.poll_head()
+
+    assert rolled_back == ['101:0']
+    assert final_events == ['101:1']
+    assert buffer.headers[102] == chain.hashes[102]
+    assert buffer.stats['reorgs'] == 1
+
+@pytest.mark.asyncio
+async def test_checkpoint_waits_for_persisted_events(chain, final_events, tmp_path):
+    """Test the checkpoint stays below blocks whose events are still in flight"""
+    path = str(tmp_path / 'events.json')
+    # Block 98's event is released but not yet persisted
+    in_flight = {98}
+    buffer = make_buffer(chain, final_events, path=path, unpersisted_floor=lambda: min(in_flight, default=None))
+    await buffer.poll_head()
+    await buffer.add_logs([log(98, 0, chain)])
+    for number in (101, 102, 103):
+        chain.extend(number)
+        await buffer.poll_head()
+
+    assert final_events == ['98:0']
+    assert buffer.finalized_block == 100
+    assert make_buffer(chain, [], path=path).resume_block == 98
+
+    in_flight.clear()
+    buffer.commit()
+    assert buffer.checkpoint_block == 100
+    assert make_buffer(chain, [], path=path).resume_block == 101
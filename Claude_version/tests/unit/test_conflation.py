@@ -0,0 +1,91 @@
+import asyncio
+import json
+import pytest
+from src.api.websocket import WebSocketManager
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, frame):
+        self.sent.append(json.loads(frame))
+
+    async def close(self, code=1000):
+        pass
+
+async def connect(manager, **subscription):
+    ws = FakeWebSocket()
+    await manager.connect(ws)
+    reply = manager.handle_message(ws, {'action': 'subscribe', 'channel': 'trades', **subscription})
+    assert reply['type'] == 'subscribed'
+    return ws
+
+@pytest.mark.asyncio
+async def test_latest_mode_coalesces_while_full_fidelity_gets_everything():
+    manager = WebSocketManager()
+    full = await connect(manager, pairs=['WETH/USDC'])
+    conflated = await connect(manager, pairs=['WETH/USDC'], conflate={'interval': 0.1})
+
+    for i in range(20):
+        await manager.broadcast_trade('WETH/USDC', {'i': i})
+        await asyncio.sleep(0.001)
+    await asyncio.sleep(0.15)
+
+    assert [m['i'] for m in full.sent] == list(range(20))
+    # The first update goes out at once, the rest of the burst as one message
+    assert [m['i'] for m in conflated.sent] == [0, 19]
+    assert sum(m['conflated'] for m in conflated.sent) == 20
+    assert manager.handle_message(conflated, {'action': 'subscriptions'})['subscriptions'] == ['trades:WETH/USDC@0.1s/latest']
+    for ws in (full, conflated):
+        await manager.disconnect(ws)
+    assert manager.get_metrics()['conflation']['conflators'] == 0
+
+@pytest.mark.asyncio
+async def test_summary_mode_aggregates_numeric_fields_per_pair():
+    manager = WebSocketManager()
+    ws = await connect(manager, conflate={'interval': 0.05, 'mode': 'summary'})
+
+    await manager.broadcast_trade('WETH/USDC', {'price': 10.0, 'amount': 1, 'side': 'buy'})
+    await asyncio.sleep(0.001)
+    for price, amount in ((12.0, 2), (9.0, 3), (11.0, 4)):
+        await manager.broadcast_trade('WETH/USDC', {'price': price, 'amount': amount, 'side': 'sell'})
+    await manager.broadcast_trade('WBTC/USDC', {'price': 60000.0, 'amount': 1})
+    await asyncio.sleep(0.08)
+
+    summaries = {(m['pair'], m['count']): m for m in ws.sent}
+    assert set(summaries) == {('WETH/USDC', 1), ('WETH/USDC', 3), ('WBTC/USDC', 1)}
+    burst = summaries[('WETH/USDC', 3)]
+    assert burst['fields']['price'] == {'first': 12.0, 'last': 11.0, 'min': 9.0, 'max': 12.0, 'sum': 32.0}
+    assert burst['fields']['amount']['sum'] == 9
+    assert 'side' not in burst['fields'] and burst['latest']['side'] == 'sell'
+    await manager.disconnect(ws)
+
+@pytest.mark.asyncio
+async def test_delivery_rate_is_capped():
+    manager = WebSocketManager()
+    ws = await connect(manager, pairs=['WETH/USDC'], conflate=0.05)
+
+    started = asyncio.get_running_loop().time()
+    while asyncio.get_running_loop().time() - started < 0.26:
+        await manager.broadcast_trade('WETH/USDC', {'price': 1.0})
+        await asyncio.sleep(0.002)
+    await asyncio.sleep(0.06)
+
+    assert 4 <= len(ws.sent) <= 7
+    await manager.disconnect(ws)
+
+@pytest.mark.asyncio
+async def test_switching_between_conflated_and_full_fidelity():
+    manager = WebSocketManager()
+    ws = await connect(manager, pairs=['WETH/USDC'], conflate=True)
+    manager.handle_message(ws, {'action': 'subscribe', 'channel': 'trades', 'pairs': ['WETH/USDC']})
+    assert manager.handle_message(ws, {'action': 'subscriptions'})['subscriptions'] == ['trades:WETH/USDC']
+    assert manager.handle_message(ws, {'action': 'subscribe', 'pairs': ['WETH/USDC'], 'conflate': 0.001})['type'] == 'error'
+    assert manager.handle_message(ws, {'action': 'subscribe', 'pairs': ['WETH/USDC'], 'conflate': {'mode': 'ohlc'}})['type'] == 'error'
+
+    manager.handle_message(ws, {'action': 'unsubscribe', 'channel': 'trades', 'pairs': ['WETH/USDC']})
+    assert manager.handle_message(ws, {'action': 'subscriptions'})['subscriptions'] == []
+    await manager.disconnect(ws)
@@ -0,0 +1,135 @@
+import asyncio
+import pytest
+from src.blockchain.connection_manager import ConnectionManager, PooledWeb3, PooledTransport
+from src.utils.error_handler import NetworkError
+from src.utils.error_handler import RetryableError
+
+class FakeProvider:
+    """Stand-in connection with fixed latency and optional failure."""
+
+    def __init__(self, name, delay, fail=False):
+        self.name = name
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+
+async def call(w3):
+    w3.calls += 1
+    await asyncio.sleep(w3.delay)
+    if w3.fail:
+        raise ConnectionError(f"{w3.name} down")
+    return w3.name
+
+@pytest.fixture
+def manager():
+    manager = ConnectionManager(['http://slow', 'http://fast', 'http://broken'], alpha=0.5)
+    manager._connections = {
+        'http://slow': FakeProvider('slow', 0.05),
+        'http://fast': FakeProvider('fast', 0.001),
+        'http://broken': FakeProvider('broken', 0.0, fail=True)
+    }
+    return manager
+
+@pytest.mark.asyncio
+async def test_routes_to_lowest_latency_provider(manager):
+    """Test requests go to the best-scoring provider after measurement."""
+    for url in manager.provider_urls:
+        try:
+            await manager._call(url, call)
+        except ConnectionError:
+            pass
+
+    assert manager.ranked_providers()[0] == 'http://fast'
+    assert await manager.request(call) == 'fast'
+    stats = manager.get_pool_stats()
+    assert stats['preferred_provider'] == 'http://fast'
+    assert stats['providers'][-1]['url'] == 'http://broken'
+
+@pytest.mark.asyncio
+async def test_fails_over_and_penalises_errors(manager):
+    """Test failover to the next provider when the preferred one errors."""
+    manager._connections['http://fast'].fail = True
+    manager.stats['http://fast'].latency = 0.001
+    manager.stats['http://slow'].latency = 0.05
+
+    assert await manager.request(call) == 'slow'
+    assert manager.stats['http://fast'].error_rate > 0
+
+@pytest.mark.asyncio
+async def test_hedged_request_returns_first_answer(manager):
+    """Test a hedged read races the runner-up when the primary is slow."""
+    manager.stats['http://slow'].latency = 0.001  # stale: now actually slow
+    manager.stats['http://fast'].latency = 0.002
+    manager.stats['http://broken'].consecutive_failures = 3
+    manager.hedge_delay = 0.005
+
+    assert await manager.request(call, hedge=True) == 'fast'
+
+@pytest.mark.asyncio
+async def test_all_providers_failing_raises(manager):
+    """Test a retryable error when no provider can serve the request."""
+    for provider in manager._connections.values():
+        provider.fail = True
+    with pytest.raises(RetryableError):
+        await manager.request(call)
+
+class FakeEth:
+    """``w3.eth`` of one provider: a block number, or a connection/RPC error."""
+
+    def __init__(self, height, error=None):
+        self.height = height
+        self.error = error
+
+    @property
+    async def block_number(self):
+        if self.error is not None:
+            raise self.error
+        return self.height
+
+    async def send_raw_transaction(self, raw):
+        raise ValueError({'code': -32000, 'message': 'already known'})
+
+@pytest.mark.asyncio
+async def test_pooled_web3_fails_over_but_passes_node_errors_through():
+    """Test eth calls made through the pool fail over, while RPC errors reach the caller unchanged."""
+    manager = ConnectionManager(['http://a', 'http://b'])
+    manager._connections = {
+        'http://a': type('W3', (), {'eth': FakeEth(1, ConnectionError('a down'))})(),
+        'http://b': type('W3', (), {'eth': FakeEth(2)})()
+    }
+    w3 = PooledWeb3(manager)
+
+    assert await w3.eth.block_number == 2
+    assert manager.stats['http://a'].errors == 1
+    with pytest.raises(ValueError, match='already known'):
+        await w3.eth.send_raw_transaction(b'')
+    assert manager.stats['http://b'].errors == 0
+
+class FakeTransport:
+    """HTTP JSON-RPC transport that echoes its URL or fails."""
+
+    def __init__(self, url, fail=False):
+        self.url = url
+        self.fail = fail
+        self.round_trips = 0
+
+    async def send(self, payload):
+        self.round_trips += 1
+        if self.fail:
+            raise NetworkError(message="JSON-RPC request failed", error_code="NETWORK_ERROR")
+        return [{'id': request['id'], 'result': self.url} for request in payload]
+
+@pytest.mark.asyncio
+async def test_pooled_transport_fails_over_batches():
+    """Test aggregated reads go to the healthiest HTTP provider and fail over."""
+    manager = ConnectionManager(['wss://a', 'http://b', 'http://c'])
+    transport = PooledTransport(manager)
+    transport._transports = {'http://b': FakeTransport('http://b', fail=True), 'http://c': FakeTransport('http://c')}
+
+    response = await transport.send([{'jsonrpc': '2.0', 'id': 1, 'method': 'eth_call', 'params': []}])
+
+    assert response == [{'id': 1, 'result': 'http://c'}]
+    assert manager.stats['http://b'].errors == 1
+    assert manager.stats['http://c'].requests == 1
+    assert manager.stats['wss://a'].requests == 0
+    assert transport.round_trips == 2
@@ -0,0 +1,67 @@
+import pytest
+from src.blockchain.dedup_index import BloomFilter, DedupIndex, event_fingerprint
+
+def tx(i):
+    return '0x' + f"{i:064x}"
+
+def test_duplicates_detected_across_hash_formats():
+    """Test the same (tx hash, log index) is recognised however it is encoded"""
+    index = DedupIndex()
+
+    assert index.check_and_add(tx(1), 0, block_number=10)
+    assert not index.check_and_add(bytes.fromhex(tx(1)[2:]), 0, block_number=10)
+    assert not index.check_and_add(tx(1).upper().replace('0X', '0x'), 0)
+    assert index.check_and_add(tx(1), 1, block_number=10)
+    assert index.stats['duplicates'] == 2
+
+def test_seen_does_not_record():
+    """Test seen() only checks, so a failed handler can be retried"""
+    index = DedupIndex()
+
+    assert not index.seen(tx(2), 0)
+    assert not index.seen(tx(2), 0)
+    index.add(tx(2), 0, block_number=5)
+    assert index.seen(tx(2), 0)
+
+def test_discarded_event_is_accepted_again():
+    """Test discard() forgets an event even though its bloom bits stay set"""
+    index = DedupIndex()
+
+    assert index.check_and_add(tx(3), 0, block_number=5)
+    index.discard(tx(3), 0)
+    assert not index.seen(tx(3), 0)
+    assert index.check_and_add(tx(3), 0, block_number=6)
+    assert not index.check_and_add(tx(3), 0, block_number=6)
+
+def test_memory_bounded_by_block_window():
+    """Test generations rotate with block height and old keys are evicted"""
+    index = DedupIndex(window_blocks=40, generations=4)
+
+    for block in range(1000):
+        for i in range(5):
+            index.check_and_add(tx(block * 10 + i), i, block_number=block)
+
+    assert index.get_metrics()['generations'] == 4
+    assert len(index) <= 40 * 5
+    assert index.seen(tx(999 * 10), 0)
+    assert not index.seen(tx(0), 0)
+
+def test_memory_bounded_under_burst():
+    """Test a burst inside one block rotates on the per-generation cap"""
+    index = DedupIndex(generations=3, max_per_generation=1000)
+
+    for i in range(20000):
+        index.check_and_add(tx(i), 0, block_number=1)
+
+    assert len(index) <= 3000
+    assert index.seen(tx(19999), 0)
+
+def test_bloom_false_positive_rate():
+    """Test the bloom filter stays near its configured error rate"""
+    bloom = BloomFilter(capacity=10000, false_positive_rate=0.01)
+    for i in range(10000):
+        bloom.add(*event_fingerprint(tx(i), 0))
+
+    assert all(event_fingerprint(tx(i), 0) in bloom for i in range(10000))
+    false_positives = sum(event_fingerprint(tx(i), 1) in bloom for i in range(10000))
+    assert false_positives < 300
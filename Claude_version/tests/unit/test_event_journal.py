@@ -0,0 +1,102 @@
+import os
+import pytest
+from src.blockchain.log_decoder import SwapRecord, SyncRecord
+from src.data.event_journal import EventJournal, read_journal, price_series
+
+PAIR = '0x' + 'ab' * 20
+
+def swap(i):
+    return SwapRecord(PAIR, 100 + i, f"0x{i:064x}", i, '0x' + '11' * 20, '0x' + '22' * 20, 2 ** 200 + i, 0, 0, 5 * i)
+
+def sync(i, reserve0, reserve1):
+    return SyncRecord(PAIR, 100 + i, f"0x{i:064x}", i, reserve0, reserve1)
+
+@pytest.mark.asyncio
+async def test_round_trips_binary_and_json_records(tmp_path):
+    journal = EventJournal(str(tmp_path))
+    journal.open()
+    records = [swap(1), sync(2, 10 ** 18, 3 * 10 ** 18), {'transaction_hash': '0x01', 'log_index': 0, 'args': {'amountIn': 5}}]
+    seqs = [journal.append(record, timestamp=1700000000.0 + i) for i, record in enumerate(records)]
+    await journal.sync()
+
+    replayed = list(read_journal(str(tmp_path)))
+    assert [seq for seq, _, _ in replayed] == seqs == [0, 1, 2]
+    assert [record for _, _, record in replayed] == records
+    assert replayed[2][1] == 1700000002.0
+    assert [record for _, _, record in journal.replay(from_seq=1)] == records[1:]
+    assert journal.stats['fsyncs'] == 1
+    await journal.close()
+
+@pytest.mark.asyncio
+async def test_reopen_truncates_torn_tail_and_keeps_commit_point(tmp_path):
+    journal = EventJournal(str(tmp_path))
+    journal.open()
+    for i in range(5):
+        journal.append(swap(i))
+    journal.ack([0, 1, 3])
+    assert journal.committed == 1
+    await journal.close()
+
+    # A crash mid-write leaves a partial frame behind
+    (segment,) = [p for p in os.listdir(tmp_path) if p.endswith('.seg')]
+    with open(tmp_path / segment, 'ab') as f:
+        f.write(b'\x40\x00\x00\x00\xde\xad')
+
+    reopened = EventJournal(str(tmp_path))
+    assert reopened.open() == 1
+    assert reopened.next_seq == 5
+    assert [seq for seq, _, _ in reopened.replay(from_seq=2)] == [2, 3, 4]
+    assert reopened.append(swap(5)) == 5
+    assert [seq for seq, _, _ in reopened.replay()] == list(range(6))
+    await reopened.close()
+
+@pytest.mark.asyncio
+async def test_replay_can_stop_early(tmp_path):
+    journal = EventJournal(str(tmp_path))
+    journal.open()
+    for i in range(3):
+        journal.append(swap(i))
+    await journal.close()
+
+    for seq, _, _ in read_journal(str(tmp_path)):
+        break
+    replay = read_journal(str(tmp_path))
+    assert next(replay)[0] == 0
+    # Closing mid-segment must not leave views pinning the mmap
+    replay.close()
+
+@pytest.mark.asyncio
+async def test_corrupt_record_stops_replay(tmp_path):
+    journal = EventJournal(str(tmp_path))
+    journal.open()
+    for i in range(3):
+        journal.append(swap(i))
+    await journal.close()
+
+    (segment,) = [p for p in os.listdir(tmp_path) if p.endswith('.seg')]
+    data = bytearray((tmp_path / segment).read_bytes())
+    data[-1] ^= 0xff
+    (tmp_path / segment).write_bytes(bytes(data))
+    assert [seq for seq, _, _ in read_journal(str(tmp_path))] == [0, 1]
+
+@pytest.mark.asyncio
+async def test_rolls_segments_and_deletes_committed_ones(tmp_path):
+    journal = EventJournal(str(tmp_path), segment_bytes=1000, retain_segments=2)
+    journal.open()
+    for i in range(40):
+        journal.append(sync(i, 1000 + i, 2000 + 2 * i), pending=i >= 20)
+    await journal.sync()
+    segments = sorted(p for p in os.listdir(tmp_path) if p.endswith('.seg'))
+    assert journal.stats['segments_rolled'] == len(segments) - 1 + journal.stats['segments_deleted']
+    # Only segments wholly before the unacked records are eligible
+    assert len(segments) == 4
+    assert [seq for seq, _, _ in journal.replay()][-20:] == list(range(20, 40))
+
+    journal.ack(range(20, 40))
+    await journal.sync()
+    assert len([p for p in os.listdir(tmp_path) if p.endswith('.seg')]) == 2
+
+    blocks, prices = price_series(str(tmp_path), PAIR)
+    assert blocks[-1] == 139
+    assert prices[-1] == pytest.approx(2.0, rel=1e-3)
+    await journal.close()
@@ -0,0 +1,102 @@
+import asyncio
+import time
+import pytest
+from unittest.mock import Mock
+from src.blockchain.event_listener import EventListener
+
+class SlowFilter:
+    """Filter stand-in whose RPC round-trip takes a fixed delay."""
+
+    def __init__(self, delay, events):
+        self.delay = delay
+        self.events = events
+        self.in_flight = 0
+        self.peak = 0
+
+    async def get_new_entries(self):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+        events, self.events = self.events, []
+        return events
+
+def make_event(tx):
+    event = Mock()
+    event.transactionHash = bytes.fromhex(tx)
+    event.blockNumber = 1
+    event.address = '0x0'
+    event.event = 'Swap'
+    event.args = {'amount0In': 1}
+    return event
+
+@pytest.mark.asyncio
+async def test_filters_polled_concurrently():
+    """Test a poll round costs about one round-trip, not one per filter."""
+    listener = EventListener(Mock(), max_concurrency=10)
+    for i in range(10):
+        listener.event_filters[f"pool_{i}"] = SlowFilter(0.05, [make_event(f"{i:02x}")])
+
+    started = time.perf_counter()
+    polled = await listener.poll_once()
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 0.25
+    assert sum(len(events) for _, events in polled) == 10
+    metrics = listener.get_metrics()
+    assert metrics['rounds'] == 1
+    assert metrics['events_per_second'] > 0
+
+@pytest.mark.asyncio
+async def test_concurrency_is_bounded():
+    """Test the semaphore caps in-flight polls."""
+    listener = EventListener(Mock(), max_concurrency=2)
+    # One shared stand-in so in_flight counts polls across every filter
+    shared = SlowFilter(0.05, [])
+    for i in range(4):
+        listener.event_filters[f"pool_{i}"] = shared
+
+    started = time.perf_counter()
+    await listener.poll_once()
+    assert time.perf_counter() - started >= 0.1
+    assert shared.peak == 2
+    assert shared.in_flight == 0
+
+@pytest.mark.asyncio
+async def test_retry_wait_releases_slot():
+    """Test a filter waiting to retry doesn't hold a polling slot."""
+    class FlakyFilter(SlowFilter):
+        async def get_new_entries(self):
+            if not self.failed:
+                self.failed = True
+                raise asyncio.TimeoutError()
+            return await super().get_new_entries()
+
+    listener = EventListener(Mock(), max_concurrency=1)
+    listener.retry_delay = 0.1
+    flaky = FlakyFilter(0, [make_event('aa')])
+    flaky.failed = False
+    listener.event_filters['flaky'] = flaky
+    listener.event_filters['ok'] = SlowFilter(0.1, [make_event('bb')])
+
+    started = time.perf_counter()
+    polled = dict(await listener.poll_once())
+    assert len(polled['flaky']) == len(polled['ok']) == 1
+    # The other filter's poll overlapped the retry delay
+    assert time.perf_counter() - started < 0.18
+
+@pytest.mark.asyncio
+async def test_failing_filter_does_not_block_others():
+    """Test one failing filter is skipped while the rest are returned."""
+    class BrokenFilter:
+        async def get_new_entries(self):
+            raise RuntimeError('filter not found')
+
+    listener = EventListener(Mock(), max_concurrency=4)
+    listener.event_filters['broken'] = BrokenFilter()
+    listener.event_filters['ok'] = SlowFilter(0, [make_event('aa')])
+
+    polled = await listener.poll_once()
+    assert [key for key, _ in polled] == ['ok']
@@ -0,0 +1,374 @@
+import asyncio
+import time
+import pytest
+from eth_abi import encode
+from src.blockchain.backfill import SWAP_TOPIC
+from src.services.event_pipeline import EventPipeline, PipelineStage
+from src.services.event_service import EventService
+
+PAIR = '0x' + 'ab' * 20
+
+def raw_swap(index, tx=1):
+    return {
+        'address': PAIR,
+        'topics': [SWAP_TOPIC, '0x' + '00' * 12 + '11' * 20, '0x' + '00' * 12 + '22' * 20],
+        'data': '0x' + encode(['uint256'] * 4, [index + 1, 0, 0, 5]).hex(),
+        'blockNumber': hex(100),
+        'blockTimestamp': hex(1_700_000_000),
+        'transactionHash': f"0x{tx:064x}",
+        'logIndex': hex(index)
+    }
+
+def sleeper(delay, sink=None):
+    async def handler(item):
+        await asyncio.sleep(delay)
+        if sink is not None:
+            sink.append(item)
+        return item
+    return handler
+
+@pytest.mark.asyncio
+async def test_throughput_bound_by_slowest_stage():
+    """Test stages overlap so total time tracks the slowest stage, not the sum"""
+    out = []
+    a = PipelineStage('a', sleeper(0.01))
+    b = PipelineStage('b', sleeper(0.01))
+    c = PipelineStage('c', sleeper(0.01, out))
+    a.to(b).to(c)
+    pipeline = EventPipeline([a, b, c])
+    pipeline.start()
+
+    started = time.perf_counter()
+    for i in range(20):
+        await pipeline.submit(i)
+    await pipeline.drain()
+    elapsed = time.perf_counter() - started
+
+    assert out == list(range(20))
+    # Serial processing would take 20 * 3 * 10ms
+    assert elapsed < 0.45
+    metrics = pipeline.get_metrics()
+    assert metrics['c']['processed'] == 20
+    assert metrics['a']['latency_ewma'] > 0.005
+    await pipeline.stop()
+
+@pytest.mark.asyncio
+async def test_block_policy_applies_backpressure():
+    slow = PipelineStage('slow', sleeper(0.05), queue_size=2)
+    slow.start()
+    for i in range(3):
+        await slow.put(i)  # one in the worker, two queued
+    blocked = asyncio.create_task(slow.put(3))
+    await asyncio.sleep(0.01)
+    assert not blocked.done()
+    await asyncio.wait_for(blocked, timeout=1)
+    assert slow.stats['dropped'] == 0
+    await slow.stop()
+
+@pytest.mark.asyncio
+async def test_drop_policies_shed_load():
+    newest = PipelineStage('newest', sleeper(0), queue_size=2, policy='drop_newest')
+    oldest = PipelineStage('oldest', sleeper(0), queue_size=2, policy='drop_oldest')
+    for i in range(4):
+        await newest.put(i)
+        await oldest.put(i)
+
+    assert [newest.queue.get_nowait()[1] for _ in range(2)] == [0, 1]
+    assert [oldest.queue.get_nowait()[1] for _ in range(2)] == [2, 3]
+    assert newest.stats['dropped'] == oldest.stats['dropped'] == 2
+
+    discarded = []
+    stage = PipelineStage('shed', sleeper(0), queue_size=1, policy='drop_oldest', on_discard=discarded.append)
+    for i in range(3):
+        await stage.put(i)
+    assert discarded == [0, 1]
+    with pytest.raises(ValueError):
+        PipelineStage('bad', sleeper(0), policy='spill')
+
+@pytest.mark.asyncio
+async def test_failing_item_does_not_stop_stage():
+    async def flaky(item):
+        if item == 1:
+            raise ValueError("bad item")
+        return item
+    out = []
+    stage = PipelineStage('flaky', flaky, concurrency=2)
+    sink = PipelineStage('sink', sleeper(0, out))
+    stage.to(sink)
+    pipeline = EventPipeline([stage, sink])
+    pipeline.start()
+    for i in range(3):
+        await pipeline.submit(i)
+    await pipeline.stop(drain=True)
+
+    assert sorted(out) == [0, 2]
+    assert stage.stats['errors'] == 1
+
+@pytest.mark.asyncio
+async def test_event_service_stages():
+    """Test raw logs flow through decode, dedup, persist, score and broadcast"""
+    service = EventService()
+    service._monitored = {PAIR}
+    persisted, broadcast = [], []
+
+    async def put(row):
+        await asyncio.sleep(0.01)  # slow database
+        persisted.append(row)
+
+    async def on_broadcast(event):
+        broadcast.append(event)
+
+    async def size_score(event):
+        return event['args']['amount0In']
+
+    service.trade_writer.put = put
+    service.broadcast_event = on_broadcast
+    service.add_scorer('size', size_score)
+    service.pipeline.start()
+
+    logs = [raw_swap(i) for i in range(5)]
+    await service._process_confirmed(logs + [raw_swap(2)] + [{**raw_swap(6), 'address': '0x' + 'cd' * 20}])
+    await service.pipeline.drain()
+
+    assert sorted(row['log_index'] for row in persisted) == [0, 1, 2, 3, 4]
+    assert sorted(event['scores']['size'] for event in broadcast) == [1, 2, 3, 4, 5]
+    metrics = service.get_metrics()['pipeline']
+    assert metrics['ingest']['processed'] == 1
+    assert metrics['decode']['processed'] == 7
+    assert metrics['persist']['processed'] == 5
+    # The duplicate and the unmonitored log are released; the rest wait for a flush
+    assert service._unpersisted == {100: 5}
+    await service.pipeline.stop()
+
+@pytest.mark.asyncio
+async def test_checkpoint_waits_for_persisted_events():
+    """Test the finalized-block checkpoint only passes events once they are flushed"""
+    service = EventService()
+    service._monitored = {PAIR}
+    service.confirmations.checkpoint_path = None
+    service.confirmations.finalized_block = service.confirmations.checkpoint_block = 99
+    rows = []
+
+    async def put(row):
+        rows.append(row)
+
+    service.trade_writer.put = put
+    service.pipeline.start()
+    await service._process_raw_logs([raw_swap(i) for i in range(2)])
+    service.confirmations.mark_finalized(105)
+    await service.pipeline.drain()
+
+    assert service.confirmations.finalized_block == 105
+    assert service.confirmations.checkpoint_block == 99
+    service._on_trades_flushed(rows[:1])
+    assert service.confirmations.checkpoint_block == 99
+    service._on_trades_flushed(rows[1:])
+    assert service.confirmations.checkpoint_block == 105
+    await service.pipeline.stop()
+
+def test_event_service_tracks_monitored_pairs():
+    """Test configured pairs are mirrored and their swaps accepted"""
+    from src.config.settings import settings
+
+    service = EventService()
+    addresses = {address.lower() for address in (p['address'] for p in settings.MONITORED_PAIRS.values())}
+    assert set(service.reserve_mirror.addresses) == addresses
+    assert service._monitored == addresses
+
+@pytest.mark.asyncio
+async def test_initialize_watches_monitored_pools(monkeypatch):
+    """Test initialize registers the pools (not the routers) and catches up"""
+    from unittest.mock import AsyncMock
+    from src.config.settings import settings
+
+    service = EventService()
+    service.catch_up = AsyncMock()
+    service.event_listener.setup_event_filter = AsyncMock()
+    await service.initialize()
+    assert service._monitored == set(service.pairs.pairs)
+    assert service.event_listener.contracts == {}
+    service.catch_up.assert_awaited_once()
+
+    monkeypatch.setattr(settings, 'EVENT_INGESTION_MODE', 'filters')
+    await service.initialize()
+    assert sorted(service.event_listener.contracts) == sorted(settings.MONITORED_PAIRS)
+    assert service.event_listener.setup_event_filter.await_count == len(settings.MONITORED_PAIRS)
+
+@pytest.mark.asyncio
+async def test_event_service_recovers_unpersisted_events_from_journal(tmp_path):
+    """Test events journaled but never flushed are re-persisted after a restart"""
+    from src.data.event_journal import EventJournal
+
+    service = EventService()
+    service._monitored = {PAIR}
+    service.journal = EventJournal(str(tmp_path))
+    persisted = []
+
+    async def upsert(rows):
+        persisted.extend(rows)
+
+    service.trade_writer.writer = upsert
+    service.pipeline.start()
+    await service._process_confirmed([raw_swap(i) for i in range(3)])
+    await service.pipeline.drain()
+    await service.trade_writer.flush()
+    await service._process_confirmed([raw_swap(i) for i in range(3, 5)])
+    await service.pipeline.drain()
+    assert service.journal.committed == 2
+    # Crash: the last two events never leave the write-behind buffer
+    await service.journal.sync()
+    await service.pipeline.stop(drain=False)
+
+    restarted = EventService()
+    restarted.journal = EventJournal(str(tmp_path))
+    restarted.trade_writer.writer = upsert
+    restarted.pipeline.start()
+    counts = await restarted.recover()
+    await restarted.pipeline.drain()
+    await restarted.trade_writer.flush()
+
+    assert counts == {'replayed': 5, 'syncs': 0, 'requeued': 2}
+    assert [row['log_index'] for row in persisted] == [0, 1, 2, 3, 4]
+    assert restarted.dedup.seen(f"0x{1:064x}", 0)
+    assert restarted.journal.committed == 4
+    await restarted.pipeline.stop()
+
+@pytest.mark.asyncio
+async def test_failed_persist_does_not_pin_journal(tmp_path):
+    """Test events the persist stage gives up on release the journal commit point"""
+    from src.data.event_journal import EventJournal
+
+    service = EventService()
+    service._monitored = {PAIR}
+    service.journal = EventJournal(str(tmp_path))
+
+    async def put(row):
+        if row['log_index'] == 1:
+            raise ValueError("bad row")
+
+    service.trade_writer.put = put
+    service.pipeline.start()
+    await service._process_confirmed([raw_swap(i) for i in range(3)])
+    await service.pipeline.drain()
+
+    assert service.pipeline['persist'].stats['errors'] == 1
+    # Persisted rows are acked on flush; the failed one is released already
+    assert service.journal.committed == -1
+    assert service._unpersisted == {100: 2}
+    service._on_trades_flushed([{'journal_seq': 0, 'block_number': 100}, {'journal_seq': 2, 'block_number': 100}])
+    assert service.journal.committed == 2
+    assert service._unpersisted == {}
+    await service.pipeline.stop()
+    await service.journal.close()
+
+@pytest.mark.asyncio
+async def test_unpersisted_event_is_accepted_when_redelivered():
+    """Test an event the persist stage gave up on is not skipped as a duplicate later"""
+    service = EventService()
+    service._monitored = {PAIR}
+    service.journal = None
+    persisted, failures = [], [1]
+
+    async def put(row):
+        if failures:
+            failures.pop()
+            raise ValueError("database down")
+        persisted.append(row['log_index'])
+
+    service.trade_writer.put = put
+    service.pipeline.start()
+    await service._process_confirmed([raw_swap(0)])
+    await service.pipeline.drain()
+    assert persisted == [] and service.dedup.stats['discarded'] == 1
+
+    # e.g. a backfill or provider failover delivers it again
+    await service._process_confirmed([raw_swap(0), raw_swap(0)])
+    await service.pipeline.drain()
+    assert persisted == [0]
+    await service.pipeline.stop()
+
+@pytest.mark.asyncio
+async def test_scored_events_reach_websocket_subscribers():
+    """Test the broadcast stage publishes each event to its pair's subscribers"""
+    import json
+    from src.api.websocket import WebSocketManager
+    from src.trading.pair_manager import PairManager
+
+    class Socket:
+        def __init__(self):
+            self.sent = []
+
+        async def accept(self):
+            pass
+
+        async def send_text(self, frame):
+            self.sent.append(json.loads(frame))
+
+    manager = WebSocketManager()
+    service = EventService(
+        pairs=PairManager.from_config({
+            'T0/T1': {'address': PAIR, 'token0': '0x' + '01' * 20, 'token1': '0x' + '02' * 20,
+                      'decimals0': 18, 'decimals1': 18}
+        }),
+        websocket_manager=manager
+    )
+
+    async def put(row):
+        pass
+
+    service.trade_writer.put = put
+    subscriber, other = Socket(), Socket()
+    await manager.connect(subscriber, pairs=['t0/t1'])
+    await manager.connect(other, pairs=['WETH/USDC'])
+    service.pipeline.start()
+    await service._process_confirmed([raw_swap(i) for i in range(3)])
+    await service.pipeline.drain()
+    await asyncio.sleep(0.01)
+
+    assert sorted(message['log_index'] for message in subscriber.sent) == [0, 1, 2]
+    assert subscriber.sent[0]['args']['amount1Out'] == 5
+    assert other.sent == []
+    await service.pipeline.stop()
+    await manager.disconnect(subscriber)
+    await manager.disconnect(other)
+
+@pytest.mark.asyncio
+async def test_sync_ticks_fire_stops():
+    """Test Sync logs of a monitored pair price the stop engine without waiting on exits"""
+    from src.blockchain.log_subscription import SYNC_TOPIC
+    from src.config.settings import settings
+    from src.trading.stop_trigger import StopTriggerEngine
+
+    fired = []
+
+    async def on_trigger(triggers):
+        await asyncio.sleep(0.2)  # exit waiting on a transaction slot
+        fired.extend(triggers)
+
+    engine = StopTriggerEngine({'trailing_stop_enabled': True, 'trailing_stop_distance': 0.05}, on_trigger=on_trigger)
+    engine.add_trailing_stop('p1', 'WETH/USDC', 'long', 1.0, 2000.0)
+    service = EventService()
+    service.journal = None
+    service.add_price_listener(engine.on_price)
+
+    def raw_sync(usdc, weth, block):
+        return {
+            'address': settings.MONITORED_PAIRS['WETH/USDC']['address'],
+            'topics': [SYNC_TOPIC],
+            'data': '0x' + encode(['uint112', 'uint112'], [usdc * 10 ** 6, weth * 10 ** 18]).hex(),
+            'blockNumber': hex(block),
+            'transactionHash': f"0x{block:064x}",
+            'logIndex': hex(0)
+        }
+
+    await service._handle_sync_log(raw_sync(2_100_000, 1000, 100))
+    assert fired == [] and engine.get_stop_price('p1') == pytest.approx(1995.0)
+    started = time.perf_counter()
+    await service._handle_sync_log(raw_sync(1_900_000, 1000, 101))
+    await service._handle_sync_log(raw_sync(1_950_000, 1000, 102))
+    assert time.perf_counter() - started < 0.1
+    assert fired == []
+    await engine.drain()
+    assert [(t.position_id, t.trigger_price) for t in fired] == [('p1', pytest.approx(1900.0))]
+    assert engine.get_metrics()['ticks_processed'] == 3
+    await engine.close()
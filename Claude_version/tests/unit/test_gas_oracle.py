@@ -0,0 +1,99 @@
+import asyncio
+import pytest
+from src.blockchain.gas_oracle import GasOracle, next_base_fee
+from src.utils.error_handler import NetworkError
+
+GWEI = 10 ** 9
+
+class FakeEth:
+    def __init__(self):
+        self.calls = []
+
+    async def fee_history(self, block_count, newest_block, percentiles):
+        self.calls.append((block_count, newest_block))
+        if newest_block == 'latest':
+            return {
+                'oldestBlock': hex(101 - block_count),
+                'baseFeePerGas': [30 * GWEI] * block_count + [31 * GWEI],
+                'gasUsedRatio': [0.5] * block_count,
+                'reward': [[1 * GWEI, 2 * GWEI, 5 * GWEI]] * block_count
+            }
+        return {
+            'oldestBlock': hex(newest_block),
+            'baseFeePerGas': [31 * GWEI, 32 * GWEI],
+            'gasUsedRatio': [1.0],
+            'reward': [[4 * GWEI, 8 * GWEI, 20 * GWEI]]
+        }
+
+class FakeWeb3:
+    def __init__(self):
+        self.eth = FakeEth()
+
+def header(number, base_fee, gas_used, gas_limit=30_000_000):
+    return {'number': number, 'baseFeePerGas': base_fee, 'gasUsed': gas_used, 'gasLimit': gas_limit}
+
+def test_next_base_fee_matches_protocol():
+    assert next_base_fee(100 * GWEI, 15_000_000, 30_000_000) == 100 * GWEI
+    assert next_base_fee(100 * GWEI, 30_000_000, 30_000_000) == 112_500_000_000
+    assert next_base_fee(100 * GWEI, 0, 30_000_000) == 87_500_000_000
+
+@pytest.mark.asyncio
+async def test_fees_served_from_cache_after_seed():
+    w3 = FakeWeb3()
+    oracle = GasOracle(w3, window=4, horizon=3)
+
+    fees = await oracle.get_fees()
+    await oracle.get_fees('fast')
+    oracle.fees('slow')
+
+    assert w3.eth.calls == [(4, 'latest')]
+    assert oracle.head == 100
+    assert fees['maxPriorityFeePerGas'] == 2 * GWEI
+    # Two blocks of worst-case 12.5% growth on top of the next base fee
+    assert fees['maxFeePerGas'] == int(31 * GWEI * 1.125 ** 2) + 2 * GWEI
+
+@pytest.mark.asyncio
+async def test_new_head_updates_prediction():
+    w3 = FakeWeb3()
+    oracle = GasOracle(w3, window=2, horizon=1)
+    await oracle.seed()
+
+    await oracle.on_head(header(101, 31 * GWEI, 30_000_000))
+    # The base fee is applied at once; percentiles arrive from a background fetch
+    assert oracle.base_fee == next_base_fee(31 * GWEI, 30_000_000, 30_000_000)
+    assert w3.eth.calls == [(2, 'latest')]
+    await asyncio.gather(*oracle._history_tasks)
+
+    assert oracle.predict_base_fee(3)['expected'] > oracle.base_fee
+    # Window of 2: one seeded block and the new head
+    assert oracle.fees('fast')['maxPriorityFeePerGas'] == int((5 + 20) / 2 * GWEI)
+    assert oracle.fees()['maxFeePerGas'] == oracle.base_fee + 5 * GWEI
+
+    # Duplicate heads are ignored
+    await oracle.on_head(header(101, 31 * GWEI, 30_000_000))
+    assert w3.eth.calls == [(2, 'latest'), (1, 101)]
+
+def test_fees_unavailable_before_seed():
+    oracle = GasOracle(FakeWeb3())
+    with pytest.raises(NetworkError):
+        oracle.fees()
+    with pytest.raises(ValueError):
+        GasOracle(FakeWeb3(), mode='stream')
+
+@pytest.mark.asyncio
+async def test_stop_cancels_run_waiting_for_heads():
+    """Test stop() ends run() even while the head stream is silent"""
+    oracle = GasOracle(FakeWeb3(), window=4)
+    silent = asyncio.Event()
+
+    async def quiet_subscription():
+        await silent.wait()
+
+    oracle._run_subscribe = quiet_subscription
+    task = asyncio.create_task(oracle.run())
+    await asyncio.sleep(0.01)
+    assert oracle.ready
+
+    await oracle.stop()
+    await asyncio.wait({task}, timeout=1)
+    assert task.cancelled()
@@ -0,0 +1,114 @@
+import json
+import pytest
+from eth_abi import encode
+from hexbytes import HexBytes
+from web3 import Web3
+from src.blockchain.backfill import SWAP_TOPIC
+from src.blockchain.log_subscription import SYNC_TOPIC
+from src.blockchain.log_decoder import SwapRecord, SyncRecord, decode_log, decode_logs, swap_to_event
+
+PAIR = Web3.to_checksum_address('0x' + 'ab' * 20)
+SENDER = '0x' + '11' * 20
+RECIPIENT = '0x' + '22' * 20
+TX_HASH = '0x' + '33' * 32
+
+PAIR_ABI = json.dumps([
+    {'anonymous': False, 'name': 'Swap', 'type': 'event', 'inputs': [
+        {'indexed': True, 'name': 'sender', 'type': 'address'},
+        {'indexed': False, 'name': 'amount0In', 'type': 'uint256'},
+        {'indexed': False, 'name': 'amount1In', 'type': 'uint256'},
+        {'indexed': False, 'name': 'amount0Out', 'type': 'uint256'},
+        {'indexed': False, 'name': 'amount1Out', 'type': 'uint256'},
+        {'indexed': True, 'name': 'to', 'type': 'address'}
+    ]},
+    {'anonymous': False, 'name': 'Sync', 'type': 'event', 'inputs': [
+        {'indexed': False, 'name': 'reserve0', 'type': 'uint112'},
+        {'indexed': False, 'name': 'reserve1', 'type': 'uint112'}
+    ]}
+])
+
+def topic_for(address):
+    return '0x' + '00' * 12 + address[2:]
+
+def raw_swap(amounts, block=0x10, index=3):
+    """Swap log as delivered by eth_subscribe: all hex strings"""
+    return {
+        'address': PAIR.lower(),
+        'topics': [SWAP_TOPIC, topic_for(SENDER), topic_for(RECIPIENT)],
+        'data': '0x' + encode(['uint256'] * 4, amounts).hex(),
+        'blockNumber': hex(block),
+        'transactionHash': TX_HASH,
+        'logIndex': hex(index)
+    }
+
+def formatted(log):
+    """Same log as returned by web3 get_logs: ints and HexBytes"""
+    return {
+        'address': PAIR,
+        'topics': [HexBytes(topic) for topic in log['topics']],
+        'data': HexBytes(log['data']),
+        'blockNumber': int(log['blockNumber'], 16),
+        'transactionHash': HexBytes(log['transactionHash']),
+        'logIndex': int(log['logIndex'], 16),
+        'transactionIndex': 0,
+        'blockHash': HexBytes('0x' + '44' * 32),
+        'removed': False
+    }
+
+def raw_sync(reserve0, reserve1):
+    return {
+        'address': PAIR.lower(),
+        'topics': [SYNC_TOPIC],
+        'data': '0x' + encode(['uint112', 'uint112'], [reserve0, reserve1]).hex(),
+        'blockNumber': '0x10',
+        'transactionHash': TX_HASH,
+        'logIndex': '0x4'
+    }
+
+@pytest.mark.parametrize('shape', [lambda log: log, formatted])
+def test_swap_matches_web3_decoding(shape):
+    """Test word slicing agrees with web3's ABI event decoder"""
+    amounts = [0, 10 ** 18, 2 ** 255 + 7, 0]
+    log = shape(raw_swap(amounts))
+    contract = Web3().eth.contract(address=PAIR, abi=json.loads(PAIR_ABI))
+    expected = contract.events.Swap().process_log(formatted(raw_swap(amounts)))['args']
+
+    record = decode_log(log)
+
+    assert isinstance(record, SwapRecord)
+    assert record.address == PAIR.lower()
+    assert record.block_number == 0x10
+    assert record.log_index == 3
+    assert record.transaction_hash == TX_HASH
+    assert record.sender == expected['sender'].lower()
+    assert record.to == expected['to'].lower()
+    assert (record.amount0_in, record.amount1_in, record.amount0_out, record.amount1_out) == (
+        expected['amount0In'], expected['amount1In'], expected['amount0Out'], expected['amount1Out']
+    )
+
+def test_sync_decoding():
+    """Test Sync reserves are sliced from the data words"""
+    record = decode_log(raw_sync(2 ** 112 - 1, 5))
+
+    assert isinstance(record, SyncRecord)
+    assert (record.reserve0, record.reserve1) == (2 ** 112 - 1, 5)
+
+def test_bulk_decode_skips_unknown_and_malformed():
+    """Test decode_logs keeps order and drops logs it cannot decode"""
+    unknown = dict(raw_swap([1, 2, 3, 4]), topics=['0x' + 'ee' * 32])
+    truncated = dict(raw_swap([1, 2, 3, 4]), data='0x' + '00' * 64)
+    logs = [raw_swap([1, 0, 0, 2]), unknown, raw_sync(7, 8), truncated, {'topics': []}]
+
+    records = decode_logs(logs)
+
+    assert [type(record) for record in records] == [SwapRecord, SyncRecord]
+    assert records[0].amount0_in == 1 and records[0].amount1_out == 2
+
+def test_swap_to_event_shape():
+    """Test records expand into the event dict consumed by EventService"""
+    event = swap_to_event(decode_log(raw_swap([1, 0, 0, 2])))
+
+    assert event['event_type'] == 'Swap'
+    assert event['transaction_hash'] == TX_HASH
+    assert event['args']['amount0In'] == 1
+    assert event['args']['amount1Out'] == 2
@@ -0,0 +1,153 @@
+import pytest
+from unittest.mock import AsyncMock, Mock
+from src.blockchain.log_subscription import LogSubscription, SYNC_TOPIC
+from src.blockchain.backfill import SWAP_TOPIC
+
+POOL_A = '0x' + 'aa' * 20
+POOL_B = '0x' + 'bb' * 20
+
+def make_log(address, topic):
+    return {'address': address, 'topics': [bytes.fromhex(topic[2:])], 'data': '0x'}
+
+class FakeFilter:
+    filter_id = '0x1'
+
+    def __init__(self, batches, eth_module=None):
+        self.batches = batches
+        self.eth_module = eth_module
+
+    async def get_new_entries(self):
+        return self.batches.pop(0) if self.batches else []
+
+@pytest.fixture
+def w3():
+    w3 = Mock()
+    w3.eth.filter = AsyncMock(return_value=FakeFilter([[
+        make_log(POOL_A, SWAP_TOPIC),
+        make_log(POOL_B, SWAP_TOPIC),
+        make_log(POOL_B, SYNC_TOPIC)
+    ]], eth_module=w3.eth))
+    w3.eth.uninstall_filter = AsyncMock(return_value=True)
+    return w3
+
+@pytest.mark.asyncio
+async def test_single_filter_demultiplexed_locally(w3):
+    """Test one filter covers all pools and logs route by address and topic."""
+    subscription = LogSubscription(w3, [POOL_A, POOL_B], mode='poll')
+    swaps_a, syncs = [], []
+
+    async def on_swap_a(log):
+        swaps_a.append(log)
+
+    async def on_sync(log):
+        syncs.append(log)
+
+    subscription.on(SWAP_TOPIC, on_swap_a, address=POOL_A)
+    subscription.on(SYNC_TOPIC, on_sync)
+
+    assert await subscription.poll_once() == 3
+    w3.eth.filter.assert_awaited_once()
+    params = w3.eth.filter.await_args.args[0]
+    assert len(params['address']) == 2
+    assert params['topics'] == [[SWAP_TOPIC, SYNC_TOPIC]]
+
+    assert len(swaps_a) == 1 and len(syncs) == 1
+    assert subscription.stats['unrouted'] == 1
+
+@pytest.mark.asyncio
+async def test_adding_pool_widens_filter(w3):
+    """Test new addresses trigger a single filter reinstall."""
+    subscription = LogSubscription(w3, [POOL_A], mode='poll')
+    await subscription.poll_once()
+    subscription.add_address(POOL_B)
+    await subscription.poll_once()
+
+    assert w3.eth.filter.await_count == 2
+    w3.eth.uninstall_filter.assert_awaited_once()
+
+@pytest.mark.asyncio
+async def test_filter_uninstalled_through_owning_provider():
+    """Test a pooled w3 removes the old filter on the provider that created it."""
+    owner = Mock()
+    owner.uninstall_filter = AsyncMock(side_effect=ConnectionError('owner down'))
+    w3 = Mock()
+    w3.eth.filter = AsyncMock(side_effect=[FakeFilter([], eth_module=owner), FakeFilter([], eth_module=w3.eth)])
+    w3.eth.uninstall_filter = AsyncMock(return_value=True)
+    subscription = LogSubscription(w3, [POOL_A], mode='poll')
+
+    await subscription.poll_once()
+    subscription.add_address(POOL_B)
+    await subscription.poll_once()
+
+    owner.uninstall_filter.assert_awaited_once_with('0x1')
+    w3.eth.uninstall_filter.assert_not_awaited()
+    # A dead owner does not stop the new filter from being installed
+    assert w3.eth.filter.await_count == 2
+
+@pytest.mark.asyncio
+async def test_silent_socket_is_still_resubscribed():
+    """Test an added pool widens the push subscription without waiting for a message."""
+    import asyncio
+
+    async def silent():
+        await asyncio.Event().wait()
+        yield
+
+    w3 = Mock()
+    w3.eth.subscribe = AsyncMock(side_effect=['0xa', '0xb'])
+    w3.eth.unsubscribe = AsyncMock(return_value=True)
+    w3.ws.process_subscriptions = silent
+    subscription = LogSubscription(w3, [POOL_A], mode='subscribe', check_interval=0.01)
+    subscription.running = True
+    task = asyncio.create_task(subscription._run_subscribe())
+    await asyncio.sleep(0.02)
+    subscription.add_address(POOL_B)
+    await asyncio.sleep(0.03)
+
+    assert w3.eth.subscribe.await_count == 2
+    assert len(w3.eth.subscribe.await_args.args[1]['address']) == 2
+    w3.eth.unsubscribe.assert_awaited_once_with('0xa')
+    await subscription.stop()
+    task.cancel()
+
+@pytest.mark.asyncio
+async def test_logs_emitted_during_reconnect_are_replayed():
+    """Test a resubscribe backfills from the last delivered block."""
+    def numbered(block, index):
+        return {**make_log(POOL_A, SWAP_TOPIC), 'blockNumber': block, 'logIndex': index}
+
+    class FakeEth:
+        def __init__(self):
+            self.filter = AsyncMock(side_effect=[
+                FakeFilter([[numbered(100, 0)]], eth_module=self),
+                FakeFilter([[numbered(103, 0)]], eth_module=self)
+            ])
+            self.uninstall_filter = AsyncMock(return_value=True)
+            self.queries = []
+
+        @property
+        async def block_number(self):
+            return 103
+
+        async def get_logs(self, params):
+            self.queries.append(params)
+            # Block 101 was mined while the old filter was gone
+            return [numbered(100, 0), numbered(101, 0)]
+
+    w3 = Mock()
+    w3.eth = FakeEth()
+    subscription = LogSubscription(w3, [POOL_A], mode='poll')
+    delivered = []
+
+    async def on_swap(log):
+        delivered.append((log['blockNumber'], log['logIndex']))
+
+    subscription.on(SWAP_TOPIC, on_swap)
+    await subscription.poll_once()
+    subscription._stale = True  # e.g. the loop's error path after a dropped connection
+    await subscription.poll_once()
+
+    assert w3.eth.queries[0]['fromBlock'] == 100 and w3.eth.queries[0]['toBlock'] == 103
+    assert sorted(set(delivered)) == [(100, 0), (101, 0), (103, 0)]
+    assert subscription.last_block == 103
+    assert subscription.stats['replayed'] == 2
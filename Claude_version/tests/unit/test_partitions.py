@@ -0,0 +1,112 @@
+import asyncio
+import pytest
+from datetime import datetime
+from src.database.partitions import PartitionManager, period_start, next_period, partition_bounds
+
+class FakePostgres:
+    """Records DDL and answers partition listings like pg_inherits."""
+    dialect = 'postgresql'
+
+    def __init__(self, partitions, stray=None):
+        self.partitions = {table: set(names) for table, names in partitions.items()}
+        # default partition -> rows counted in any range
+        self.stray = stray or {}
+        self.statements = []
+        self.scripts = []
+
+    async def fetch(self, sql, *args):
+        if sql.startswith('SELECT count(*)'):
+            return [{'n': self.stray.get(sql.split()[5], 0)}]
+        return [{'name': name} for name in self.partitions.get(args[0], ())]
+
+    async def executescript(self, script):
+        self.scripts.append(script)
+
+    async def execute(self, sql, *args):
+        self.statements.append(sql)
+        words = sql.split()
+        if sql.startswith('CREATE TABLE'):
+            self.partitions[words[8]].add(words[5])
+        elif sql.startswith('DROP TABLE'):
+            for names in self.partitions.values():
+                names.discard(words[4])
+        return 0
+
+def test_period_arithmetic():
+    moment = datetime(2024, 12, 18, 15, 30)
+    assert period_start(moment, 'day') == datetime(2024, 12, 18)
+    assert period_start(moment, 'week') == datetime(2024, 12, 16)
+    assert period_start(moment, 'month') == datetime(2024, 12, 1)
+    assert next_period(datetime(2024, 12, 1), 'month') == datetime(2025, 1, 1)
+    assert partition_bounds('trades', 'trades_p20241201', 'month') == (datetime(2024, 12, 1), datetime(2025, 1, 1))
+    assert partition_bounds('trades', 'trades_default', 'month') is None
+
+@pytest.mark.asyncio
+async def test_creates_upcoming_and_drops_expired_partitions():
+    db = FakePostgres({
+        'trades': {'trades_default', 'trades_p20240101', 'trades_p20241201'},
+        'predictions': {'predictions_default', 'predictions_p20240901', 'predictions_p20241101'}
+    })
+    manager = PartitionManager(db, {'trades': None, 'predictions': 60}, interval='month', ahead=2)
+
+    result = await manager.maintain(now=datetime(2024, 12, 18))
+
+    assert sorted(result['created']) == [
+        'predictions_p20241201', 'predictions_p20250101', 'predictions_p20250201',
+        'trades_p20250101', 'trades_p20250201'
+    ]
+    assert "FOR VALUES FROM ('2025-01-01') TO ('2025-02-01')" in db.statements[0]
+    # Cutoff 2024-10-19: September ends before it, November does not
+    assert result['dropped'] == ['predictions_p20240901']
+    assert 'trades_p20240101' in db.partitions['trades']
+
+    again = await manager.maintain(now=datetime(2024, 12, 18))
+    assert again == {'created': [], 'dropped': []}
+
+@pytest.mark.asyncio
+async def test_rows_in_default_are_moved_and_expired():
+    db = FakePostgres({'trade_events': {'trade_events_default'}}, stray={'trade_events_default': 7})
+    manager = PartitionManager(db, {'trade_events': 30}, interval='month', ahead=0)
+
+    result = await manager.maintain(now=datetime(2024, 12, 18))
+
+    assert result['created'] == ['trade_events_p20241201']
+    script = db.scripts[0]
+    assert 'CREATE TABLE trade_events_p20241201 (LIKE trade_events' in script
+    assert "DELETE FROM trade_events_default WHERE timestamp >= '2024-12-01' AND timestamp < '2025-01-01'" in script
+    assert "ATTACH PARTITION trade_events_p20241201 FOR VALUES FROM ('2024-12-01') TO ('2025-01-01')" in script
+    assert manager.stats['rows_moved'] == 7
+    assert db.statements == ['DELETE FROM trade_events_default WHERE timestamp < $1']
+
+@pytest.mark.asyncio
+async def test_failing_table_does_not_block_others():
+    db = FakePostgres({'trades': {'trades_default'}, 'predictions': {'predictions_default'}})
+    failing = db.execute
+
+    async def execute(sql, *args):
+        if 'PARTITION OF trades ' in sql:
+            raise RuntimeError('updated partition constraint for default partition would be violated')
+        return await failing(sql, *args)
+
+    db.execute = execute
+    manager = PartitionManager(db, {'trades': None, 'predictions': None}, interval='month', ahead=0)
+    result = await manager.maintain(now=datetime(2024, 12, 18))
+
+    assert result['created'] == ['predictions_p20241201']
+    assert manager.stats['errors'] == 1
+
+def test_rejects_unknown_interval():
+    with pytest.raises(ValueError):
+        PartitionManager(FakePostgres({}), {}, interval='year')
+
+@pytest.mark.asyncio
+async def test_stop_cancels_run_between_passes():
+    """Test stop() does not wait out the maintenance interval"""
+    manager = PartitionManager(FakePostgres({'trades': {'trades_default'}}), {'trades': None})
+    task = asyncio.create_task(manager.run(interval=3600))
+    await asyncio.sleep(0.01)
+    assert manager.stats['runs'] == 1
+
+    await manager.stop()
+    await asyncio.wait({task}, timeout=1)
+    assert task.cancelled()
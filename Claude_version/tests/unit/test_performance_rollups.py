@@ -0,0 +1,51 @@
+import pytest
+import numpy as np
+from src.trading.performance_tracker import PerformanceTracker
+from src.trading.performance_rollups import DAY, HOUR
+
+class FakeStore:
+    def __init__(self):
+        self.rows = []
+
+    async def save_performance_buckets(self, rows):
+        self.rows.extend(rows)
+
+@pytest.fixture
+def store():
+    return FakeStore()
+
+@pytest.mark.asyncio
+async def test_timeframe_query_matches_raw_trades(store):
+    """Test bucket-combined metrics equal a scan over the raw trades."""
+    tracker = PerformanceTracker(initial_capital=1000.0, store=store)
+    rng = np.random.default_rng(3)
+    start = 1_700_000_000
+    timestamps = np.sort(rng.uniform(start, start + 20 * DAY, 500))
+    pnls = rng.normal(0, 10, 500)
+    for ts, pnl in zip(timestamps, pnls):
+        await tracker.add_trade({'timestamp': ts, 'price': 1.0, 'amount': 1.0, 'type': 'sell', 'pnl': pnl})
+
+    now = start + 20 * DAY
+    result = tracker.rollups.query('10d', now=now)
+
+    window_start = (now // HOUR * HOUR + HOUR) - 10 * DAY
+    mask = timestamps >= window_start
+    equity = 1000.0 + np.cumsum(pnls)
+    opening = equity[~mask][-1]
+    window_equity = np.concatenate(([opening], equity[mask]))
+    peaks = np.maximum.accumulate(window_equity)
+
+    assert result['total_trades'] == mask.sum()
+    assert result['total_return'] == pytest.approx(window_equity[-1] / opening - 1)
+    assert result['max_drawdown'] == pytest.approx((window_equity / peaks - 1).min())
+    assert result['win_rate'] == pytest.approx((pnls[mask] > 0).mean())
+    assert result['buckets_read'] < 40
+
+    assert store.rows
+    assert {row['timeframe'] for row in store.rows} == {'1h', '1d', '1w'}
+
+def test_invalid_timeframe():
+    """Test rejection of malformed timeframes."""
+    tracker = PerformanceTracker()
+    with pytest.raises(ValueError):
+        tracker.get_metrics('yesterday')
@@ -0,0 +1,50 @@
+import pytest
+import numpy as np
+from src.trading.performance_tracker import PerformanceTracker
+
+@pytest.fixture
+def tracker():
+    return PerformanceTracker(initial_capital=1000.0)
+
+@pytest.mark.asyncio
+async def test_incremental_metrics(tracker):
+    """Test running metrics match a full recomputation over the ledger."""
+    pnls = [100.0, -50.0, 0.0, 30.0, -200.0, 80.0]
+    for i, pnl in enumerate(pnls):
+        await tracker.add_trade({
+            'timestamp': float(i),
+            'price': 2000.0,
+            'amount': 1.0,
+            'type': 'sell',
+            'pnl': pnl
+        })
+
+    metrics = tracker.get_metrics()
+    equity = 1000.0 + np.cumsum([p for p in pnls if p])
+    returns = np.array([p for p in pnls if p]) / np.concatenate(([1000.0], equity[:-1]))
+    peaks = np.maximum.accumulate(np.concatenate(([1000.0], equity)))
+
+    assert metrics['total_trades'] == 6
+    assert metrics['closed_trades'] == 5
+    assert metrics['total_return'] == pytest.approx(equity[-1] / 1000.0 - 1)
+    assert metrics['win_rate'] == pytest.approx(3 / 5)
+    assert metrics['max_drawdown'] == pytest.approx((np.concatenate(([1000.0], equity)) / peaks - 1).min())
+    assert metrics['sharpe_ratio'] == pytest.approx(returns.mean() / returns.std(ddof=1))
+
+@pytest.mark.asyncio
+async def test_ledger_columns(tracker):
+    """Test ledger growth and read-only column views."""
+    for i in range(2000):
+        await tracker.add_trade({'timestamp': i, 'price': 1.0, 'amount': 2.0, 'type': 'buy'})
+
+    history = tracker.get_trade_history()
+    assert len(history['price']) == 2000
+    assert np.all(history['side'] == 1)
+    with pytest.raises(ValueError):
+        history['price'][0] = 5.0
+
+@pytest.mark.asyncio
+async def test_rejects_invalid_trade(tracker):
+    """Test validation of required fields."""
+    with pytest.raises(ValueError):
+        await tracker.add_trade({'price': 1.0})
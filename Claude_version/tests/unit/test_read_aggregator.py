@@ -0,0 +1,109 @@
+import asyncio
+import pytest
+from eth_abi import encode, decode
+from src.blockchain.read_aggregator import ReadAggregator, AGGREGATE3, GET_RESERVES, DECIMALS
+from src.trading.pair_manager import PairManager
+from src.utils.error_handler import ContractError
+
+PAIR_A = '0x' + 'aa' * 20
+PAIR_B = '0x' + 'bb' * 20
+TOKEN = '0x' + 'cc' * 20
+BROKEN = '0x' + 'dd' * 20
+
+RESERVES = {PAIR_A: (100, 200, 1), PAIR_B: (300, 400, 2)}
+
+def eth_call(to, data):
+    to = to.lower()
+    if data == GET_RESERVES and to in RESERVES:
+        return True, encode(['uint112', 'uint112', 'uint32'], list(RESERVES[to]))
+    if data == DECIMALS and to == TOKEN:
+        return True, encode(['uint8'], [18])
+    return False, b''
+
+class FakeTransport:
+    """In-process node answering single, batch and aggregate3 eth_calls"""
+
+    def __init__(self):
+        self.round_trips = 0
+        self.payloads = []
+
+    def _answer(self, request):
+        call = request['params'][0]
+        data = bytes.fromhex(call['data'][2:])
+        if data[:4] == AGGREGATE3:
+            (calls,) = decode(['(address,bool,bytes)[]'], data[4:])
+            results = [eth_call(target, call_data) for target, _, call_data in calls]
+            return {'id': request['id'], 'result': '0x' + encode(['(bool,bytes)[]'], [results]).hex()}
+        ok, result = eth_call(call['to'], data)
+        if not ok:
+            return {'id': request['id'], 'error': {'code': 3, 'message': 'execution reverted'}}
+        return {'id': request['id'], 'result': '0x' + result.hex()}
+
+    async def send(self, payload):
+        self.round_trips += 1
+        self.payloads.append(payload)
+        if isinstance(payload, list):
+            # Answer out of order to exercise id matching
+            return [self._answer(request) for request in reversed(payload)]
+        return self._answer(payload)
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('mode', ['multicall', 'batch'])
+async def test_concurrent_reads_share_one_round_trip(mode):
+    """Test concurrent calls are coalesced and each caller gets its own result"""
+    transport = FakeTransport()
+    reader = ReadAggregator(transport, mode=mode)
+
+    reserves_a, reserves_b, decimals = await asyncio.gather(
+        reader.get_reserves(PAIR_A),
+        reader.get_reserves(PAIR_B),
+        reader.decimals(TOKEN)
+    )
+
+    assert transport.round_trips == 1
+    assert reserves_a == (100, 200, 1)
+    assert reserves_b == (300, 400, 2)
+    assert decimals == 18
+    assert reader.stats == {'calls': 3, 'batches': 1}
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('mode', ['multicall', 'batch'])
+async def test_revert_fails_only_its_caller(mode):
+    """Test a reverting call raises ContractError without failing the batch"""
+    reader = ReadAggregator(FakeTransport(), mode=mode)
+
+    results = await asyncio.gather(
+        reader.get_reserves(PAIR_A),
+        reader.get_reserves(BROKEN),
+        return_exceptions=True
+    )
+
+    assert results[0] == (100, 200, 1)
+    assert isinstance(results[1], ContractError)
+
+@pytest.mark.asyncio
+async def test_max_batch_splits_requests():
+    """Test batches are capped at max_batch calls"""
+    transport = FakeTransport()
+    reader = ReadAggregator(transport, mode='batch', max_batch=2)
+
+    await asyncio.gather(*(reader.get_reserves(PAIR_A) for _ in range(5)))
+
+    assert transport.round_trips == 3
+    assert [len(payload) for payload in transport.payloads] == [2, 2, 1]
+
+@pytest.mark.asyncio
+async def test_pair_manager_reads_through_aggregator():
+    """Test pair loading and reserve refresh each take one round-trip"""
+    transport = FakeTransport()
+    reader = ReadAggregator(transport)
+    manager = PairManager()
+
+    pair = await manager.load_pair(PAIR_A, TOKEN, TOKEN, reader)
+    await manager.load_pair(PAIR_B, TOKEN, TOKEN, reader)
+    assert pair.decimals0 == pair.decimals1 == 18
+    assert transport.round_trips == 2
+
+    reserves = await manager.fetch_reserves(reader)
+    assert reserves == {PAIR_A: (100, 200), PAIR_B: (300, 400)}
+    assert transport.round_trips == 3
@@ -0,0 +1,86 @@
+import pytest
+from src.trading.amm_mirror import amounts_out
+from src.trading.router import RoutingEngine
+
+WETH, USDC, DAI, LINK = ('0x' + c * 40 for c in 'abcd')
+
+def pool(n):
+    return f"0x{n:040x}"
+
+@pytest.fixture
+def engine():
+    engine = RoutingEngine()
+    # Direct WETH/USDC on both DEXes, plus a WETH -> DAI -> USDC detour
+    for address, token0, token1, dex, r0, r1 in [
+        (pool(1), WETH, USDC, 'uniswap_v2', 1000e18, 2_000_000e18),
+        (pool(2), WETH, USDC, 'sushiswap', 500e18, 1_000_000e18),
+        (pool(3), WETH, DAI, 'uniswap_v2', 100e18, 200_000e18),
+        (pool(4), USDC, DAI, 'sushiswap', 1_000_000e18, 1_000_000e18)
+    ]:
+        engine.add_pool(address, token0, token1, dex=dex)
+        engine.mirror.set_reserves(address, int(r0), int(r1))
+    return engine
+
+def test_small_trade_takes_best_direct_pool(engine):
+    """Test a small order routes through the deepest direct pool"""
+    plan = engine.best_route(WETH, USDC, 1e18, split=False)
+
+    assert plan.legs[0].pools == [pool(1)]
+    assert plan.amount_out == pytest.approx(amounts_out(1e18, 1000e18, 2_000_000e18))
+
+def test_large_trade_splits_across_dexes(engine):
+    """Test a large order is split between Uniswap and SushiSwap"""
+    amount = 300e18
+    single = engine.best_route(WETH, USDC, amount, split=False)
+    plan = engine.best_route(WETH, USDC, amount)
+
+    assert plan.is_split
+    assert {leg.dexes[0] for leg in plan.legs} == {'uniswap_v2', 'sushiswap'}
+    assert sum(leg.amount_in for leg in plan.legs) == pytest.approx(amount)
+    assert plan.amount_out > single.amount_out
+
+def test_raw_amounts_are_exact_ints(engine):
+    """Test raw amounts above 2**53 are not rounded through floats"""
+    amount = engine.to_raw(WETH, 1234.5678)
+    assert amount == 1234_567800000000000000  # float math gives ...032768
+    assert isinstance(amount, int) and amount > 2 ** 53
+
+    plan = engine.best_route(WETH, USDC, amount)
+    assert plan.amount_in == amount
+    assert all(isinstance(leg.amount_in, int) for leg in plan.legs)
+    assert sum(leg.amount_in for leg in plan.legs) == amount
+
+def test_multi_hop_route_found(engine):
+    """Test tokens without a direct pool are reached through intermediates"""
+    plan = engine.best_route(DAI, WETH, 1000e18)
+
+    assert plan.legs[0].tokens[0] == DAI and plan.legs[0].tokens[-1] == WETH
+    assert plan.amount_out > 0
+
+def test_reserve_changes_need_no_cache_rebuild(engine):
+    """Test quotes follow live reserves while the path cache is reused"""
+    engine.best_route(WETH, USDC, 1e18, split=False)
+    engine.mirror.set_reserves(pool(2), int(500e18), int(2_000_000e18))
+
+    plan = engine.best_route(WETH, USDC, 1e18, split=False)
+
+    assert plan.legs[0].pools == [pool(2)]
+    assert engine.stats['cache_hits'] == 1
+    assert engine.stats['cache_misses'] == 1
+
+def test_new_pool_invalidates_affected_pairs_only(engine):
+    """Test adding an edge drops just the cached routes it can affect"""
+    far = ['0x' + f"{i:040x}" for i in range(100, 106)]
+    for i, (token0, token1) in enumerate(zip(far, far[1:])):
+        engine.add_pool(pool(50 + i), token0, token1)
+    engine.candidates(WETH, USDC)
+    engine.candidates(far[0], far[5])
+
+    engine.add_pool(pool(9), DAI, LINK)
+
+    assert (WETH, USDC) not in engine._cache
+    assert (far[0], far[5]) in engine._cache
+    assert engine.best_route(LINK, USDC, 1e18) is not None
+
+def test_no_route_returns_none(engine):
+    assert engine.best_route(WETH, '0x' + 'ee' * 20, 1e18) is None
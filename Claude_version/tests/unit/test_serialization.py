@@ -0,0 +1,52 @@
+from datetime import datetime
+from decimal import Decimal
+import numpy as np
+from fastapi import FastAPI
+import httpx
+import pytest
+from hexbytes import HexBytes
+from src.utils.serialization import FastJSONResponse, dumps, encode_frame, loads
+
+def test_encodes_numpy_decimal_and_bytes():
+    payload = {
+        'price': np.float64(1.5),
+        'volume': np.int64(7),
+        'weights': np.array([0.25, 0.75]),
+        'amount': Decimal('123456789.123456789123456789'),
+        'tx': HexBytes('0x' + 'ab' * 32),
+        'timestamp': datetime(2024, 1, 2, 3, 4, 5),
+        'tags': {'dex'},
+        100: 'block'
+    }
+    decoded = loads(dumps(payload))
+    assert decoded == {
+        'price': 1.5,
+        'volume': 7,
+        'weights': [0.25, 0.75],
+        'amount': '123456789.123456789123456789',
+        'tx': '0x' + 'ab' * 32,
+        'timestamp': '2024-01-02T03:04:05',
+        'tags': ['dex'],
+        '100': 'block'
+    }
+    assert encode_frame(payload) == dumps(payload).decode()
+
+@pytest.mark.asyncio
+async def test_fast_json_response_is_default_for_routes():
+    app = FastAPI(default_response_class=FastJSONResponse)
+
+    @app.get('/status')
+    async def status():
+        return {'status': 'healthy', 'checked_at': datetime(2024, 1, 2)}
+
+    @app.get('/metrics')
+    async def metrics():
+        # Returned directly so NumPy values skip jsonable_encoder
+        return FastJSONResponse({'latency': np.float32(0.5), 'pnl': Decimal('1.10')})
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://test') as client:
+        status = await client.get('/status')
+        metrics = await client.get('/metrics')
+    assert status.json() == {'status': 'healthy', 'checked_at': '2024-01-02T00:00:00'}
+    assert metrics.headers['content-type'] == 'application/json'
+    assert metrics.json() == {'latency': 0.5, 'pnl': '1.10'}
@@ -0,0 +1,85 @@
+import asyncio
+import time
+import pytest
+from src.trading.stop_trigger import StopTriggerEngine
+
+@pytest.fixture
+def engine():
+    return StopTriggerEngine({
+        'trailing_stop_enabled': True,
+        'trailing_stop_distance': 0.1
+    })
+
+@pytest.mark.asyncio
+async def test_fixed_stops_fire_on_cross(engine):
+    """Test that only crossed long and short stops fire."""
+    engine.add_stop('l1', 'ETH/USD', 'long', 1.0, 95.0)
+    engine.add_stop('l2', 'ETH/USD', 'long', 1.0, 90.0)
+    engine.add_stop('s1', 'ETH/USD', 'short', 1.0, 105.0)
+
+    assert await engine.on_price('ETH/USD', 100.0) == []
+
+    fired = await engine.on_price('ETH/USD', 94.0)
+    assert [t.position_id for t in fired] == ['l1']
+    assert fired[0].stop_price == 95.0
+    assert fired[0].latency >= 0
+
+    fired = await engine.on_price('ETH/USD', 106.0)
+    assert [t.position_id for t in fired] == ['s1']
+    assert engine.get_metrics()['open_positions'] == 1
+
+@pytest.mark.asyncio
+async def test_trailing_stops_ratchet_in_bulk(engine):
+    """Test trailing levels follow new highs and fire on pullback."""
+    engine.add_trailing_stop('a', 'ETH/USD', 'long', 1.0, 100.0)
+    engine.add_trailing_stop('b', 'ETH/USD', 'long', 2.0, 110.0)
+    engine.add_trailing_stop('c', 'ETH/USD', 'short', 1.0, 100.0)
+
+    fired = await engine.on_price('ETH/USD', 120.0)
+    assert [t.position_id for t in fired] == ['c']
+    assert engine.get_stop_price('a') == pytest.approx(108.0)
+    assert engine.get_stop_price('b') == pytest.approx(108.0)
+
+    fired = await engine.on_price('ETH/USD', 107.0)
+    assert sorted(t.position_id for t in fired) == ['a', 'b']
+    assert all(t.kind == 'trailing' for t in fired)
+
+@pytest.mark.asyncio
+async def test_removed_positions_do_not_fire(engine):
+    """Test removal and on_trigger emission."""
+    emitted = []
+
+    async def on_trigger(triggers):
+        emitted.extend(triggers)
+
+    engine.on_trigger = on_trigger
+    engine.add_stop('l1', 'ETH/USD', 'long', 1.0, 95.0)
+    engine.add_trailing_stop('t1', 'ETH/USD', 'long', 1.0, 100.0)
+    engine.remove('l1')
+
+    await engine.on_price('ETH/USD', 80.0)
+    await engine.drain()
+    assert [t.position_id for t in emitted] == ['t1']
+
+@pytest.mark.asyncio
+async def test_slow_exit_does_not_delay_next_tick(engine):
+    """Test a tick returns without waiting for on_trigger to finish the exit."""
+    emitted = []
+
+    async def on_trigger(triggers):
+        await asyncio.sleep(0.1)  # e.g. waiting for a transaction slot
+        emitted.extend(triggers)
+
+    engine.on_trigger = on_trigger
+    engine.add_stop('l1', 'ETH/USD', 'long', 1.0, 95.0)
+    engine.add_stop('l2', 'ETH/USD', 'long', 1.0, 90.0)
+
+    started = time.perf_counter()
+    await engine.on_price('ETH/USD', 94.0)
+    await engine.on_price('ETH/USD', 89.0)
+    assert time.perf_counter() - started < 0.05
+    assert emitted == [] and engine.get_metrics()['exits_pending'] >= 1
+
+    await engine.drain()
+    assert [t.position_id for t in emitted] == ['l1', 'l2']
+    await engine.close()
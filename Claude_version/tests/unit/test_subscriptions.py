@@ -0,0 +1,43 @@
+import pytest
+from src.api.subscriptions import SubscriptionRegistry, ALL_PAIRS
+
+def test_subscribe_unsubscribe_and_remove():
+    registry = SubscriptionRegistry()
+    a, b = object(), object()
+    assert registry.subscribe(a, 'trades', 'weth/usdc')
+    assert not registry.subscribe(a, 'trades', 'WETH/USDC ')
+    registry.subscribe(b, 'trades', 'WETH/USDC')
+    registry.subscribe(b, 'predictions', 'WBTC/USDC')
+
+    assert set(registry.subscribers('trades', 'WETH/USDC')) == {a, b}
+    assert list(registry.subscribers('trades', 'WBTC/USDC')) == []
+    assert registry.unsubscribe(a, 'trades', 'WETH/USDC')
+    assert not registry.unsubscribe(a, 'trades', 'WETH/USDC')
+    assert list(registry.subscribers('trades', 'WETH/USDC')) == [b]
+
+    assert registry.remove(b) == {('trades', 'WETH/USDC'), ('predictions', 'WBTC/USDC')}
+    assert registry.remove(b) == set()
+    assert registry.get_metrics()['topics'] == 0
+    assert a in registry and b not in registry
+
+def test_channel_wide_subscribers_receive_each_message_once():
+    registry = SubscriptionRegistry()
+    a, b = object(), object()
+    registry.subscribe(a, 'trades')
+    registry.subscribe(a, 'trades', 'WETH/USDC')
+    registry.subscribe(b, 'trades', 'WETH/USDC')
+
+    delivered = list(registry.subscribers('trades', 'WETH/USDC'))
+    assert sorted(map(id, delivered)) == sorted(map(id, [a, b]))
+    assert list(registry.subscribers('trades', 'DAI/USDC')) == [a]
+    assert list(registry.subscribers('trades', ALL_PAIRS)) == [a]
+
+def test_unknown_channel_is_rejected():
+    registry = SubscriptionRegistry()
+    with pytest.raises(ValueError):
+        registry.subscribe(object(), 'orders', 'WETH/USDC')
+
+def test_non_string_pair_is_rejected():
+    registry = SubscriptionRegistry()
+    with pytest.raises(ValueError):
+        registry.subscribe(object(), 'trades', 1)
@@ -0,0 +1,66 @@
+import pytest
+import numpy as np
+from src.models.volatility import VolatilityTracker, true_range, wilder_atr
+
+@pytest.fixture
+def prices():
+    rng = np.random.default_rng(7)
+    close = 100 + np.cumsum(rng.normal(0, 1, 200))
+    return {
+        'high': close + rng.random(200),
+        'low': close - rng.random(200),
+        'close': close
+    }
+
+def test_incremental_matches_full_recompute(prices):
+    """Test O(1) updates agree with recomputing over the history tail."""
+    tracker = VolatilityTracker(atr_period=14, volatility_window=20)
+    for h, l, c in zip(prices['high'], prices['low'], prices['close']):
+        tracker.update('ETH/USD', h, l, c)
+
+    tr = true_range(prices['high'], prices['low'], prices['close'])
+    assert tracker.get_atr('ETH/USD') == pytest.approx(wilder_atr(tr, 14))
+    assert tracker.get_volatility('ETH/USD') == pytest.approx(np.std(prices['close'][-20:]))
+
+def test_seed_then_update_keeps_window(prices):
+    """Test seeding from history and continuing incrementally."""
+    tracker = VolatilityTracker(atr_period=14, volatility_window=20)
+    tracker.seed('ETH/USD', {k: v[:150] for k, v in prices.items()})
+    for h, l, c in zip(prices['high'][150:], prices['low'][150:], prices['close'][150:]):
+        tracker.update('ETH/USD', h, l, c)
+    assert tracker.get_volatility('ETH/USD') == pytest.approx(np.std(prices['close'][-20:]))
+
+def test_batch_stop_loss(prices):
+    """Test vectorized stops and risk-budget sizing for many positions."""
+    tracker = VolatilityTracker()
+    tracker.seed('ETH/USD', prices)
+    tracker.seed('BTC/USD', {k: v * 10 for k, v in prices.items()})
+
+    result = tracker.batch_stop_loss(
+        ['ETH/USD', 'BTC/USD', 'ETH/USD'],
+        [100.0, 1000.0, 100.0],
+        sides=['long', 'long', 'short'],
+        risk_budget=50.0
+    )
+    assert result['stop_price'][0] < 100.0 < result['stop_price'][2]
+    assert result['stop_price'][1] < 1000.0
+    assert np.allclose(result['risk_amount'], 50.0)
+
+@pytest.mark.asyncio
+async def test_price_ticks_are_folded_into_bars(monkeypatch):
+    """Test ticks become one bar per interval and feed the incremental update"""
+    import src.models.volatility as volatility
+
+    clock = [1200.0]
+    monkeypatch.setattr(volatility.time, 'time', lambda: clock[0])
+    tracker = VolatilityTracker(atr_period=2, volatility_window=2, bar_interval=60.0)
+    reference = VolatilityTracker(atr_period=2, volatility_window=2)
+
+    for at, price in [(1200, 10.0), (1210, 12.0), (1220, 9.0), (1230, 11.0), (1270, 11.5), (1330, 13.0)]:
+        clock[0] = at
+        await tracker.on_price('ETH/USD', price)
+    reference.update('ETH/USD', 12.0, 9.0, 11.0)
+    reference.update('ETH/USD', 11.5, 11.5, 11.5)
+
+    assert tracker.get_atr('ETH/USD') == pytest.approx(reference.get_atr('ETH/USD'))
+    assert tracker.get_volatility('ETH/USD') == pytest.approx(reference.get_volatility('ETH/USD'))
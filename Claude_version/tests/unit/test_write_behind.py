@@ -0,0 +1,140 @@
+import asyncio
+import pytest
+from src.data.write_behind import WriteBehindBuffer
+
+class FakeTable:
+    """Upserts rows on transaction_hash, optionally slow or failing."""
+
+    def __init__(self, delay=0.0, failures=0):
+        self.rows = {}
+        self.batches = []
+        self.delay = delay
+        self.failures = failures
+
+    async def bulk_upsert(self, rows):
+        await asyncio.sleep(self.delay)
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("database unavailable")
+        self.batches.append(len(rows))
+        for row in rows:
+            self.rows[row['transaction_hash']] = row
+
+def trade(i, amount=1):
+    return {'transaction_hash': f"0x{i:064x}", 'amount_in': amount}
+
+@pytest.mark.asyncio
+async def test_flushes_on_batch_size_and_interval():
+    table = FakeTable()
+    buffer = WriteBehindBuffer(table.bulk_upsert, max_batch=10, flush_interval=0.05)
+    buffer.start()
+
+    for i in range(25):
+        await buffer.put(trade(i))
+    await asyncio.sleep(0.01)
+    assert sum(table.batches) >= 20
+    assert all(size <= 10 for size in table.batches)
+
+    await asyncio.sleep(0.1)
+    assert len(table.rows) == 25
+    await buffer.close()
+
+@pytest.mark.asyncio
+async def test_repeated_rows_coalesce():
+    table = FakeTable()
+    buffer = WriteBehindBuffer(table.bulk_upsert, max_batch=100, flush_interval=60)
+    await buffer.put(trade(1, amount=1))
+    await buffer.put(trade(1, amount=2))
+
+    assert len(buffer) == 1
+    await buffer.flush()
+    assert table.rows[trade(1)['transaction_hash']]['amount_in'] == 2
+    assert buffer.stats['coalesced'] == 1
+
+@pytest.mark.asyncio
+async def test_backpressure_when_database_lags():
+    table = FakeTable(delay=0.05)
+    buffer = WriteBehindBuffer(table.bulk_upsert, max_batch=5, flush_interval=60, max_pending=5)
+    buffer.start()
+
+    for i in range(5):
+        await buffer.put(trade(i))
+    blocked = asyncio.create_task(buffer.put(trade(5)))
+    await asyncio.sleep(0.01)
+    assert not blocked.done()
+
+    await asyncio.wait_for(blocked, timeout=1)
+    assert buffer.stats['backpressure_waits'] == 1
+    await buffer.close()
+    assert len(table.rows) == 6
+
+@pytest.mark.asyncio
+async def test_failed_flush_is_retried_and_close_drains():
+    table = FakeTable(failures=1)
+    buffer = WriteBehindBuffer(table.bulk_upsert, max_batch=2, flush_interval=0.01, retry_delay=0.01)
+    buffer.start()
+    for i in range(3):
+        await buffer.put(trade(i))
+
+    await buffer.close()
+
+    assert len(table.rows) == 3
+    assert buffer.stats['failures'] == 1
+    assert len(buffer) == 0
+    with pytest.raises(RuntimeError):
+        await buffer.put(trade(4))
+
+@pytest.mark.asyncio
+async def test_on_flush_reports_written_and_superseded_rows():
+    table = FakeTable()
+    flushed = []
+    buffer = WriteBehindBuffer(table.bulk_upsert, max_batch=10, on_flush=flushed.extend)
+    await buffer.put({**trade(1), 'seq': 0})
+    await buffer.put({**trade(2), 'seq': 1})
+    await buffer.put({**trade(1, amount=2), 'seq': 2})
+    await buffer.flush()
+    assert sorted(row['seq'] for row in flushed) == [0, 1, 2]
+    assert table.rows[trade(1)['transaction_hash']]['amount_in'] == 2
+
+@pytest.mark.asyncio
+async def test_row_that_keeps_failing_is_dead_lettered():
+    table = FakeTable()
+    poison = trade(0)['transaction_hash']
+
+    async def upsert(rows):
+        if any(row['transaction_hash'] == poison for row in rows):
+            raise ValueError("numeric field overflow")
+        await table.bulk_upsert(rows)
+
+    dead = []
+    buffer = WriteBehindBuffer(upsert, max_batch=8, max_row_failures=3, on_dead_letter=dead.extend)
+    for i in range(20):
+        await buffer.put(trade(i))
+    # Later rows keep arriving while the poisoned one is retried
+    arrived = 0
+    while len(buffer):
+        try:
+            await buffer.flush()
+        except ValueError:
+            arrived += 1
+            await buffer.put(trade(100 + arrived))
+        assert arrived < 20
+
+    assert [row['transaction_hash'] for row in dead] == [poison]
+    assert len(table.rows) == 19 + arrived and poison not in table.rows
+    assert buffer.get_metrics()['dead_lettered'] == 1 and buffer.get_metrics()['suspect'] == 0
+
+@pytest.mark.asyncio
+async def test_outage_does_not_dead_letter_rows():
+    table = FakeTable(failures=30)
+    dead = []
+    buffer = WriteBehindBuffer(table.bulk_upsert, max_batch=8, max_row_failures=2, on_dead_letter=dead.extend)
+    for i in range(20):
+        await buffer.put(trade(i))
+    for _ in range(30):
+        with pytest.raises(ConnectionError):
+            await buffer.flush()
+    assert buffer.get_metrics()['batch_limit'] == 1
+
+    await buffer.flush()
+    assert dead == [] and len(table.rows) == 20
@@ -0,0 +1,156 @@
+import asyncio
+import json
+import time
+from decimal import Decimal
+import pytest
+from src.api.ws_connection import ClientConnection, SLOW_CONSUMER_CLOSE_CODE
+from src.api.websocket import WebSocketManager
+
+class FakeWebSocket:
+    """Records sent messages; each send takes ``delay`` seconds."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.sent = []
+        self.close_code = None
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, frame):
+        await asyncio.sleep(self.delay)
+        self.sent.append(json.loads(frame))
+
+    async def close(self, code=1000):
+        self.close_code = code
+
+@pytest.mark.asyncio
+async def test_slow_client_does_not_stall_broadcast():
+    manager = WebSocketManager()
+    fast, slow = FakeWebSocket(), FakeWebSocket(delay=0.05)
+    await manager.connect(fast, pairs=['WETH/USDC'])
+    await manager.connect(slow, pairs=['WETH/USDC'])
+
+    started = time.perf_counter()
+    for i in range(20):
+        await manager.broadcast_trade('WETH/USDC', {'i': i})
+    assert time.perf_counter() - started < 0.05
+
+    await asyncio.sleep(0.02)
+    assert [m['i'] for m in fast.sent] == list(range(20))
+    assert len(slow.sent) < 5
+    metrics = manager.get_metrics()
+    assert metrics['broadcasts'] == 20
+    assert metrics['enqueued'] == 40
+    assert metrics['queue_depth_max'] > 10
+    await manager.disconnect(fast)
+    await manager.disconnect(slow)
+    assert manager.active_connections == {} and manager.get_metrics()['subscriptions']['topics'] == 0
+
+@pytest.mark.asyncio
+async def test_full_queue_drops_oldest_and_recovers():
+    ws = FakeWebSocket(delay=0.01)
+    client = ClientConnection(ws, max_queue=5, max_lag=10)
+    client.start()
+    for i in range(20):
+        client.send(i)
+    assert client.lossy
+    assert client.stats['dropped'] == 15
+
+    await asyncio.sleep(0.1)
+    assert ws.sent == list(range(15, 20))
+    assert not client.lossy
+    assert client.stats['sent'] == 5
+    await client.close()
+
+@pytest.mark.asyncio
+async def test_lagging_client_is_evicted():
+    manager = WebSocketManager()
+    stuck, healthy = FakeWebSocket(delay=10), FakeWebSocket()
+    await manager.connect(stuck, pairs=['WETH/USDC'])
+    await manager.connect(healthy, pairs=['WETH/USDC'])
+    manager.active_connections[stuck].max_lag = 0.02
+
+    await manager.broadcast_trade('WETH/USDC', {'i': 0})
+    await manager.broadcast_trade('WETH/USDC', {'i': 1})
+    await asyncio.sleep(0.05)
+    await manager.broadcast_trade('WETH/USDC', {'i': 2})
+    await asyncio.sleep(0.01)
+
+    assert stuck.close_code == SLOW_CONSUMER_CLOSE_CODE
+    assert list(manager.active_connections) == [healthy]
+    assert [m['i'] for m in healthy.sent] == [0, 1, 2]
+    assert manager.get_metrics()['evicted'] == 1
+    await manager.disconnect(healthy)
+
+@pytest.mark.asyncio
+async def test_blocked_send_times_out():
+    ws = FakeWebSocket(delay=10)
+    closed = []
+    client = ClientConnection(ws, max_lag=10, send_timeout=0.02, on_close=closed.append)
+    client.start()
+    assert client.send({'i': 0})
+    await asyncio.sleep(0.05)
+    assert not client.send({'i': 1})
+    await asyncio.sleep(0)
+    assert closed == [client]
+    assert ws.close_code == SLOW_CONSUMER_CLOSE_CODE
+    assert client.stats['evicted']
+
+@pytest.mark.asyncio
+async def test_broadcast_encodes_frame_once():
+    manager = WebSocketManager()
+    sockets = [FakeWebSocket(delay=1) for _ in range(3)]
+    for ws in sockets:
+        await manager.connect(ws, pairs=['WETH/USDC'])
+    await manager.broadcast_trade('WETH/USDC', {'price': Decimal('1.5')})
+
+    frames = [manager.active_connections[ws]._queue[-1][1] for ws in sockets]
+    assert all(frame is frames[0] for frame in frames)
+    assert json.loads(frames[0]) == {'price': '1.5'}
+    for ws in sockets:
+        await manager.disconnect(ws)
+
+@pytest.mark.asyncio
+async def test_dynamic_subscriptions_through_messages():
+    manager = WebSocketManager()
+    ws = FakeWebSocket()
+    await manager.connect(ws)
+
+    assert manager.handle_message(ws, {'action': 'subscribe', 'channel': 'trades', 'pairs': ['weth/usdc', 'WBTC/USDC']}) == {
+        'type': 'subscribed', 'channel': 'trades', 'pairs': ['weth/usdc', 'WBTC/USDC']
+    }
+    manager.handle_message(ws, {'action': 'subscribe', 'channel': 'performance'})
+    manager.handle_message(ws, {'action': 'unsubscribe', 'channel': 'trades', 'pairs': 'WBTC/USDC'})
+    assert manager.handle_message(ws, {'action': 'subscriptions'})['subscriptions'] == ['performance:*', 'trades:WETH/USDC']
+    assert manager.handle_message(ws, {'action': 'subscribe', 'channel': 'orders'})['type'] == 'error'
+    assert manager.handle_message(ws, {'action': 'subscribe', 'pairs': [1]})['type'] == 'error'
+
+    await manager.broadcast_trade('WETH/USDC', {'i': 0})
+    await manager.broadcast_trade('WBTC/USDC', {'i': 1})
+    await manager.broadcast({'type': 'performance'}, 'performance')
+    await asyncio.sleep(0.01)
+    assert ws.sent == [{'i': 0}, {'type': 'performance'}]
+
+    await manager.disconnect(ws)
+    await manager.disconnect(ws)
+    assert manager.get_metrics()['subscriptions']['topics'] == 0
+
+@pytest.mark.asyncio
+async def test_performance_snapshots_are_published_on_change():
+    from src.trading.performance_tracker import PerformanceTracker
+
+    manager = WebSocketManager()
+    ws = FakeWebSocket()
+    await manager.connect(ws)
+    manager.handle_message(ws, {'action': 'subscribe', 'channel': 'performance'})
+    tracker = PerformanceTracker()
+    publisher = asyncio.create_task(manager.run_performance(tracker, 0.01))
+
+    await asyncio.sleep(0.05)
+    await tracker.add_trade({'timestamp': time.time(), 'price': 10.0, 'amount': 1.0, 'type': 'sell', 'pnl': 5.0})
+    await asyncio.sleep(0.05)
+    publisher.cancel()
+
+    assert [m['data']['total_trades'] for m in ws.sent] == [0, 1]
+    await manager.disconnect(ws)